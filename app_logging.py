@@ -0,0 +1,213 @@
+"""
+Journalisation structurée (JSON) et asynchrone pour Sport Connect
+
+Le thread de la requête ne fait qu'ajouter le contexte (request_id, route,
+utilisateur) et déposer l'enregistrement dans une file bornée, sans attendre :
+la mise en forme JSON et l'écriture (fichier avec rotation et/ou stdout) sont
+faites par un thread d'écriture. File pleine : l'enregistrement est abandonné
+et compté plutôt que de ralentir la requête.
+
+Les lignes verbeuses (niveau DEBUG : corps de requêtes, réponses du LLM) sont
+échantillonnées (LOG_DEBUG_SAMPLE_RATE) et tronquées (LOG_BODY_CHARS).
+
+Variables d'environnement :
+    LOG_LEVEL (INFO), LOG_FILE (logs/sportconnect.log, '{pid}' remplacé par le
+    pid du processus, vide = pas de fichier), LOG_MAX_BYTES (10 Mo),
+    LOG_BACKUP_COUNT (5), LOG_STDOUT (1), LOG_QUEUE_SIZE (10000),
+    LOG_DEBUG_SAMPLE_RATE (0.1), LOG_BODY_CHARS (200)
+"""
+
+from datetime import datetime, timezone
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import uuid
+
+from flask import g, has_request_context, request
+
+from metrics import count_log_dropped
+
+REQUEST_ID_HEADER = 'X-Request-Id'
+
+BODY_CHARS = int(os.environ.get('LOG_BODY_CHARS', 200))
+
+# Identifiant de requête transmis par un proxy : accepté s'il est raisonnable
+_REQUEST_ID_RE = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+# Attributs standard d'un LogRecord (tout le reste est un champ structuré)
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_queue_handler = None
+_listener = None
+
+
+def truncate(text, limit=None):
+    """Tronque un texte journalisé (corps de requête ou de réponse)"""
+    limit = BODY_CHARS if limit is None else limit
+    text = text if isinstance(text, str) else repr(text)
+    return text if len(text) <= limit else f"{text[:limit]}… (+{len(text) - limit} car.)"
+
+
+# ===========================
+# IDENTIFIANT DE REQUÊTE
+# ===========================
+
+def assign_request_id():
+    """À appeler en début de requête : reprend X-Request-Id ou en génère un"""
+    incoming = request.headers.get(REQUEST_ID_HEADER, '')
+    g.request_id = incoming if _REQUEST_ID_RE.match(incoming) else uuid.uuid4().hex[:16]
+    return g.request_id
+
+
+def current_request_id():
+    return g.get('request_id') if has_request_context() else None
+
+
+# ===========================
+# FILTRES ET FORMAT
+# ===========================
+
+class RequestContextFilter(logging.Filter):
+    """Ajoute request_id, route, méthode, chemin et utilisateur (thread de la requête)"""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get('request_id')
+            record.endpoint = request.endpoint
+            record.method = request.method
+            record.path = request.path
+            # Utilisateur déjà chargé par Flask-Login, sans requête SQL supplémentaire
+            user = g.get('_login_user')
+            if user is not None and getattr(user, 'is_authenticated', False):
+                record.user_id = user.id
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Ne garde qu'une fraction des enregistrements DEBUG ; les autres niveaux passent tous"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        return self.rate >= 1 or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement, champs supplémentaires (extra=...) compris"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'pid': record.process,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui abandonne (et compte) au lieu de bloquer si la file est pleine"""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            count_log_dropped()
+
+    def prepare(self, record):
+        # Seul le message est résolu ici ; la mise en forme JSON se fait dans le thread d'écriture
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# ===========================
+# INSTALLATION
+# ===========================
+
+def _output_handlers():
+    formatter = JsonFormatter()
+    handlers = []
+    log_file = os.environ.get('LOG_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                       'logs', 'sportconnect.log'))
+    if log_file:
+        # '{pid}' : un fichier par processus, seule façon de garder la rotation sûre avec plusieurs
+        # workers (défaut de gunicorn.conf.py ; le fichier unique ne convient qu'à un seul processus)
+        log_file = log_file.replace('{pid}', str(os.getpid()))
+        if os.path.dirname(log_file):
+            os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=int(os.environ.get('LOG_MAX_BYTES', 10 * 1024 * 1024)),
+            backupCount=int(os.environ.get('LOG_BACKUP_COUNT', 5)), encoding='utf-8'))
+    if os.environ.get('LOG_STDOUT', '1').lower() not in ('0', 'false', 'no'):
+        handlers.append(logging.StreamHandler(sys.stdout))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def _start_listener():
+    global _listener
+    _queue_handler.queue = queue.Queue(int(os.environ.get('LOG_QUEUE_SIZE', 10000)))
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *_output_handlers(),
+                                               respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging():
+    """Vide la file et arrête le thread d'écriture (appelé à la sortie du processus)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def configure_logging():
+    """
+    Installe la journalisation JSON asynchrone sur le logger racine (idempotent)
+
+    Après un fork (workers gunicorn avec preload), le thread d'écriture est
+    relancé dans l'enfant avec une file neuve.
+    """
+    global _queue_handler
+    if _queue_handler is not None:
+        return
+    _queue_handler = NonBlockingQueueHandler(queue.Queue())
+    _queue_handler.addFilter(SamplingFilter(float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', 0.1))))
+    _queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+
+    _start_listener()
+    atexit.register(stop_logging)
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_start_listener)
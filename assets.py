@@ -0,0 +1,168 @@
+"""
+Assets statiques de Sport Connect (JS / CSS)
+Construit des bundles minifiés aux noms contenant un hash du contenu,
+avec un manifeste et des versions précompressées (gzip, brotli)
+
+Usage :
+    python assets.py            # construit static/dist/
+    python assets.py --clean    # supprime aussi les fichiers d'anciens builds
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_NAME = 'manifest.json'
+
+# Bundles : nom logique (utilisé dans les templates) -> fichiers sources dans static/
+# L'ordre des sources est l'ordre de concaténation
+BUNDLES = {
+    'style.css': ['style.css'],
+    'main.js': ['main.js'],
+    'js/index.js': ['js/index.js'],
+    'js/map.js': ['js/map.js'],
+    'js/chatbot.js': ['js/chatbot.js'],
+}
+
+# Les petits fichiers ne gagnent rien à être compressés
+COMPRESS_MIN_BYTES = 1024
+
+
+# Les minifieurs et brotli ne servent qu'au build : l'application n'importe que AssetManifest
+
+def _brotli():
+    """Module brotli, ou None (optionnel : seuls les .gz sont alors générés)"""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def minify(name, source):
+    """Minifie une source JS ou CSS selon l'extension du bundle"""
+    if name.endswith('.js'):
+        import rjsmin
+        return rjsmin.jsmin(source)
+    if name.endswith('.css'):
+        import rcssmin
+        return rcssmin.cssmin(source)
+    return source
+
+
+def hashed_name(name, content):
+    """'js/index.js' -> 'js/index.<hash>.js'"""
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    stem, ext = os.path.splitext(name)
+    return f'{stem}.{digest}{ext}'
+
+
+def _write_atomic(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def write_compressed(path, content):
+    """Écrit les versions .gz et .br à côté du fichier"""
+    if len(content) < COMPRESS_MIN_BYTES:
+        return []
+    written = [path + '.gz']
+    # mtime=0 : build reproductible
+    _write_atomic(path + '.gz', gzip.compress(content, compresslevel=9, mtime=0))
+    brotli = _brotli()
+    if brotli is not None:
+        _write_atomic(path + '.br', brotli.compress(content, quality=11))
+        written.append(path + '.br')
+    return written
+
+
+def build(clean=False):
+    """
+    Construit tous les bundles dans static/dist/ et écrit le manifeste
+
+    Returns:
+        dict: {nom logique: chemin relatif à static/ du fichier hashé}
+    """
+    manifest = {}
+    produced = {os.path.join(DIST_DIR, MANIFEST_NAME)}
+
+    for name, sources in BUNDLES.items():
+        parts = []
+        for source in sources:
+            with open(os.path.join(STATIC_DIR, source), 'r', encoding='utf-8') as f:
+                parts.append(f.read())
+        # ';' entre les fichiers JS : une source sans point-virgule final reste valide
+        separator = '\n;\n' if name.endswith('.js') else '\n'
+        original = separator.join(parts)
+        content = minify(name, original).encode('utf-8')
+
+        filename = hashed_name(name, content)
+        path = os.path.join(DIST_DIR, filename)
+        if not os.path.exists(path):
+            _write_atomic(path, content)
+        produced.add(path)
+        produced.update(write_compressed(path, content))
+
+        manifest[name] = f'dist/{filename}'
+        print(f"  {name:<16} {len(original.encode('utf-8')):>8} -> {len(content):>7} octets  {filename}")
+
+    _write_atomic(os.path.join(DIST_DIR, MANIFEST_NAME),
+                  json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+    if clean:
+        for root, _, files in os.walk(DIST_DIR):
+            for filename in files:
+                path = os.path.join(root, filename)
+                if path not in produced:
+                    os.remove(path)
+                    print(f"  supprimé : {os.path.relpath(path, DIST_DIR)}")
+
+    return manifest
+
+
+class AssetManifest:
+    """
+    Résout les noms logiques d'assets vers leurs fichiers hashés
+
+    Le manifeste est relu si le fichier change (nouveau build sans redémarrage).
+    Sans manifeste, les noms sont servis tels quels depuis static/.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._mtime = None
+        self._entries = {}
+
+    def _reload(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            self._mtime, self._entries = None, {}
+            return
+        if mtime != self._mtime:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+            self._mtime = mtime
+
+    def resolve(self, name):
+        """Chemin relatif à static/ du fichier à servir pour un nom logique"""
+        self._reload()
+        return self._entries.get(name, name)
+
+
+if __name__ == '__main__':
+    print("Construction des assets statiques...")
+    if _brotli() is None:
+        print("  (module brotli absent : seuls les fichiers .gz sont générés)")
+    result = build(clean='--clean' in sys.argv)
+    print(f"✅ {len(result)} bundles écrits dans {os.path.relpath(DIST_DIR)}")
@@ -0,0 +1,313 @@
+"""
+Sauvegardes en ligne de Sport Connect (API de sauvegarde SQLite)
+Copier database.db pendant que l'application tourne peut produire un fichier
+incohérent (écriture en cours, pages encore dans le WAL). La copie passe donc
+par sqlite3.Connection.backup, qui lit un instantané cohérent :
+
+- base en WAL : une seule étape (un lecteur WAL ne bloque pas les écrivains,
+  et l'instantané ne bouge pas pendant la copie) ;
+- autre journal : BACKUP_PAGES pages par étape avec une pause entre deux, pour
+  laisser le verrou aux écrivains ; si les écritures font recommencer la copie
+  trop souvent, dernière passe en une seule étape.
+
+La copie est compressée (gzip) dans BACKUP_DIR puis les plus anciennes sont
+supprimées (on en garde BACKUP_KEEP). verify ouvre chaque sauvegarde et lance
+PRAGMA integrity_check ; restore recopie une sauvegarde vérifiée dans la base
+(après avoir sauvegardé l'état courant).
+
+Usage :
+    python backup.py backup
+    python backup.py list
+    python backup.py verify [fichier ...]   # toutes les sauvegardes par défaut
+    python backup.py restore fichier
+
+Variables d'environnement :
+    BACKUP_DIR (backups/), BACKUP_KEEP (7), BACKUP_PAGES (1024), BACKUP_SLEEP_MS (5),
+    BACKUP_COMPRESSLEVEL (1 : la compression domine la durée, 9 = plus petit mais ~4x plus lent),
+    BACKUP_INTERVAL_HOURS (0 = pas de sauvegarde programmée, sinon tâche périodique)
+"""
+
+from datetime import datetime
+import argparse
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from db import DATABASE_PATH, connect_db, sqlite_connect
+from metrics import observe_backup
+
+logger = logging.getLogger('sportconnect.backup')
+
+BACKUP_DIR = os.environ.get('BACKUP_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backups'))
+# Sauvegardes conservées (les plus récentes)
+KEEP = int(os.environ.get('BACKUP_KEEP', 7))
+# Pages copiées par étape et pause entre deux étapes (journal hors WAL)
+PAGES = int(os.environ.get('BACKUP_PAGES', 1024))
+SLEEP_SECONDS = float(os.environ.get('BACKUP_SLEEP_MS', 5)) / 1000
+COMPRESSLEVEL = int(os.environ.get('BACKUP_COMPRESSLEVEL', 1))
+# Intervalle de la tâche périodique (app.py), 0 = désactivée
+INTERVAL_SECONDS = float(os.environ.get('BACKUP_INTERVAL_HOURS', 0)) * 3600
+# Redémarrages de la copie tolérés avant la passe en une étape
+MAX_RESTARTS = 3
+
+PREFIX = 'sportconnect-'
+SUFFIX = '.db.gz'
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def _copy(src, dst, pages, sleep):
+    """
+    Copie src dans dst par étapes de `pages` pages
+
+    Returns:
+        tuple: (étapes, redémarrages, pages copiées)
+    """
+    state = {'steps': 0, 'restarts': 0, 'remaining': None, 'total': 0}
+
+    def progress(status, remaining, total):
+        # Une écriture d'une autre connexion fait recommencer la copie : le reste remonte
+        if state['remaining'] is not None and remaining > state['remaining']:
+            state['restarts'] += 1
+            if state['restarts'] > MAX_RESTARTS:
+                raise _TooManyRestarts()
+        state['steps'] += 1
+        state['remaining'] = remaining
+        state['total'] = total
+
+    src.backup(dst, pages=pages, progress=progress, sleep=sleep)
+    return state['steps'], state['restarts'], state['total']
+
+
+def _backup_name(backup_dir, label=None):
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    name = PREFIX + stamp + (f'-{label}' if label else '')
+    path = os.path.join(backup_dir, name + SUFFIX)
+    n = 1
+    while os.path.exists(path):
+        path = os.path.join(backup_dir, f'{name}-{n}{SUFFIX}')
+        n += 1
+    return path
+
+
+def create_backup(db_path=DATABASE_PATH, backup_dir=BACKUP_DIR, keep=KEEP, pages=PAGES, label=None):
+    """
+    Sauvegarde compressée de la base, puis rotation
+
+    Returns:
+        dict: Chemin, tailles, durées (copie, compression), étapes et sauvegardes supprimées
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    path = _backup_name(backup_dir, label)
+    raw_path = path[:-len('.gz')] + '.tmp'
+    started = time.perf_counter()
+    try:
+        src = connect_db(db_path)
+        dst = sqlite3.connect(raw_path)
+        try:
+            journal_mode = src.execute('PRAGMA journal_mode').fetchone()[0].lower()
+            if journal_mode == 'wal':
+                steps, restarts, total = _copy(src, dst, -1, 0)
+            else:
+                try:
+                    steps, restarts, total = _copy(src, dst, pages, SLEEP_SECONDS)
+                except _TooManyRestarts:
+                    logger.warning("Copie recommencée trop souvent, dernière passe en une étape")
+                    steps, restarts, total = _copy(src, dst, -1, 0)
+                    restarts += MAX_RESTARTS + 1
+            # Fichier autonome (sans -wal / -shm) quel que soit le mode de la base
+            dst.execute('PRAGMA journal_mode=DELETE')
+        finally:
+            dst.close()
+            src.close()
+        copied = time.perf_counter()
+
+        with open(raw_path, 'rb') as raw, gzip.open(path + '.tmp', 'wb', compresslevel=COMPRESSLEVEL) as compressed:
+            shutil.copyfileobj(raw, compressed, 1024 * 1024)
+        os.replace(path + '.tmp', path)
+        size = os.path.getsize(raw_path)
+    except BaseException:
+        observe_backup('error', time.perf_counter() - started)
+        for leftover in (path + '.tmp', path):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        raise
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+    finished = time.perf_counter()
+
+    removed = rotate(backup_dir, keep)
+    observe_backup('done', finished - started)
+    result = {
+        'path': path,
+        'journal_mode': journal_mode,
+        'pages': total,
+        'steps': steps,
+        'restarts': restarts,
+        'size': size,
+        'compressed_size': os.path.getsize(path),
+        'copy_s': round(copied - started, 3),
+        'compress_s': round(finished - copied, 3),
+        'duration_s': round(finished - started, 3),
+        'removed': removed,
+    }
+    logger.info("Sauvegarde terminée", extra={key: value for key, value in result.items() if key != 'removed'})
+    return result
+
+
+def list_backups(backup_dir=BACKUP_DIR):
+    """Sauvegardes présentes, de la plus récente à la plus ancienne"""
+    if not os.path.isdir(backup_dir):
+        return []
+    backups = []
+    for name in os.listdir(backup_dir):
+        if name.startswith(PREFIX) and name.endswith(SUFFIX):
+            path = os.path.join(backup_dir, name)
+            stat = os.stat(path)
+            backups.append({
+                'name': name,
+                'path': path,
+                'size': stat.st_size,
+                'mtime': stat.st_mtime,
+                'created_at': datetime.fromtimestamp(stat.st_mtime).isoformat(sep=' ', timespec='seconds'),
+            })
+    backups.sort(key=lambda backup: backup['mtime'], reverse=True)
+    return backups
+
+
+def rotate(backup_dir=BACKUP_DIR, keep=KEEP):
+    """Supprime les sauvegardes au-delà des `keep` plus récentes (noms supprimés)"""
+    removed = []
+    for backup in list_backups(backup_dir)[keep:]:
+        os.remove(backup['path'])
+        removed.append(backup['name'])
+    return removed
+
+
+def _decompress(path, directory):
+    fd, raw_path = tempfile.mkstemp(suffix='.db', dir=directory)
+    with os.fdopen(fd, 'wb') as raw, gzip.open(path, 'rb') as compressed:
+        shutil.copyfileobj(compressed, raw, 1024 * 1024)
+    return raw_path
+
+
+def verify_backup(path):
+    """
+    Décompresse la sauvegarde et vérifie son intégrité
+
+    Returns:
+        dict: ok, résultat d'integrity_check, nombre de tables, d'utilisateurs et d'activités
+    """
+    started = time.perf_counter()
+    result = {'name': os.path.basename(path), 'ok': False}
+    raw_path = None
+    try:
+        raw_path = _decompress(path, os.path.dirname(os.path.abspath(path)))
+        conn = sqlite3.connect(f'file:{raw_path}?mode=ro', uri=True)
+        try:
+            result['integrity'] = [row[0] for row in conn.execute('PRAGMA integrity_check')]
+            result['tables'] = conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0]
+            result['users'] = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+            result['events'] = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        finally:
+            conn.close()
+        result['ok'] = result['integrity'] == ['ok']
+    except (OSError, EOFError, sqlite3.Error) as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        if raw_path and os.path.exists(raw_path):
+            os.remove(raw_path)
+    result['duration_s'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def restore_backup(path, db_path=DATABASE_PATH, backup_dir=BACKUP_DIR):
+    """
+    Remplace le contenu de la base par une sauvegarde vérifiée
+
+    L'état courant est d'abord sauvegardé (étiquette 'avant-restauration'). La
+    recopie passe elle aussi par l'API de sauvegarde : les connexions ouvertes
+    voient directement le nouveau contenu.
+
+    Returns:
+        dict: Vérification de la sauvegarde et sauvegarde de l'état précédent
+    """
+    check = verify_backup(path)
+    if not check['ok']:
+        raise ValueError(f"Sauvegarde invalide : {check.get('error') or check.get('integrity')}")
+    previous = create_backup(db_path, backup_dir, keep=KEEP + 1, label='avant-restauration')
+    raw_path = _decompress(path, backup_dir)
+    try:
+        src = sqlite3.connect(raw_path)
+        dst = sqlite_connect(db_path, timeout=30)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+    finally:
+        os.remove(raw_path)
+    logger.warning("Base restaurée", extra={'backup': os.path.basename(path), 'previous': previous['path']})
+    return {'verified': check, 'previous': previous['path']}
+
+
+# ===========================
+# LIGNE DE COMMANDE
+# ===========================
+
+def _size(n):
+    return f"{n / 1024 / 1024:.1f} Mo"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('backup', help="Nouvelle sauvegarde + rotation")
+    commands.add_parser('list', help="Sauvegardes présentes")
+    verify = commands.add_parser('verify', help="Vérifie l'intégrité des sauvegardes")
+    verify.add_argument('files', nargs='*')
+    restore = commands.add_parser('restore', help="Remplace la base par une sauvegarde")
+    restore.add_argument('file')
+    args = parser.parse_args(argv)
+
+    if args.command == 'backup':
+        result = create_backup()
+        print(f"✓ {result['path']}")
+        print(f"  {_size(result['size'])} -> {_size(result['compressed_size'])} compressé, "
+              f"{result['pages']} pages en {result['steps']} étape(s), {result['restarts']} redémarrage(s)")
+        print(f"  copie {result['copy_s']} s + compression {result['compress_s']} s = {result['duration_s']} s")
+        for name in result['removed']:
+            print(f"  supprimée (rotation) : {name}")
+    elif args.command == 'list':
+        for backup in list_backups():
+            print(f"{backup['created_at']}  {_size(backup['size']):>10}  {backup['name']}")
+    elif args.command == 'verify':
+        paths = args.files or [backup['path'] for backup in list_backups()]
+        failures = 0
+        for path in paths:
+            result = verify_backup(path)
+            if result['ok']:
+                print(f"✓ {result['name']} : {result['tables']} tables, {result['users']} utilisateurs, "
+                      f"{result['events']} activités ({result['duration_s']} s)")
+            else:
+                failures += 1
+                print(f"❌ {result['name']} : {result.get('error') or result.get('integrity')}")
+        return 1 if failures else 0
+    elif args.command == 'restore':
+        result = restore_backup(args.file)
+        print(f"✓ Base restaurée depuis {args.file}")
+        print(f"  État précédent sauvegardé dans {result['previous']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Benchmark : durée d'une sauvegarde en ligne et impact sur la latence des requêtes
+Usage : python benchmarks/bench_backup.py [--db /tmp/loadtest.db | --scale 0.02] [--journal wal] [--seconds 5]
+
+1. Latence de référence (POST d'un message + GET du chat d'une activité, en boucle).
+2. Même boucle pendant que d'autres processus enchaînent des sauvegardes
+   (backup.create_backup : API de sauvegarde SQLite, puis gzip).
+
+Affiche la durée des sauvegardes (copie, compression, étapes, redémarrages) et
+les p50 / p95 / p99 / max des requêtes dans les deux cas. Sans --db, une base
+synthétique est générée (generate_dataset.py). Travaille sur une copie temporaire.
+"""
+
+import argparse
+from multiprocessing import Event, Process, Queue
+import os
+import queue
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _backup_loop(db_path, backup_dir, pages, stop, results):
+    import backup
+    while not stop.is_set():
+        results.put(backup.create_backup(db_path, backup_dir, keep=2, pages=pages))
+
+
+def measure(client, user_event, seconds):
+    """Durées (ms) des requêtes exécutées pendant `seconds` secondes"""
+    event_id = user_event[1]
+    durations = []
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        if i % 2:
+            response = client.post(f'/api/event/{event_id}/messages', json={'content': f'bench {i}'})
+        else:
+            response = client.get(f'/api/event/{event_id}/messages')
+        durations.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.status_code
+        i += 1
+    return durations
+
+
+def summarize(label, durations):
+    durations = sorted(durations)
+
+    def pct(p):
+        return durations[min(len(durations) - 1, int(len(durations) * p))]
+    print(f"{label:<26} {len(durations):>7} {statistics.median(durations):>8.2f} {pct(0.95):>8.2f} "
+          f"{pct(0.99):>8.2f} {durations[-1]:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--db', help="Base à copier (défaut : base synthétique générée)")
+    parser.add_argument('--scale', type=float, default=0.02, help="Échelle de la base générée")
+    parser.add_argument('--journal', default='wal', choices=('wal', 'delete'))
+    parser.add_argument('--pages', type=int, default=1024, help="Pages par étape (journal hors WAL)")
+    parser.add_argument('--processes', type=int, default=1, help="Processus de sauvegarde en parallèle")
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='bench_backup_')
+    try:
+        db_path = os.path.join(tmp_dir, 'database.db')
+        if args.db:
+            shutil.copy(args.db, db_path)
+        else:
+            subprocess.run([sys.executable, os.path.join(ROOT, 'benchmarks', 'generate_dataset.py'),
+                            '--output', db_path, '--scale', str(args.scale)], check=True,
+                           stdout=subprocess.DEVNULL)
+        conn = sqlite3.connect(db_path)
+        conn.execute(f'PRAGMA journal_mode={args.journal}')
+        user_event = conn.execute(
+            "SELECT organizer_id, id FROM events WHERE organizer_id IS NOT NULL ORDER BY id LIMIT 1").fetchone()
+        conn.close()
+        print(f"Base : {os.path.getsize(db_path) / 1024 / 1024:.1f} Mo, journal {args.journal}, "
+              f"{os.cpu_count()} CPU (sauvegardes et requêtes se partagent les cœurs)")
+
+        os.environ.update({'DATABASE_PATH': db_path, 'LOG_STDOUT': '0', 'LOG_FILE': '', 'RATE_LIMIT': 'off',
+                           'JOBS_WORKER': 'off', 'WRITER_WAL': 'on' if args.journal == 'wal' else 'off'})
+        from app import app
+        app.config['TESTING'] = True
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_event[0])
+            session['_fresh'] = True
+
+        measure(client, user_event, 1)  # échauffement
+        baseline = measure(client, user_event, args.seconds)
+
+        stop, results = Event(), Queue()
+        workers = [Process(target=_backup_loop, args=(db_path, os.path.join(tmp_dir, f'backups{i}'),
+                                                      args.pages, stop, results))
+                   for i in range(args.processes)]
+        for worker in workers:
+            worker.start()
+        during = measure(client, user_event, args.seconds)
+        stop.set()
+        # Vider la file avant join : un processus qui y a écrit ne se termine qu'une fois lu
+        backups = []
+        while any(worker.is_alive() for worker in workers) or not results.empty():
+            try:
+                backups.append(results.get(timeout=0.1))
+            except queue.Empty:
+                pass
+        for worker in workers:
+            worker.join()
+
+        print()
+        print(f"{len(backups)} sauvegarde(s) pendant la mesure")
+        if backups:
+            print(f"  durée médiane {statistics.median(b['duration_s'] for b in backups):.3f} s "
+                  f"(copie {statistics.median(b['copy_s'] for b in backups):.3f} s, "
+                  f"compression {statistics.median(b['compress_s'] for b in backups):.3f} s)")
+            print(f"  {backups[0]['size'] / 1024 / 1024:.1f} Mo -> "
+                  f"{backups[0]['compressed_size'] / 1024 / 1024:.1f} Mo, "
+                  f"étapes {max(b['steps'] for b in backups)}, "
+                  f"redémarrages {sum(b['restarts'] for b in backups)}")
+        print()
+        print(f"{'requêtes (ms)':<26} {'n':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+        print('-' * 70)
+        summarize('sans sauvegarde', baseline)
+        summarize('pendant les sauvegardes', during)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark : réponse complète vs 304 sur les routes JSON avec ETag
+Usage : python benchmarks/bench_conditional_get.py [--places 500] [--events 300] [--messages 2000] [--runs 200]
+
+Travaille sur une copie temporaire de database.db (migrations déjà appliquées),
+enrichie de lieux, d'événements et de messages pour que la sérialisation ait un coût réaliste.
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seed(db_path, nb_places, nb_events, nb_messages):
+    """Ajoute des lieux, événements et messages de test, retourne (user_id, event_id)"""
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    c.executemany(
+        "INSERT INTO places (name, city, address, latitude, longitude, sports) VALUES (?, ?, ?, ?, ?, ?)",
+        [(f'Gymnase {i}', 'Paris', f'{i} rue du Sport', 48.85 + i * 1e-4, 2.35, 'Football,Basketball')
+         for i in range(nb_places)]
+    )
+    c.execute("SELECT organizer_id, id FROM events WHERE organizer_id IS NOT NULL ORDER BY id LIMIT 1")
+    user_id, event_id = c.fetchone()
+    c.execute("SELECT username FROM users WHERE id = ?", (user_id,))
+    username = c.fetchone()[0]
+    c.executemany(
+        "INSERT INTO events (organisateur, sport, niveau, lieu, date_heure, organizer_id, latitude, longitude) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(username, 'Football', 'Débutant', f'Stade {i}', 'samedi 14h', user_id, 48.85, 2.35 + i * 1e-4)
+         for i in range(nb_events)]
+    )
+    c.executemany(
+        "INSERT INTO messages (event_id, user_id, username, content) VALUES (?, ?, ?, ?)",
+        [(event_id, user_id, username, f'Message de test numéro {i}') for i in range(nb_messages)]
+    )
+    conn.commit()
+    conn.close()
+    return user_id, event_id
+
+
+def measure(client, url, runs, headers=None):
+    """Retourne (statut, durées en ms) pour `runs` requêtes GET"""
+    durations = []
+    status = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        response = client.get(url, headers=headers or {})
+        durations.append((time.perf_counter() - start) * 1000)
+        status = response.status_code
+    return status, durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--places', type=int, default=500)
+    parser.add_argument('--events', type=int, default=300)
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='bench_etag_')
+    db_path = os.path.join(tmp_dir, 'database.db')
+    shutil.copy(os.path.join(ROOT, 'database.db'), db_path)
+    os.environ['DATABASE_PATH'] = db_path
+    sys.path.insert(0, ROOT)
+
+    user_id, event_id = seed(db_path, args.places, args.events, args.messages)
+
+    from app import app
+    app.config['TESTING'] = True
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+    urls = ['/api/places', '/api/events/map', f'/api/event/{event_id}/messages']
+
+    print(f"{'Route':<32} {'200 (ms)':>10} {'304 (ms)':>10} {'Gain':>8}")
+    print('-' * 64)
+    try:
+        for url in urls:
+            etag = client.get(url).headers['ETag']
+            full_status, full = measure(client, url, args.runs)
+            cached_status, cached = measure(client, url, args.runs, {'If-None-Match': etag})
+            assert full_status == 200 and cached_status == 304, (url, full_status, cached_status)
+            full_ms = statistics.median(full)
+            cached_ms = statistics.median(cached)
+            print(f"{url:<32} {full_ms:>10.3f} {cached_ms:>10.3f} {full_ms / cached_ms:>7.1f}x")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
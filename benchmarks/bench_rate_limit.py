@@ -0,0 +1,124 @@
+"""
+Benchmark : coût du limiteur de débit (seaux à jetons)
+Usage : python benchmarks/bench_rate_limit.py [--calls 20000] [--processes 4] [--runs 300]
+
+1. Coût d'un appel consume() : seaux en mémoire, seaux SQLite (un processus),
+   seaux SQLite partagés par --processes processus en parallèle (contention du verrou).
+2. Surcoût de bout en bout sur POST /api/event/<id>/messages, limiteur actif
+   (budget assez large pour ne jamais refuser) puis désactivé.
+
+Travaille sur une copie temporaire de database.db et une base de seaux temporaire.
+"""
+
+import argparse
+from multiprocessing import Pool
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from rate_limit import MemoryBuckets, SQLiteBuckets  # noqa: E402
+
+# Budget jamais atteint : seul le coût de la vérification est mesuré
+UNLIMITED = {'burst': 10 ** 9, 'per_minute': 10 ** 9}
+
+
+def time_consume(buckets, calls, keys=50):
+    """Durées (µs) de `calls` appels consume() répartis sur `keys` seaux"""
+    durations = []
+    for i in range(calls):
+        key = f"bench:user:{i % keys}"
+        started = time.perf_counter()
+        buckets.consume(key, 10 ** 9, 10 ** 9)
+        durations.append((time.perf_counter() - started) * 1e6)
+    return durations
+
+
+def _worker(args):
+    path, calls = args
+    return time_consume(SQLiteBuckets(path), calls)
+
+
+def summarize(label, durations):
+    durations = sorted(durations)
+    p99 = durations[int(len(durations) * 0.99) - 1]
+    print(f"{label:<38} {statistics.mean(durations):>9.1f} {statistics.median(durations):>9.1f} {p99:>9.1f}")
+
+
+def bench_buckets(tmp_dir, calls, processes):
+    print(f"{'consume()':<38} {'moy. µs':>9} {'méd. µs':>9} {'p99 µs':>9}")
+    print('-' * 68)
+    summarize('mémoire', time_consume(MemoryBuckets(), calls))
+
+    path = os.path.join(tmp_dir, 'ratelimit.db')
+    summarize('SQLite, 1 processus', time_consume(SQLiteBuckets(path), calls))
+
+    with Pool(processes) as pool:
+        results = pool.map(_worker, [(path, calls // processes)] * processes)
+    summarize(f'SQLite, {processes} processus en parallèle', [d for result in results for d in result])
+
+
+def bench_route(tmp_dir, runs):
+    db_path = os.path.join(tmp_dir, 'database.db')
+    shutil.copy(os.path.join(ROOT, 'database.db'), db_path)
+    os.environ['DATABASE_PATH'] = db_path
+    os.environ['RATE_LIMIT_DB'] = os.path.join(tmp_dir, 'ratelimit_app.db')
+    os.environ['LOG_STDOUT'] = '0'
+    os.environ['LOG_FILE'] = ''
+
+    conn = sqlite3.connect(db_path)
+    user_id, event_id = conn.execute(
+        "SELECT organizer_id, id FROM events WHERE organizer_id IS NOT NULL ORDER BY id LIMIT 1").fetchone()
+    conn.close()
+
+    from app import app
+    from extensions import rate_limiter
+    app.config['TESTING'] = True
+    rate_limiter.rules = {name: dict(UNLIMITED) for name in rate_limiter.rules}
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+    url = f'/api/event/{event_id}/messages'
+    print()
+    print(f"POST {url} ({runs} requêtes, médiane)")
+    results = {}
+    for enabled in (True, False, True, False):
+        rate_limiter.enabled = enabled
+        durations = []
+        for i in range(runs):
+            started = time.perf_counter()
+            response = client.post(url, json={'content': f'bench {i}'})
+            durations.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, response.status_code
+        # Deux passes alternées : on garde la meilleure (la première sert d'échauffement)
+        results[enabled] = min(results.get(enabled, float('inf')), statistics.median(durations))
+    print(f"  limiteur actif     : {results[True]:.3f} ms")
+    print(f"  limiteur désactivé : {results[False]:.3f} ms")
+    print(f"  surcoût            : {(results[True] - results[False]) * 1000:+.0f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=20000)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--runs', type=int, default=300)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='bench_ratelimit_')
+    try:
+        bench_buckets(tmp_dir, args.calls, args.processes)
+        bench_route(tmp_dir, args.runs)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""
+Benchmark : démarrage d'un worker (étape schéma, ou import complet avec --boot)
+Usage : python benchmarks/bench_startup.py [--runs 200] [--journal wal] [--hold-ms 20]
+        python benchmarks/bench_startup.py --boot [--runs 10] [--budget-ms 500]
+
+Avant migrate.py, chaque worker exécutait init_db() à l'import de app.py : PRAGMA
+auto_vacuum, CREATE TABLE / INDEX IF NOT EXISTS puis commit. Même quand tout
+existe déjà, ce DDL prend le verrou d'écriture ; il attend donc derrière les
+écritures en cours (et échoue en 'database is locked' au-delà du timeout).
+check_schema ne fait qu'une lecture de schema_version.
+
+Deux situations, chaque mesure sur une connexion neuve (comme un worker qui démarre) :
+1. base au repos ;
+2. un autre processus enchaîne des transactions d'écriture de --hold-ms ms.
+
+Avec --boot : `import app` (create_app compris) dans un interpréteur neuf, --runs
+fois, sous -X importtime. Affiche la durée médiane, les modules les plus coûteux et
+vérifie que les modules importés à la demande (LAZY_MODULES) ne sont pas chargés.
+Code de sortie 1 si la médiane dépasse --budget-ms (BOOT_BUDGET_MS) ou si un module
+paresseux est chargé au démarrage : utilisable en intégration continue.
+
+Travaille sur une copie temporaire de database.db.
+"""
+
+import argparse
+import re
+from multiprocessing import Event, Process
+import os
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from migrate import check_schema  # noqa: E402
+
+# init_db() tel qu'il tournait dans chaque worker avant les migrations versionnées
+LEGACY_INIT_DB = [
+    "PRAGMA auto_vacuum = INCREMENTAL",
+    '''CREATE TABLE IF NOT EXISTS events
+       (id INTEGER PRIMARY KEY AUTOINCREMENT, organisateur TEXT, sport TEXT, niveau TEXT,
+        lieu TEXT, date_heure TEXT, accessibilite TEXT)''',
+    '''CREATE TABLE IF NOT EXISTS messages
+       (id INTEGER PRIMARY KEY AUTOINCREMENT, event_id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+        username TEXT NOT NULL, content TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''',
+    "CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)",
+    '''CREATE TABLE IF NOT EXISTS jobs
+       (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, args TEXT NOT NULL DEFAULT '{}',
+        status TEXT NOT NULL DEFAULT 'queued', attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL DEFAULT 3, run_at TIMESTAMP NOT NULL, locked_by TEXT,
+        locked_until TIMESTAMP, last_error TEXT, created_at TIMESTAMP NOT NULL, finished_at TIMESTAMP)''',
+    "CREATE INDEX IF NOT EXISTS idx_jobs_status_run_at ON jobs(status, run_at)",
+]
+
+
+def legacy_init_db(db_path):
+    conn = sqlite3.connect(db_path)
+    for statement in LEGACY_INIT_DB:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+def _writer_loop(db_path, hold_seconds, stop):
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    while not stop.is_set():
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE users SET points = points WHERE id = (SELECT MIN(id) FROM users)")
+        time.sleep(hold_seconds)
+        conn.execute("COMMIT")
+        time.sleep(0.001)
+    conn.close()
+
+
+def measure(fn, db_path, runs):
+    """Durées (ms) des appels réussis et nombre d'échecs"""
+    durations, failures = [], 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        try:
+            fn(db_path)
+        except sqlite3.OperationalError:
+            failures += 1
+            continue
+        durations.append((time.perf_counter() - started) * 1000)
+    return durations, failures
+
+
+def summarize(label, durations, failures):
+    if not durations:
+        print(f"{label:<34} {'-':>8} {'-':>8} {'-':>8} {failures:>7}")
+        return
+    durations = sorted(durations)
+    p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+    print(f"{label:<34} {statistics.median(durations):>8.2f} {p95:>8.2f} {durations[-1]:>8.2f} {failures:>7}")
+
+
+# ===========================
+# IMPORT COMPLET (--boot)
+# ===========================
+
+# Importés à la première utilisation, jamais au démarrage d'un worker
+LAZY_MODULES = ('requests', 'PIL', 'profiling', 'memory_profiling', 'llm', 'suggestions', 'dates')
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def boot_once(db_path):
+    """Un démarrage : durée totale (ms) et {module: (self_us, cumulative_us)} de niveau quelconque"""
+    env = dict(os.environ, DATABASE_PATH=db_path, LOG_STDOUT='0', LOG_FILE='', JOBS_WORKER='off')
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    wall = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        sys.exit(f"import app a échoué :\n{result.stderr[-2000:]}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return wall, modules
+
+
+def run_boot(db_path, runs, budget_ms, top):
+    walls, samples = [], []
+    for _ in range(runs):
+        wall, modules = boot_once(db_path)
+        walls.append(wall)
+        samples.append(modules)
+
+    wall = statistics.median(walls)
+    import_app = statistics.median(m['app'][1] for m in samples if 'app' in m) / 1000
+    print(f"{runs} démarrages (python -c 'import app', interpréteur neuf)")
+    print(f"{'processus complet (ms)':<34} p50 {wall:>8.1f}   min {min(walls):>8.1f}   budget {budget_ms:.0f}")
+    print(f"{'import app (ms, cumulé)':<34} p50 {import_app:>8.1f}")
+
+    # Coût propre médian de chaque module (hors dépendances), les plus lourds d'abord
+    names = set().union(*samples)
+    self_ms = {name: statistics.median(m.get(name, (0, 0))[0] for m in samples) / 1000 for name in names}
+    print()
+    print(f"{'module (coût propre)':<44} {'ms':>8}")
+    print('-' * 54)
+    for name, ms in sorted(self_ms.items(), key=lambda item: -item[1])[:top]:
+        print(f"{name:<44} {ms:>8.2f}")
+
+    loaded = sorted({name.split('.')[0] for name in names} & set(LAZY_MODULES))
+    print()
+    failed = False
+    if loaded:
+        print(f"ÉCHEC : modules paresseux chargés au démarrage : {', '.join(loaded)}")
+        failed = True
+    else:
+        print(f"ok : aucun de {', '.join(LAZY_MODULES)} chargé au démarrage")
+    if wall > budget_ms:
+        print(f"ÉCHEC : démarrage médian {wall:.1f} ms > budget {budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, help="200 pour l'étape schéma, 10 avec --boot")
+    parser.add_argument('--journal', default='wal', choices=('wal', 'delete'))
+    parser.add_argument('--hold-ms', type=float, default=20.0, help="durée d'une transaction d'écriture concurrente")
+    parser.add_argument('--boot', action='store_true', help="mesurer l'import complet de app.py")
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('BOOT_BUDGET_MS', 500)),
+                        help="durée médiane maximale d'un démarrage avec --boot")
+    parser.add_argument('--top', type=int, default=15, help="modules affichés avec --boot")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='bench_startup_')
+    try:
+        db_path = os.path.join(tmp_dir, 'database.db')
+        shutil.copy(os.path.join(ROOT, 'database.db'), db_path)
+        conn = sqlite3.connect(db_path)
+        conn.execute(f'PRAGMA journal_mode={args.journal}')
+        conn.close()
+
+        if args.boot:
+            return run_boot(db_path, args.runs or 10, args.budget_ms, args.top)
+
+        args.runs = args.runs or 200
+        print(f"{args.runs} démarrages par mesure, journal {args.journal}")
+        print(f"{'étape schéma (ms)':<34} {'p50':>8} {'p95':>8} {'max':>8} {'échecs':>7}")
+        print('-' * 70)
+        summarize('repos : init_db (avant)', *measure(legacy_init_db, db_path, args.runs))
+        summarize('repos : check_schema', *measure(check_schema, db_path, args.runs))
+
+        stop = Event()
+        writer = Process(target=_writer_loop, args=(db_path, args.hold_ms / 1000, stop))
+        writer.start()
+        time.sleep(0.2)
+        try:
+            summarize('écritures : init_db (avant)', *measure(legacy_init_db, db_path, args.runs))
+            summarize('écritures : check_schema', *measure(check_schema, db_path, args.runs))
+        finally:
+            stop.set()
+            writer.join()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Benchmark : première requête d'un worker neuf, sans et avec préchauffage (warmup.py)
+Usage : python benchmarks/bench_warmup.py [--runs 5] [--steady 20]
+
+Chaque mesure démarre un interpréteur neuf (comme un worker après un déploiement),
+importe l'application, appelle warm_up() ou non, puis demande chaque page une
+première fois et --steady fois ensuite (régime établi, médiane).
+
+Travaille sur une copie temporaire de database.db.
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ROUTES = ['/', '/map', '/calendar', '/profile', '/chatbot', '/notifications', '/api/events/map', '/api/places']
+
+
+def _worker(warm, user_id, steady, results):
+    """Processus neuf : durées (ms) de la première requête et médiane des suivantes, par route"""
+    from app import app
+    if warm:
+        from warmup import warm_up
+        warm_up(app)
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+    timings = {}
+    for url in ROUTES:
+        durations = []
+        for _ in range(steady + 1):
+            started = time.perf_counter()
+            response = client.get(url)
+            durations.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, (url, response.status_code)
+        timings[url] = (durations[0], statistics.median(durations[1:]))
+    results.put(timings)
+
+
+def measure(warm, user_id, runs, steady):
+    """Médiane sur `runs` processus de (première requête, régime établi) par route"""
+    context = multiprocessing.get_context('spawn')
+    samples = []
+    for _ in range(runs):
+        results = context.Queue()
+        process = context.Process(target=_worker, args=(warm, user_id, steady, results))
+        process.start()
+        samples.append(results.get())
+        process.join()
+    return {url: (statistics.median(s[url][0] for s in samples),
+                  statistics.median(s[url][1] for s in samples)) for url in ROUTES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5, help="processus neufs par configuration")
+    parser.add_argument('--steady', type=int, default=20, help="requêtes suivantes par route")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='bench_warmup_')
+    try:
+        db_path = os.path.join(tmp_dir, 'database.db')
+        shutil.copy(os.path.join(ROOT, 'database.db'), db_path)
+        conn = sqlite3.connect(db_path)
+        user_id = conn.execute("SELECT id FROM users ORDER BY id LIMIT 1").fetchone()[0]
+        conn.close()
+
+        # Hérité par les processus neufs
+        os.environ.update({
+            'DATABASE_PATH': db_path,
+            'RATE_LIMIT_DB': os.path.join(tmp_dir, 'ratelimit.db'),
+            'LOG_STDOUT': '0',
+            'LOG_FILE': '',
+            'JOBS_WORKER': 'off',
+        })
+
+        cold = measure(False, user_id, args.runs, args.steady)
+        warm = measure(True, user_id, args.runs, args.steady)
+
+        print(f"{args.runs} processus neufs par configuration, médianes en ms")
+        print(f"{'route':<20} {'1re (froid)':>12} {'1re (préchauffé)':>17} {'régime établi':>14}")
+        print('-' * 66)
+        for url in ROUTES:
+            print(f"{url:<20} {cold[url][0]:>12.1f} {warm[url][0]:>17.1f} {warm[url][1]:>14.1f}")
+        print('-' * 66)
+        print(f"{'total':<20} {sum(v[0] for v in cold.values()):>12.1f} "
+              f"{sum(v[0] for v in warm.values()):>17.1f} {sum(v[1] for v in warm.values()):>14.1f}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+"""
+Vérification du proxy d'images (image_proxy.py, route /img/<key>) contre une origine locale
+Usage : python benchmarks/check_image_proxy.py [-k motif]
+
+Une origine HTTP locale (thread) sert des images, des erreurs et des types refusés,
+et compte les requêtes reçues. Chaque vérification part d'un cache disque vide :
+téléchargement unique puis succès de cache, éviction LRU au-delà de max_bytes,
+échecs de l'origine (erreur HTTP, type non image ou SVG, taille, origine injoignable)
+et réponses de la route (en-têtes de cache, 304, 502, clé non signée).
+
+Code de sortie 1 si une vérification échoue (détail de l'erreur affiché).
+"""
+
+import argparse
+import collections
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+KB = 1024
+# Chemin -> (statut, Content-Type, corps) servis par l'origine locale
+ORIGIN_FILES = {
+    '/a.png': (200, 'image/png', b'\x89PNG' + b'a' * (10 * KB)),
+    '/b.jpg': (200, 'image/jpeg', b'\xff\xd8' + b'b' * (10 * KB)),
+    '/c.webp': (200, 'image/webp; charset=binary', b'RIFF' + b'c' * (10 * KB)),
+    '/big.png': (200, 'image/png', b'\x89PNG' + b'x' * (200 * KB)),
+    '/page.html': (200, 'text/html', b'<script>alert(1)</script>'),
+    '/logo.svg': (200, 'image/svg+xml', b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(1)</script></svg>'),
+    '/error.png': (500, 'text/plain', b'erreur'),
+    '/missing.png': (404, 'text/plain', b'introuvable'),
+}
+
+
+# ===========================
+# ORIGINE LOCALE
+# ===========================
+
+class OriginHandler(BaseHTTPRequestHandler):
+    """Sert ORIGIN_FILES et compte les requêtes par chemin"""
+    requests = collections.Counter()
+
+    def do_GET(self):
+        OriginHandler.requests[self.path] += 1
+        status, content_type, body = ORIGIN_FILES.get(self.path, (404, 'text/plain', b''))
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_origin():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OriginHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def closed_port_url():
+    """URL d'un port local où personne n'écoute"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}/a.png"
+
+
+class Context:
+    """Origine, cache disque vide et client de test d'une vérification"""
+
+    def __init__(self, origin_url, cache_dir, app):
+        from extensions import image_cache
+        from image_proxy import DiskImageCache
+
+        OriginHandler.requests.clear()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        self.origin_url = origin_url
+        self.cache_dir = cache_dir
+        self.app = app
+        # Le cache de l'application (route /img/<key>) repart de zéro
+        self.app_cache = image_cache
+        for name in ('hits', 'misses', 'evictions', 'origin_errors'):
+            setattr(image_cache, name, 0)
+        self.DiskImageCache = DiskImageCache
+
+    def url(self, path):
+        return self.origin_url + path
+
+    def cache(self, **kwargs):
+        return self.DiskImageCache(self.cache_dir, **{'max_bytes': 1024 * KB, **kwargs})
+
+    def proxied(self, path):
+        """URL /img/<key> émise par l'application pour une image de l'origine"""
+        from blueprints.core import proxied_image
+        with self.app.test_request_context():
+            return proxied_image(self.url(path))
+
+
+def expect_origin_error(cache, url, message):
+    from image_proxy import OriginError
+    try:
+        cache.fetch(url)
+    except OriginError as e:
+        assert message in str(e), f"{url} : {e}, attendu « {message} »"
+    else:
+        raise AssertionError(f"{url} : accepté, OriginError attendue")
+    assert cache.get(url) is None, f"{url} : mis en cache malgré l'échec"
+
+
+# ===========================
+# VÉRIFICATIONS
+# ===========================
+
+def check_download_once_then_hit(ctx):
+    cache = ctx.cache()
+    url = ctx.url('/a.png')
+    path, meta = cache.fetch(url)
+    with open(path, 'rb') as f:
+        assert f.read() == ORIGIN_FILES['/a.png'][2]
+    assert meta['content_type'] == 'image/png' and meta['size'] == len(ORIGIN_FILES['/a.png'][2])
+    for _ in range(5):
+        assert cache.fetch(url)[0] == path
+    assert OriginHandler.requests['/a.png'] == 1, f"{OriginHandler.requests['/a.png']} téléchargements"
+    assert (cache.hits, cache.misses) == (5, 1)
+    # Un autre processus (autre instance, même dossier) profite du cache
+    assert ctx.cache().fetch(url)[0] == path and OriginHandler.requests['/a.png'] == 1
+
+
+def check_content_type_parameters(ctx):
+    _, meta = ctx.cache().fetch(ctx.url('/c.webp'))
+    assert meta['content_type'] == 'image/webp'
+
+
+def check_lru_eviction(ctx):
+    # Place pour deux images de 10 Ko, pas trois
+    cache = ctx.cache(max_bytes=25 * KB)
+    a, b, c = ctx.url('/a.png'), ctx.url('/b.jpg'), ctx.url('/c.webp')
+    cache.fetch(a)
+    cache.fetch(b)
+    # Dates de dernier accès explicites : a plus récente que b
+    now = time.time()
+    os.utime(cache._paths(cache.key_for(b))[1], (now - 60, now - 60))
+    os.utime(cache._paths(cache.key_for(a))[1], (now - 30, now - 30))
+    cache.fetch(c)
+    assert cache.get(b) is None, "l'entrée la moins récemment utilisée n'a pas été évincée"
+    assert cache.get(a) is not None and cache.get(c) is not None
+    assert cache.evictions == 1
+    assert cache.stats()['bytes'] <= 25 * KB
+    # Évincée : de nouveau téléchargée
+    cache.fetch(b)
+    assert OriginHandler.requests['/b.jpg'] == 2
+
+
+def check_image_too_large(ctx):
+    cache = ctx.cache(max_image_bytes=100 * KB)
+    expect_origin_error(cache, ctx.url('/big.png'), 'trop volumineuse')
+    assert not [name for name in os.listdir(ctx.cache_dir) if name.endswith('.tmp')], "fichier temporaire laissé"
+
+
+def check_origin_http_errors(ctx):
+    cache = ctx.cache()
+    expect_origin_error(cache, ctx.url('/error.png'), 'HTTP 500')
+    expect_origin_error(cache, ctx.url('/missing.png'), 'HTTP 404')
+    # Pas de cache négatif : l'origine rétablie est de nouveau interrogée
+    expect_origin_error(cache, ctx.url('/error.png'), 'HTTP 500')
+    assert OriginHandler.requests['/error.png'] == 2
+    assert cache.origin_errors == 3
+
+
+def check_refused_content_types(ctx):
+    cache = ctx.cache()
+    expect_origin_error(cache, ctx.url('/page.html'), 'text/html')
+    # SVG : peut contenir du script, servi depuis notre domaine ce serait une XSS stockée
+    expect_origin_error(cache, ctx.url('/logo.svg'), 'image/svg+xml')
+
+
+def check_origin_unreachable(ctx):
+    cache = ctx.cache(timeout=2)
+    expect_origin_error(cache, closed_port_url(), 'ConnectionError')
+
+
+def check_route_serves_cached_image(ctx):
+    client = ctx.app.test_client()
+    url = ctx.proxied('/a.png')
+    response = client.get(url)
+    assert response.status_code == 200, response.status_code
+    assert response.data == ORIGIN_FILES['/a.png'][2]
+    assert response.mimetype == 'image/png'
+    assert 'immutable' in response.headers['Cache-Control'], response.headers['Cache-Control']
+    assert response.headers.get('X-Content-Type-Options') == 'nosniff'
+    etag = response.headers['ETag']
+    response.close()
+
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304, response.status_code
+    response.close()
+    assert OriginHandler.requests['/a.png'] == 1
+    assert ctx.app_cache.hits == 1 and ctx.app_cache.misses == 1
+
+
+def check_route_origin_failure(ctx):
+    client = ctx.app.test_client()
+    for path in ('/error.png', '/logo.svg'):
+        response = client.get(ctx.proxied(path))
+        assert response.status_code == 502, f"{path} : {response.status_code}"
+        assert response.headers['Cache-Control'] == 'no-store'
+    assert ctx.app_cache.origin_errors == 2
+
+
+def check_route_rejects_unsigned_key(ctx):
+    response = ctx.app.test_client().get('/img/' + 'x' * 40)
+    assert response.status_code == 404, response.status_code
+    assert sum(OriginHandler.requests.values()) == 0
+
+
+CHECKS = {name[len('check_'):]: fn for name, fn in list(globals().items()) if name.startswith('check_')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('-k', dest='pattern', help="Seulement les vérifications dont le nom contient ce motif")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='check_image_proxy_')
+    cache_dir = os.path.join(tmp_dir, 'images')
+    # Avant l'import de l'application : base de schéma à jour, cache d'images temporaire
+    os.environ.update({
+        'DATABASE_PATH': os.path.join(tmp_dir, 'database.db'),
+        'IMAGE_CACHE_DIR': cache_dir,
+        'RATE_LIMIT': 'off',
+        'RATE_LIMIT_STORAGE': 'memory',
+        'JOBS_WORKER': 'off',
+        'LOG_STDOUT': '0',
+        'LOG_FILE': '',
+    })
+    server, origin_url = start_origin()
+    results = []
+    try:
+        from migrate import upgrade
+        upgrade(os.environ['DATABASE_PATH'], echo=lambda *args: None)
+        from app import app
+        app.config['TESTING'] = True
+
+        for name, check in CHECKS.items():
+            if args.pattern and args.pattern not in name:
+                continue
+            started = time.perf_counter()
+            try:
+                check(Context(origin_url, cache_dir, app))
+                error = None
+            except Exception:
+                error = traceback.format_exc()
+            results.append((name, (time.perf_counter() - started) * 1000, error))
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    failures = [(name, error) for name, _, error in results if error]
+    for name, duration, error in results:
+        print(f"{'ÉCHEC' if error else 'ok':<6} {name:<32} {duration:>8.1f} ms")
+    for name, error in failures:
+        print(f"\n--- {name}\n{error}")
+    print(f"\n{len(results) - len(failures)}/{len(results)} vérifications réussies")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,328 @@
+"""
+Vérification des plans d'exécution des requêtes SQL des routes principales
+Usage : python benchmarks/check_query_plans.py [--scale 0.05] [--database /tmp/plans.db] [--verbose]
+
+Génère une base représentative (generate_dataset.py, schéma de database.db), appelle
+les routes principales avec le client de test Flask et capture chaque instruction SQL
+exécutée avec son EXPLAIN QUERY PLAN. Sort en erreur (code 1) si une instruction :
+- parcourt entièrement une grande table (SCAN, index automatique) sans y être autorisée ;
+- utilise un tri temporaire (USE TEMP B-TREE) sur une grande table sans y être autorisée ;
+- n'utilise pas l'index attendu par EXPECTATIONS.
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Une table est « grande » au-delà de ce nombre de lignes dans la base générée
+LARGE_TABLE_ROWS = 1000
+
+# Attentes par instruction (motif sur le SQL normalisé, premier motif qui correspond) :
+#   index : nom d'index qui doit apparaître dans le plan ('rowid' pour la clé primaire)
+#   scan : grandes tables dont le parcours complet est assumé
+#   temp_btree : tri temporaire assumé (résultat borné)
+#   why : justification, affichée dans le rapport
+EXPECTATIONS = [
+    # Fil d'actualité et carte : toutes les activités, sans pagination
+    {'match': r"^SELECT \* FROM events WHERE is_cancelled = \?( AND genre = \?)? ORDER BY id DESC$",
+     'scan': {'events'}, 'why': "fil complet, dans l'ordre des id"},
+    {'match': r"^SELECT \* FROM events WHERE is_cancelled = \? AND sport = \?", 'index': 'idx_events_sport'},
+    {'match': r"^SELECT \* FROM events WHERE is_cancelled = \? AND niveau = \?", 'index': 'idx_events_niveau'},
+    {'match': r"^SELECT \* FROM events WHERE is_cancelled = \? AND lieu LIKE \?",
+     'scan': {'events'}, 'why': "LIKE '%...%' ne peut pas utiliser d'index"},
+    {'match': r"^SELECT id FROM participations WHERE event_id = \? AND user_id = \?$",
+     'index': 'sqlite_autoindex_participations_1'},
+
+    # Synchronisation incrémentale
+    {'match': r"FROM events WHERE likelihood\(row_version > \?", 'index': 'idx_events_row_version',
+     'temp_btree': True, 'why': "tri du delta, petit par construction"},
+    {'match': r"^SELECT event_id FROM event_tombstones WHERE row_version > \?$",
+     'index': 'idx_event_tombstones_version'},
+    {'match': r"^SELECT event_id, COUNT\(\*\) as count FROM participations WHERE event_id IN",
+     'index': 'idx_participations_event'},
+
+    # Calendrier et contexte du coach : activités de l'utilisateur
+    {'match': r"FROM events e LEFT JOIN participations p ON e\.id = p\.event_id AND p\.user_id = \? "
+              r"WHERE e\.is_cancelled = \? AND \(p\.id IS NOT NULL OR e\.organizer_id = \?\)",
+     'scan': {'events'}, 'temp_btree': True,
+     'why': "OR entre inscription et organisation : pas d'index possible sans réécriture en UNION"},
+    {'match': r"FROM events e LEFT JOIN users u ON e\.organizer_id = u\.id WHERE e\.is_cancelled = \? "
+              r"AND e\.id NOT IN",
+     'scan': {'events'}, 'index': 'sqlite_autoindex_participations_1',
+     'why': "ORDER BY id DESC LIMIT 20 : le parcours s'arrête aux 20 premières"},
+
+    # Profil
+    {'match': r"^SELECT \* FROM events WHERE organizer_id = \?", 'index': 'idx_events_organizer'},
+    {'match': r"FROM participations p JOIN events e ON p\.event_id = e\.id WHERE p\.user_id = \?",
+     'index': 'idx_participations_user', 'temp_btree': True, 'why': "tri des inscriptions d'un seul utilisateur"},
+    {'match': r"FROM events e JOIN users u ON e\.organizer_id = u\.id WHERE e\.is_cancelled = \? ORDER BY e\.id DESC",
+     'scan': {'events'}, 'why': "liste complète des activités"},
+
+    # Chat d'une activité
+    {'match': r"FROM messages m LEFT JOIN users u ON m\.user_id = u\.id WHERE m\.event_id = \?",
+     'index': 'idx_messages_event'},
+
+    # Notifications : boîte d'un utilisateur et fan-out à l'écriture
+    {'match': r"FROM notifications WHERE user_id = \? ORDER BY id DESC", 'index': 'idx_notifications_user'},
+    {'match': r"^UPDATE notifications SET message = \?", 'index': 'idx_notifications_unread_event'},
+    {'match': r"^SELECT user_id FROM participations WHERE event_id = \? UNION SELECT organizer_id FROM events",
+     'index': 'idx_participations_event', 'temp_btree': True,
+     'why': "UNION : dédoublonnage des destinataires d'une seule activité"},
+
+    # Administration : listes complètes
+    {'match': r"FROM events e LEFT JOIN users u ON e\.organizer_id = u\.id ORDER BY e\.id DESC",
+     'scan': {'events'}, 'why': "liste d'administration complète"},
+    {'match': r"^SELECT u\.\*, \(SELECT COUNT\(\*\) FROM events WHERE organizer_id = u\.id\)",
+     'scan': {'users'}, 'index': 'idx_events_organizer', 'why': "liste d'administration complète"},
+]
+
+# Scénarios : (nom, méthode, URL, corps JSON) ; {event_id} = activité de l'utilisateur avec messages
+SCENARIOS = [
+    ('index', 'GET', '/', None),
+    ('index (sport)', 'GET', '/?sport=Tennis', None),
+    ('index (niveau)', 'GET', '/?niveau=Expert', None),
+    ('index (sport, niveau, genre)', 'GET', '/?sport=Tennis&niveau=Expert&genre=Mixte', None),
+    ('index (lieu)', 'GET', '/?lieu=Stade', None),
+    ('map', 'GET', '/map', None),
+    ('api map', 'GET', '/api/events/map', None),
+    ('changes', 'GET', '/api/events/changes?since={since}', None),
+    ('calendar', 'GET', '/calendar', None),
+    ('profile', 'GET', '/profile', None),
+    ('chatbot context', 'POST', '/api/chatbot', {'message': 'Du tennis samedi ?', 'history': []}),
+    ('messages', 'GET', '/api/event/{event_id}/messages', None),
+    ('messages (since)', 'GET', '/api/event/{event_id}/messages?since=1', None),
+    ('post message', 'POST', '/api/event/{event_id}/messages', {'content': 'Plan de requête'}),
+    ('api notifications', 'GET', '/api/notifications', None),
+    ('notifications', 'GET', '/notifications', None),
+    ('admin events', 'GET', '/admin/events', None),
+    ('admin users', 'GET', '/admin/users', None),
+    ('admin places', 'GET', '/admin/places', None),
+    ('api places', 'GET', '/api/places', None),
+]
+
+_TABLE_REF_RE = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!WHERE|ON|LEFT|JOIN|ORDER|GROUP|LIMIT|INNER)(\w+))?",
+                           re.IGNORECASE)
+
+
+# ===========================
+# BASE REPRÉSENTATIVE
+# ===========================
+
+def build_database(path, scale, seed):
+    """Génère la base de test avec generate_dataset.py (schéma et index de database.db)"""
+    subprocess.run([sys.executable, os.path.join(BENCHMARKS_DIR, 'generate_dataset.py'),
+                    '--output', path, '--scale', str(scale), '--seed', str(seed)],
+                   check=True, stdout=subprocess.DEVNULL)
+
+
+def large_tables(path):
+    conn = sqlite3.connect(path)
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    large = {table for table in tables
+             if conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] >= LARGE_TABLE_ROWS}
+    conn.close()
+    return large
+
+
+def pick_fixtures(path):
+    """Utilisateur le plus actif (rendu admin) et une de ses activités avec des messages"""
+    conn = sqlite3.connect(path)
+    user_id = conn.execute(
+        "SELECT user_id FROM participations GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+    event_id = conn.execute("""
+        SELECT m.event_id FROM messages m
+        JOIN participations p ON p.event_id = m.event_id AND p.user_id = ?
+        GROUP BY m.event_id ORDER BY COUNT(*) DESC LIMIT 1
+    """, (user_id,)).fetchone()[0]
+    since = conn.execute("SELECT MAX(row_version) - 20 FROM events").fetchone()[0]
+    conn.execute("UPDATE users SET is_admin = 1 WHERE id = ?", (user_id,))
+    conn.commit()
+    conn.close()
+    return {'user_id': user_id, 'event_id': event_id, 'since': since}
+
+
+# ===========================
+# CAPTURE DES INSTRUCTIONS
+# ===========================
+
+def capture_plans(fixtures):
+    """
+    Exécute les scénarios et capture le plan de chaque instruction distincte
+
+    Returns:
+        list: (scénario, SQL normalisé, lignes du plan, erreur EXPLAIN, statut HTTP)
+    """
+    import perf
+    import slow_queries
+    from app import app
+
+    captured = {}
+    current = {'scenario': None}
+
+    def on_statement(connection, sql, parameters, duration):
+        key = (current['scenario'], slow_queries.normalize_sql(sql))
+        if key not in captured:
+            captured[key] = slow_queries.explain(connection, sql, parameters)
+
+    # Seuil 0 : chaque exécution passe par l'observateur des requêtes lentes
+    perf.slow_statement_hooks[:] = [on_statement]
+    perf.slow_threshold = 0
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(fixtures['user_id'])
+        session['_fresh'] = True
+
+    statuses = {}
+    for name, method, url, body in SCENARIOS:
+        current['scenario'] = name
+        response = client.open(url.format(**fixtures), method=method, json=body)
+        statuses[name] = response.status_code
+
+    perf.slow_threshold = None
+    return [(scenario, sql, plan, error, statuses[scenario])
+            for (scenario, sql), (plan, error) in captured.items()]
+
+
+# ===========================
+# RÈGLES
+# ===========================
+
+def table_aliases(sql):
+    """Alias -> table d'après les clauses FROM / JOIN"""
+    aliases = {}
+    for table, alias in _TABLE_REF_RE.findall(sql):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+
+def find_expectation(sql):
+    for expectation in EXPECTATIONS:
+        if re.search(expectation['match'], sql):
+            return expectation
+    return None
+
+
+def check_plan(sql, plan, large):
+    """
+    Returns:
+        tuple: (liste des problèmes, attente utilisée ou None)
+    """
+    expectation = find_expectation(sql) or {}
+    aliases = table_aliases(sql)
+    allowed_scans = expectation.get('scan', set())
+    statement_tables = set(aliases.values())
+    problems = []
+
+    for line in plan:
+        detail = line.strip()
+        words = detail.split()
+        if len(words) < 2 or words[0] not in ('SCAN', 'SEARCH'):
+            continue
+        table = aliases.get(words[1], words[1])
+        if table not in large:
+            continue
+        if words[0] == 'SCAN' and table not in allowed_scans:
+            problems.append(f"parcours complet de {table} : {detail}")
+        elif 'AUTOMATIC' in detail:
+            problems.append(f"index automatique (index manquant) sur {table} : {detail}")
+
+    if not expectation.get('temp_btree') and statement_tables & large:
+        problems.extend(f"tri temporaire : {line.strip()}" for line in plan
+                        if line.strip().startswith('USE TEMP B-TREE'))
+
+    expected_index = expectation.get('index')
+    if expected_index:
+        marker = 'INTEGER PRIMARY KEY' if expected_index == 'rowid' else expected_index
+        if not any(marker in line for line in plan):
+            problems.append(f"index attendu non utilisé : {expected_index}")
+
+    return problems, expectation or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scale', type=float, default=0.05, help="Taille de la base générée (1.0 = production)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', help="Base déjà générée à réutiliser (sinon base temporaire)")
+    parser.add_argument('--verbose', action='store_true', help="Afficher tous les plans")
+    parser.add_argument('--analyze', action='store_true',
+                        help="Collecter les statistiques comme la maintenance (ANALYZE borné) avant la vérification")
+    args = parser.parse_args()
+
+    workdir = None
+    path = args.database
+    if not path or not os.path.exists(path):
+        if not path:
+            workdir = tempfile.TemporaryDirectory()
+            path = os.path.join(workdir.name, 'plans.db')
+        print(f"Génération de la base ({args.scale:g} x production)...")
+        build_database(path, args.scale, args.seed)
+
+    # Avant l'import de l'application : base générée, pas de vrai LLM, pas de journal
+    os.environ['DATABASE_PATH'] = path
+    os.environ['ALBERT_API_URL'] = 'http://127.0.0.1:9'
+    os.environ['SLOW_QUERY_MS'] = 'off'
+    sys.path.insert(0, ROOT)
+
+    if args.analyze:
+        from maintenance import ANALYSIS_LIMIT
+        conn = sqlite3.connect(path)
+        conn.execute(f'PRAGMA analysis_limit = {ANALYSIS_LIMIT}')
+        conn.execute('ANALYZE')
+        conn.commit()
+        conn.close()
+
+    large = large_tables(path)
+    fixtures = pick_fixtures(path)
+    results = capture_plans(fixtures)
+
+    failures = 0
+    used = set()
+    current_scenario = None
+    for scenario, sql, plan, error, status in results:
+        problems, expectation = check_plan(sql, plan, large)
+        if expectation:
+            used.add(expectation['match'])
+        if error:
+            problems.append(f"EXPLAIN impossible : {error}")
+        if problems:
+            failures += 1
+        if problems or args.verbose:
+            if scenario != current_scenario:
+                current_scenario = scenario
+                print(f"\n## {scenario} (HTTP {status})")
+            print(f"{'❌' if problems else '✓'} {sql[:160]}")
+            for line in plan:
+                print(f"      {line}")
+            for problem in problems:
+                print(f"   → {problem}")
+            if expectation and expectation.get('why'):
+                print(f"   (assumé : {expectation['why']})")
+
+    unused = [expectation['match'] for expectation in EXPECTATIONS if expectation['match'] not in used]
+    print(f"\n{len(results)} instructions vérifiées, grandes tables : {', '.join(sorted(large))}")
+    for pattern in unused:
+        print(f"⚠️  Attente jamais utilisée (requête modifiée ?) : {pattern}")
+
+    if workdir:
+        workdir.cleanup()
+    if failures:
+        print(f"\n❌ {failures} instruction(s) avec un plan non conforme")
+        return 1
+    print("\n✅ Tous les plans sont conformes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
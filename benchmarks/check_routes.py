@@ -0,0 +1,400 @@
+"""
+Vérification des routes en parallèle, chaque processus sur sa propre base en mémoire
+Usage : python benchmarks/check_routes.py [--workers 4] [--template base.db] [--scale 0.002] [-k motif]
+
+1. Base modèle, construite une fois : migrations (migrate.upgrade) puis jeu de
+   données synthétique (generate_dataset.py) ; ou --template, base existante à jour.
+2. Chaque processus ouvre sa base en mémoire partagée (db.MemoryDatabase), copie
+   de la modèle par l'API de sauvegarde, et importe l'application dessus
+   (DATABASE_PATH = son URI) : aucun fichier, aucune base commune.
+3. Les vérifications (CHECKS) sont réparties entre les processus ; la base est
+   recopiée avant chacune : leur ordre et leur répartition sont sans effet.
+
+Code de sortie 1 si une vérification échoue (détail de l'erreur affiché).
+"""
+
+import argparse
+import multiprocessing
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS_DIR = os.path.join(ROOT, 'benchmarks')
+sys.path.insert(0, ROOT)
+
+PASSWORD = 'loadtest'  # generate_dataset.LOADTEST_PASSWORD
+
+# État du processus de vérification (initialisé par _init_worker)
+_database = None
+_app = None
+
+
+# ===========================
+# BASE MODÈLE
+# ===========================
+
+def build_template(tmp_dir, scale):
+    """Migrations sur une base vide (le schéma), puis données synthétiques ; retourne le chemin"""
+    from migrate import upgrade
+
+    schema_path = os.path.join(tmp_dir, 'schema.db')
+    upgrade(schema_path, echo=lambda *args: None)
+    template_path = os.path.join(tmp_dir, 'template.db')
+    subprocess.run([sys.executable, os.path.join(BENCHMARKS_DIR, 'generate_dataset.py'),
+                    '--output', template_path, '--template', schema_path, '--scale', str(scale)],
+                   check=True, capture_output=True)
+    # Clé factice du test de charge : le chatbot répond sans appeler d'API
+    conn = sqlite3.connect(template_path)
+    conn.execute("DELETE FROM settings WHERE key = 'albert_api_key'")
+    conn.commit()
+    conn.close()
+    return template_path
+
+
+# ===========================
+# PROCESSUS DE VÉRIFICATION
+# ===========================
+
+def _init_worker(template_path, tmp_dir):
+    """Base en mémoire propre au processus, puis import de l'application dessus"""
+    global _database, _app
+    work_dir = os.path.join(tmp_dir, str(os.getpid()))
+    # Avant tout import de l'application (db.py compris) : tout ce qu'elle lit à l'import
+    os.environ.update({
+        'DATABASE_PATH': f'file:check_routes_{os.getpid()}?mode=memory&cache=shared',
+        'RATE_LIMIT': 'off',
+        'RATE_LIMIT_STORAGE': 'memory',
+        'JOBS_WORKER': 'off',
+        'LOG_STDOUT': '0',
+        'LOG_FILE': '',
+        'PROFILE_DIR': os.path.join(work_dir, 'profiles'),
+        'IMAGE_CACHE_DIR': os.path.join(work_dir, 'images'),
+        'BACKUP_DIR': os.path.join(work_dir, 'backups'),
+        # Aucun appel réseau : la base modèle n'a pas de clé API
+        'ALBERT_API_URL': 'http://127.0.0.1:9/v1',
+    })
+    from db import DATABASE_PATH, MemoryDatabase
+
+    _database = MemoryDatabase(DATABASE_PATH, template=template_path)
+    from app import app
+    app.config['TESTING'] = True
+    _app = app
+
+
+def _run_check(name):
+    """(nom, durée en ms, erreur ou None) d'une vérification, sur une base remise à zéro"""
+    from fragment_cache import CACHES
+
+    _database.reset()
+    for cache in CACHES.values():
+        cache.clear()
+    started = time.perf_counter()
+    try:
+        CHECKS[name](Context(_app))
+        error = None
+    except Exception:
+        error = traceback.format_exc()
+    return name, (time.perf_counter() - started) * 1000, error
+
+
+class Context:
+    """Identifiants de la base modèle et clients de test d'une vérification"""
+
+    def __init__(self, app):
+        self.app = app
+        self.admin_id = self.value("SELECT id FROM users WHERE is_admin = 1 ORDER BY id LIMIT 1")
+        # Un utilisateur qui organise une activité en cours, et une activité d'un autre à rejoindre
+        self.user_id = self.value("""SELECT id FROM users WHERE is_admin = 0 AND id IN
+                                     (SELECT organizer_id FROM events WHERE is_cancelled = 0) ORDER BY id LIMIT 1""")
+        self.own_event = self.value("SELECT id FROM events WHERE organizer_id = ? AND is_cancelled = 0 "
+                                    "ORDER BY id LIMIT 1", (self.user_id,))
+        self.other_event = self.value("""SELECT id FROM events WHERE is_cancelled = 0 AND organizer_id != ?
+                                         AND id NOT IN (SELECT event_id FROM participations WHERE user_id = ?)
+                                         ORDER BY id LIMIT 1""", (self.user_id, self.user_id))
+
+    def query(self, sql, params=()):
+        from db import DATABASE_PATH, connect_db
+        conn = connect_db(DATABASE_PATH)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def value(self, sql, params=()):
+        rows = self.query(sql, params)
+        return rows[0][0] if rows else None
+
+    def client(self, user_id=None):
+        """Client de test, connecté en tant que user_id (anonyme si None)"""
+        client = self.app.test_client()
+        if user_id is not None:
+            with client.session_transaction() as session:
+                session['_user_id'] = str(user_id)
+                session['_fresh'] = True
+        return client
+
+    def points(self, user_id):
+        return self.value("SELECT points FROM users WHERE id = ?", (user_id,))
+
+    def sync_version(self):
+        return self.value("SELECT version FROM sync_versions WHERE scope = 'events'")
+
+
+def expect(response, status, location=None):
+    assert response.status_code == status, f"{response.request.path} : {response.status_code}, attendu {status}"
+    if location is not None:
+        assert response.location.startswith(location), f"redirection vers {response.location}"
+    return response
+
+
+# ===========================
+# VÉRIFICATIONS
+# ===========================
+
+USER_PAGES = ['/', '/map', '/calendar', '/profile', '/chatbot', '/notifications', '/add',
+              '/api/events/map', '/api/places', '/api/notifications', '/api/events/changes?since=0&cards=1']
+
+
+def check_anonymous_redirects(ctx):
+    client = ctx.client()
+    for url in ('/', '/map', '/profile', '/api/places'):
+        expect(client.get(url), 302, '/login?next=')
+    for url in ('/login', '/register', '/metrics'):
+        expect(client.get(url), 200)
+
+
+def check_login_logout(ctx):
+    username = ctx.value("SELECT username FROM users WHERE id = ?", (ctx.user_id,))
+    client = ctx.client()
+    response = expect(client.post('/login', data={'username': username, 'password': 'mauvais'}), 200)
+    assert 'incorrect' in response.get_data(as_text=True)
+    expect(client.post('/login', data={'username': username, 'password': PASSWORD}), 302, '/')
+    expect(client.get('/'), 200)
+    expect(client.get('/logout'), 302, '/login')
+    expect(client.get('/'), 302, '/login')
+
+
+def check_register(ctx):
+    client = ctx.client()
+    expect(client.post('/register', data={'username': 'nouveau_sportif', 'password': 'secret1',
+                                          'password_confirm': 'secret1'}), 302, '/')
+    assert ctx.value("SELECT COUNT(*) FROM users WHERE username = 'nouveau_sportif'") == 1
+    expect(client.get('/profile'), 200)
+
+
+def check_user_pages(ctx):
+    client = ctx.client(ctx.user_id)
+    for url in USER_PAGES:
+        expect(client.get(url), 200)
+    expect(client.get('/calendar?month=2026-03'), 200)
+
+
+def check_admin_pages(ctx):
+    admin, user = ctx.client(ctx.admin_id), ctx.client(ctx.user_id)
+    urls = [rule.rule for rule in ctx.app.url_map.iter_rules()
+            if rule.rule.startswith('/admin') and 'GET' in rule.methods and not rule.arguments
+            and rule.rule != '/admin/memory/compare']  # 404 sans instantanés à comparer
+    assert len(urls) > 10, urls
+    for url in urls:
+        expect(admin.get(url), 200)
+        expect(user.get(url), 302, '/')
+    for url in ('/admin/perf', '/admin/jobs', '/admin/database', '/admin/memory'):
+        assert admin.get(f'{url}?format=json').is_json, url
+
+
+def check_index_cards(ctx):
+    client = ctx.client(ctx.user_id)
+    html = expect(client.get('/'), 200).get_data(as_text=True)
+    assert f'data-event-id="{ctx.own_event}"' in html
+    sport = ctx.value("SELECT sport FROM events WHERE id = ?", (ctx.own_event,))
+    html = expect(client.get('/', query_string={'sport': sport}), 200).get_data(as_text=True)
+    shown = set(re.findall(r'data-sport="([^"]+)"', html))
+    assert shown == {sport}, shown
+
+
+def check_join_leave(ctx):
+    client = ctx.client(ctx.user_id)
+    before = ctx.points(ctx.user_id)
+    data = expect(client.post(f'/event/{ctx.other_event}/join'), 200).get_json()
+    assert data['success'] and data['new_points'] == before + 50, data
+    expect(client.post(f'/event/{ctx.other_event}/join'), 400)
+    data = expect(client.post(f'/event/{ctx.other_event}/leave'), 200).get_json()
+    assert data['new_points'] == before, data
+    expect(client.post(f'/event/{ctx.other_event}/leave'), 400)
+    assert ctx.value("SELECT COUNT(*) FROM participations WHERE user_id = ? AND event_id = ?",
+                     (ctx.user_id, ctx.other_event)) == 0
+
+
+def check_add_event(ctx):
+    client = ctx.client(ctx.user_id)
+    before, version = ctx.points(ctx.user_id), ctx.sync_version()
+    expect(client.post('/add', data={'sport': 'Escalade', 'niveau': 'Débutant', 'date_heure': 'samedi 10h',
+                                     'place_id': 'other', 'lieu_custom': 'Salle de vérification'}), 302, '/')
+    event_id = ctx.value("SELECT id FROM events WHERE lieu = 'Salle de vérification' AND organizer_id = ?",
+                         (ctx.user_id,))
+    assert event_id is not None
+    assert ctx.points(ctx.user_id) == before + 20
+    changes = expect(client.get(f'/api/events/changes?since={version}&cards=1'), 200).get_json()
+    assert [event['event']['id'] for event in changes['events']] == [event_id], changes
+
+
+def check_cancel_event(ctx):
+    participants = ctx.value("SELECT COUNT(*) FROM participations WHERE event_id = ?", (ctx.own_event,))
+    version = ctx.sync_version()
+    expect(ctx.client(ctx.admin_id).post(f'/event/{ctx.own_event}/cancel'), 403)
+    expect(ctx.client(ctx.user_id).post(f'/event/{ctx.own_event}/cancel'), 200)
+    assert ctx.value("SELECT is_cancelled FROM events WHERE id = ?", (ctx.own_event,)) == 1
+    assert ctx.value("SELECT COUNT(*) FROM notifications WHERE event_id = ?", (ctx.own_event,)) == participants
+    changes = ctx.client(ctx.user_id).get(f'/api/events/changes?since={version}').get_json()
+    assert ctx.own_event in changes['deleted'], changes
+
+
+def check_cancel_event_twice(ctx):
+    organizer = ctx.client(ctx.user_id)
+    participants = [row[0] for row in ctx.query("SELECT user_id FROM participations WHERE event_id = ?",
+                                                  (ctx.own_event,))]
+    unread = {user_id: ctx.value("SELECT unread_notifications FROM users WHERE id = ?", (user_id,))
+              for user_id in participants}
+    expect(organizer.post(f'/event/{ctx.own_event}/cancel'), 200)
+    points = ctx.points(ctx.user_id)
+    expect(organizer.post(f'/event/{ctx.own_event}/cancel'), 400)
+    assert ctx.points(ctx.user_id) == points, "pénalité appliquée deux fois"
+    # Une seule notification par participant, compteur augmenté une seule fois
+    rows = ctx.query("""SELECT user_id, COUNT(*) FROM notifications WHERE event_id = ? AND kind = 'cancelled'
+                        GROUP BY user_id""", (ctx.own_event,))
+    assert dict(rows) == {user_id: 1 for user_id in participants if user_id != ctx.user_id}, rows
+    for user_id in participants:
+        assert ctx.value("SELECT unread_notifications FROM users WHERE id = ?", (user_id,)) == unread[user_id] + 1
+
+
+def check_event_messages(ctx):
+    organizer, outsider = ctx.client(ctx.user_id), ctx.client(ctx.admin_id)
+    url = f'/api/event/{ctx.own_event}/messages'
+    etag = expect(organizer.get(url), 200).headers['ETag']
+    expect(organizer.get(url, headers={'If-None-Match': etag}), 304)
+    expect(organizer.post(url, json={'content': 'Rendez-vous devant le gymnase'}), 200)
+    expect(organizer.post(url, json={'content': '  '}), 400)
+    expect(outsider.post(url, json={'content': 'intrus'}), 403)
+    response = expect(organizer.get(url, headers={'If-None-Match': etag}), 200)
+    assert response.get_json()['messages'][-1]['content'] == 'Rendez-vous devant le gymnase'
+
+
+def check_notifications(ctx):
+    member = ctx.value("SELECT user_id FROM participations WHERE event_id = ? ORDER BY user_id LIMIT 1",
+                       (ctx.own_event,))
+    if member is None:
+        return
+    expect(ctx.client(ctx.user_id).post(f'/api/event/{ctx.own_event}/messages', json={'content': 'Bonjour'}), 200)
+    client = ctx.client(member)
+    assert client.get('/api/notifications').get_json()['unread'] >= 1
+    expect(client.get('/notifications'), 200)
+    assert client.get('/api/notifications').get_json()['unread'] == 0
+
+
+def check_conditional_get(ctx):
+    client = ctx.client(ctx.user_id)
+    for url in ('/api/places', '/api/events/map'):
+        etag = expect(client.get(url), 200).headers['ETag']
+        expect(client.get(url, headers={'If-None-Match': etag}), 304)
+
+
+def check_chatbot_without_key(ctx):
+    data = expect(ctx.client(ctx.user_id).post('/api/chatbot', json={'message': 'Quel sport pour débuter ?'}),
+                  200).get_json()
+    assert 'Admin > Réglages' in data['response'], data
+
+
+def check_admin_settings(ctx):
+    from models import get_setting
+
+    admin = ctx.client(ctx.admin_id)
+    expect(admin.post('/admin/settings', data={'albert_api_key': 'cle-de-verification'}), 302)
+    assert get_setting('albert_api_key') == 'cle-de-verification'
+    expect(admin.post('/admin/settings/toggle-registration'), 302)
+    expect(ctx.client().get('/register'), 302, '/login')
+
+
+def check_admin_delete_user(ctx):
+    import tasks
+
+    admin = ctx.client(ctx.admin_id)
+    # Une notification pour le compte supprimé : il rejoint une activité que l'admin annule
+    expect(ctx.client(ctx.user_id).post(f'/event/{ctx.other_event}/join'), 200)
+    expect(admin.post(f'/admin/events/{ctx.other_event}/toggle-cancel'), 302)
+    assert ctx.value("SELECT COUNT(*) FROM notifications WHERE user_id = ?", (ctx.user_id,)) > 0
+    expect(admin.post(f'/admin/users/{ctx.admin_id}/delete'), 302)
+    assert ctx.value("SELECT COUNT(*) FROM users WHERE id = ?", (ctx.admin_id,)) == 1
+    expect(admin.post(f'/admin/users/{ctx.user_id}/delete'), 302)
+    assert ctx.value("SELECT COUNT(*) FROM users WHERE id = ?", (ctx.user_id,)) == 0
+    # JOBS_WORKER=off : le nettoyage reste en file, exécuté ici directement
+    assert ctx.value("SELECT COUNT(*) FROM jobs WHERE name = 'cleanup_deleted_user' AND status = 'queued'") == 1
+    tasks.cleanup_deleted_user(ctx.user_id)
+    assert ctx.value("SELECT COUNT(*) FROM notifications WHERE user_id = ?", (ctx.user_id,)) == 0
+    assert ctx.value("SELECT COUNT(*) FROM participations WHERE user_id = ?", (ctx.user_id,)) == 0
+
+
+def check_admin_delete_event(ctx):
+    participants = [row[0] for row in ctx.query("SELECT user_id FROM participations WHERE event_id = ?",
+                                                  (ctx.own_event,))]
+    assert participants, "activité sans participant"
+    unread = {user_id: ctx.value("SELECT unread_notifications FROM users WHERE id = ?", (user_id,))
+              for user_id in participants}
+    expect(ctx.client(ctx.user_id).post(f'/event/{ctx.own_event}/cancel'), 200)
+    expect(ctx.client(ctx.admin_id).post(f'/admin/events/{ctx.own_event}/delete'), 302)
+    assert ctx.value("SELECT COUNT(*) FROM events WHERE id = ?", (ctx.own_event,)) == 0
+    # Plus de notification vers l'activité supprimée, compteurs revenus à leur valeur
+    assert ctx.value("SELECT COUNT(*) FROM notifications WHERE event_id = ?", (ctx.own_event,)) == 0
+    for user_id in participants:
+        assert ctx.value("SELECT unread_notifications FROM users WHERE id = ?", (user_id,)) == unread[user_id]
+
+
+def check_metrics(ctx):
+    ctx.client(ctx.user_id).get('/')
+    body = expect(ctx.client().get('/metrics'), 200).get_data(as_text=True)
+    assert 'sportconnect_http_request_duration_seconds_count{endpoint="events.index"' in body
+
+
+CHECKS = {name[len('check_'):]: fn for name, fn in list(globals().items()) if name.startswith('check_')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=min(os.cpu_count() or 1, len(CHECKS)))
+    parser.add_argument('--template', help="Base modèle existante (migrations à jour) au lieu d'une base générée")
+    parser.add_argument('--scale', type=float, default=0.002, help="Volume de la base générée (generate_dataset.py)")
+    parser.add_argument('-k', dest='pattern', help="Seulement les vérifications dont le nom contient ce motif")
+    args = parser.parse_args()
+
+    names = [name for name in CHECKS if not args.pattern or args.pattern in name]
+    tmp_dir = tempfile.mkdtemp(prefix='check_routes_')
+    started = time.perf_counter()
+    try:
+        template = args.template or build_template(tmp_dir, args.scale)
+        prepared = time.perf_counter()
+
+        context = multiprocessing.get_context('spawn')
+        workers = max(1, min(args.workers, len(names)))
+        with context.Pool(workers, initializer=_init_worker, initargs=(template, tmp_dir)) as pool:
+            results = pool.map(_run_check, names, chunksize=1)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    failures = [(name, error) for name, _, error in results if error]
+    for name, duration, error in results:
+        print(f"{'ÉCHEC' if error else 'ok':<6} {name:<24} {duration:>8.1f} ms")
+    for name, error in failures:
+        print(f"\n--- {name}\n{error}")
+    print(f"\n{len(results) - len(failures)}/{len(results)} vérifications réussies, {workers} processus, "
+          f"base modèle {(prepared - started) * 1000:.0f} ms, total {(time.perf_counter() - started):.1f} s")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""
+Générateur de jeu de données synthétique à l'échelle de la production
+Usage : python benchmarks/generate_dataset.py --output /tmp/loadtest.db [--scale 1.0] [--seed 42]
+        [--users 50000] [--events 200000] [--participations 2000000] [--messages 5000000] [--places 2000]
+
+Le schéma (tables, index, triggers, compteurs de version) est recopié depuis
+database.db, donc toutes les migrations déjà appliquées sont prises en compte.
+Les données sont chargées sans index ni triggers, qui sont créés ensuite.
+Tous les utilisateurs ont le mot de passe LOADTEST_PASSWORD.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOADTEST_PASSWORD = 'loadtest'
+
+# Mêmes 36 sports que les filtres de l'application
+SPORTS = ['Running', 'Tennis', 'Yoga', 'Football', 'Natation', 'Basketball', 'Cyclisme',
+          'Roller', 'Volley-ball', 'Danse', 'Judo', 'Karaté', 'Capoeira',
+          'Ping-pong', 'Patinage', 'Taekwondo', 'Kendo', 'Handball',
+          'Gymnastique', 'Escrime', 'Skate', 'Voile',
+          'Escalade', 'Rugby', 'Badminton', 'Multijeux', 'Ultimate',
+          'Boxe', 'MMA', 'Parkour', 'Hockey',
+          'Saut à la perche', 'Bowling', 'Tir à l\'arc', 'Golf', 'Ski']
+NIVEAUX = ['Débutant', 'Intermédiaire', 'Expert']
+GENRES = ['Mixte', 'Mixte', 'Mixte', 'Homme', 'Femme']
+JOURS = ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche']
+MOIS = ['janvier', 'février', 'mars', 'avril', 'mai', 'juin', 'juillet', 'août',
+        'septembre', 'octobre', 'novembre', 'décembre']
+PRENOMS = ['lucas', 'emma', 'hugo', 'jade', 'louis', 'louise', 'gabriel', 'alice', 'arthur', 'chloe',
+           'jules', 'lina', 'adam', 'rose', 'nathan', 'lea', 'tom', 'manon', 'theo', 'ines']
+COULEURS = ['#6c757d', '#667eea', '#f59e0b', '#10b981', '#ef4444', '#8b5cf6', '#ec4899', '#14b8a6']
+STATIONS = [('Bercy', 'M6, M14'), ('Château de Vincennes', 'M1'), ('Porte d Auteuil', 'M10'),
+            ('Nation', 'M1, M2, M6, M9, RER A'), ('Bastille', 'M1, M5, M8'), ('République', 'M3, M5, M8, M9, M11')]
+PHRASES = ["On se retrouve devant l'entrée ?", "Je serai là 10 minutes en avance",
+           "Quelqu'un a un ballon en plus ?", "Super séance, merci à tous !",
+           "Il pleut, on maintient ?", "J'amène de l'eau pour tout le monde",
+           "Je suis en retard de 5 minutes, désolé", "On fait des équipes à l'arrivée"]
+
+# Paris et proche banlieue
+LAT_RANGE = (48.80, 48.91)
+LNG_RANGE = (2.25, 2.42)
+
+BATCH_SIZE = 20000
+
+
+def random_date_heure(rng, base):
+    """Date en texte libre, dans les différents formats saisis par les utilisateurs"""
+    day = base + timedelta(days=rng.randint(-60, 120))
+    hour = rng.choice(['9h', '10h', '12h30', '14h', '18h', '18h30', '19h', '20h15'])
+    fmt = rng.random()
+    if fmt < 0.35:
+        return f"{JOURS[day.weekday()]} {hour}"
+    if fmt < 0.65:
+        return f"{day.day} {MOIS[day.month - 1]} {hour}"
+    if fmt < 0.85:
+        return f"{day.day:02d}/{day.month:02d}/{day.year} {hour}"
+    return f"{day.isoformat()} {hour}"
+
+
+def copy_schema(template_path, conn):
+    """
+    Crée les tables depuis la base modèle
+
+    Returns:
+        tuple: (instructions des index et triggers à créer après le chargement, compteurs de version)
+    """
+    template = sqlite3.connect(template_path)
+    rows = template.execute(
+        "SELECT type, name, sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'"
+    ).fetchall()
+    scopes = [row[0] for row in template.execute("SELECT scope FROM sync_versions")]
+    # Migrations appliquées : l'application vérifie le numéro de version au démarrage
+    versions = template.execute("SELECT version, name, applied_at, duration_ms FROM schema_version").fetchall()
+    template.close()
+
+    deferred = []
+    for obj_type, _, sql in rows:
+        if obj_type == 'table':
+            conn.execute(sql)
+        else:
+            deferred.append((obj_type, sql))
+    conn.executemany("INSERT INTO schema_version VALUES (?, ?, ?, ?)", versions)
+    # Index avant triggers
+    deferred.sort(key=lambda item: item[0] != 'index')
+    return [sql for _, sql in deferred], scopes
+
+
+def insert_batches(conn, sql, rows):
+    """executemany par lots sur un générateur de lignes, retourne le nombre de lignes"""
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.executemany(sql, batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        conn.executemany(sql, batch)
+        total += len(batch)
+    return total
+
+
+def generate(conn, rng, counts):
+    """Remplit la base, retourne les nombres de lignes insérées"""
+    now = datetime(2026, 3, 1, 12, 0, 0)
+    password_hash = generate_password_hash(LOADTEST_PASSWORD)
+    nb_users = counts['users']
+
+    # 1. Utilisateurs (le premier est administrateur)
+    def users():
+        for i in range(1, nb_users + 1):
+            username = f"{PRENOMS[i % len(PRENOMS)]}{i}"
+            yield (i, username, password_hash, f"{username}@example.com",
+                   (now - timedelta(days=rng.randint(0, 700))).strftime('%Y-%m-%d %H:%M:%S'),
+                   int(rng.paretovariate(1.5) * 50) % 5000, rng.choice(COULEURS), 1 if i == 1 else 0)
+    inserted = {'users': insert_batches(
+        conn, "INSERT INTO users (id, username, password_hash, email, created_at, points, avatar_color, is_admin) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", users())}
+
+    # 2. Lieux
+    places = []
+    for i in range(1, counts['places'] + 1):
+        station, lines = rng.choice(STATIONS)
+        places.append((i, f"Équipement sportif {i}", f"{rng.randint(1, 200)} rue du Sport",
+                       'Paris', round(rng.uniform(*LAT_RANGE), 6), round(rng.uniform(*LNG_RANGE), 6),
+                       ', '.join(rng.sample(SPORTS, rng.randint(1, 4))), rng.randint(0, 1), station, lines))
+    inserted['places'] = insert_batches(
+        conn, "INSERT INTO places (id, name, address, city, latitude, longitude, sports, is_pmr_accessible, "
+              "transport_station, transport_lines) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", places)
+
+    # 3. Événements, participations et messages générés ensemble (mémoire constante)
+    nb_events = counts['events']
+    participants_per_event = counts['participations'] / nb_events
+    messages_per_participant = counts['messages'] / max(counts['participations'], 1)
+    # Popularité inégale des sports (les premiers de la liste sont les plus pratiqués)
+    sport_weights = [1 / (rank + 1) ** 0.8 for rank in range(len(SPORTS))]
+
+    events, participations, messages = [], [], []
+    totals = {'events': 0, 'participations': 0, 'messages': 0}
+    message_id = 0
+
+    def flush(final=False):
+        for key, rows, sql in (
+            ('events', events,
+             "INSERT INTO events (id, organisateur, sport, niveau, lieu, date_heure, accessibilite, organizer_id, "
+             "created_at, is_cancelled, latitude, longitude, transport_station, transport_lines, place_id, genre) "
+             "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"),
+            ('participations', participations,
+             "INSERT INTO participations (user_id, event_id, joined_at, points_awarded) VALUES (?, ?, ?, ?)"),
+            ('messages', messages,
+             "INSERT INTO messages (id, event_id, user_id, username, content, created_at) VALUES (?, ?, ?, ?, ?, ?)"),
+        ):
+            if rows and (final or len(rows) >= BATCH_SIZE):
+                conn.executemany(sql, rows)
+                totals[key] += len(rows)
+                rows.clear()
+
+    for event_id in range(1, nb_events + 1):
+        organizer_id = rng.randint(1, nb_users)
+        place = rng.choice(places)
+        created = now - timedelta(minutes=rng.randint(0, 200 * 24 * 60))
+        events.append((event_id, f"{PRENOMS[organizer_id % len(PRENOMS)]}{organizer_id}",
+                       rng.choices(SPORTS, sport_weights)[0], rng.choice(NIVEAUX), place[1],
+                       random_date_heure(rng, now), rng.choice(['Oui', 'Non']), organizer_id,
+                       created.strftime('%Y-%m-%d %H:%M:%S'), 1 if rng.random() < 0.05 else 0,
+                       place[4] + rng.uniform(-5e-4, 5e-4), place[5] + rng.uniform(-5e-4, 5e-4),
+                       place[8], place[9], place[0], rng.choice(GENRES)))
+
+        # Nombre de participants : distribution exponentielle autour de la moyenne visée
+        nb_participants = min(int(rng.expovariate(1 / participants_per_event) + 0.5), nb_users - 1)
+        members = [uid for uid in rng.sample(range(1, nb_users + 1), nb_participants + 1) if uid != organizer_id]
+        members = members[:nb_participants]
+        for uid in members:
+            participations.append((uid, event_id, created.strftime('%Y-%m-%d %H:%M:%S'), 50))
+
+        speakers = members + [organizer_id]
+        nb_messages = int(rng.expovariate(1 / (messages_per_participant * len(members))) + 0.5) if members else 0
+        for n in range(nb_messages):
+            message_id += 1
+            uid = rng.choice(speakers)
+            messages.append((message_id, event_id, uid, f"{PRENOMS[uid % len(PRENOMS)]}{uid}",
+                             rng.choice(PHRASES), (created + timedelta(minutes=n * 7)).strftime('%Y-%m-%d %H:%M:%S')))
+
+        flush()
+        if event_id % 20000 == 0:
+            print(f"   {event_id}/{nb_events} événements...")
+    flush(final=True)
+
+    inserted.update(totals)
+    return inserted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--output', required=True, help="Base à créer (écrasée si elle existe)")
+    parser.add_argument('--template', default=os.path.join(ROOT, 'database.db'), help="Base modèle pour le schéma")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiplie tous les volumes (ex. 0.01)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--events', type=int, default=200000)
+    parser.add_argument('--participations', type=int, default=2000000)
+    parser.add_argument('--messages', type=int, default=5000000)
+    parser.add_argument('--places', type=int, default=2000)
+    args = parser.parse_args()
+
+    counts = {key: max(1, int(getattr(args, key) * args.scale))
+              for key in ('users', 'events', 'participations', 'messages', 'places')}
+    counts['users'] = max(counts['users'], 2)
+
+    if os.path.exists(args.output):
+        os.remove(args.output)
+
+    start = time.perf_counter()
+    conn = sqlite3.connect(args.output)
+    # Chargement initial : pas besoin de journal ni de fsync
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+
+    print(f"1. Copie du schéma depuis {args.template}...")
+    deferred, scopes = copy_schema(args.template, conn)
+
+    print("2. Génération des données...")
+    rng = random.Random(args.seed)
+    inserted = generate(conn, rng, counts)
+    conn.commit()
+
+    print("3. Création des index et triggers...")
+    for sql in deferred:
+        conn.execute(sql)
+
+    print("4. Initialisation des compteurs de version...")
+    # Même état qu'après add_delta_sync / add_etag_versions : version de ligne = id
+    conn.execute("UPDATE events SET row_version = id")
+    conn.execute("INSERT INTO sync_versions (scope, version) SELECT 'events', COALESCE(MAX(id), 0) FROM events")
+    if 'places' in scopes:  # compteurs créés par add_etag_versions
+        conn.execute("INSERT INTO sync_versions (scope, version) VALUES ('places', 1)")
+        conn.execute("INSERT INTO sync_versions (scope, version) "
+                     "SELECT 'messages:' || event_id, COUNT(*) FROM messages GROUP BY event_id")
+    # Clé factice : /api/chatbot interroge le faux LLM du test de charge
+    conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('albert_api_key', 'loadtest')")
+    conn.commit()
+
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.close()
+
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(args.output) / (1024 * 1024)
+    print(f"✅ {args.output} ({size_mb:.1f} Mo) en {elapsed:.1f}s")
+    for key, value in inserted.items():
+        print(f"   {key:<16} {value:>10}")
+    print(f"   Mot de passe de tous les comptes : {LOADTEST_PASSWORD}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
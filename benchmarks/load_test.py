@@ -0,0 +1,378 @@
+"""
+Test de charge de bout en bout sur un jeu de données généré
+Usage : python benchmarks/load_test.py --db /tmp/loadtest.db [--duration 30] [--concurrency 8]
+        [--url http://127.0.0.1:5000] [--llm-delay 0.3] [--output results.json] [--compare baseline.json]
+
+Sans --url, l'application est lancée dans un processus séparé (flask run) sur la base --db,
+avec ALBERT_API_URL pointant vers un faux LLM local. Avec --url, le serveur doit déjà
+utiliser la même base et un faux LLM (le test mesure alors aussi sa configuration).
+Chaque worker se connecte avec un compte généré (benchmarks/generate_dataset.py) et
+enchaîne des actions tirées selon SCENARIO. Les résultats (p50/p95/p99, débit par route)
+sont écrits en JSON pour comparer les exécutions.
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from generate_dataset import LOADTEST_PASSWORD  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+# Actions et poids relatifs (proche de l'usage observé : beaucoup de polling et de listes)
+SCENARIO = {
+    'index': 25,
+    'map': 10,
+    'calendar': 8,
+    'profile': 7,
+    'join_leave': 10,
+    'poll_messages': 35,
+    'chatbot': 5,
+}
+
+CHATBOT_QUESTIONS = ["Quel sport pour débuter ?", "Comment progresser en course à pied ?",
+                     "Quelle activité ce week-end près de Bastille ?", "Je veux me remettre au tennis"]
+
+
+# ===========================
+# FAUX LLM
+# ===========================
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Répond à /chat/completions comme l'API Albert après un délai fixe"""
+    delay = 0.3
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        time.sleep(self.delay)
+        body = json.dumps({
+            'choices': [{'message': {'role': 'assistant',
+                                     'content': "Excellente idée ! Commence doucement et hydrate-toi bien 💪"}}],
+            'usage': {'prompt_tokens': 420, 'completion_tokens': 24, 'total_tokens': 444}
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_llm(delay):
+    """Démarre le faux LLM dans un thread, retourne (serveur, URL de base)"""
+    handler = type('Handler', (FakeLLMHandler,), {'delay': delay})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ===========================
+# SERVEUR APPLICATIF
+# ===========================
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_app(db_path, llm_url):
+    """Lance l'application dans un processus séparé, retourne (processus, URL)"""
+    port = free_port()
+    env = dict(os.environ, DATABASE_PATH=os.path.abspath(db_path), ALBERT_API_URL=llm_url, FLASK_DEBUG='0')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'flask', '--app', 'app', 'run', '--port', str(port), '--no-reload'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"L'application s'est arrêtée :\n{process.stderr.read().decode(errors='replace')}")
+        try:
+            requests.get(f"{url}/login", timeout=1)
+            return process, url
+        except requests.exceptions.ConnectionError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("L'application n'a pas démarré en 30s")
+
+
+# ===========================
+# UTILISATEURS VIRTUELS
+# ===========================
+
+def load_accounts(db_path, count, rng):
+    """
+    Tire des comptes ayant des participations, avec leurs événements
+
+    Returns:
+        tuple: (liste de (username, [event_ids rejoints]), [event_ids ouverts])
+    """
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    c.execute("""
+        SELECT u.username, GROUP_CONCAT(p.event_id)
+        FROM users u JOIN participations p ON p.user_id = u.id
+        GROUP BY u.id ORDER BY RANDOM() LIMIT ?
+    """, (count,))
+    accounts = [(username, [int(x) for x in event_ids.split(',')]) for username, event_ids in c.fetchall()]
+    c.execute("SELECT id FROM events WHERE is_cancelled = 0 ORDER BY RANDOM() LIMIT 5000")
+    open_events = [row[0] for row in c.fetchall()]
+    conn.close()
+    rng.shuffle(accounts)
+    return accounts, open_events
+
+
+class VirtualUser:
+    """Session HTTP connectée, avec l'état de polling d'un navigateur (since, ETag)"""
+
+    def __init__(self, base_url, username, joined_events, open_events, rng, record):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.username = username
+        self.joined_events = joined_events
+        self.open_events = open_events
+        self.rng = rng
+        self.record = record
+        self.poll_state = {}  # event_id -> (since, etag)
+
+    def request(self, route, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=60,
+                                            allow_redirects=False, **kwargs)
+            status = response.status_code
+        except requests.exceptions.RequestException:
+            response, status = None, 'error'
+        self.record(route, start, (time.perf_counter() - start) * 1000, status)
+        return response
+
+    def login(self):
+        response = self.request('login', 'POST', '/login',
+                                data={'username': self.username, 'password': LOADTEST_PASSWORD})
+        return response is not None and response.status_code == 302 and 'session' in self.session.cookies
+
+    def run_action(self, action):
+        if action == 'index':
+            self.request('GET /', 'GET', '/')
+        elif action == 'map':
+            self.request('GET /map', 'GET', '/map')
+        elif action == 'calendar':
+            self.request('GET /calendar', 'GET', '/calendar')
+        elif action == 'profile':
+            self.request('GET /profile', 'GET', '/profile')
+        elif action == 'join_leave':
+            event_id = self.rng.choice(self.open_events)
+            self.request('POST join', 'POST', f'/event/{event_id}/join')
+            self.request('POST leave', 'POST', f'/event/{event_id}/leave')
+        elif action == 'poll_messages':
+            event_id = self.rng.choice(self.joined_events)
+            since, etag = self.poll_state.get(event_id, (0, None))
+            headers = {'If-None-Match': etag} if etag else {}
+            response = self.request('GET messages (poll)', 'GET',
+                                    f'/api/event/{event_id}/messages?since={since}', headers=headers)
+            if response is not None and response.status_code == 200:
+                messages = response.json().get('messages', [])
+                if messages:
+                    since = messages[-1]['id']
+                self.poll_state[event_id] = (since, response.headers.get('ETag'))
+        elif action == 'chatbot':
+            self.request('POST /api/chatbot', 'POST', '/api/chatbot',
+                         json={'message': self.rng.choice(CHATBOT_QUESTIONS), 'history': []})
+
+
+# ===========================
+# MESURES
+# ===========================
+
+class Recorder:
+    """
+    Collecte thread-safe des durées par route
+
+    Seules les requêtes démarrées pendant la fenêtre de mesure sont comptées,
+    y compris celles qui se terminent après (les requêtes lentes ne sont pas perdues).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.statuses = {}
+        self.window = (float('inf'), float('inf'))
+
+    def __call__(self, route, started, duration_ms, status):
+        if not self.window[0] <= started < self.window[1]:
+            return
+        with self._lock:
+            self.samples.setdefault(route, []).append(duration_ms)
+            counts = self.statuses.setdefault(route, {})
+            counts[str(status)] = counts.get(str(status), 0) + 1
+
+
+def percentile(sorted_values, pct):
+    """Percentile au rang le plus proche sur une liste triée"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(durations, statuses, elapsed):
+    values = sorted(durations)
+    errors = sum(count for status, count in statuses.items() if status == 'error' or status.startswith('5'))
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'throughput_rps': round(len(values) / elapsed, 2),
+        'mean_ms': round(sum(values) / len(values), 2) if values else 0.0,
+        'p50_ms': round(percentile(values, 50), 2),
+        'p95_ms': round(percentile(values, 95), 2),
+        'p99_ms': round(percentile(values, 99), 2),
+        'max_ms': round(values[-1], 2) if values else 0.0,
+        'statuses': statuses,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results, baseline=None):
+    print(f"\n{'Route':<24} {'Req':>7} {'Err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    print('-' * 74)
+    rows = sorted(results['routes'].items()) + [('TOTAL', results['total'])]
+    for route, stats in rows:
+        print(f"{route:<24} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput_rps']:>8.1f} "
+              f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+        if baseline:
+            base = baseline['routes'].get(route) if route != 'TOTAL' else baseline.get('total')
+            if base and base['p95_ms'] and base['throughput_rps']:
+                print(f"{'  vs référence':<24} {'':>7} {'':>5} "
+                      f"{(stats['throughput_rps'] / base['throughput_rps'] - 1) * 100:>+7.1f}% "
+                      f"{(stats['p50_ms'] / base['p50_ms'] - 1) * 100 if base['p50_ms'] else 0:>+7.1f}% "
+                      f"{(stats['p95_ms'] / base['p95_ms'] - 1) * 100:>+7.1f}% "
+                      f"{(stats['p99_ms'] / base['p99_ms'] - 1) * 100 if base['p99_ms'] else 0:>+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--db', required=True, help="Base générée par generate_dataset.py")
+    parser.add_argument('--url', help="Serveur déjà lancé (sinon lancé automatiquement)")
+    parser.add_argument('--duration', type=float, default=30, help="Durée de mesure en secondes")
+    parser.add_argument('--warmup', type=float, default=3, help="Durée d'échauffement non mesurée")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--llm-delay', type=float, default=0.3, help="Latence du faux LLM en secondes")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="Fichier JSON de résultats (défaut : benchmarks/results/)")
+    parser.add_argument('--compare', help="Résultats JSON de référence à comparer")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    accounts, open_events = load_accounts(args.db, args.concurrency, rng)
+    if len(accounts) < args.concurrency or not open_events:
+        sys.exit("La base ne contient pas assez d'utilisateurs avec participations.")
+
+    llm_server, llm_url = start_fake_llm(args.llm_delay)
+    process = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        process, base_url = start_app(args.db, llm_url)
+        print(f"Application lancée sur {base_url} (faux LLM : {llm_url})")
+
+    recorder = Recorder()
+    stop = threading.Event()
+    actions, weights = zip(*SCENARIO.items())
+
+    def worker(index):
+        username, joined_events = accounts[index]
+        user = VirtualUser(base_url, username, joined_events, open_events,
+                           random.Random(args.seed * 1000 + index), recorder)
+        if not user.login():
+            print(f"⚠️  Connexion impossible pour {username}")
+            return
+        while not stop.is_set():
+            user.run_action(user.rng.choices(actions, weights)[0])
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(args.concurrency)]
+    try:
+        for thread in threads:
+            thread.start()
+        time.sleep(args.warmup)
+        started = time.perf_counter()
+        recorder.window = (started, started + args.duration)
+        print(f"Mesure pendant {args.duration:.0f}s avec {args.concurrency} utilisateurs virtuels...")
+        time.sleep(args.duration)
+        stop.set()
+        # Attendre les requêtes en cours (comptées si démarrées dans la fenêtre)
+        for thread in threads:
+            thread.join(timeout=65)
+        elapsed = args.duration
+    finally:
+        llm_server.shutdown()
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+
+    all_durations = [d for durations in recorder.samples.values() for d in durations]
+    all_statuses = {}
+    for counts in recorder.statuses.values():
+        for status, count in counts.items():
+            all_statuses[status] = all_statuses.get(status, 0) + count
+
+    conn = sqlite3.connect(args.db)
+    dataset = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+               for table in ('users', 'events', 'participations', 'messages', 'places')}
+    conn.close()
+
+    results = {
+        'meta': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'duration_s': round(elapsed, 2),
+            'concurrency': args.concurrency,
+            'llm_delay_s': args.llm_delay,
+            'scenario': SCENARIO,
+            'dataset': dataset,
+        },
+        'routes': {route: summarize(durations, recorder.statuses[route], elapsed)
+                   for route, durations in recorder.samples.items()},
+        'total': summarize(all_durations, all_statuses, elapsed),
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\n✅ Résultats écrits dans {output}")
+
+
+if __name__ == '__main__':
+    main()
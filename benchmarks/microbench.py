@@ -0,0 +1,180 @@
+"""
+Microbenchmarks des fonctions Python pures appelées à chaque requête
+Usage : python benchmarks/microbench.py [--threshold 25] [--update] [--only parse_date_heure]
+
+Compare chaque fonction à benchmarks/microbench_baseline.json et sort en erreur (code 1)
+si l'une d'elles est plus lente que la référence de plus de --threshold %.
+Les temps sont normalisés par une boucle de calibration, mesurée aussi lors de la
+création de la référence, pour limiter l'effet d'une machine plus lente ou plus rapide.
+--update réécrit la référence (à faire sur une machine au repos, puis à committer).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dates import parse_date_heure  # noqa: E402
+from suggestions import suggest_events  # noqa: E402
+from models import User, get_level_info  # noqa: E402
+from generate_dataset import NIVEAUX, PRENOMS, SPORTS, random_date_heure  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'microbench_baseline.json')
+
+REPEAT = 15
+
+
+# ===========================
+# DONNÉES D'ENTRÉE (déterministes)
+# ===========================
+
+rng = random.Random(2026)
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+# Mélange des formats saisis (jour de semaine, "13 mars", "25/01/2026", ISO)
+DATE_STRINGS = [random_date_heure(rng, NOW) for _ in range(200)]
+
+# Même forme que les lignes de /api/chatbot (LIMIT 20)
+AVAILABLE_EVENTS = [
+    {'id': i, 'sport': rng.choice(SPORTS), 'niveau': rng.choice(NIVEAUX), 'lieu': f'Stade {i}',
+     'date_heure': random_date_heure(rng, NOW), 'organisateur': rng.choice(PRENOMS)}
+    for i in range(20)
+]
+HISTORY = [
+    {'role': 'user', 'content': "Bonjour, je cherche une activité sportive"},
+    {'role': 'assistant', 'content': "Bien sûr ! Quel sport souhaitez-vous pratiquer et quel est votre niveau ?"},
+    {'role': 'user', 'content': "Plutôt du tennis ou du badminton, je suis débutant"},
+    {'role': 'assistant', 'content': "Êtes-vous plutôt disponible en semaine ou le week-end ?"},
+] * 3
+USER_MESSAGE = "Le samedi matin ce serait parfait"
+
+POINTS = [rng.randint(0, 2000) for _ in range(200)]
+USERS = [User(i, name, None, 0, '#6c757d') for i, name in
+         enumerate([rng.choice(PRENOMS) + str(i) for i in range(150)] +
+                   [f"{rng.choice(PRENOMS)} {rng.choice(PRENOMS)}" for _ in range(50)])]
+
+
+# ===========================
+# CAS MESURÉS (une opération = un appel)
+# ===========================
+
+def bench_parse_date_heure():
+    for dt_str in DATE_STRINGS:
+        parse_date_heure(dt_str, 2026, 3)
+
+
+def bench_suggest_events():
+    suggest_events(AVAILABLE_EVENTS, HISTORY, USER_MESSAGE)
+
+
+def bench_get_level_info():
+    for points in POINTS:
+        get_level_info(points)
+
+
+def bench_get_initials():
+    for user in USERS:
+        user.get_initials()
+
+
+# nom -> (fonction, nombre d'appels par exécution)
+CASES = {
+    'parse_date_heure': (bench_parse_date_heure, len(DATE_STRINGS)),
+    'suggest_events': (bench_suggest_events, 1),
+    'get_level_info': (bench_get_level_info, len(POINTS)),
+    'get_initials': (bench_get_initials, len(USERS)),
+}
+
+
+def calibration_workload():
+    """Boucle de référence : mesure la vitesse de l'interpréteur sur cette machine"""
+    total = 0
+    for i in range(2000):
+        total += i % 7
+    return total
+
+
+def measure(func, calls_per_run=1):
+    """Meilleur temps par appel en nanosecondes"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=REPEAT, number=number))
+    return best / number / calls_per_run * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threshold', type=float, default=25.0, help="Régression tolérée en %%")
+    parser.add_argument('--update', action='store_true', help="Réécrire la référence")
+    parser.add_argument('--only', action='append', help="Limiter à un cas (répétable)")
+    args = parser.parse_args()
+
+    cases = {name: case for name, case in CASES.items() if not args.only or name in args.only}
+    calibration_ns = measure(calibration_workload)
+    results = {name: measure(func, calls) for name, (func, calls) in cases.items()}
+
+    if args.update:
+        baseline = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'calibration_ns': round(calibration_ns, 1),
+            'cases': {name: round(ns, 1) for name, ns in results.items()},
+        }
+        if args.only and os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+            previous['cases'].update(baseline['cases'])
+            baseline['cases'] = previous['cases']
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+            f.write('\n')
+        for name, ns in results.items():
+            print(f"{name:<20} {ns:>10.1f} ns/appel")
+        print(f"✅ Référence écrite dans {os.path.relpath(BASELINE_PATH, ROOT)}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("Aucune référence : lancer d'abord avec --update")
+        return 1
+    with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    # Ramener les temps à la vitesse de la machine de référence
+    speed_ratio = calibration_ns / baseline['calibration_ns']
+    print(f"Calibration : {calibration_ns:.0f} ns (référence {baseline['calibration_ns']:.0f} ns, "
+          f"facteur {speed_ratio:.2f})\n")
+    print(f"{'Fonction':<20} {'ns/appel':>10} {'normalisé':>10} {'référence':>10} {'écart':>8}")
+    print('-' * 62)
+
+    regressions = []
+    for name, ns in results.items():
+        reference = baseline['cases'].get(name)
+        normalized = ns / speed_ratio
+        if reference is None:
+            print(f"{name:<20} {ns:>10.1f} {normalized:>10.1f} {'—':>10} {'nouveau':>8}")
+            continue
+        delta = (normalized / reference - 1) * 100
+        flag = ''
+        if delta > args.threshold:
+            regressions.append(name)
+            flag = '  ❌'
+        print(f"{name:<20} {ns:>10.1f} {normalized:>10.1f} {reference:>10.1f} {delta:>+7.1f}%{flag}")
+
+    if regressions:
+        print(f"\n❌ Régression de plus de {args.threshold:.0f}% : {', '.join(regressions)}")
+        return 1
+    print(f"\n✅ Aucune régression au-delà de {args.threshold:.0f}%")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
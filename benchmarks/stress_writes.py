@@ -0,0 +1,161 @@
+"""
+Test de charge : écritures concurrentes, transactions directes contre écrivain unique
+Usage : python benchmarks/stress_writes.py [--processes 4] [--threads 8] [--ops 150] [--journal wal] [--timeout 5]
+
+Chaque thread de chaque processus enchaîne des écritures du site : rejoindre une
+activité (participation + points), y poster un message (message + notifications)
+puis la quitter (suppression + points).
+
+- direct : comme les routes avant writer.py, une connexion par opération,
+  lecture puis écriture dans une transaction implicite et commit (attente du
+  verrou : --timeout, 5 s par défaut comme sqlite3.connect) ;
+- writer : les mêmes écritures confiées à l'écrivain unique du processus
+  (commits groupés, nouvelles tentatives avec jitter).
+
+Affiche le débit (opérations/s), le nombre d'erreurs 'database is locked' et la
+taille moyenne des lots. Travaille sur une copie temporaire de database.db.
+"""
+
+import argparse
+from multiprocessing import Pool
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from db import connect_db  # noqa: E402
+from models import apply_points  # noqa: E402
+import notifications  # noqa: E402
+from writer import SingleWriter  # noqa: E402
+
+
+def join(conn, user_id, event_id):
+    c = conn.cursor()
+    c.execute("SELECT id FROM participations WHERE user_id = ? AND event_id = ?", (user_id, event_id))
+    if c.fetchone():
+        return None
+    c.execute("INSERT INTO participations (user_id, event_id, points_awarded) VALUES (?, ?, 50)",
+              (user_id, event_id))
+    return apply_points(conn, user_id, 50)
+
+
+def post(conn, user_id, event_id):
+    c = conn.cursor()
+    c.execute("INSERT INTO messages (event_id, user_id, username, content) VALUES (?, ?, 'stress', ?)",
+              (event_id, user_id, 'message de charge'))
+    notifications.notify_event(conn, event_id, 'message', exclude_user_id=user_id,
+                               username='stress', preview='message de charge')
+    return c.lastrowid
+
+
+def leave(conn, user_id, event_id):
+    c = conn.cursor()
+    c.execute("DELETE FROM participations WHERE user_id = ? AND event_id = ?", (user_id, event_id))
+    if c.rowcount:
+        return apply_points(conn, user_id, -50)
+    return None
+
+
+OPERATIONS = (join, post, leave)
+
+
+def run_direct(path, timeout, fn, *args):
+    conn = connect_db(path)
+    conn.execute(f'PRAGMA busy_timeout = {int(timeout * 1000)}')
+    try:
+        result = fn(conn, *args)
+        conn.commit()
+        return result
+    finally:
+        conn.close()
+
+
+def _process(args):
+    path, mode, journal, timeout, ops, users, events = args
+    db_writer = SingleWriter(path, mode='thread', wal=journal == 'wal')
+    counts = {'ok': 0, 'locked': 0, 'other': 0}
+    lock = threading.Lock()
+
+    def thread_main(user_id, first_event):
+        local = {'ok': 0, 'locked': 0, 'other': 0}
+        for i in range(ops):
+            fn = OPERATIONS[i % len(OPERATIONS)]
+            event_id = events[(first_event + i // len(OPERATIONS)) % len(events)]
+            try:
+                if mode == 'writer':
+                    db_writer.run(fn, user_id, event_id)
+                else:
+                    run_direct(path, timeout, fn, user_id, event_id)
+                local['ok'] += 1
+            except sqlite3.OperationalError as e:
+                local['locked' if 'locked' in str(e) else 'other'] += 1
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+
+    workers = [threading.Thread(target=thread_main, args=(user_id, i)) for i, user_id in enumerate(users)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    db_writer.stop()
+    counts['batches'] = db_writer.batches
+    counts['writes'] = db_writer.writes
+    return counts
+
+
+def stress(tmp_dir, mode, journal, timeout, processes, threads, ops):
+    path = os.path.join(tmp_dir, f'{mode}.db')
+    shutil.copy(os.path.join(ROOT, 'database.db'), path)
+    conn = sqlite3.connect(path)
+    conn.execute(f'PRAGMA journal_mode={journal}')
+    events = [row[0] for row in conn.execute("SELECT id FROM events WHERE is_cancelled = 0 ORDER BY id")]
+    # Un utilisateur par thread : join / leave d'un thread ne se marchent pas dessus
+    users = [conn.execute("INSERT INTO users (username, email, password_hash) VALUES (?, ?, 'x')",
+                          (f'stress{i}', f'stress{i}@example.com')).lastrowid
+             for i in range(processes * threads)]
+    conn.commit()
+    conn.close()
+
+    tasks = [(path, mode, journal, timeout, ops, users[p * threads:(p + 1) * threads], events)
+             for p in range(processes)]
+    started = time.perf_counter()
+    with Pool(processes) as pool:
+        results = pool.map(_process, tasks)
+    elapsed = time.perf_counter() - started
+
+    total = {key: sum(result[key] for result in results) for key in results[0]}
+    batch = f"{total['writes'] / total['batches']:.1f}" if total['batches'] else '-'
+    print(f"{mode:<8} {total['ok'] / elapsed:>10.0f} {total['ok']:>8} {total['locked']:>10} "
+          f"{total['other']:>7} {batch:>9} {elapsed:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--ops', type=int, default=150, help="opérations par thread")
+    parser.add_argument('--journal', default='wal', choices=('wal', 'delete'))
+    parser.add_argument('--timeout', type=float, default=5.0, help="attente du verrou en mode direct (s)")
+    args = parser.parse_args()
+
+    print(f"{args.processes} processus x {args.threads} threads x {args.ops} opérations, "
+          f"journal {args.journal}, timeout direct {args.timeout} s")
+    print(f"{'mode':<8} {'ops/s':>10} {'réussies':>8} {'verrouil.':>10} {'autres':>7} {'lot moy.':>9} {'durée s':>8}")
+    print('-' * 66)
+    tmp_dir = tempfile.mkdtemp(prefix='stress_writes_')
+    try:
+        for mode in ('direct', 'writer'):
+            stress(tmp_dir, mode, args.journal, args.timeout, args.processes, args.threads, args.ops)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+"""
+Routes de Sport Connect, par domaine (enregistrées par create_app() dans app.py)
+
+- core : /metrics, assets hashés, dérivés d'images, proxy d'images distantes
+- auth : inscription, connexion, profil, notifications
+- events : liste des activités, synchronisation, création, participation, lieux
+- map_calendar : carte interactive et calendrier
+- chat : messages des activités
+- chatbot : coach Sporty (client LLM importé au premier appel)
+- admin : pages /admin/* (profileurs, sauvegardes et uploads importés à la demande)
+
+Les endpoints sont préfixés par le blueprint : url_for('events.index').
+"""
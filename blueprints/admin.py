@@ -0,0 +1,913 @@
+"""
+Administration (/admin/*) : lieux, activités, utilisateurs, mesures, tâches,
+base de données, mémoire, réglages et images des sports
+
+Sous-systèmes rarement utilisés importés à la première visite : profileurs
+(profiling, memory_profiling), client LLM (test de la clé), Pillow (uploads).
+"""
+
+from functools import wraps
+import json
+import os
+import random
+import re
+import sqlite3
+
+from flask import (Blueprint, abort, flash, jsonify, redirect, render_template, request, send_file,
+                   url_for)
+from flask_login import current_user, login_required
+from werkzeug.security import generate_password_hash
+from werkzeug.utils import secure_filename
+
+import backup
+from db import connect_db
+from extensions import (DATABASE_PATH, PROFILE_HEADER, PROFILE_PARAM, ROOT_DIR, UPLOAD_FOLDER,
+                        asset_manifest, db_writer, get_profile_store, image_cache, route_stats)
+from fragment_cache import all_cache_stats
+from images import validate_image, variant_url
+import maintenance
+from models import (DEFAULT_SPORT_IMAGES, create_place, delete_place, get_all_places, get_place_by_id,
+                    get_setting, get_sport_images, set_setting, toggle_place_active, update_place)
+import notifications
+import slow_queries
+from slow_queries import slow_query_log
+import tasks
+from tasks import (backup_database, cleanup_deleted_user, job_queue, maintain_database, note_batch_changes,
+                   process_uploaded_image)
+
+bp = Blueprint('admin', __name__)
+
+
+def admin_required(f):
+    """Décorateur pour protéger les routes admin"""
+    @wraps(f)
+    @login_required
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_admin:
+            flash('Accès réservé aux administrateurs.', 'error')
+            return redirect(url_for('events.index'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+# ===========================
+# UPLOADS D'IMAGES
+# ===========================
+
+ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp'}
+
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def save_upload(file, base_name):
+    """
+    Enregistre un upload dans le dossier d'attente et vérifie que c'est une image
+
+    Returns:
+        str: Chemin du fichier, ou None si ce n'est pas une image valide
+    """
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    ext = os.path.splitext(secure_filename(file.filename))[1].lower() or '.jpg'
+    path = os.path.join(UPLOAD_FOLDER, f"{base_name}-{os.urandom(8).hex()}{ext}")
+    file.save(path)
+    if not validate_image(path):
+        os.remove(path)
+        return None
+    return path
+
+
+# ===========================
+# ADMIN - LIEUX
+# ===========================
+
+@bp.route('/admin/places')
+@admin_required
+def admin_places():
+    """Liste des lieux de pratique sportive (admin)"""
+    places = get_all_places(active_only=False)
+    return render_template('admin/places_list.html', places=places)
+
+
+@bp.route('/admin/places/add', methods=['GET', 'POST'])
+@admin_required
+def admin_add_place():
+    """Ajouter un nouveau lieu (admin)"""
+    if request.method == 'POST':
+        name = request.form.get('name', '').strip()
+        city = request.form.get('city', '').strip()
+        address = request.form.get('address', '').strip() or None
+        sports = request.form.get('sports', '').strip() or None
+        is_pmr = request.form.get('is_pmr_accessible') == 'on'
+        transport_station = request.form.get('transport_station', '').strip() or None
+        transport_lines = request.form.get('transport_lines', '').strip() or None
+        image_url = request.form.get('image_url', '').strip() or None
+
+        # Coordonnées
+        try:
+            latitude = float(request.form.get('latitude')) if request.form.get('latitude') else None
+            longitude = float(request.form.get('longitude')) if request.form.get('longitude') else None
+        except (ValueError, TypeError):
+            latitude = None
+            longitude = None
+
+        if not name or not city:
+            flash('Le nom et la ville sont obligatoires.', 'error')
+            return render_template('admin/place_form.html', place=None)
+
+        place_id = create_place(
+            name=name, city=city, address=address,
+            latitude=latitude, longitude=longitude,
+            sports=sports, is_pmr_accessible=is_pmr,
+            transport_station=transport_station, transport_lines=transport_lines,
+            image_url=image_url
+        )
+
+        flash(f'Lieu "{name}" créé avec succès !', 'success')
+        return redirect(url_for('admin.admin_places'))
+
+    return render_template('admin/place_form.html', place=None)
+
+
+@bp.route('/admin/places/<int:place_id>/edit', methods=['GET', 'POST'])
+@admin_required
+def admin_edit_place(place_id):
+    """Modifier un lieu existant (admin)"""
+    place = get_place_by_id(place_id)
+
+    if not place:
+        flash('Lieu introuvable.', 'error')
+        return redirect(url_for('admin.admin_places'))
+
+    if request.method == 'POST':
+        name = request.form.get('name', '').strip()
+        city = request.form.get('city', '').strip()
+        address = request.form.get('address', '').strip() or None
+        sports = request.form.get('sports', '').strip() or None
+        is_pmr = request.form.get('is_pmr_accessible') == 'on'
+        transport_station = request.form.get('transport_station', '').strip() or None
+        transport_lines = request.form.get('transport_lines', '').strip() or None
+        image_url = request.form.get('image_url', '').strip() or None
+
+        # Coordonnées
+        try:
+            latitude = float(request.form.get('latitude')) if request.form.get('latitude') else None
+            longitude = float(request.form.get('longitude')) if request.form.get('longitude') else None
+        except (ValueError, TypeError):
+            latitude = None
+            longitude = None
+
+        if not name or not city:
+            flash('Le nom et la ville sont obligatoires.', 'error')
+            return render_template('admin/place_form.html', place=place)
+
+        update_place(
+            place_id=place_id, name=name, city=city, address=address,
+            latitude=latitude, longitude=longitude,
+            sports=sports, is_pmr_accessible=is_pmr,
+            transport_station=transport_station, transport_lines=transport_lines,
+            image_url=image_url
+        )
+
+        flash(f'Lieu "{name}" modifié avec succès !', 'success')
+        return redirect(url_for('admin.admin_places'))
+
+    return render_template('admin/place_form.html', place=place)
+
+
+@bp.route('/admin/places/<int:place_id>/toggle', methods=['POST'])
+@admin_required
+def admin_toggle_place(place_id):
+    """Activer/désactiver un lieu (admin)"""
+    new_status = toggle_place_active(place_id)
+
+    if new_status is not None:
+        status_text = 'activé' if new_status else 'désactivé'
+        flash(f'Lieu {status_text} avec succès.', 'success')
+    else:
+        flash('Lieu introuvable.', 'error')
+
+    return redirect(url_for('admin.admin_places'))
+
+
+@bp.route('/admin/places/<int:place_id>/delete', methods=['POST'])
+@admin_required
+def admin_delete_place(place_id):
+    """Supprimer un lieu (admin)"""
+    place = get_place_by_id(place_id)
+
+    if place:
+        delete_place(place_id)
+        flash(f'Lieu "{place["name"]}" supprimé.', 'success')
+    else:
+        flash('Lieu introuvable.', 'error')
+
+    return redirect(url_for('admin.admin_places'))
+
+
+# ===========================
+# ADMIN - GESTION DES ACTIVITÉS
+# ===========================
+
+@bp.route('/admin/events')
+@admin_required
+def admin_events():
+    """Liste des événements (admin)"""
+    conn = connect_db(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+
+    # Nombre de participants dans la même requête (sous-requête sur l'index de participations)
+    c.execute("""
+        SELECT e.*, u.username as organizer_name,
+               (SELECT COUNT(*) FROM participations p WHERE p.event_id = e.id) as participant_count
+        FROM events e
+        LEFT JOIN users u ON e.organizer_id = u.id
+        ORDER BY e.id DESC
+    """)
+    events_list = []
+    for row in c.fetchall():
+        event = dict(row)
+        participant_count = event.pop('participant_count')
+        events_list.append({
+            'event': event,
+            'participant_count': participant_count
+        })
+
+    conn.close()
+    return render_template('admin/events_list.html', events=events_list)
+
+
+@bp.route('/admin/events/<int:event_id>/delete', methods=['POST'])
+@admin_required
+def admin_delete_event(event_id):
+    """Supprimer un événement (admin)"""
+    # Participations, notifications puis l'événement (même transaction, via l'écrivain)
+    def write(conn):
+        if not conn.execute("DELETE FROM events WHERE id = ? RETURNING id", (event_id,)).fetchone():
+            return None
+        changes = conn.execute("DELETE FROM participations WHERE event_id = ?", (event_id,)).rowcount
+        changes += notifications.delete_for_event(conn, event_id)
+        return changes + 1
+
+    changes = db_writer.run(write)
+    if changes is not None:
+        note_batch_changes(changes)
+        flash('Événement supprimé avec succès.', 'success')
+    else:
+        flash('Événement introuvable.', 'error')
+
+    return redirect(url_for('admin.admin_events'))
+
+
+@bp.route('/admin/events/<int:event_id>/toggle-cancel', methods=['POST'])
+@admin_required
+def admin_toggle_cancel_event(event_id):
+    """Annuler/réactiver un événement (admin)"""
+    # Bascule et notification des participants (même transaction, via l'écrivain)
+    def write(conn, user_id):
+        result = conn.execute("UPDATE events SET is_cancelled = NOT is_cancelled WHERE id = ? RETURNING is_cancelled",
+                              (event_id,)).fetchone()
+        if result:
+            notifications.notify_event(conn, event_id, 'cancelled' if result[0] else 'reactivated',
+                                       exclude_user_id=user_id)
+        return result
+
+    result = db_writer.run(write, current_user.id)
+
+    if result:
+        status = 'annulé' if result[0] else 'réactivé'
+        flash(f'Événement {status}.', 'success')
+    else:
+        flash('Événement introuvable.', 'error')
+
+    return redirect(url_for('admin.admin_events'))
+
+
+# ===========================
+# ADMIN - GESTION DES UTILISATEURS
+# ===========================
+
+@bp.route('/admin/users')
+@admin_required
+def admin_users():
+    """Liste des utilisateurs (admin)"""
+    conn = connect_db(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+
+    c.execute("""
+        SELECT u.*,
+               (SELECT COUNT(*) FROM events WHERE organizer_id = u.id) as events_count,
+               (SELECT COUNT(*) FROM participations WHERE user_id = u.id) as participations_count
+        FROM users u
+        ORDER BY u.id DESC
+    """)
+    users = c.fetchall()
+
+    conn.close()
+    return render_template('admin/users_list.html', users=users)
+
+
+@bp.route('/admin/users/<int:user_id>/toggle-admin', methods=['POST'])
+@admin_required
+def admin_toggle_admin(user_id):
+    """Promouvoir/rétrograder un utilisateur admin (admin)"""
+    # Empêcher de se rétrograder soi-même
+    if user_id == current_user.id:
+        flash('Vous ne pouvez pas modifier votre propre statut admin.', 'error')
+        return redirect(url_for('admin.admin_users'))
+
+    result = db_writer.run(lambda conn: conn.execute(
+        "UPDATE users SET is_admin = NOT is_admin WHERE id = ? RETURNING username, is_admin", (user_id,)).fetchone())
+
+    if result:
+        status = 'promu administrateur' if result[1] else 'rétrogradé utilisateur'
+        flash(f'{result[0]} a été {status}.', 'success')
+    else:
+        flash('Utilisateur introuvable.', 'error')
+
+    return redirect(url_for('admin.admin_users'))
+
+
+@bp.route('/admin/users/<int:user_id>/delete', methods=['POST'])
+@admin_required
+def admin_delete_user(user_id):
+    """Supprimer un utilisateur (admin)"""
+    # Empêcher de se supprimer soi-même
+    if user_id == current_user.id:
+        flash('Vous ne pouvez pas supprimer votre propre compte.', 'error')
+        return redirect(url_for('admin.admin_users'))
+
+    # Supprimer l'utilisateur tout de suite (plus de connexion possible), jamais un
+    # administrateur ; participations et activités organisées sont traitées en arrière-plan
+    def write(conn):
+        target = conn.execute("SELECT username, is_admin FROM users WHERE id = ?", (user_id,)).fetchone()
+        if target and not target[1]:
+            conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        return target
+
+    user = db_writer.run(write)
+
+    if user and user[1]:
+        flash('Impossible de supprimer un compte administrateur.', 'error')
+    elif user:
+        cleanup_deleted_user.delay(user_id)
+        flash(f'Utilisateur "{user[0]}" supprimé.', 'success')
+    else:
+        flash('Utilisateur introuvable.', 'error')
+
+    return redirect(url_for('admin.admin_users'))
+
+
+@bp.route('/admin/users/<int:user_id>/reset-points', methods=['POST'])
+@admin_required
+def admin_reset_points(user_id):
+    """Remettre les points à zéro (admin)"""
+    result = db_writer.run(lambda conn: conn.execute(
+        "UPDATE users SET points = 0 WHERE id = ? RETURNING username", (user_id,)).fetchone())
+
+    if result:
+        flash(f'Points de {result[0]} remis à zéro.', 'success')
+    else:
+        flash('Utilisateur introuvable.', 'error')
+
+    return redirect(url_for('admin.admin_users'))
+
+
+# ===========================
+# ADMIN - CACHES
+# ===========================
+
+@bp.route('/admin/caches')
+@admin_required
+def admin_caches():
+    """Statistiques des caches de fragments (taux de hit, mémoire)"""
+    return jsonify({'caches': all_cache_stats() + [image_cache.stats()]})
+
+
+@bp.route('/admin/perf')
+@admin_required
+def admin_perf():
+    """Temps et requêtes SQL par route sur une fenêtre glissante (ce processus)"""
+    window = request.args.get('window', 15, type=int)
+    if window not in (5, 15, 60):
+        window = 15
+    routes = route_stats.summary(window * 60)
+    if request.args.get('format') == 'json':
+        return jsonify({'window_minutes': window, 'pid': os.getpid(), 'routes': routes})
+    return render_template('admin/perf.html', routes=routes, window=window, pid=os.getpid())
+
+
+@bp.route('/admin/perf/reset', methods=['POST'])
+@admin_required
+def admin_perf_reset():
+    """Remet à zéro les mesures de ce processus"""
+    route_stats.clear()
+    flash('Mesures de performance remises à zéro.', 'success')
+    return redirect(url_for('admin.admin_perf'))
+
+
+@bp.route('/admin/slow-queries')
+@admin_required
+def admin_slow_queries():
+    """Requêtes SQL lentes regroupées par empreinte, triées par temps total (ce processus)"""
+    threshold = slow_queries.get_threshold()
+    threshold_ms = None if threshold is None else round(threshold * 1000, 1)
+    entries = slow_query_log.summary()
+    if request.args.get('format') == 'json':
+        return jsonify({'threshold_ms': threshold_ms, 'pid': os.getpid(), 'queries': entries})
+    return render_template('admin/slow_queries.html', entries=entries,
+                           threshold_ms=threshold_ms, pid=os.getpid())
+
+
+@bp.route('/admin/slow-queries/threshold', methods=['POST'])
+@admin_required
+def admin_slow_queries_threshold():
+    """Change le seuil de ce processus (vide = désactivé), jusqu'au prochain redémarrage"""
+    value = request.form.get('threshold_ms', '').strip()
+    if not value:
+        slow_queries.set_threshold(None)
+        flash('Journal des requêtes lentes désactivé.', 'success')
+    else:
+        try:
+            threshold_ms = float(value)
+        except ValueError:
+            flash('Seuil invalide.', 'error')
+            return redirect(url_for('admin.admin_slow_queries'))
+        slow_queries.set_threshold(max(0.0, threshold_ms) / 1000)
+        flash(f'Seuil des requêtes lentes : {threshold_ms:g} ms.', 'success')
+    return redirect(url_for('admin.admin_slow_queries'))
+
+
+@bp.route('/admin/slow-queries/reset', methods=['POST'])
+@admin_required
+def admin_slow_queries_reset():
+    """Vide le journal des requêtes lentes de ce processus"""
+    slow_query_log.clear()
+    flash('Journal des requêtes lentes vidé.', 'success')
+    return redirect(url_for('admin.admin_slow_queries'))
+
+
+@bp.route('/admin/profiles')
+@admin_required
+def admin_profiles():
+    """Profils de requêtes enregistrés (tous processus, dossier PROFILE_DIR)"""
+    profiles = get_profile_store().list()
+    if request.args.get('format') == 'json':
+        return jsonify({'profiles': profiles})
+    return render_template('admin/profiles.html', profiles=profiles,
+                           profile_param=PROFILE_PARAM, profile_header=PROFILE_HEADER)
+
+
+@bp.route('/admin/profiles/<profile_id>/<kind>')
+@admin_required
+def admin_profile_download(profile_id, kind):
+    """Télécharge le .pstats, le .collapsed ou les métadonnées d'un profil"""
+    path = get_profile_store().path(profile_id, kind)
+    if path is None:
+        abort(404)
+    mimetype = 'application/json' if kind == 'json' else \
+        'text/plain' if kind == 'collapsed' else 'application/octet-stream'
+    return send_file(path, mimetype=mimetype, as_attachment=True, download_name=f"{profile_id}.{kind}")
+
+
+@bp.route('/admin/profiles/<profile_id>/delete', methods=['POST'])
+@admin_required
+def admin_profile_delete(profile_id):
+    get_profile_store().delete(profile_id)
+    flash('Profil supprimé.', 'success')
+    return redirect(url_for('admin.admin_profiles'))
+
+
+@bp.route('/admin/profiles/clear', methods=['POST'])
+@admin_required
+def admin_profiles_clear():
+    get_profile_store().clear()
+    flash('Tous les profils ont été supprimés.', 'success')
+    return redirect(url_for('admin.admin_profiles'))
+
+
+# ===========================
+# ADMIN - TÂCHES EN ARRIÈRE-PLAN
+# ===========================
+
+@bp.route('/admin/jobs')
+@admin_required
+def admin_jobs():
+    """Profondeur de la file, tâches en cours et en échec (tous processus, table jobs)"""
+    stats = job_queue.stats()
+    worker = tasks.jobs_worker.status() if tasks.jobs_worker is not None else None
+    if request.args.get('format') == 'json':
+        return jsonify(dict(stats, worker=worker, worker_mode=tasks.JOBS_WORKER, pid=os.getpid()))
+    return render_template('admin/jobs.html', stats=stats, worker=worker, worker_mode=tasks.JOBS_WORKER,
+                           pid=os.getpid())
+
+
+@bp.route('/admin/jobs/<int:job_id>/retry', methods=['POST'])
+@admin_required
+def admin_jobs_retry(job_id):
+    job_queue.retry(job_id)
+    flash(f'Tâche #{job_id} remise en file.', 'success')
+    return redirect(url_for('admin.admin_jobs'))
+
+
+@bp.route('/admin/jobs/<int:job_id>/delete', methods=['POST'])
+@admin_required
+def admin_jobs_delete(job_id):
+    job_queue.delete(job_id)
+    flash(f'Tâche #{job_id} supprimée.', 'success')
+    return redirect(url_for('admin.admin_jobs'))
+
+
+@bp.route('/admin/jobs/purge', methods=['POST'])
+@admin_required
+def admin_jobs_purge():
+    deleted = job_queue.purge(keep_days=0)
+    flash(f'{deleted} tâche(s) terminée(s) supprimée(s).', 'success')
+    return redirect(url_for('admin.admin_jobs'))
+
+
+# ===========================
+# ADMIN - BASE DE DONNÉES
+# ===========================
+
+@bp.route('/admin/database')
+@admin_required
+def admin_database():
+    """Taille de la base, pages libres, WAL, dernier passage de maintenance et sauvegardes"""
+    stats = maintenance.database_stats(DATABASE_PATH)
+    last_run = get_setting('maintenance_last_run')
+    last_run = json.loads(last_run) if last_run else None
+    backups = backup.list_backups()
+    if request.args.get('format') == 'json':
+        return jsonify({'stats': stats, 'last_maintenance': last_run, 'backups': backups})
+    return render_template('admin/database.html', stats=stats, last_run=last_run, backups=backups,
+                           maintenance_interval=maintenance.INTERVAL_SECONDS,
+                           backup_interval=backup.INTERVAL_SECONDS)
+
+
+@bp.route('/admin/database/maintenance', methods=['POST'])
+@admin_required
+def admin_database_maintenance():
+    """Passage de maintenance immédiat (vacuum même si le site n'est pas calme)"""
+    report = maintain_database(force=True)
+    flash(f"Maintenance terminée en {report['duration_s']} s : {report['pages_freed']} page(s) rendue(s) "
+          f"({report['vacuum']}).", 'success')
+    return redirect(url_for('admin.admin_database'))
+
+
+@bp.route('/admin/database/backup', methods=['POST'])
+@admin_required
+def admin_database_backup():
+    job_id = backup_database.delay()
+    flash(f'Sauvegarde mise en file (tâche #{job_id}).', 'success')
+    return redirect(url_for('admin.admin_database'))
+
+
+# ===========================
+# ADMIN - MÉMOIRE (TRACEMALLOC)
+# ===========================
+
+MEMORY_DIR = os.environ.get('MEMORY_DIR', os.path.join(ROOT_DIR, 'cache', 'memory'))
+_snapshot_store = None
+
+
+def snapshot_store():
+    """Instantanés tracemalloc ; memory_profiling n'est importé qu'à la première visite"""
+    global _snapshot_store
+    if _snapshot_store is None:
+        import memory_profiling
+        # Structures en mémoire estimées sur /admin/memory (les caches de fragments le sont d'office)
+        memory_profiling.track('route_stats', route_stats)
+        memory_profiling.track('slow_query_log', slow_query_log)
+        memory_profiling.track('asset_manifest', asset_manifest)
+        _snapshot_store = memory_profiling.SnapshotStore(MEMORY_DIR)
+    return _snapshot_store
+
+
+@bp.route('/admin/memory')
+@admin_required
+def admin_memory():
+    """État du traçage, mémoire des caches et instantanés (ce processus)"""
+    import memory_profiling
+
+    store = snapshot_store()
+    data = {
+        'status': memory_profiling.status(),
+        'caches': memory_profiling.cache_estimates(),
+        'snapshots': store.list(),
+    }
+    if request.args.get('format') == 'json':
+        return jsonify(data)
+    return render_template('admin/memory.html', **data)
+
+
+@bp.route('/admin/memory/start', methods=['POST'])
+@admin_required
+def admin_memory_start():
+    from memory_profiling import DEFAULT_FRAMES
+
+    frames = request.form.get('frames', DEFAULT_FRAMES, type=int)
+    snapshot_store().start(max(1, min(frames, 50)))
+    flash(f'Traçage mémoire démarré (processus {os.getpid()}).', 'success')
+    return redirect(url_for('admin.admin_memory'))
+
+
+@bp.route('/admin/memory/stop', methods=['POST'])
+@admin_required
+def admin_memory_stop():
+    snapshot_store().stop()
+    flash('Traçage mémoire arrêté.', 'success')
+    return redirect(url_for('admin.admin_memory'))
+
+
+@bp.route('/admin/memory/snapshot', methods=['POST'])
+@admin_required
+def admin_memory_snapshot():
+    try:
+        meta = snapshot_store().take(request.form.get('label', '').strip())
+    except RuntimeError as e:
+        flash(str(e), 'error')
+    else:
+        flash(f"Instantané {meta['id']} enregistré.", 'success')
+    return redirect(url_for('admin.admin_memory'))
+
+
+@bp.route('/admin/memory/compare')
+@admin_required
+def admin_memory_compare():
+    """Croissance des allocations entre deux instantanés (?old=&new=&by=lineno|filename&format=txt|json)"""
+    from memory_profiling import format_report
+
+    key_type = request.args.get('by', 'lineno')
+    if key_type not in ('lineno', 'filename'):
+        key_type = 'lineno'
+    comparison = snapshot_store().compare(request.args.get('old', ''), request.args.get('new', ''),
+                                        key_type, limit=request.args.get('limit', 30, type=int))
+    if comparison is None:
+        abort(404)
+    output = request.args.get('format')
+    if output == 'json':
+        return jsonify(comparison)
+    if output == 'txt':
+        return format_report(comparison), 200, {
+            'Content-Type': 'text/plain; charset=utf-8',
+            'Content-Disposition': f"attachment; filename=memoire-{comparison['old']}-{comparison['new']}.txt",
+        }
+    return render_template('admin/memory_compare.html', comparison=comparison)
+
+
+@bp.route('/admin/memory/snapshots/<snapshot_id>')
+@admin_required
+def admin_memory_download(snapshot_id):
+    """Instantané brut (tracemalloc.Snapshot.load)"""
+    path = snapshot_store().path(snapshot_id)
+    if path is None:
+        abort(404)
+    return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                     download_name=f"{snapshot_id}.tracemalloc")
+
+
+@bp.route('/admin/memory/snapshots/<snapshot_id>/delete', methods=['POST'])
+@admin_required
+def admin_memory_delete(snapshot_id):
+    snapshot_store().delete(snapshot_id)
+    flash('Instantané supprimé.', 'success')
+    return redirect(url_for('admin.admin_memory'))
+
+
+# ===========================
+# ADMIN - RÉGLAGES
+# ===========================
+
+@bp.route('/admin/settings', methods=['GET', 'POST'])
+@admin_required
+def admin_settings():
+    """Page de réglages administrateur"""
+    if request.method == 'POST':
+        albert_key = request.form.get('albert_api_key', '').strip()
+        set_setting('albert_api_key', albert_key)
+        flash('Réglages sauvegardés avec succès !', 'success')
+        return redirect(url_for('admin.admin_settings'))
+
+    current_key = get_setting('albert_api_key')
+    current_logo = get_setting('logo_path', 'logo.png')
+    registration_enabled = get_setting('registration_enabled', '1') == '1'
+    whitelist_enabled = get_setting('whitelist_enabled', '0') == '1'
+    whitelist = json.loads(get_setting('whitelist', '[]'))
+    return render_template('admin/settings.html',
+                           albert_api_key=current_key,
+                           current_logo=current_logo,
+                           registration_enabled=registration_enabled,
+                           whitelist_enabled=whitelist_enabled,
+                           whitelist=whitelist)
+
+
+@bp.route('/admin/settings/test-albert')
+@admin_required
+def admin_test_albert():
+    """Tester la connexion avec l'API Albert"""
+    import llm
+
+    api_key = get_setting('albert_api_key')
+    if not api_key:
+        return jsonify({'status': 'error', 'message': 'Aucune clé API configurée.'})
+    try:
+        response = llm.chat_completion('admin_test_albert', api_key,
+                                       [{"role": "user", "content": "Dis bonjour en une phrase."}],
+                                       max_tokens=30, timeout=10)
+        if response.status_code == 200:
+            reply = llm.reply_text(response, '...')
+            return jsonify({'status': 'success', 'message': f'Connexion réussie ✅ — Réponse : {reply}'})
+        else:
+            return jsonify({'status': 'error', 'message': f'Erreur {response.status_code} — Clé invalide ou expirée.'})
+    except llm.Timeout:
+        return jsonify({'status': 'error', 'message': 'Timeout — L\'API Albert ne répond pas.'})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': f'Erreur : {str(e)}'})
+
+
+@bp.route('/admin/settings/upload-logo', methods=['POST'])
+@admin_required
+def admin_upload_logo():
+    """Upload d'un nouveau logo"""
+    file = request.files.get('logo_file')
+    path = None
+    if file and file.filename and allowed_file(file.filename):
+        path = save_upload(file, 'logo_custom')
+    if path:
+        # Le logo est basculé sur le dérivé une fois généré
+        process_uploaded_image.delay(path, 'logo', 'logo_custom', 'logo_path', 'images/derived/', 'nav')
+        flash('Logo reçu, il sera mis à jour dans quelques secondes.', 'success')
+    else:
+        flash('Fichier invalide. Formats acceptés : jpg, png, gif, webp.', 'error')
+    return redirect(url_for('admin.admin_settings'))
+
+
+@bp.route('/admin/settings/reset-logo', methods=['POST'])
+@admin_required
+def admin_reset_logo():
+    """Réinitialiser le logo par défaut"""
+    set_setting('logo_path', 'logo.png')
+    flash('Logo réinitialisé.', 'success')
+    return redirect(url_for('admin.admin_settings'))
+
+
+@bp.route('/admin/settings/toggle-registration', methods=['POST'])
+@admin_required
+def admin_toggle_registration():
+    """Activer ou désactiver les inscriptions"""
+    current = get_setting('registration_enabled', '1')
+    new_value = '0' if current == '1' else '1'
+    set_setting('registration_enabled', new_value)
+    state = 'désactivées' if new_value == '0' else 'activées'
+    flash(f'Les inscriptions sont maintenant {state}.', 'success')
+    return redirect(url_for('admin.admin_settings'))
+
+
+@bp.route('/admin/settings/whitelist/toggle', methods=['POST'])
+@admin_required
+def admin_toggle_whitelist():
+    """Activer ou désactiver la liste blanche"""
+    current = get_setting('whitelist_enabled', '0')
+    new_value = '0' if current == '1' else '1'
+    set_setting('whitelist_enabled', new_value)
+    state = 'activée' if new_value == '1' else 'désactivée'
+    flash(f'La liste blanche est maintenant {state}.', 'success')
+    return redirect(url_for('admin.admin_settings'))
+
+
+@bp.route('/admin/settings/whitelist/add', methods=['POST'])
+@admin_required
+def admin_whitelist_add():
+    """Ajouter manuellement un compte à la liste blanche"""
+    username = request.form.get('username', '').strip()
+    password = request.form.get('password', '').strip()
+    email = request.form.get('email', '').strip() or None
+
+    if not username or not password:
+        flash('Identifiant et mot de passe requis.', 'error')
+        return redirect(url_for('admin.admin_settings'))
+    if len(password) < 6:
+        flash('Le mot de passe doit contenir au moins 6 caractères.', 'error')
+        return redirect(url_for('admin.admin_settings'))
+
+    whitelist = json.loads(get_setting('whitelist', '[]'))
+    if any(e.get('username') == username for e in whitelist):
+        flash(f'« {username} » est déjà dans la liste blanche.', 'info')
+        return redirect(url_for('admin.admin_settings'))
+
+    entry = {
+        'username': username,
+        'password': password,
+        'password_hash': generate_password_hash(password)
+    }
+    if email:
+        entry['email'] = email
+    whitelist.append(entry)
+    set_setting('whitelist', json.dumps(whitelist))
+    flash(f'« {username} » ajouté à la liste blanche.', 'success')
+    return redirect(url_for('admin.admin_settings'))
+
+
+@bp.route('/admin/settings/whitelist/generate', methods=['POST'])
+@admin_required
+def admin_whitelist_generate():
+    """Générer automatiquement un compte de test"""
+    import secrets, string
+    adj = ['rapide', 'fort', 'agile', 'brave', 'vif', 'grand', 'fier', 'sûr']
+    sport = ['lion', 'aigle', 'tigre', 'requin', 'faucon', 'puma', 'lynx', 'cobra']
+    username = f"{random.choice(adj)}_{random.choice(sport)}_{random.randint(10,99)}"
+    alphabet = string.ascii_letters + string.digits + '!@#$'
+    password = ''.join(secrets.choice(alphabet) for _ in range(10))
+
+    whitelist = json.loads(get_setting('whitelist', '[]'))
+    # Sécurité : éviter les doublons
+    if any(e.get('username') == username for e in whitelist):
+        username += str(random.randint(1, 9))
+
+    entry = {
+        'username': username,
+        'password': password,
+        'password_hash': generate_password_hash(password)
+    }
+    whitelist.append(entry)
+    set_setting('whitelist', json.dumps(whitelist))
+    flash(f'Compte « {username} » généré avec succès.', 'success')
+    return redirect(url_for('admin.admin_settings'))
+
+
+@bp.route('/admin/settings/whitelist/remove', methods=['POST'])
+@admin_required
+def admin_whitelist_remove():
+    """Retirer un compte de la liste blanche"""
+    username = request.form.get('username', '').strip()
+    whitelist = json.loads(get_setting('whitelist', '[]'))
+    new_list = [e for e in whitelist if e.get('username') != username]
+    if len(new_list) < len(whitelist):
+        set_setting('whitelist', json.dumps(new_list))
+        flash(f'« {username} » supprimé de la liste blanche.', 'success')
+    return redirect(url_for('admin.admin_settings'))
+
+
+# ===========================
+# ADMIN - IMAGES DES SPORTS
+# ===========================
+
+@bp.route('/admin/sport-images')
+@admin_required
+def admin_sport_images():
+    """Visualiser et modifier les images des sports"""
+    images = get_sport_images()
+    sports = []
+    for sport in DEFAULT_SPORT_IMAGES.keys():
+        image_url = images.get(sport, '')
+        # Aperçu : la vignette générée à l'upload, l'image elle-même pour une URL distante
+        sports.append((sport, image_url, variant_url(image_url, 'thumb') or image_url))
+    return render_template('admin/sport_images.html', sports=sports)
+
+
+@bp.route('/admin/sport-images/update', methods=['POST'])
+@admin_required
+def admin_update_sport_image():
+    """Mettre à jour l'image d'un sport (upload fichier ou URL)"""
+    sport = request.form.get('sport', '').strip()
+    image_url = request.form.get('image_url', '').strip()
+
+    if not sport:
+        flash('Sport non spécifié.', 'error')
+        return redirect(url_for('admin.admin_sport_images'))
+
+    # Priorité : fichier uploadé (dérivés générés en arrière-plan)
+    file = request.files.get('image_file')
+    if file and file.filename:
+        safe_name = re.sub(r'[^a-zA-Z0-9]', '_', sport).lower()
+        path = save_upload(file, safe_name) if allowed_file(file.filename) else None
+        if not path:
+            flash('Fichier invalide. Formats acceptés : jpg, png, gif, webp.', 'error')
+            return redirect(url_for('admin.admin_sport_images'))
+        process_uploaded_image.delay(path, 'sport', safe_name, f'sport_image_{sport}',
+                                     '/static/images/derived/', 'card')
+        flash(f'Image reçue pour « {sport} », elle sera mise à jour dans quelques secondes.', 'success')
+        return redirect(url_for('admin.admin_sport_images'))
+
+    if image_url:
+        set_setting(f'sport_image_{sport}', image_url)
+        flash(f'Image mise à jour pour « {sport} » !', 'success')
+    else:
+        flash('Aucune image fournie.', 'error')
+
+    return redirect(url_for('admin.admin_sport_images'))
+
+
+@bp.route('/admin/sport-images/reset', methods=['POST'])
+@admin_required
+def admin_reset_sport_image():
+    """Réinitialiser l'image d'un sport à sa valeur par défaut"""
+    sport = request.form.get('sport', '').strip()
+    if sport:
+        db_writer.run(lambda conn: conn.execute("DELETE FROM settings WHERE key = ?", (f'sport_image_{sport}',)))
+        flash(f'Image réinitialisée pour « {sport} ».', 'success')
+    return redirect(url_for('admin.admin_sport_images'))
@@ -0,0 +1,230 @@
+"""
+Authentification et compte : inscription, connexion (liste blanche comprise),
+déconnexion, profil et boîte de notifications
+"""
+
+import json
+import random
+import sqlite3
+
+from flask import Blueprint, flash, jsonify, redirect, render_template, request, url_for
+from flask_login import current_user, login_required, login_user, logout_user
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from db import connect_db
+from extensions import DATABASE_PATH, db_writer
+from models import User, create_user, get_setting, get_user_by_id, get_user_by_username
+import notifications
+
+bp = Blueprint('auth', __name__)
+
+
+# ===========================
+# ROUTES D'AUTHENTIFICATION
+# ===========================
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    """Page d'inscription"""
+    if current_user.is_authenticated:
+        return redirect(url_for('events.index'))
+
+    # Vérifier si les inscriptions sont activées
+    if get_setting('registration_enabled', '1') == '0':
+        flash('Les inscriptions sont actuellement désactivées.', 'error')
+        return redirect(url_for('auth.login'))
+
+    if request.method == 'POST':
+        username = request.form.get('username', '').strip()
+        email = request.form.get('email', '').strip() or None
+        password = request.form.get('password', '')
+        password_confirm = request.form.get('password_confirm', '')
+
+        # Validation
+        if not username or len(username) < 3:
+            flash('Le nom d\'utilisateur doit contenir au moins 3 caractères.', 'error')
+            return render_template('register.html')
+
+        if not password or len(password) < 6:
+            flash('Le mot de passe doit contenir au moins 6 caractères.', 'error')
+            return render_template('register.html')
+
+        if password != password_confirm:
+            flash('Les mots de passe ne correspondent pas.', 'error')
+            return render_template('register.html')
+
+        # Vérifier si le username existe déjà
+        if get_user_by_username(username):
+            flash('Ce nom d\'utilisateur est déjà pris.', 'error')
+            return render_template('register.html')
+
+        # Génération d'une couleur d'avatar aléatoire
+        colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A', '#98D8C8',
+                  '#F06292', '#64B5F6', '#81C784', '#FFB74D', '#BA68C8']
+        avatar_color = random.choice(colors)
+
+        # Hachage du mot de passe
+        password_hash = generate_password_hash(password)
+
+        # Créer l'utilisateur
+        user_id = create_user(username, password_hash, email, avatar_color)
+
+        if user_id:
+            # Auto-connexion après inscription
+            user = get_user_by_id(user_id)
+            login_user(user)
+            flash(f'Bienvenue sur Olympus, {username} !', 'success')
+            return redirect(url_for('events.index'))
+        else:
+            flash('Une erreur s\'est produite lors de l\'inscription.', 'error')
+
+    return render_template('register.html')
+
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    """Page de connexion"""
+    if current_user.is_authenticated:
+        return redirect(url_for('events.index'))
+
+    if request.method == 'POST':
+        username = request.form.get('username', '').strip()
+        password = request.form.get('password', '')
+        remember = request.form.get('remember') == 'yes'
+
+        # Récupérer l'utilisateur
+        user_data = get_user_by_username(username)
+
+        whitelist_enabled = get_setting('whitelist_enabled', '0') == '1'
+
+        # --- Mode liste blanche ---
+        if whitelist_enabled and user_data and not bool(user_data.get('is_admin', 0)):
+            whitelist = json.loads(get_setting('whitelist', '[]'))
+            entry = next((e for e in whitelist if e.get('username') == username), None)
+            if not entry:
+                flash('Accès refusé. Votre compte n\'est pas dans la liste autorisée.', 'error')
+                return render_template('login.html')
+            if not check_password_hash(entry['password_hash'], password):
+                flash('Nom d\'utilisateur ou mot de passe incorrect.', 'error')
+                return render_template('login.html')
+            # Credentials whitelist OK → connecter avec le compte DB
+            user = User(
+                id=user_data['id'],
+                username=user_data['username'],
+                email=user_data['email'],
+                points=user_data['points'],
+                avatar_color=user_data['avatar_color'],
+                is_admin=False
+            )
+            login_user(user, remember=remember)
+            next_page = request.args.get('next')
+            if next_page and next_page.startswith('/'):
+                return redirect(next_page)
+            return redirect(url_for('events.index'))
+
+        # --- Mode normal ---
+        if user_data and check_password_hash(user_data['password_hash'], password):
+            user = User(
+                id=user_data['id'],
+                username=user_data['username'],
+                email=user_data['email'],
+                points=user_data['points'],
+                avatar_color=user_data['avatar_color'],
+                is_admin=bool(user_data.get('is_admin', 0))
+            )
+            login_user(user, remember=remember)
+            next_page = request.args.get('next')
+            if next_page and next_page.startswith('/'):
+                return redirect(next_page)
+            return redirect(url_for('events.index'))
+        else:
+            flash('Nom d\'utilisateur ou mot de passe incorrect.', 'error')
+
+    return render_template('login.html')
+
+
+@bp.route('/logout')
+@login_required
+def logout():
+    """Déconnexion"""
+    logout_user()
+    flash('Vous êtes maintenant déconnecté.', 'info')
+    return redirect(url_for('auth.login'))
+
+
+# ===========================
+# ROUTE PROFIL
+# ===========================
+
+@bp.route('/profile')
+@login_required
+def profile():
+    """Page de profil utilisateur"""
+    conn = connect_db(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+
+    # Récupérer les événements organisés par l'utilisateur
+    c.execute("""
+        SELECT * FROM events
+        WHERE organizer_id = ?
+        ORDER BY id DESC
+    """, (current_user.id,))
+    organized_events = c.fetchall()
+
+    # Récupérer les participations
+    c.execute("""
+        SELECT e.*, p.joined_at, p.points_awarded
+        FROM participations p
+        JOIN events e ON p.event_id = e.id
+        WHERE p.user_id = ?
+        ORDER BY p.joined_at DESC
+    """, (current_user.id,))
+    participated_events = c.fetchall()
+
+    # Récupérer tous les événements actifs (pour section favoris)
+    c.execute("""
+        SELECT e.id, e.sport, e.niveau, e.lieu, e.date_heure, e.genre, u.username as organizer
+        FROM events e
+        JOIN users u ON e.organizer_id = u.id
+        WHERE e.is_cancelled = 0
+        ORDER BY e.id DESC
+    """)
+    all_events = [dict(row) for row in c.fetchall()]
+
+    conn.close()
+
+    return render_template('profile.html',
+                         organized_events=organized_events,
+                         participated_events=participated_events,
+                         all_events=all_events)
+
+
+# ===========================
+# NOTIFICATIONS
+# ===========================
+
+@bp.route('/notifications')
+@login_required
+def notifications_inbox():
+    """Boîte de notifications (les non-lues sont marquées comme lues à l'affichage)"""
+    inbox = notifications.get_inbox(current_user.id)
+    if current_user.unread_notifications or any(not n['is_read'] for n in inbox):
+        db_writer.run(notifications.mark_all_read, current_user.id)
+        current_user.unread_notifications = 0
+    return render_template('notifications.html', notifications=inbox)
+
+
+@bp.route('/api/notifications')
+@login_required
+def api_notifications():
+    """Compteur de non-lues et dernières notifications (JSON, sans les marquer comme lues)"""
+    return jsonify({'unread': current_user.unread_notifications,
+                    'notifications': notifications.get_inbox(current_user.id)})
+
+
+@bp.route('/api/notifications/<int:notification_id>/read', methods=['POST'])
+@login_required
+def api_notification_read(notification_id):
+    db_writer.run(notifications.mark_read, current_user.id, notification_id)
+    return jsonify({'success': True})
@@ -0,0 +1,129 @@
+"""
+Messages des activités (participants et organisateur), lus par polling
+"""
+
+import sqlite3
+
+from flask import Blueprint, jsonify, request
+from flask_login import current_user, login_required
+
+from db import connect_db
+from extensions import DATABASE_PATH, db_writer, rate_limiter
+from http_cache import compute_etag, not_modified, with_etag
+from metrics import count_chat_message
+import notifications
+
+bp = Blueprint('chat', __name__)
+
+
+# ===========================
+# API CHAT
+# ===========================
+
+@bp.route('/api/event/<int:event_id>/messages')
+@login_required
+def get_event_messages(event_id):
+    """Récupérer les messages d'un événement"""
+    # Vérifier que l'utilisateur participe à l'événement
+    conn = connect_db(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+
+    c.execute("SELECT id FROM participations WHERE event_id = ? AND user_id = ?",
+              (event_id, current_user.id))
+    if not c.fetchone():
+        # Vérifier si l'utilisateur est l'organisateur
+        c.execute("SELECT organizer_id FROM events WHERE id = ?", (event_id,))
+        event = c.fetchone()
+        if not event or event['organizer_id'] != current_user.id:
+            conn.close()
+            return jsonify({'error': 'Non autorisé'}), 403
+
+    # Récupérer les messages (paramètre since pour polling)
+    since_id = request.args.get('since', 0, type=int)
+
+    # Aucun nouveau message depuis la dernière réponse → 304 sans requête
+    etag = compute_etag([f'messages:{event_id}'], current_user.id, since_id)
+    cached = not_modified(etag)
+    if cached is not None:
+        conn.close()
+        return cached
+
+    c.execute("""
+        SELECT m.*, u.avatar_color
+        FROM messages m
+        LEFT JOIN users u ON m.user_id = u.id
+        WHERE m.event_id = ? AND m.id > ?
+        ORDER BY m.created_at ASC
+    """, (event_id, since_id))
+
+    messages = []
+    for row in c.fetchall():
+        messages.append({
+            'id': row['id'],
+            'user_id': row['user_id'],
+            'username': row['username'],
+            'content': row['content'],
+            'created_at': row['created_at'],
+            'avatar_color': row['avatar_color'] or '#6c757d',
+            'is_mine': row['user_id'] == current_user.id
+        })
+
+    conn.close()
+    return with_etag(jsonify({'messages': messages}), etag)
+
+
+@bp.route('/api/event/<int:event_id>/messages', methods=['POST'])
+@login_required
+@rate_limiter.limit('chat_message')
+def send_event_message(event_id):
+    """Envoyer un message dans un événement"""
+    conn = connect_db(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+
+    # Vérifier que l'utilisateur participe ou est organisateur
+    c.execute("SELECT id FROM participations WHERE event_id = ? AND user_id = ?",
+              (event_id, current_user.id))
+    is_participant = c.fetchone() is not None
+
+    c.execute("SELECT organizer_id FROM events WHERE id = ?", (event_id,))
+    event = c.fetchone()
+    is_organizer = event and event['organizer_id'] == current_user.id
+
+    if not is_participant and not is_organizer:
+        conn.close()
+        return jsonify({'error': 'Non autorisé'}), 403
+
+    content = request.json.get('content', '').strip()
+    if not content:
+        conn.close()
+        return jsonify({'error': 'Message vide'}), 400
+
+    conn.close()
+
+    # Insérer le message et notifier les participants (même transaction, via l'écrivain)
+    def write(conn, user_id, username):
+        c = conn.execute("""
+            INSERT INTO messages (event_id, user_id, username, content)
+            VALUES (?, ?, ?, ?)
+        """, (event_id, user_id, username, content))
+        message_id = c.lastrowid
+        notifications.notify_event(conn, event_id, 'message', exclude_user_id=user_id,
+                                   username=username, preview=notifications.preview(content))
+        return message_id
+
+    message_id = db_writer.run(write, current_user.id, current_user.username)
+    count_chat_message('event')
+
+    return jsonify({
+        'success': True,
+        'message': {
+            'id': message_id,
+            'user_id': current_user.id,
+            'username': current_user.username,
+            'content': content,
+            'avatar_color': current_user.avatar_color,
+            'is_mine': True
+        }
+    })
@@ -0,0 +1,188 @@
+"""
+Coach Sporty : page du chatbot et API /api/chatbot
+La page ne charge rien de lourd ; le client LLM (llm.py, requests compris) et le
+rapprochement des activités (suggestions.py) sont importés au premier message.
+"""
+
+import logging
+import sqlite3
+
+from flask import Blueprint, jsonify, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+
+from db import connect_db
+from extensions import DATABASE_PATH, rate_limiter
+from metrics import count_chat_message
+from models import get_setting
+
+chatbot_logger = logging.getLogger('sportconnect.chatbot')
+
+bp = Blueprint('chatbot', __name__)
+
+
+SPORTS_DATA = [
+    {'name': 'Running', 'emoji': '🏃', 'color': '#FF6B6B'},
+    {'name': 'Tennis', 'emoji': '🎾', 'color': '#4ECDC4'},
+    {'name': 'Yoga', 'emoji': '🧘', 'color': '#A78BFA'},
+    {'name': 'Football', 'emoji': '⚽', 'color': '#34D399'},
+    {'name': 'Natation', 'emoji': '🏊', 'color': '#60A5FA'},
+    {'name': 'Basketball', 'emoji': '🏀', 'color': '#F59E0B'},
+    {'name': 'Cyclisme', 'emoji': '🚴', 'color': '#F97316'},
+    {'name': 'Roller', 'emoji': '🛼', 'color': '#E879F9'},
+    {'name': 'Volley-ball', 'emoji': '🏐', 'color': '#FB923C'},
+    {'name': 'Danse', 'emoji': '💃', 'color': '#EC4899'},
+    {'name': 'Judo', 'emoji': '🥋', 'color': '#14B8A6'},
+    {'name': 'Karaté', 'emoji': '🥊', 'color': '#EF4444'},
+    {'name': 'Capoeira', 'emoji': '🤸', 'color': '#F472B6'},
+    {'name': 'Ping-pong', 'emoji': '🏓', 'color': '#8B5CF6'},
+    {'name': 'Patinage', 'emoji': '⛸️', 'color': '#38BDF8'},
+    {'name': 'Taekwondo', 'emoji': '🦶', 'color': '#DC2626'},
+    {'name': 'Kendo', 'emoji': '🗡️', 'color': '#6366F1'},
+    {'name': 'Handball', 'emoji': '🤾', 'color': '#10B981'},
+    {'name': 'Gymnastique', 'emoji': '🤸‍♀️', 'color': '#D946EF'},
+    {'name': 'Escrime', 'emoji': '🤺', 'color': '#78716C'},
+    {'name': 'Skate', 'emoji': '🛹', 'color': '#A3A3A3'},
+    {'name': 'Voile', 'emoji': '⛵', 'color': '#0EA5E9'},
+    {'name': 'Escalade', 'emoji': '🧗', 'color': '#92400E'},
+    {'name': 'Rugby', 'emoji': '🏉', 'color': '#15803D'},
+    {'name': 'Badminton', 'emoji': '🏸', 'color': '#0891B2'},
+    {'name': 'Multijeux', 'emoji': '🎮', 'color': '#7C3AED'},
+    {'name': 'Ultimate', 'emoji': '🥏', 'color': '#0D9488'},
+    {'name': 'Boxe', 'emoji': '🥊', 'color': '#B91C1C'},
+    {'name': 'MMA', 'emoji': '🤼', 'color': '#1E293B'},
+    {'name': 'Parkour', 'emoji': '🏃‍♂️', 'color': '#D97706'},
+    {'name': 'Hockey', 'emoji': '🏒', 'color': '#1D4ED8'},
+    {'name': 'Saut à la perche', 'emoji': '🏅', 'color': '#6B7280'},
+    {'name': 'Bowling', 'emoji': '🎳', 'color': '#7C2D12'},
+    {'name': 'Tir à l\'arc', 'emoji': '🏹', 'color': '#166534'},
+    {'name': 'Golf', 'emoji': '⛳', 'color': '#15803D'},
+    {'name': 'Ski', 'emoji': '⛷️', 'color': '#BAE6FD'},
+]
+
+
+@bp.route('/chatbot')
+@login_required
+def chatbot():
+    """Page du chatbot Sporty (coach IA unifié)"""
+    return render_template('chatbot.html', sports_data=SPORTS_DATA)
+
+
+@bp.route('/coach')
+@login_required
+def coach():
+    """Redirige vers la page Sporty unifiée"""
+    return redirect(url_for('chatbot.chatbot'))
+
+
+@bp.route('/api/chatbot', methods=['POST'])
+@login_required
+@rate_limiter.limit('chatbot')
+def api_chatbot():
+    """Endpoint API pour le chatbot Sporty"""
+    # Client LLM et suggestions : importés au premier message de ce worker
+    import llm
+    from suggestions import suggest_events
+
+    data = request.get_json()
+    if not data or not data.get('message'):
+        return jsonify({'error': 'Message vide'}), 400
+
+    user_message = data['message']
+    history = data.get('history', [])
+    count_chat_message('chatbot')
+
+    conn = connect_db(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+
+    # Activités de l'utilisateur (inscrit ou organisateur)
+    c.execute("""
+        SELECT DISTINCT e.sport, e.niveau, e.lieu, e.date_heure
+        FROM events e
+        LEFT JOIN participations p ON e.id = p.event_id AND p.user_id = ?
+        WHERE e.is_cancelled = 0
+          AND (p.id IS NOT NULL OR e.organizer_id = ?)
+        ORDER BY e.id DESC LIMIT 10
+    """, (current_user.id, current_user.id))
+    user_events = c.fetchall()
+
+    # Activités disponibles sur l'appli (toutes celles auxquelles l'utilisateur n'est pas encore inscrit)
+    c.execute("""
+        SELECT e.id, e.sport, e.niveau, e.lieu, e.date_heure, u.username as organisateur
+        FROM events e
+        LEFT JOIN users u ON e.organizer_id = u.id
+        WHERE e.is_cancelled = 0
+          AND e.id NOT IN (
+              SELECT event_id FROM participations WHERE user_id = ?
+          )
+        ORDER BY e.id DESC LIMIT 20
+    """, (current_user.id,))
+    available_events = c.fetchall()
+
+    conn.close()
+
+    # Construire le contexte : activités de l'utilisateur
+    if user_events:
+        user_events_text = "\n".join(
+            f"- {ev['sport']} ({ev['niveau']}) à {ev['lieu']}, {ev['date_heure']}"
+            for ev in user_events
+        )
+    else:
+        user_events_text = "Aucune activité inscrite pour le moment."
+
+    # Construire le contexte : activités disponibles sur l'appli
+    if available_events:
+        available_text = "\n".join(
+            f"- {ev['sport']} ({ev['niveau']}) à {ev['lieu']}, {ev['date_heure']} — proposé par {ev['organisateur']}"
+            for ev in available_events
+        )
+    else:
+        available_text = "Aucune activité disponible en ce moment."
+
+    activites_context = (
+        f"{user_events_text}\n\n"
+        f"ACTIVITÉS DISPONIBLES SUR L'APPLICATION (non encore rejointes) :\n"
+        f"{available_text}"
+    )
+
+    # --- Matcher les activités pertinentes selon la conversation ---
+    suggested_events = suggest_events(available_events, history, user_message)
+
+    # Construire les messages pour l'API
+    system_content = llm.SPORTY_SYSTEM_PROMPT + activites_context
+    messages = [{"role": "system", "content": system_content}]
+
+    for msg in history[-20:]:
+        messages.append({"role": msg.get("role", "user"), "content": msg.get("content", "")})
+    messages.append({"role": "user", "content": user_message})
+
+    # Récupérer la clé API depuis les paramètres admin
+    api_key = get_setting('albert_api_key')
+
+    if not llm.ALBERT_API_URL or not api_key:
+        return jsonify({
+            'response': "Mon cerveau IA n'est pas encore configuré. Un administrateur peut renseigner la clé API dans Admin > Réglages. 😊"
+        })
+
+    try:
+        response = llm.chat_completion('api_chatbot', api_key, messages,
+                                       max_tokens=150, timeout=30, temperature=0.7)
+
+        if response.status_code == 200:
+            ai_response = llm.reply_text(response)
+            if not ai_response:
+                ai_response = "Je n'ai pas bien compris, pourriez-vous reformuler ? 😊"
+            return jsonify({
+                'response': ai_response,
+                'suggested_events': suggested_events
+            })
+        else:
+            return jsonify({
+                'response': f"Une erreur de connexion est survenue (code {response.status_code}). Veuillez réessayer dans quelques instants. 🔄"
+            })
+
+    except llm.Timeout:
+        return jsonify({'response': "La réponse a pris trop de temps. Veuillez réessayer ! 😊"})
+    except Exception as e:
+        chatbot_logger.exception("Erreur du coach")
+        return jsonify({'response': f"Erreur technique : {type(e).__name__}: {str(e)[:200]}"})
@@ -0,0 +1,128 @@
+"""
+Routes techniques : métriques Prometheus, assets hashés, dérivés d'images
+et proxy d'images distantes (plus les fonctions de template associées)
+"""
+
+import logging
+import mimetypes
+import os
+
+from flask import Blueprint, abort, current_app, jsonify, request, send_file, url_for
+from itsdangerous import BadSignature, URLSafeSerializer
+from werkzeug.security import safe_join
+
+from assets import DIST_DIR
+from extensions import DERIVED_FOLDER, asset_manifest, image_cache
+from image_proxy import OriginError
+import metrics
+
+logger = logging.getLogger('sportconnect')
+
+bp = Blueprint('core', __name__)
+
+
+@bp.route('/metrics')
+def prometheus_metrics():
+    """Métriques au format texte Prometheus (jeton METRICS_TOKEN requis s'il est défini)"""
+    token = os.environ.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        abort(401)
+    body, content_type = metrics.render()
+    return body, 200, {'Content-Type': content_type, 'Cache-Control': 'no-store'}
+
+
+# ===========================
+# ASSETS STATIQUES (BUNDLES HASHÉS)
+# ===========================
+
+# Un fichier hashé ne change jamais : le navigateur n'a pas à le revalider
+ASSET_MAX_AGE = 365 * 24 * 3600
+IMMUTABLE_CACHE_CONTROL = f'public, max-age={ASSET_MAX_AGE}, immutable'
+
+# Versions précompressées par ordre de préférence : (encodage, suffixe)
+PRECOMPRESSED = [('br', '.br'), ('gzip', '.gz')]
+
+
+@bp.app_template_global()
+def asset_url(name):
+    """URL d'un asset statique (fichier hashé du manifeste si disponible)"""
+    return url_for('static', filename=asset_manifest.resolve(name))
+
+
+def send_immutable(directory, filename):
+    """Sert un fichier hashé, précompressé si le client l'accepte"""
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encoding = None
+    for candidate, suffix in PRECOMPRESSED:
+        if candidate in request.accept_encodings and os.path.isfile(path + suffix):
+            encoding, path = candidate, path + suffix
+            break
+
+    response = send_file(path, mimetype=mimetype, max_age=ASSET_MAX_AGE, conditional=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+
+@bp.route('/static/dist/<path:filename>')
+def dist_asset(filename):
+    """Bundles JS/CSS construits par assets.py"""
+    return send_immutable(DIST_DIR, filename)
+
+
+@bp.route('/static/images/derived/<path:filename>')
+def derived_image(filename):
+    """Dérivés d'images uploadées (noms contenant le hash du contenu)"""
+    return send_immutable(DERIVED_FOLDER, filename)
+
+
+# ===========================
+# PROXY D'IMAGES DISTANTES
+# ===========================
+
+# Les images mises en cache ne changent jamais pour une même URL
+IMAGE_PROXY_MAX_AGE = 365 * 24 * 3600
+
+
+def image_key_serializer():
+    """La clé /img/<key> est l'URL distante signée : le proxy ne sert que des URLs émises par l'app"""
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='image-proxy')
+
+
+@bp.app_template_filter('proxied_image')
+def proxied_image(url):
+    """URL locale /img/<key> pour une image distante, URL inchangée sinon"""
+    if url and url.startswith(('http://', 'https://')):
+        return url_for('core.image_proxy', key=image_key_serializer().dumps(url))
+    return url
+
+
+@bp.route('/img/<key>')
+def image_proxy(key):
+    """Sert une image distante depuis le cache disque (téléchargée au premier accès)"""
+    try:
+        url = image_key_serializer().loads(key)
+    except BadSignature:
+        abort(404)
+
+    try:
+        path, meta = image_cache.fetch(url)
+    except OriginError as e:
+        logger.warning("Origine d'image en échec", extra={'url': url, 'error': str(e)})
+        response = jsonify({'error': "Image indisponible"})
+        response.status_code = 502
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    response = send_file(path, mimetype=meta['content_type'], max_age=IMAGE_PROXY_MAX_AGE,
+                         conditional=True, etag=image_cache.key_for(url))
+    response.headers['Cache-Control'] = f'public, max-age={IMAGE_PROXY_MAX_AGE}, immutable'
+    # Le navigateur s'en tient au type vérifié à l'origine
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
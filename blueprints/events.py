@@ -0,0 +1,560 @@
+"""
+Activités : liste filtrée (cartes mises en cache), synchronisation incrémentale,
+création, participation et lieux proposés dans le formulaire
+"""
+
+import os
+import sqlite3
+
+from flask import (Blueprint, flash, get_template_attribute, jsonify, redirect, render_template,
+                   request, url_for)
+from flask_login import current_user, login_required
+from markupsafe import Markup
+
+from blueprints.core import proxied_image
+from db import connect_db
+from extensions import DATABASE_PATH, db_writer, rate_limiter
+from fragment_cache import FragmentCache
+from http_cache import conditional_get
+from images import variant_url
+from models import apply_points, get_all_places, get_place_by_id, get_sport_images
+import notifications
+
+bp = Blueprint('events', __name__)
+
+
+# ===========================
+# CACHE DES CARTES D'ACTIVITÉ
+# ===========================
+
+DEFAULT_CARD_IMAGE = 'https://images.unsplash.com/photo-1461896836934-68f78c8c46b6?w=400&h=200&fit=crop'
+
+# Partie commune des cartes, clé (id, row_version, image)
+card_cache = FragmentCache('event_cards',
+                           max_bytes=int(os.environ.get('CARD_CACHE_MAX_BYTES', 8 * 1024 * 1024)))
+
+
+def render_card_fragments(item, image_url):
+    """Rend la partie commune d'une carte et ses variantes par état utilisateur"""
+    event = item['event']
+    shared = render_template('partials/event_card.html', item=item,
+                             image_url=proxied_image(image_url),
+                             image_2x_url=variant_url(image_url, 'card_2x'))
+    notif_icon = get_template_attribute('partials/event_card_user.html', 'notif_icon')
+    actions = get_template_attribute('partials/event_card_user.html', 'actions')
+    states = {
+        state: str(actions(event, state))
+        for state in ('organizer', 'joined', 'none')
+    }
+    return shared, str(notif_icon(event)), states
+
+
+def render_event_card(item, sport_images):
+    """
+    HTML d'une carte d'activité pour l'utilisateur courant
+
+    La partie commune vient du cache ; l'état propre à l'utilisateur
+    (inscrit / organisateur) est appliqué par simple remplacement.
+    """
+    event = item['event']
+    image_url = sport_images.get(event['sport'], DEFAULT_CARD_IMAGE)
+    key = (event['id'], event['row_version'], image_url)
+
+    fragments = card_cache.get(key)
+    if fragments is None:
+        fragments = render_card_fragments(item, image_url)
+        shared, notif, states = fragments
+        size = len(shared) + len(notif) + sum(len(html) for html in states.values())
+        card_cache.set(key, fragments, size)
+    shared, notif, states = fragments
+
+    if item['is_organizer']:
+        state = 'organizer'
+    elif item['user_joined']:
+        state = 'joined'
+    else:
+        state = 'none'
+
+    flags = f"{'true' if item['user_joined'] else 'false'}, {'true' if item['is_organizer'] else 'false'}"
+    html = (shared
+            .replace('<!--user:class-->', 'event-joined' if item['user_joined'] else '', 1)
+            .replace('<!--user:flags-->', flags, 1)
+            .replace('<!--user:notif-->', notif if state != 'none' else '', 1)
+            .replace('<!--user:actions-->', states[state], 1))
+    return Markup(html)
+
+
+# Identifiants par requête IN (...) de load_card_items : au-delà de quelques centaines,
+# le planificateur préfère parcourir tout l'index de users plutôt que chercher chaque id
+CARD_BATCH_SIZE = 200
+
+
+def load_card_items(c, events, user_id):
+    """
+    Infos d'affichage des cartes, en une requête par type (et non une par événement)
+
+    Args:
+        c: Curseur (row_factory sqlite3.Row)
+        events (list): Lignes de la table events
+        user_id (int): Utilisateur courant (None : aucun inscrit, préchauffage)
+
+    Returns:
+        list: Un dict par événement (event, participant_count, user_joined, organizer_name, is_organizer)
+    """
+    participant_counts = {}
+    joined_ids = set()
+    organizer_names = {}
+    # Par lots : le nombre de paramètres d'une requête SQLite est borné
+    event_ids = [event['id'] for event in events]
+    for start in range(0, len(event_ids), CARD_BATCH_SIZE):
+        batch = event_ids[start:start + CARD_BATCH_SIZE]
+        placeholders = ','.join('?' * len(batch))
+
+        c.execute(f"""
+            SELECT event_id, COUNT(*) as count FROM participations
+            WHERE event_id IN ({placeholders})
+            GROUP BY event_id
+        """, batch)
+        participant_counts.update((row['event_id'], row['count']) for row in c.fetchall())
+
+        if user_id is not None:
+            c.execute(f"""
+                SELECT event_id FROM participations
+                WHERE user_id = ? AND event_id IN ({placeholders})
+            """, [user_id] + batch)
+            joined_ids.update(row['event_id'] for row in c.fetchall())
+
+    organizer_ids = list({event['organizer_id'] for event in events if event['organizer_id']})
+    for start in range(0, len(organizer_ids), CARD_BATCH_SIZE):
+        batch = organizer_ids[start:start + CARD_BATCH_SIZE]
+        c.execute(f"SELECT id, username FROM users WHERE id IN ({','.join('?' * len(batch))})", batch)
+        organizer_names.update((row['id'], row['username']) for row in c.fetchall())
+
+    return [{
+        'event': dict(event),
+        'participant_count': participant_counts.get(event['id'], 0),
+        'user_joined': event['id'] in joined_ids,
+        'organizer_name': organizer_names.get(event['organizer_id'], event['organisateur']),
+        'is_organizer': user_id is not None and event['organizer_id'] == user_id
+    } for event in events]
+
+
+def warm_card_cache(limit):
+    """
+    Rend les cartes des `limit` activités visibles les plus récentes (préchauffage, warmup.py)
+    À appeler dans un contexte de requête : les templates utilisent url_for.
+
+    Returns:
+        int: Nombre de cartes rendues
+    """
+    conn = connect_db(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    c.execute("SELECT * FROM events WHERE is_cancelled = 0 ORDER BY id DESC LIMIT ?", (limit,))
+    items = load_card_items(c, c.fetchall(), None)
+    conn.close()
+
+    sport_images = get_sport_images()
+    for item in items:
+        render_event_card(item, sport_images)
+    return len(items)
+
+
+def get_sync_version(c, scope='events'):
+    """Version courante d'un compteur de synchronisation (maintenu par triggers)"""
+    c.execute("SELECT version FROM sync_versions WHERE scope = ?", (scope,))
+    row = c.fetchone()
+    return row[0] if row else 0
+
+
+# ===========================
+# ROUTE PRINCIPALE (INDEX)
+# ===========================
+
+@bp.route('/')
+@login_required
+def index():
+    """Page d'accueil avec liste des événements et filtres"""
+    # Récupérer les filtres depuis l'URL
+    sport_filter = request.args.get('sport', '').strip()
+    niveau_filter = request.args.get('niveau', '').strip()
+    lieu_filter = request.args.get('lieu', '').strip()
+    genre_filter = request.args.get('genre', '').strip()
+
+    conn = connect_db(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+
+    # Version lue avant les événements : le client repartira de ce point
+    sync_version = get_sync_version(c)
+
+    # Construire la requête SQL dynamique
+    query = "SELECT * FROM events WHERE is_cancelled = 0"
+    params = []
+
+    if sport_filter:
+        query += " AND sport = ?"
+        params.append(sport_filter)
+
+    if niveau_filter:
+        query += " AND niveau = ?"
+        params.append(niveau_filter)
+
+    if lieu_filter:
+        query += " AND lieu LIKE ?"
+        params.append(f'%{lieu_filter}%')
+
+    if genre_filter:
+        query += " AND genre = ?"
+        params.append(genre_filter)
+
+    query += " ORDER BY id DESC"
+
+    c.execute(query, params)
+    events = c.fetchall()
+
+    # Participants, inscription et organisateur : quelques requêtes groupées, pas trois par événement
+    event_list = load_card_items(c, events, current_user.id)
+    conn.close()
+
+    sport_images = get_sport_images()
+    for item in event_list:
+        item['html'] = render_event_card(item, sport_images)
+
+    # Liste des sports disponibles (hardcodé pour MVP)
+    sports_list = ['Running', 'Tennis', 'Yoga', 'Football', 'Natation', 'Basketball', 'Cyclisme',
+                   'Roller', 'Volley-ball', 'Danse', 'Judo', 'Karaté', 'Capoeira',
+                   'Ping-pong', 'Patinage', 'Taekwondo', 'Kendo', 'Handball',
+                   'Gymnastique', 'Escrime', 'Skate', 'Voile',
+                   'Escalade', 'Rugby', 'Badminton', 'Multijeux', 'Ultimate',
+                   'Boxe', 'MMA', 'Parkour', 'Hockey',
+                   'Saut à la perche', 'Bowling', 'Tir à l\'arc', 'Golf', 'Ski']
+    niveaux_list = ['Débutant', 'Intermédiaire', 'Expert']
+    genres_list = ['Mixte', 'Homme', 'Femme']
+
+    return render_template('index.html',
+                         events=event_list,
+                         sports_list=sports_list,
+                         niveaux_list=niveaux_list,
+                         genres_list=genres_list,
+                         sync_version=sync_version,
+                         filters={
+                             'sport': sport_filter,
+                             'niveau': niveau_filter,
+                             'lieu': lieu_filter,
+                             'genre': genre_filter
+                         })
+
+
+# ===========================
+# API SYNCHRONISATION INCRÉMENTALE
+# ===========================
+
+def event_matches_filters(event, filters):
+    """Applique en Python les mêmes filtres que la requête de index()"""
+    if filters['sport'] and event['sport'] != filters['sport']:
+        return False
+    if filters['niveau'] and event['niveau'] != filters['niveau']:
+        return False
+    if filters['lieu'] and filters['lieu'].lower() not in (event['lieu'] or '').lower():
+        return False
+    if filters['genre'] and event['genre'] != filters['genre']:
+        return False
+    return True
+
+
+@bp.route('/api/events/changes')
+@login_required
+def api_events_changes():
+    """
+    Événements modifiés depuis une version donnée (polling incrémental)
+
+    Retourne les événements visibles dont row_version > since, et dans
+    'deleted' les ids à retirer de la page : événements supprimés
+    (tombstones), annulés, ou qui ne correspondent plus aux filtres.
+    Avec cards=1, chaque événement est accompagné du HTML de sa carte.
+    """
+    since = request.args.get('since', 0, type=int)
+    include_cards = request.args.get('cards') == '1'
+    filters = {
+        'sport': request.args.get('sport', '').strip(),
+        'niveau': request.args.get('niveau', '').strip(),
+        'lieu': request.args.get('lieu', '').strip(),
+        'genre': request.args.get('genre', '').strip()
+    }
+
+    conn = connect_db(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+
+    version = get_sync_version(c)
+
+    # Curseur plus récent que la base (restauration) → le client doit recharger
+    if since > version:
+        conn.close()
+        return jsonify({'version': version, 'reset': True, 'events': [], 'deleted': []})
+
+    # Le delta est petit : likelihood() oriente SQLite vers idx_events_row_version
+    # plutôt qu'un parcours de toute la table dans l'ordre des id
+    c.execute("SELECT * FROM events WHERE likelihood(row_version > ?, 0.01) ORDER BY id DESC", (since,))
+    changed = c.fetchall()
+
+    c.execute("SELECT event_id FROM event_tombstones WHERE row_version > ?", (since,))
+    deleted = [row['event_id'] for row in c.fetchall()]
+
+    visible = []
+    for event in changed:
+        if event['is_cancelled'] or not event_matches_filters(event, filters):
+            deleted.append(event['id'])
+        else:
+            visible.append(event)
+
+    event_list = load_card_items(c, visible, current_user.id)
+    conn.close()
+
+    if include_cards:
+        sport_images = get_sport_images()
+        for item in event_list:
+            item['html'] = render_event_card(item, sport_images)
+
+    return jsonify({
+        'version': version,
+        'events': event_list,
+        'deleted': deleted
+    })
+
+
+# ===========================
+# ROUTE AJOUT D'ÉVÉNEMENT
+# ===========================
+
+@bp.route('/add', methods=('GET', 'POST'))
+@login_required
+def add():
+    """Créer un nouvel événement"""
+    # Récupérer les lieux pour le menu déroulant
+    places = get_all_places(active_only=True)
+
+    sports_list = ['Running', 'Tennis', 'Yoga', 'Football', 'Natation', 'Basketball', 'Cyclisme',
+                   'Roller', 'Volley-ball', 'Danse', 'Judo', 'Karaté', 'Capoeira',
+                   'Ping-pong', 'Patinage', 'Taekwondo', 'Kendo', 'Handball',
+                   'Gymnastique', 'Escrime', 'Skate', 'Voile',
+                   'Escalade', 'Rugby', 'Badminton', 'Multijeux', 'Ultimate',
+                   'Boxe', 'MMA', 'Parkour', 'Hockey',
+                   'Saut à la perche', 'Bowling', 'Tir à l\'arc', 'Golf', 'Ski']
+
+    if request.method == 'POST':
+        sport = request.form['sport']
+        niveau = request.form['niveau']
+        date_heure = request.form['date_heure']
+        accessibilite = request.form.get('accessibilite')
+        genre = request.form.get('genre', 'Mixte')
+
+        # Gestion du lieu (prédéfini ou personnalisé)
+        place_id = request.form.get('place_id')
+        lieu_custom = request.form.get('lieu_custom', '').strip()
+
+        # Récupérer les coordonnées et transports
+        latitude = request.form.get('latitude')
+        longitude = request.form.get('longitude')
+        transport_station = request.form.get('transport_station', '').strip() or None
+        transport_lines = request.form.get('transport_lines', '').strip() or None
+
+        # Si un lieu prédéfini est sélectionné
+        if place_id and place_id != 'other':
+            place = get_place_by_id(int(place_id))
+            if place:
+                lieu = place['name'] + (f", {place['city']}" if place['city'] else "")
+                # Utiliser les coordonnées et transports du lieu si non renseignés
+                if not latitude and place['latitude']:
+                    latitude = place['latitude']
+                if not longitude and place['longitude']:
+                    longitude = place['longitude']
+                if not transport_station and place['transport_station']:
+                    transport_station = place['transport_station']
+                if not transport_lines and place['transport_lines']:
+                    transport_lines = place['transport_lines']
+                if not accessibilite and place['is_pmr_accessible']:
+                    accessibilite = 'Oui'
+            else:
+                lieu = lieu_custom
+                place_id = None
+        else:
+            lieu = lieu_custom
+            place_id = None
+
+        # Convertir en float ou None si vide
+        try:
+            latitude = float(latitude) if latitude else None
+            longitude = float(longitude) if longitude else None
+        except (ValueError, TypeError):
+            latitude = None
+            longitude = None
+
+        # Créer l'événement et ajouter les points de création (même transaction, via l'écrivain)
+        def write(conn, user_id, username):
+            conn.execute("""INSERT INTO events
+                            (organisateur, sport, niveau, lieu, date_heure, accessibilite, organizer_id, latitude, longitude, transport_station, transport_lines, place_id, genre)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                         (username, sport, niveau, lieu, date_heure, accessibilite, user_id, latitude, longitude, transport_station, transport_lines, place_id, genre))
+            apply_points(conn, user_id, 20)
+
+        db_writer.run(write, current_user.id, current_user.username)
+
+        flash(f'Événement "{sport}" créé avec succès ! +20 points', 'success')
+        return redirect(url_for('events.index'))
+
+    return render_template('add.html', places=places, sports_list=sports_list)
+
+
+# ===========================
+# ROUTES DE PARTICIPATION (AJAX)
+# ===========================
+
+@bp.route('/event/<int:event_id>/join', methods=['POST'])
+@login_required
+@rate_limiter.limit('participation')
+def join_event(event_id):
+    """Rejoindre un événement (API JSON)"""
+    conn = connect_db(DATABASE_PATH)
+    c = conn.cursor()
+    try:
+        # Vérifier que l'événement existe et n'est pas annulé
+        c.execute("SELECT is_cancelled, sport FROM events WHERE id = ?", (event_id,))
+        event = c.fetchone()
+
+        # Vérifier si déjà inscrit
+        c.execute("SELECT id FROM participations WHERE user_id = ? AND event_id = ?",
+                 (current_user.id, event_id))
+        already_joined = c.fetchone() is not None
+    finally:
+        # Lectures fermées avant de passer la main à l'écrivain (voir leave_event)
+        conn.close()
+
+    if not event:
+        return jsonify({'success': False, 'message': 'Événement introuvable'}), 404
+
+    if event[0] == 1:  # is_cancelled
+        return jsonify({'success': False, 'message': 'Cet événement a été annulé'}), 400
+
+    if already_joined:
+        return jsonify({'success': False, 'message': 'Vous êtes déjà inscrit à cet événement'}), 400
+
+    try:
+        # Créer la participation et attribuer les points (même transaction, via l'écrivain)
+        points_awarded = 50
+
+        def write(conn, user_id):
+            conn.execute("INSERT INTO participations (user_id, event_id, points_awarded) VALUES (?, ?, ?)",
+                         (user_id, event_id, points_awarded))
+            return apply_points(conn, user_id, points_awarded)
+
+        new_points = db_writer.run(write, current_user.id)
+
+        return jsonify({
+            'success': True,
+            'message': f'+{points_awarded} points ! Vous avez rejoint {event[1]}',
+            'new_points': new_points
+        })
+
+    except sqlite3.IntegrityError:
+        return jsonify({'success': False, 'message': 'Vous êtes déjà inscrit'}), 400
+
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@bp.route('/event/<int:event_id>/leave', methods=['POST'])
+@login_required
+@rate_limiter.limit('participation')
+def leave_event(event_id):
+    """Quitter un événement (API JSON)"""
+    conn = connect_db(DATABASE_PATH)
+    try:
+        # Récupérer les points attribués
+        participation = conn.execute("SELECT points_awarded FROM participations WHERE user_id = ? AND event_id = ?",
+                                     (current_user.id, event_id)).fetchone()
+    finally:
+        # Fermée avant de passer la main à l'écrivain : un SELECT dont on n'a lu qu'une ligne
+        # n'est pas terminé et, hors WAL (WRITER_WAL=off), garde un verrou partagé qui
+        # bloquerait le COMMIT de l'écrivain jusqu'à WRITER_BUSY_SECONDS
+        conn.close()
+
+    if not participation:
+        return jsonify({'success': False, 'message': 'Vous n\'êtes pas inscrit à cet événement'}), 400
+
+    try:
+        points_to_deduct = participation[0]
+
+        # Supprimer la participation et déduire les points (même transaction, via l'écrivain)
+        def write(conn, user_id):
+            deleted = conn.execute("DELETE FROM participations WHERE user_id = ? AND event_id = ? RETURNING id",
+                                   (user_id, event_id)).fetchone()
+            if not deleted:
+                return None  # déjà quittée entre-temps (double clic)
+            return apply_points(conn, user_id, -points_to_deduct)
+
+        new_points = db_writer.run(write, current_user.id)
+
+        if new_points is None:
+            return jsonify({'success': False, 'message': 'Vous n\'êtes pas inscrit à cet événement'}), 400
+
+        return jsonify({
+            'success': True,
+            'message': f'Participation annulée (-{points_to_deduct} points)',
+            'new_points': new_points
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@bp.route('/event/<int:event_id>/cancel', methods=['POST'])
+@login_required
+def cancel_event(event_id):
+    """Annuler un événement (organisateur uniquement) (API JSON)"""
+    conn = connect_db(DATABASE_PATH)
+    try:
+        # Vérifier que l'utilisateur est l'organisateur
+        event = conn.execute("SELECT organizer_id, sport FROM events WHERE id = ?", (event_id,)).fetchone()
+    finally:
+        # Lecture fermée avant de passer la main à l'écrivain (voir leave_event)
+        conn.close()
+
+    if not event:
+        return jsonify({'success': False, 'message': 'Événement introuvable'}), 404
+
+    if event[0] != current_user.id:
+        return jsonify({'success': False, 'message': 'Vous n\'êtes pas l\'organisateur de cet événement'}), 403
+
+    try:
+        # Marquer comme annulé, prévenir les participants et appliquer la pénalité
+        # de points (même transaction, via l'écrivain)
+        def write(conn, user_id):
+            cancelled = conn.execute("UPDATE events SET is_cancelled = 1 WHERE id = ? AND is_cancelled = 0",
+                                     (event_id,)).rowcount == 1
+            if not cancelled:
+                return False  # déjà annulé (double clic, nouvel envoi) : ni notification ni pénalité
+            notifications.notify_event(conn, event_id, 'cancelled', exclude_user_id=user_id)
+            apply_points(conn, user_id, -10)
+            return True
+
+        if not db_writer.run(write, current_user.id):
+            return jsonify({'success': False, 'message': 'Cet événement est déjà annulé'}), 400
+
+        return jsonify({
+            'success': True,
+            'message': 'Événement annulé (-10 points)'
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@bp.route('/api/places')
+@login_required
+@conditional_get(lambda: (['places'], []))
+def api_places():
+    """API pour récupérer les lieux actifs (pour le formulaire d'ajout)"""
+    places = get_all_places(active_only=True)
+    return jsonify(places)
@@ -0,0 +1,264 @@
+"""
+Carte interactive des activités géolocalisées et calendrier mensuel
+"""
+
+from datetime import date
+import sqlite3
+
+from flask import Blueprint, jsonify, render_template, request
+from flask_login import current_user, login_required
+
+from blueprints.events import get_sync_version, load_card_items
+from db import connect_db
+from extensions import DATABASE_PATH
+from http_cache import conditional_get
+
+bp = Blueprint('map_calendar', __name__)
+
+
+# ===========================
+# ROUTE CARTE INTERACTIVE
+# ===========================
+
+def get_map_events(user_id):
+    """
+    Événements non annulés enrichis pour la carte
+
+    Returns:
+        tuple: (version de synchronisation, liste des événements enrichis)
+    """
+    conn = connect_db(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+
+    sync_version = get_sync_version(c)
+
+    # Récupérer tous les événements non annulés avec géolocalisation
+    c.execute("SELECT * FROM events WHERE is_cancelled = 0 ORDER BY id DESC")
+    events = c.fetchall()
+
+    # Participants, inscription et organisateur : requêtes groupées par lots (comme les cartes de l'accueil)
+    event_list = load_card_items(c, events, user_id)
+    conn.close()
+
+    return sync_version, event_list
+
+
+@bp.route('/map')
+@login_required
+def map_view():
+    """Page de carte interactive avec les événements géolocalisés"""
+    sync_version, event_list = get_map_events(current_user.id)
+
+    # Liste des sports pour les filtres
+    sports_list = ['Running', 'Tennis', 'Yoga', 'Football', 'Natation', 'Basketball', 'Cyclisme',
+                   'Roller', 'Volley-ball', 'Danse', 'Judo', 'Karaté', 'Capoeira',
+                   'Ping-pong', 'Patinage', 'Taekwondo', 'Kendo', 'Handball',
+                   'Gymnastique', 'Escrime', 'Skate', 'Voile',
+                   'Escalade', 'Rugby', 'Badminton', 'Multijeux', 'Ultimate',
+                   'Boxe', 'MMA', 'Parkour', 'Hockey',
+                   'Saut à la perche', 'Bowling', 'Tir à l\'arc', 'Golf', 'Ski']
+
+    # Convertir en JSON pour JavaScript
+    import json
+    events_json = json.dumps(event_list)
+
+    return render_template('map.html',
+                         events=event_list,
+                         events_json=events_json,
+                         sync_version=sync_version,
+                         sports_list=sports_list)
+
+
+@bp.route('/api/events/map')
+@login_required
+@conditional_get(lambda: (['events'], [current_user.id]))
+def api_map_events():
+    """Données de la carte en JSON (ETag sur la version des événements)"""
+    _, event_list = get_map_events(current_user.id)
+    return jsonify(event_list)
+
+
+# ===========================
+# ROUTE CALENDRIER
+# ===========================
+
+@bp.route('/calendar')
+@login_required
+def calendar_view():
+    """Page calendrier des activités sportives"""
+    # Importés ici : seule cette page en a besoin
+    import calendar as cal_module
+    from dates import parse_date_heure
+
+    # Récupérer le mois demandé (défaut = mois courant)
+    month_param = request.args.get('month', '')
+    try:
+        if month_param:
+            year, month = map(int, month_param.split('-'))
+        else:
+            today = date.today()
+            year, month = today.year, today.month
+    except (ValueError, TypeError):
+        today = date.today()
+        year, month = today.year, today.month
+
+    # Calculer mois précédent et suivant
+    if month == 1:
+        prev_year, prev_month = year - 1, 12
+    else:
+        prev_year, prev_month = year, month - 1
+
+    if month == 12:
+        next_year, next_month = year + 1, 1
+    else:
+        next_year, next_month = year, month + 1
+
+    prev_month_str = f"{prev_year}-{prev_month:02d}"
+    next_month_str = f"{next_year}-{next_month:02d}"
+
+    # Premier et dernier jour du mois
+    first_day_weekday, days_in_month = cal_module.monthrange(year, month)
+
+    # Noms des mois en français
+    mois_fr = {
+        1: 'Janvier', 2: 'Février', 3: 'Mars', 4: 'Avril',
+        5: 'Mai', 6: 'Juin', 7: 'Juillet', 8: 'Août',
+        9: 'Septembre', 10: 'Octobre', 11: 'Novembre', 12: 'Décembre'
+    }
+
+    # Récupérer les événements du mois
+    month_start = f"{year}-{month:02d}-01"
+    month_end = f"{year}-{month:02d}-{days_in_month}"
+
+    conn = connect_db(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+
+    # Récupérer les événements auxquels l'utilisateur participe ou qu'il organise
+    c.execute("""
+        SELECT DISTINCT e.* FROM events e
+        LEFT JOIN participations p ON e.id = p.event_id AND p.user_id = ?
+        WHERE e.is_cancelled = 0
+          AND (p.id IS NOT NULL OR e.organizer_id = ?)
+        ORDER BY e.id DESC
+    """, (current_user.id, current_user.id))
+    events = c.fetchall()
+
+    conn.close()
+
+    # Grouper les événements par jour
+    events_by_day = {}
+    events_list = []
+    for event in events:
+        ev = dict(event)
+        jour, heure = parse_date_heure(event['date_heure'], year, month)
+        ev['parsed_time'] = heure
+        events_list.append(ev)
+        if jour:
+            if jour not in events_by_day:
+                events_by_day[jour] = []
+            events_by_day[jour].append(ev)
+
+    # Construire la grille du calendrier
+    # first_day_weekday : 0=lundi, 6=dimanche
+    calendar_days = []
+    # Cases vides avant le premier jour
+    for _ in range(first_day_weekday):
+        calendar_days.append({'day': None, 'events': []})
+    # Jours du mois
+    for day in range(1, days_in_month + 1):
+        calendar_days.append({
+            'day': day,
+            'events': events_by_day.get(day, []),
+            'is_today': (day == date.today().day and month == date.today().month and year == date.today().year)
+        })
+
+    # Couleurs et icônes par sport
+    sport_colors = {
+        'Running': '#FF6B6B',
+        'Tennis': '#4ECDC4',
+        'Yoga': '#A78BFA',
+        'Football': '#34D399',
+        'Natation': '#60A5FA',
+        'Basketball': '#F59E0B',
+        'Cyclisme': '#F97316',
+        'Roller': '#E879F9',
+        'Volley-ball': '#FB923C',
+        'Danse': '#EC4899',
+        'Judo': '#14B8A6',
+        'Karaté': '#EF4444',
+        'Capoeira': '#F472B6',
+        'Ping-pong': '#8B5CF6',
+        'Patinage': '#38BDF8',
+        'Taekwondo': '#DC2626',
+        'Kendo': '#6366F1',
+        'Handball': '#10B981',
+        'Gymnastique': '#D946EF',
+        'Escrime': '#78716C',
+        'Skate': '#A3A3A3',
+        'Voile': '#0EA5E9',
+        'Escalade': '#92400E',
+        'Rugby': '#15803D',
+        'Badminton': '#0891B2',
+        'Multijeux': '#7C3AED',
+        'Ultimate': '#0D9488',
+        'Boxe': '#B91C1C',
+        'MMA': '#1E293B',
+        'Parkour': '#D97706',
+        'Hockey': '#1D4ED8',
+        'Saut à la perche': '#6B7280',
+        'Bowling': '#7C2D12',
+        'Tir à l\'arc': '#166534',
+        'Golf': '#15803D',
+        'Ski': '#BAE6FD',
+    }
+    sport_icons = {
+        'Running': '🏃',
+        'Tennis': '🎾',
+        'Yoga': '🧘',
+        'Football': '⚽',
+        'Natation': '🏊',
+        'Basketball': '🏀',
+        'Cyclisme': '🚴',
+        'Roller': '🛼',
+        'Volley-ball': '🏐',
+        'Danse': '💃',
+        'Judo': '🥋',
+        'Karaté': '🥊',
+        'Capoeira': '🤸',
+        'Ping-pong': '🏓',
+        'Patinage': '⛸️',
+        'Taekwondo': '🦶',
+        'Kendo': '🗡️',
+        'Handball': '🤾',
+        'Gymnastique': '🤸‍♀️',
+        'Escrime': '🤺',
+        'Skate': '🛹',
+        'Voile': '⛵',
+        'Escalade': '🧗',
+        'Rugby': '🏉',
+        'Badminton': '🏸',
+        'Multijeux': '🎮',
+        'Ultimate': '🥏',
+        'Boxe': '🥊',
+        'MMA': '🤼',
+        'Parkour': '🏃‍♂️',
+        'Hockey': '🏒',
+        'Saut à la perche': '🏅',
+        'Bowling': '🎳',
+        'Tir à l\'arc': '🏹',
+        'Golf': '⛳',
+        'Ski': '⛷️',
+    }
+
+    return render_template('calendar.html',
+                         calendar_days=calendar_days,
+                         events_list=events_list,
+                         month_name=mois_fr[month],
+                         year=year,
+                         month=month,
+                         prev_month=prev_month_str,
+                         next_month=next_month_str,
+                         sport_colors=sport_colors,
+                         sport_icons=sport_icons)
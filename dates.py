@@ -0,0 +1,89 @@
+"""
+Analyse des dates saisies en texte libre pour Sport Connect
+Les activités ont une date_heure libre ("samedi 14h", "13 mars 18h30",
+"25/01/2026", "2026-03-14 09h") que le calendrier doit placer dans un mois
+"""
+
+import calendar as cal_module
+from datetime import date
+import re
+
+# Jours de la semaine en français pour le parsing
+JOURS_SEMAINE_FR = {
+    'lundi': 0, 'mardi': 1, 'mercredi': 2, 'jeudi': 3,
+    'vendredi': 4, 'samedi': 5, 'dimanche': 6
+}
+MOIS_FR_PARSE = {
+    'janvier': 1, 'février': 2, 'fevrier': 2, 'mars': 3, 'avril': 4,
+    'mai': 5, 'juin': 6, 'juillet': 7, 'août': 8, 'aout': 8,
+    'septembre': 9, 'octobre': 10, 'novembre': 11, 'décembre': 12, 'decembre': 12
+}
+
+# Heure (formats: 14h, 14h00, 15h30)
+HEURE_RE = re.compile(r'(\d{1,2})\s*h\s*(\d{2})?')
+# Format ISO (YYYY-MM-DD), en début de chaîne
+ISO_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+# Format "13 février" ou "13 mars 14h"
+JOUR_MOIS_RE = re.compile(r'(\d{1,2})\s+(' + '|'.join(MOIS_FR_PARSE) + r')')
+# Format "25/01/2026" ou "25/01"
+SLASH_RE = re.compile(r'(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?')
+
+
+def parse_date_heure(dt_str, current_year, current_month):
+    """
+    Parse une date en texte libre français pour un mois donné
+
+    Args:
+        dt_str (str): Date saisie par l'organisateur
+        current_year (int): Année affichée
+        current_month (int): Mois affiché (1-12)
+
+    Returns:
+        tuple: (jour du mois ou None si hors du mois, heure 'HH:MM' ou '')
+    """
+    if not dt_str:
+        return None, ''
+    dt_lower = dt_str.lower().strip()
+    days_in_month = cal_module.monthrange(current_year, current_month)[1]
+    jour = None
+    heure = ''
+
+    h_match = HEURE_RE.search(dt_lower)
+    if h_match:
+        h = h_match.group(1).zfill(2)
+        m = h_match.group(2) or '00'
+        heure = f"{h}:{m}"
+
+    iso_match = ISO_RE.match(dt_lower)
+    if iso_match:
+        y, mo, d = int(iso_match.group(1)), int(iso_match.group(2)), int(iso_match.group(3))
+        if mo == current_month and y == current_year:
+            jour = d
+        return jour, heure
+
+    date_match = JOUR_MOIS_RE.search(dt_lower)
+    if date_match:
+        d = int(date_match.group(1))
+        m = MOIS_FR_PARSE.get(date_match.group(2))
+        if m == current_month and 1 <= d <= days_in_month:
+            jour = d
+        return jour, heure
+
+    slash_match = SLASH_RE.search(dt_lower)
+    if slash_match:
+        d = int(slash_match.group(1))
+        m = int(slash_match.group(2))
+        if m == current_month and 1 <= d <= days_in_month:
+            jour = d
+        return jour, heure
+
+    # Jour de la semaine (lundi, mardi, etc.) → premier de ce jour dans le mois
+    for jour_nom, jour_idx in JOURS_SEMAINE_FR.items():
+        if jour_nom in dt_lower:
+            for d in range(1, days_in_month + 1):
+                if date(current_year, current_month, d).weekday() == jour_idx:
+                    jour = d
+                    break
+            break
+
+    return jour, heure
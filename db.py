@@ -0,0 +1,114 @@
+"""
+Connexions SQLite de Sport Connect
+Point d'entrée unique pour ouvrir une connexion (instrumentée, voir perf.py)
+
+DATABASE_PATH est un chemin de fichier ou une URI SQLite : avec
+file:nom?mode=memory&cache=shared, une base en mémoire partagée par toutes les
+connexions du processus, qui vit tant qu'une connexion reste ouverte (MemoryDatabase).
+Une base modèle (migrations + données) y est recopiée par l'API de sauvegarde :
+une base neuve en quelques millisecondes, sans fichier (benchmarks/check_routes.py).
+
+La fabrique de connexions est remplaçable (set_connection_factory).
+"""
+
+import os
+import sqlite3
+
+from perf import InstrumentedConnection
+
+# Chemin de la base de données (ou URI file:...)
+DATABASE_PATH = os.environ.get('DATABASE_PATH', 'database.db')
+
+# Désactivable pour comparer le coût de l'instrumentation (PERF_INSTRUMENTATION=0)
+INSTRUMENTATION_ENABLED = os.environ.get('PERF_INSTRUMENTATION', '1').lower() not in ('0', 'false', 'no')
+
+
+def is_memory(path):
+    return path.startswith('file:') and 'mode=memory' in path
+
+
+def sqlite_connect(path, **kwargs):
+    """
+    sqlite3.connect acceptant aussi les URI (file:...)
+
+    En mémoire partagée, les verrous sont ceux des tables et n'attendent pas
+    (busy_timeout sans effet) : les lectures se font sans verrou (read_uncommitted)
+    pour ne jamais bloquer l'écrivain unique.
+    """
+    if path.startswith('file:'):
+        kwargs['uri'] = True
+    conn = sqlite3.connect(path, **kwargs)
+    if is_memory(path):
+        conn.execute('PRAGMA read_uncommitted = 1')
+    return conn
+
+
+def default_connection(path):
+    """Fabrique par défaut : requêtes comptées et chronométrées (perf.py) sauf PERF_INSTRUMENTATION=0"""
+    if INSTRUMENTATION_ENABLED:
+        return sqlite_connect(path, factory=InstrumentedConnection)
+    return sqlite_connect(path)
+
+
+_connection_factory = default_connection
+
+
+def set_connection_factory(factory=None):
+    """
+    Remplace la fabrique utilisée par connect_db (None : fabrique par défaut)
+
+    Args:
+        factory: Fonction path -> sqlite3.Connection
+
+    Returns:
+        La fabrique précédente (pour la rétablir)
+    """
+    global _connection_factory
+    previous = _connection_factory
+    _connection_factory = factory or default_connection
+    return previous
+
+
+def connect_db(path):
+    """Ouvre une connexion SQLite (les requêtes sont comptées et chronométrées)"""
+    return _connection_factory(path)
+
+
+# ===========================
+# BASES EN MÉMOIRE
+# ===========================
+
+def clone_database(template_path, target):
+    """
+    Recopie une base modèle dans une autre par l'API de sauvegarde (contenu remplacé)
+
+    Args:
+        template_path (str): Base source (chemin ou URI)
+        target (sqlite3.Connection): Connexion à la base de destination
+    """
+    src = sqlite_connect(template_path)
+    try:
+        src.backup(target)
+    finally:
+        src.close()
+
+
+class MemoryDatabase:
+    """Base en mémoire partagée, copie d'une base modèle, gardée ouverte par sa connexion"""
+
+    def __init__(self, uri, template=None):
+        if not is_memory(uri):
+            raise ValueError(f"{uri} n'est pas une URI de base en mémoire (file:nom?mode=memory&cache=shared)")
+        self.uri = uri
+        self.template = template
+        self._keeper = sqlite_connect(self.uri)
+        if template:
+            self.reset()
+
+    def reset(self):
+        """Revient au contenu de la base modèle (aucune connexion ne doit avoir de transaction ouverte)"""
+        clone_database(self.template, self._keeper)
+
+    def close(self):
+        """Dernière connexion fermée : la base disparaît"""
+        self._keeper.close()
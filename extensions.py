@@ -0,0 +1,88 @@
+"""
+Objets partagés de Sport Connect (un exemplaire par processus)
+Créés à l'import, sans application ni routes : les blueprints (blueprints/) les
+importent, create_app() (app.py) les branche sur l'application.
+
+Rien de coûteux ici : requests, Pillow, les profileurs et le client LLM sont
+importés à la première utilisation (voir benchmarks/bench_startup.py --boot).
+"""
+
+import os
+
+from flask_login import LoginManager
+
+from assets import AssetManifest, DIST_DIR, MANIFEST_NAME
+from db import DATABASE_PATH
+from image_proxy import DiskImageCache
+from models import get_user_by_id
+from perf import RouteStats
+from rate_limit import RateLimiter, buckets_from_env
+from writer import writer_for
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Originaux en attente de traitement (hors de static/, jamais servis tels quels)
+UPLOAD_FOLDER = os.path.join(ROOT_DIR, 'uploads')
+# Dérivés générés (noms contenant le hash du contenu)
+DERIVED_FOLDER = os.path.join(ROOT_DIR, 'static', 'images', 'derived')
+
+# Écrivain unique du processus : les écritures concurrentes passent par sa file
+db_writer = writer_for(DATABASE_PATH)
+
+
+# ===========================
+# AUTHENTIFICATION
+# ===========================
+
+login_manager = LoginManager()
+login_manager.login_view = 'auth.login'
+login_manager.login_message = 'Veuillez vous connecter pour accéder à cette page.'
+login_manager.login_message_category = 'info'
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    """Charge un utilisateur depuis la base de données par son ID"""
+    return get_user_by_id(user_id)
+
+
+# Limitation de débit du chatbot, des messages et des participations (429 + Retry-After)
+rate_limiter = RateLimiter(buckets_from_env(os.path.join(ROOT_DIR, 'cache', 'ratelimit.db')))
+
+
+# ===========================
+# MESURES ET PROFILAGE
+# ===========================
+
+# Histogrammes glissants par route (1 heure, par minute), propres à chaque processus
+route_stats = RouteStats()
+
+# ?_profile=cprofile|sample ou en-tête X-Profile, honorés pour les administrateurs uniquement
+PROFILE_PARAM = '_profile'
+PROFILE_HEADER = 'X-Profile'
+
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(ROOT_DIR, 'cache', 'profiles'))
+_profile_store = None
+
+
+def get_profile_store():
+    """Profils enregistrés (PROFILE_DIR) ; profiling n'est importé qu'au premier profil ou sur /admin/profiles"""
+    global _profile_store
+    if _profile_store is None:
+        from profiling import ProfileStore
+        _profile_store = ProfileStore(PROFILE_DIR)
+    return _profile_store
+
+
+# ===========================
+# CACHES
+# ===========================
+
+# Construits par `python assets.py` ; sans build, les sources de static/ sont servies
+asset_manifest = AssetManifest(os.path.join(DIST_DIR, MANIFEST_NAME))
+
+# Images distantes téléchargées une fois, servies par /img/<key>
+image_cache = DiskImageCache(
+    directory=os.environ.get('IMAGE_CACHE_DIR', os.path.join(ROOT_DIR, 'cache', 'images')),
+    max_bytes=int(os.environ.get('IMAGE_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+)
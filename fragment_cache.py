@@ -0,0 +1,87 @@
+"""
+Cache de fragments HTML pour Sport Connect
+Cache LRU en mémoire, borné en octets, avec compteurs de hits/misses
+"""
+
+from collections import OrderedDict
+import threading
+
+from metrics import count_cache_lookup
+
+# Tous les caches créés, pour l'exposition des statistiques
+CACHES = {}
+
+
+class FragmentCache:
+    """Cache LRU thread-safe de fragments rendus"""
+
+    def __init__(self, name, max_bytes):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        CACHES[name] = self
+
+    def get(self, key):
+        """Retourne la valeur en cache (et la marque récente) ou None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        count_cache_lookup(self.name, entry is not None)
+        return entry[0] if entry is not None else None
+
+    def set(self, key, value, size):
+        """
+        Ajoute une valeur en évinçant les moins récemment utilisées
+
+        Args:
+            key: Clé hashable
+            value: Valeur à stocker
+            size (int): Taille estimée en octets
+        """
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Vide le cache (les compteurs sont conservés)"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Statistiques du cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def all_cache_stats():
+    """Statistiques de tous les caches de fragments"""
+    return [cache.stats() for cache in CACHES.values()]
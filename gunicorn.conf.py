@@ -0,0 +1,68 @@
+"""
+Configuration gunicorn de Sport Connect (production, Linux / macOS)
+Usage : python migrate.py && gunicorn   (ce fichier est lu depuis le dossier courant)
+
+- preload_app : wsgi.py (application + préchauffage) est importé une fois dans
+  le maître ; les workers forkés en héritent, prêts à servir ;
+- post_fork : chaque worker démarre ses threads et rouvre ses connexions SQLite
+  (une connexion ne traverse jamais un fork) avant sa première requête ;
+- max_requests + jitter : chaque worker est remplacé après un nombre de requêtes
+  tiré autour de GUNICORN_MAX_REQUESTS (pas de redémarrages simultanés), en
+  terminant ses requêtes en cours (graceful_timeout) ;
+- PROMETHEUS_MULTIPROC_DIR (cache/prometheus par défaut) vidé au démarrage du
+  maître, worker terminé signalé à metrics (child_exit) ;
+- LOG_FILE par défaut logs/sportconnect-{pid}.log : un fichier par processus,
+  chacun fait sa propre rotation sans écraser les lignes des autres.
+
+Variables d'environnement : GUNICORN_BIND (0.0.0.0:5000), WEB_CONCURRENCY (2 x CPU + 1),
+GUNICORN_THREADS (4), GUNICORN_TIMEOUT (60 s), GUNICORN_GRACEFUL_TIMEOUT (30 s),
+GUNICORN_MAX_REQUESTS (2000), GUNICORN_MAX_REQUESTS_JITTER (200)
+"""
+
+import multiprocessing
+import os
+import shutil
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Plusieurs threads par worker (gthread) : un appel LLM lent n'occupe pas tout le processus
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+# Supérieur au délai des appels LLM (30 s)
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+preload_app = True
+
+# Journal d'accès : celui de l'application (JSON, identifiant de requête, temps SQL)
+accesslog = None
+
+# Doit être défini avant l'import de prometheus_client (preload, dans le maître)
+MULTIPROC_DIR = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(ROOT_DIR, 'cache', 'prometheus'))
+os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+# Avant l'import de l'application (preload) : chaque worker ouvre son fichier après le fork
+os.environ.setdefault('LOG_FILE', os.path.join(ROOT_DIR, 'logs', 'sportconnect-{pid}.log'))
+
+
+def on_starting(server):
+    """Maître, une fois (pas à chaque rechargement SIGHUP) : métriques de l'exécution précédente effacées"""
+    for name in os.listdir(MULTIPROC_DIR):
+        path = os.path.join(MULTIPROC_DIR, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.remove(path)
+
+
+def post_fork(server, worker):
+    from warmup import warm_worker
+    warm_worker()
+
+
+def child_exit(server, worker):
+    import metrics
+    metrics.mark_process_dead(worker.pid)
@@ -0,0 +1,98 @@
+"""
+Cache HTTP pour Sport Connect
+ETags forts calculés à partir des compteurs de version (table sync_versions)
+et réponses 304 sur If-None-Match, sans exécuter la requête métier
+"""
+
+from flask import request, make_response
+from functools import wraps
+import hashlib
+
+from db import DATABASE_PATH, connect_db
+
+# Données par utilisateur : seul le navigateur peut les garder, et il doit
+# revalider à chaque fois (un 304 ne coûte qu'une lecture de compteur)
+DEFAULT_CACHE_CONTROL = 'private, no-cache'
+
+
+def get_versions(scopes):
+    """
+    Lit les compteurs de version demandés en une seule requête
+
+    Args:
+        scopes (list): Noms des compteurs ('events', 'places', 'messages:12'...)
+
+    Returns:
+        dict: {scope: version}, 0 pour un compteur encore inexistant
+    """
+    conn = connect_db(DATABASE_PATH)
+    c = conn.cursor()
+    c.execute(
+        f"SELECT scope, version FROM sync_versions WHERE scope IN ({','.join('?' * len(scopes))})",
+        list(scopes)
+    )
+    versions = dict(c.fetchall())
+    conn.close()
+    return {scope: versions.get(scope, 0) for scope in scopes}
+
+
+def compute_etag(scopes, *extra):
+    """
+    Calcule un ETag fort à partir des compteurs et d'éléments de variation
+
+    Args:
+        scopes (list): Compteurs dont dépend la réponse
+        *extra: Ce qui fait varier la réponse en plus (utilisateur, paramètres...)
+
+    Returns:
+        str: ETag (sans guillemets)
+    """
+    versions = get_versions(scopes)
+    key = '|'.join([f'{scope}={versions[scope]}' for scope in scopes] + [str(e) for e in extra])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def not_modified(etag, cache_control=DEFAULT_CACHE_CONTROL):
+    """
+    Retourne une réponse 304 si le client possède déjà cette version
+
+    Returns:
+        Response: 304 vide, ou None si la réponse complète doit être produite
+    """
+    if etag in request.if_none_match:
+        response = make_response('', 304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = cache_control
+        return response
+    return None
+
+
+def with_etag(response, etag, cache_control=DEFAULT_CACHE_CONTROL):
+    """Ajoute ETag et Cache-Control à une réponse complète"""
+    response = make_response(response)
+    if response.status_code == 200:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = cache_control
+    return response
+
+
+def conditional_get(scopes_func, cache_control=DEFAULT_CACHE_CONTROL):
+    """
+    Décorateur GET conditionnel pour les routes JSON en lecture seule
+
+    Args:
+        scopes_func (callable): Reçoit les kwargs de la route, retourne
+            (scopes, extra) : compteurs et éléments de variation de l'ETag
+        cache_control (str): En-tête Cache-Control des réponses
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            scopes, extra = scopes_func(**kwargs)
+            etag = compute_etag(scopes, *extra)
+            cached = not_modified(etag, cache_control)
+            if cached is not None:
+                return cached
+            return with_etag(f(*args, **kwargs), etag, cache_control)
+        return decorated_function
+    return decorator
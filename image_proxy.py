@@ -0,0 +1,197 @@
+"""
+Proxy d'images distantes pour Sport Connect
+Chaque image distante est téléchargée une seule fois puis servie depuis un
+cache disque LRU borné en taille (fichier + métadonnées JSON par entrée)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from metrics import count_cache_lookup
+
+# Types acceptés depuis l'origine (le proxy ne doit servir que des images). Pas de SVG :
+# il peut contenir du script, exécuté avec les droits de notre domaine (XSS stockée)
+ALLOWED_CONTENT_TYPES = {'image/jpeg', 'image/png', 'image/gif', 'image/webp', 'image/avif'}
+
+
+class OriginError(Exception):
+    """L'image n'a pas pu être récupérée depuis l'origine"""
+
+
+class DiskImageCache:
+    """
+    Cache disque LRU : <hash>.bin (contenu) et <hash>.json (métadonnées)
+
+    La date de modification du fichier de métadonnées sert de date de
+    dernier accès, ce qui fonctionne entre plusieurs processus workers.
+    """
+
+    def __init__(self, directory, max_bytes, max_image_bytes=5 * 1024 * 1024, timeout=10):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # Une image ne peut pas dépasser la taille totale du cache
+        self.max_image_bytes = min(max_image_bytes, max_bytes)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.origin_errors = 0
+
+    @staticmethod
+    def key_for(url):
+        """Nom de fichier (hash) d'une URL distante"""
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + '.bin', base + '.json'
+
+    def get(self, url):
+        """
+        Retourne (chemin, métadonnées) si l'image est en cache, sinon None
+        """
+        data_path, meta_path = self._paths(self.key_for(url))
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(data_path):
+            return None
+        # Marquer l'entrée comme récemment utilisée
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return data_path, meta
+
+    def fetch(self, url):
+        """
+        Sert l'image depuis le cache, ou la télécharge puis la met en cache
+
+        Returns:
+            tuple: (chemin du fichier, métadonnées)
+
+        Raises:
+            OriginError: Origine injoignable, erreur HTTP, type ou taille invalide
+        """
+        cached = self.get(url)
+        count_cache_lookup('image_proxy', cached is not None)
+        if cached:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        try:
+            data_path, meta = self._download(url)
+        except OriginError:
+            self.origin_errors += 1
+            raise
+        self.evict()
+        return data_path, meta
+
+    def _download(self, url):
+        """Télécharge l'image en flux vers un fichier temporaire puis l'installe"""
+        # Importé au premier téléchargement : les images déjà en cache n'en ont pas besoin
+        import requests
+
+        os.makedirs(self.directory, exist_ok=True)
+        data_path, meta_path = self._paths(self.key_for(url))
+        tmp_path = f"{data_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        try:
+            with requests.get(url, stream=True, timeout=self.timeout) as response:
+                if response.status_code != 200:
+                    raise OriginError(f"HTTP {response.status_code}")
+                content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+                if content_type not in ALLOWED_CONTENT_TYPES:
+                    raise OriginError(f"type non autorisé : {content_type or 'inconnu'}")
+
+                size = 0
+                with open(tmp_path, 'wb') as f:
+                    for chunk in response.iter_content(65536):
+                        size += len(chunk)
+                        if size > self.max_image_bytes:
+                            raise OriginError("image trop volumineuse")
+                        f.write(chunk)
+        except requests.exceptions.RequestException as e:
+            self._remove(tmp_path)
+            raise OriginError(type(e).__name__)
+        except OriginError:
+            self._remove(tmp_path)
+            raise
+
+        meta = {
+            'url': url,
+            'content_type': content_type,
+            'size': size,
+            'fetched_at': int(time.time())
+        }
+        os.replace(tmp_path, data_path)
+        # Les métadonnées sont écrites en dernier : leur présence valide l'entrée
+        tmp_meta = meta_path + '.tmp'
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, meta_path)
+        return data_path, meta
+
+    def entries(self):
+        """Liste des entrées : (dernier accès, taille, clé)"""
+        result = []
+        try:
+            scanner = os.scandir(self.directory)
+        except OSError:
+            return result
+        with scanner:
+            for entry in scanner:
+                if not entry.name.endswith('.json'):
+                    continue
+                key = entry.name[:-len('.json')]
+                data_path, _ = self._paths(key)
+                try:
+                    size = os.path.getsize(data_path)
+                    result.append((entry.stat().st_mtime, size, key))
+                except OSError:
+                    continue
+        return result
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de max_bytes"""
+        with self._lock:
+            entries = sorted(self.entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, key in entries:
+                if total <= self.max_bytes:
+                    break
+                data_path, meta_path = self._paths(key)
+                self._remove(meta_path)
+                self._remove(data_path)
+                total -= size
+                self.evictions += 1
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def stats(self):
+        """Statistiques du cache (pour ce processus, taille sur disque globale)"""
+        entries = self.entries()
+        lookups = self.hits + self.misses
+        return {
+            'name': 'image_proxy',
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'origin_errors': self.origin_errors,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
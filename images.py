@@ -0,0 +1,123 @@
+"""
+Traitement des images uploadées pour Sport Connect
+Génère des dérivés redimensionnés et recompressés (WebP) aux noms
+contenant un hash du contenu (appelé depuis la file de tâches, voir jobs.py)
+"""
+
+import hashlib
+import os
+import re
+
+# Refuser les images démesurées (bombe de décompression)
+MAX_IMAGE_PIXELS = 40_000_000
+
+# Variantes par type d'image : nom -> (largeur, hauteur, mode)
+# 'fill' recadre exactement à la taille, 'fit' conserve les proportions
+VARIANTS = {
+    'sport': {
+        'card': (400, 200, 'fill'),       # carte d'activité (index)
+        'card_2x': (800, 400, 'fill'),    # carte d'activité, écrans haute densité
+        'thumb': (300, 150, 'fill'),      # aperçu de /admin/sport-images (150px de haut)
+    },
+    'logo': {
+        'nav': (400, 55, 'fit'),          # barre de navigation (hauteur 55px)
+        'nav_2x': (800, 110, 'fit'),
+    },
+}
+
+WEBP_QUALITY = 80
+
+# {nom}-{hash}-{variante}.webp
+DERIVED_NAME_RE = re.compile(r'^(?P<prefix>.+-[0-9a-f]{12})-(?P<variant>[a-z0-9_]+)\.webp$')
+
+
+def content_hash(path):
+    """Hash court du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def _pillow():
+    """
+    Pillow, importé au premier traitement : variant_url (appelé à chaque page)
+    n'en a pas besoin, seuls les uploads et la file de tâches le chargent
+    """
+    from PIL import Image, ImageOps
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    return Image, ImageOps
+
+
+def validate_image(path):
+    """
+    Vérifie qu'un fichier est une image lisible (sans la décoder entièrement)
+
+    Returns:
+        bool: True si Pillow reconnaît l'image
+    """
+    Image, _ = _pillow()
+    try:
+        with Image.open(path) as img:
+            img.verify()
+        return True
+    except (OSError, SyntaxError, Image.DecompressionBombError):
+        return False
+
+
+def generate_derivatives(src_path, kind, base_name, output_dir):
+    """
+    Génère toutes les variantes d'une image source
+
+    Args:
+        src_path (str): Fichier original
+        kind (str): Type d'image ('sport' ou 'logo'), clé de VARIANTS
+        base_name (str): Préfixe des fichiers générés (déjà nettoyé)
+        output_dir (str): Dossier de destination
+
+    Returns:
+        dict: {variante: nom de fichier généré}
+    """
+    Image, ImageOps = _pillow()
+    os.makedirs(output_dir, exist_ok=True)
+    digest = content_hash(src_path)
+    filenames = {}
+
+    with Image.open(src_path) as img:
+        img = ImageOps.exif_transpose(img)
+        has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+        img = img.convert('RGBA' if has_alpha else 'RGB')
+
+        for variant, (width, height, mode) in VARIANTS[kind].items():
+            filename = f'{base_name}-{digest}-{variant}.webp'
+            dest = os.path.join(output_dir, filename)
+            if not os.path.exists(dest):
+                if mode == 'fill':
+                    resized = ImageOps.fit(img, (width, height), Image.LANCZOS)
+                else:
+                    resized = ImageOps.contain(img, (width, height), Image.LANCZOS)
+                # Écriture atomique : un fichier servi n'est jamais partiel
+                tmp_dest = dest + '.tmp'
+                resized.save(tmp_dest, 'WEBP', quality=WEBP_QUALITY, method=4)
+                os.replace(tmp_dest, dest)
+            filenames[variant] = filename
+
+    return filenames
+
+
+def variant_url(url, variant):
+    """
+    URL d'une autre variante d'un dérivé ('.../x-<hash>-card.webp' -> '..._2x')
+
+    Returns:
+        str: URL de la variante, ou None si l'URL n'est pas un dérivé
+    """
+    if not url:
+        return None
+    directory, _, filename = url.rpartition('/')
+    match = DERIVED_NAME_RE.match(filename)
+    if not match:
+        return None
+    return f"{directory}/{match.group('prefix')}-{variant}.webp" if directory else \
+        f"{match.group('prefix')}-{variant}.webp"
@@ -0,0 +1,387 @@
+"""
+File de tâches en arrière-plan pour Sport Connect, stockée dans SQLite
+Pas de broker : une table `jobs` dans database.db (migration 0009) et un worker qui la consomme.
+
+- @job_queue.task enregistre une fonction ; fonction.delay(...) la met en file
+  (arguments sérialisés en JSON), un appel direct l'exécute tout de suite ;
+- le worker réserve une tâche par une seule instruction UPDATE ... RETURNING,
+  avec un bail (JOBS_LEASE_SECONDS) : une tâche dont le worker est mort est
+  reprise à l'expiration du bail ;
+- un échec est retenté avec un délai croissant jusqu'à max_attempts, puis la
+  tâche passe en 'failed' (visible et relançable depuis /admin/jobs) ;
+- arrêt propre : le worker termine la tâche en cours avant de s'arrêter ;
+- @job_queue.task(every=secondes) déclare une tâche périodique : le worker en
+  garde toujours une occurrence en file, reprogrammée à chaque exécution.
+
+Le worker tourne dans un thread de chaque processus web (JOBS_WORKER=thread, par
+défaut) ou dans un processus à part (JOBS_WORKER=off côté web, puis python jobs.py).
+"""
+
+from datetime import datetime, timedelta
+from functools import wraps
+import json
+import logging
+import os
+import signal
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+from db import connect_db
+from metrics import observe_job
+
+logger = logging.getLogger('sportconnect.jobs')
+
+STATUSES = ('queued', 'running', 'done', 'failed')
+
+# Durée du bail d'une tâche réservée (au-delà, elle est considérée abandonnée)
+LEASE_SECONDS = int(os.environ.get('JOBS_LEASE_SECONDS', 300))
+# Attente entre deux interrogations de la table quand la file est vide
+POLL_SECONDS = float(os.environ.get('JOBS_POLL_SECONDS', 1.0))
+# Délai avant nouvelle tentative : RETRY_BASE_SECONDS * 4^(tentative - 1)
+RETRY_BASE_SECONDS = 10
+# Tâches terminées conservées (jours)
+KEEP_DAYS = int(os.environ.get('JOBS_KEEP_DAYS', 7))
+# Longueur maximale conservée d'une trace d'erreur
+ERROR_CHARS = 4000
+
+_CLAIM_SQL = """
+    UPDATE jobs SET status = 'running', locked_by = ?, locked_until = ?, attempts = attempts + 1
+    WHERE id = (SELECT id FROM jobs WHERE status = 'queued' AND run_at <= ? ORDER BY run_at, id LIMIT 1)
+    RETURNING id, name, args, attempts, max_attempts
+"""
+
+
+def _now():
+    return datetime.now().isoformat(sep=' ', timespec='seconds')
+
+
+def _later(seconds):
+    return (datetime.now() + timedelta(seconds=seconds)).isoformat(sep=' ', timespec='seconds')
+
+
+# ===========================
+# FILE (TABLE JOBS)
+# ===========================
+
+class JobQueue:
+    """Table jobs et registre des fonctions exécutables en arrière-plan"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.tasks = {}
+        # Tâches périodiques : nom -> (intervalle en s, max_attempts)
+        self.periodic = {}
+        # Réveille le worker du processus dès qu'une tâche est mise en file
+        self.wakeup = threading.Event()
+
+    def task(self, max_attempts=3, every=None):
+        """
+        Décorateur : enregistre la fonction et lui ajoute .delay(*args, **kwargs)
+
+        Les arguments doivent être sérialisables en JSON (identifiants, chemins,
+        chaînes), jamais des objets de la requête. Avec every (s), la tâche (sans
+        argument) est aussi exécutée périodiquement.
+        """
+        def decorator(f):
+            if f.__name__ in self.tasks:
+                raise ValueError(f"Tâche déjà enregistrée : {f.__name__}")
+            self.tasks[f.__name__] = f
+            if every:
+                self.periodic[f.__name__] = (every, max_attempts)
+
+            @wraps(f)
+            def delay(*args, **kwargs):
+                return self.enqueue(f.__name__, args, kwargs, max_attempts=max_attempts)
+
+            f.delay = delay
+            return f
+        return decorator
+
+    def enqueue(self, name, args=(), kwargs=None, max_attempts=3, delay_seconds=0):
+        """Met une tâche en file et retourne son identifiant"""
+        if name not in self.tasks:
+            raise KeyError(f"Tâche inconnue : {name}")
+        payload = json.dumps({'args': list(args), 'kwargs': kwargs or {}})
+        conn = connect_db(self.db_path)
+        c = conn.cursor()
+        c.execute("INSERT INTO jobs (name, args, max_attempts, run_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                  (name, payload, max_attempts, _later(delay_seconds), _now()))
+        job_id = c.lastrowid
+        conn.commit()
+        conn.close()
+        self.wakeup.set()
+        return job_id
+
+    def enqueue_once(self, name, max_attempts=3, delay_seconds=0, advance=False):
+        """
+        Met une tâche sans argument en file, sauf si une occurrence y attend déjà
+
+        Une seule instruction INSERT ... WHERE NOT EXISTS : pas de doublon même si
+        plusieurs processus programment la même tâche au même moment.
+
+        Args:
+            advance (bool): Si une occurrence attend déjà (tâche périodique programmée
+                plus tard), l'avancer pour qu'elle parte dans delay_seconds
+
+        Returns:
+            int: Identifiant de la tâche créée ou avancée, ou None
+        """
+        conn = connect_db(self.db_path)
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO jobs (name, args, max_attempts, run_at, created_at)
+            SELECT ?, ?, ?, ?, ?
+            WHERE NOT EXISTS (SELECT 1 FROM jobs WHERE status = 'queued' AND name = ?)
+        """, (name, json.dumps({'args': [], 'kwargs': {}}), max_attempts, _later(delay_seconds), _now(), name))
+        job_id = c.lastrowid if c.rowcount else None
+        if job_id is None and advance:
+            run_at = _later(delay_seconds)
+            row = c.execute("""
+                UPDATE jobs SET run_at = ?
+                WHERE id = (SELECT id FROM jobs WHERE status = 'queued' AND name = ? AND run_at > ?
+                            ORDER BY run_at, id LIMIT 1)
+                RETURNING id
+            """, (run_at, name, run_at)).fetchone()
+            job_id = row[0] if row else None
+        conn.commit()
+        conn.close()
+        if job_id is not None and advance:
+            self.wakeup.set()
+        return job_id
+
+    def schedule_periodic(self):
+        """Programme la prochaine occurrence de chaque tâche périodique qui n'en a pas"""
+        for name, (every, max_attempts) in self.periodic.items():
+            self.enqueue_once(name, max_attempts=max_attempts, delay_seconds=every)
+
+    def claim(self, worker_id, lease_seconds=LEASE_SECONDS):
+        """Réserve la prochaine tâche prête (atomique entre processus), ou None"""
+        conn = connect_db(self.db_path)
+        try:
+            self._recover_expired(conn)
+            row = conn.execute(_CLAIM_SQL, (worker_id, _later(lease_seconds), _now())).fetchone()
+            conn.commit()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return dict(zip(('id', 'name', 'args', 'attempts', 'max_attempts'), row))
+
+    def _recover_expired(self, conn):
+        """Remet en file (ou en échec) les tâches dont le bail a expiré (worker tué)"""
+        conn.execute("""
+            UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                            locked_by = NULL, locked_until = NULL,
+                            last_error = 'Bail expiré (worker arrêté pendant la tâche)'
+            WHERE status = 'running' AND locked_until < ?
+        """, (_now(),))
+
+    def complete(self, job_id):
+        conn = connect_db(self.db_path)
+        conn.execute("UPDATE jobs SET status = 'done', locked_by = NULL, locked_until = NULL, finished_at = ? "
+                     "WHERE id = ?", (_now(), job_id))
+        conn.commit()
+        conn.close()
+
+    def fail(self, job, error):
+        """Échec : nouvelle tentative différée, ou 'failed' si les tentatives sont épuisées"""
+        conn = connect_db(self.db_path)
+        if job['attempts'] < job['max_attempts']:
+            retry_in = RETRY_BASE_SECONDS * 4 ** (job['attempts'] - 1)
+            conn.execute("UPDATE jobs SET status = 'queued', locked_by = NULL, locked_until = NULL, "
+                         "run_at = ?, last_error = ? WHERE id = ?",
+                         (_later(retry_in), error[-ERROR_CHARS:], job['id']))
+        else:
+            conn.execute("UPDATE jobs SET status = 'failed', locked_by = NULL, locked_until = NULL, "
+                         "finished_at = ?, last_error = ? WHERE id = ?",
+                         (_now(), error[-ERROR_CHARS:], job['id']))
+        conn.commit()
+        conn.close()
+
+    def run(self, job):
+        """Exécute une tâche réservée et enregistre son résultat"""
+        if job['name'] in self.periodic:
+            # Reprogrammée avant l'exécution : un échec n'interrompt pas la série
+            every, max_attempts = self.periodic[job['name']]
+            self.enqueue_once(job['name'], max_attempts=max_attempts, delay_seconds=every)
+        started = time.perf_counter()
+        try:
+            payload = json.loads(job['args'])
+            self.tasks[job['name']](*payload['args'], **payload['kwargs'])
+        except Exception:
+            duration = time.perf_counter() - started
+            observe_job(job['name'], 'error', duration)
+            logger.exception("Tâche en échec", extra={
+                'job_id': job['id'], 'task': job['name'], 'attempt': job['attempts']})
+            self.fail(job, traceback.format_exc())
+            return False
+        duration = time.perf_counter() - started
+        observe_job(job['name'], 'done', duration)
+        logger.info("Tâche terminée", extra={
+            'job_id': job['id'], 'task': job['name'], 'duration_ms': round(duration * 1000, 1)})
+        self.complete(job['id'])
+        return True
+
+    # --- Administration ---
+
+    def retry(self, job_id):
+        """Relance une tâche en échec (compteur de tentatives remis à zéro)"""
+        conn = connect_db(self.db_path)
+        conn.execute("UPDATE jobs SET status = 'queued', attempts = 0, run_at = ?, finished_at = NULL "
+                     "WHERE id = ? AND status = 'failed'", (_now(), job_id))
+        conn.commit()
+        conn.close()
+        self.wakeup.set()
+
+    def delete(self, job_id):
+        conn = connect_db(self.db_path)
+        conn.execute("DELETE FROM jobs WHERE id = ? AND status != 'running'", (job_id,))
+        conn.commit()
+        conn.close()
+
+    def purge(self, keep_days=KEEP_DAYS):
+        """Supprime les tâches terminées depuis plus de keep_days jours"""
+        conn = connect_db(self.db_path)
+        c = conn.cursor()
+        c.execute("DELETE FROM jobs WHERE status = 'done' AND finished_at < ?", (_later(-keep_days * 86400),))
+        deleted = c.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
+
+    def stats(self, failures_limit=50):
+        """Profondeur de la file, répartition par tâche et dernières erreurs"""
+        conn = connect_db(self.db_path)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        c.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+        by_status = {status: 0 for status in STATUSES}
+        by_status.update({row['status']: row['n'] for row in c.fetchall()})
+        c.execute("""
+            SELECT name,
+                   SUM(status = 'queued') AS queued, SUM(status = 'running') AS running,
+                   SUM(status = 'done') AS done, SUM(status = 'failed') AS failed
+            FROM jobs GROUP BY name ORDER BY name
+        """)
+        by_task = [dict(row) for row in c.fetchall()]
+        c.execute("SELECT MIN(run_at) FROM jobs WHERE status = 'queued' AND run_at <= ?", (_now(),))
+        oldest = c.fetchone()[0]
+        c.execute("""
+            SELECT id, name, args, status, attempts, max_attempts, run_at, locked_by, last_error, created_at
+            FROM jobs WHERE status = 'running' OR (status IN ('queued', 'failed') AND last_error IS NOT NULL)
+            ORDER BY id DESC LIMIT ?
+        """, (failures_limit,))
+        problems = [dict(row) for row in c.fetchall()]
+        conn.close()
+        return {
+            'by_status': by_status,
+            'by_task': by_task,
+            'oldest_ready_wait_s': (datetime.now() - datetime.fromisoformat(oldest)).total_seconds()
+            if oldest else None,
+            'jobs': problems,
+            'registered': sorted(self.tasks),
+        }
+
+
+# ===========================
+# WORKER
+# ===========================
+
+class Worker:
+    """Consomme la file dans un thread ; stop() attend la fin de la tâche en cours"""
+
+    def __init__(self, job_queue, poll_seconds=POLL_SECONDS):
+        self.queue = job_queue
+        self.poll_seconds = poll_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.current = None
+        self.processed = 0
+        self._stopping = threading.Event()
+        self._thread = None
+        self._last_purge = 0.0
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run_forever, name='jobs-worker', daemon=True)
+        self._thread.start()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def run_forever(self):
+        logger.info("Worker démarré", extra={'worker_id': self.worker_id})
+        try:
+            self.queue.schedule_periodic()
+        except sqlite3.Error:
+            logger.exception("Programmation des tâches périodiques impossible")
+        while not self._stopping.is_set():
+            try:
+                job = self.queue.claim(self.worker_id)
+            except sqlite3.Error:
+                logger.exception("Réservation impossible")
+                job = None
+            if job is None:
+                self._maybe_purge()
+                self.queue.wakeup.wait(self.poll_seconds)
+                self.queue.wakeup.clear()
+                continue
+            self.current = job
+            self.queue.run(job)
+            self.current = None
+            self.processed += 1
+        logger.info("Worker arrêté", extra={'worker_id': self.worker_id, 'processed': self.processed})
+
+    def _maybe_purge(self):
+        if time.monotonic() - self._last_purge > 3600:
+            self._last_purge = time.monotonic()
+            try:
+                self.queue.purge()
+            except sqlite3.Error:
+                logger.exception("Purge des tâches impossible")
+
+    def stop(self, timeout=None):
+        """Arrêt propre : plus de nouvelle réservation, la tâche en cours se termine"""
+        self._stopping.set()
+        self.queue.wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+            if self._thread.is_alive() and self.current:
+                logger.warning("Arrêt avant la fin de la tâche (reprise à l'expiration du bail)",
+                               extra={'job_id': self.current['id'], 'task': self.current['name']})
+
+    def status(self):
+        return {
+            'worker_id': self.worker_id,
+            'alive': self.is_alive(),
+            'processed': self.processed,
+            'current': {'id': self.current['id'], 'name': self.current['name']} if self.current else None,
+        }
+
+
+def run_standalone():
+    """Worker dans un processus dédié (python jobs.py), arrêt propre sur SIGTERM / Ctrl+C"""
+    # Importer tasks enregistre les tâches (@job_queue.task), sans l'application web
+    from dotenv import load_dotenv
+    load_dotenv()
+    from app_logging import configure_logging
+    from tasks import job_queue
+
+    configure_logging()
+
+    worker = Worker(job_queue)
+
+    def handle_signal(signum, frame):
+        logger.info("Signal reçu, arrêt après la tâche en cours", extra={'signal': signum})
+        worker.stop()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    worker.run_forever()
+
+
+if __name__ == '__main__':
+    os.environ['JOBS_WORKER'] = 'off'
+    run_standalone()
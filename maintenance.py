@@ -0,0 +1,257 @@
+"""
+Maintenance automatique de la base SQLite de Sport Connect
+Un passage (tâche périodique maintain_database, ou bouton de /admin/database) :
+
+1. checkpoint du WAL : PASSIVE (n'attend personne), TRUNCATE quand le fichier
+   -wal dépasse MAINTENANCE_WAL_TRUNCATE_MB (un lecteur actif empêche le
+   checkpoint automatique d'aller au bout et le WAL grossit) ;
+2. statistiques du planificateur : ANALYZE borné par PRAGMA analysis_limit
+   (chaque index est échantillonné, le coût ne grandit pas avec la base) ;
+3. pages libres : avec auto_vacuum=INCREMENTAL (migration
+   0011_enable_incremental_vacuum.py), les pages laissées par les suppressions sont
+   rendues au système par pas de MAINTENANCE_VACUUM_STEP_PAGES, seulement si
+   l'application est calme et dans un budget de temps.
+
+Les traitements de masse signalent leurs lignes modifiées (note_changes) : au-delà
+de MAINTENANCE_ANALYZE_CHANGES, un passage est programmé sans attendre l'intervalle.
+
+Calme : aucune requête depuis MAINTENANCE_QUIET_SECONDS dans aucun processus. Chaque
+requête touche un fichier témoin (MAINTENANCE_ACTIVITY_FILE, au plus une fois par
+seconde et par processus) : un worker séparé (python jobs.py), qui ne sert aucune
+requête, voit ainsi l'activité des processus web.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from db import connect_db
+
+logger = logging.getLogger('sportconnect.maintenance')
+
+# Intervalle de la tâche périodique (0 = désactivée)
+INTERVAL_SECONDS = float(os.environ.get('MAINTENANCE_INTERVAL_MINUTES', 60)) * 60
+# Lignes examinées par index pendant ANALYZE
+ANALYSIS_LIMIT = int(os.environ.get('MAINTENANCE_ANALYSIS_LIMIT', 1000))
+# Lignes modifiées par des traitements de masse avant un passage anticipé
+ANALYZE_CHANGES = int(os.environ.get('MAINTENANCE_ANALYZE_CHANGES', 10000))
+# Taille du WAL au-delà de laquelle il est tronqué
+WAL_TRUNCATE_BYTES = float(os.environ.get('MAINTENANCE_WAL_TRUNCATE_MB', 64)) * 1024 * 1024
+# Vacuum incrémental : pages par pas, temps total, pages libres en dessous desquelles on ne fait rien
+VACUUM_STEP_PAGES = int(os.environ.get('MAINTENANCE_VACUUM_STEP_PAGES', 256))
+VACUUM_BUDGET_SECONDS = float(os.environ.get('MAINTENANCE_VACUUM_BUDGET_SECONDS', 2))
+VACUUM_MIN_FREE_PAGES = int(os.environ.get('MAINTENANCE_VACUUM_MIN_FREE_PAGES', 64))
+# L'application est calme si aucun processus n'a reçu de requête depuis ce délai
+QUIET_SECONDS = float(os.environ.get('MAINTENANCE_QUIET_SECONDS', 30))
+# Fichier témoin de la dernière requête, partagé entre les processus (date de modification)
+ACTIVITY_FILE = os.environ.get('MAINTENANCE_ACTIVITY_FILE',
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'last_request'))
+# Écart minimal entre deux mises à jour du témoin par un même processus
+ACTIVITY_WRITE_SECONDS = 1.0
+
+AUTO_VACUUM_MODES = {0: 'none', 1: 'full', 2: 'incremental'}
+
+_last_request = 0.0
+_last_written = 0.0
+_changes = 0
+_changes_lock = threading.Lock()
+
+
+def touch():
+    """À appeler à chaque requête HTTP (détection des périodes calmes)"""
+    global _last_request, _last_written
+    _last_request = time.time()
+    if _last_request - _last_written < ACTIVITY_WRITE_SECONDS:
+        return
+    _last_written = _last_request
+    try:
+        os.utime(ACTIVITY_FILE)
+    except FileNotFoundError:
+        try:
+            os.makedirs(os.path.dirname(ACTIVITY_FILE), exist_ok=True)
+            open(ACTIVITY_FILE, 'a').close()
+        except OSError:
+            pass
+    except OSError:
+        pass
+
+
+def _last_activity():
+    """Dernière requête connue (horodatage), de ce processus ou des autres (fichier témoin)"""
+    try:
+        return max(_last_request, os.path.getmtime(ACTIVITY_FILE))
+    except OSError:
+        return _last_request
+
+
+def is_quiet(seconds=QUIET_SECONDS):
+    return time.time() - _last_activity() >= seconds
+
+
+def note_changes(count):
+    """
+    Compte les lignes modifiées par un traitement de masse
+
+    Returns:
+        bool: True quand le seuil est franchi (compteur remis à zéro) : programmer un passage
+    """
+    global _changes
+    with _changes_lock:
+        _changes += max(0, count)
+        if _changes < ANALYZE_CHANGES:
+            return False
+        _changes = 0
+        return True
+
+
+# ===========================
+# ÉTAT DE LA BASE
+# ===========================
+
+def _file_size(path):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def database_stats(db_path):
+    """
+    Taille, pages libres, WAL et statistiques du planificateur (lecture seule, sans parcours)
+
+    Returns:
+        dict: Tailles en octets, pages, modes, lignes estimées par table (sqlite_stat1)
+    """
+    conn = connect_db(db_path)
+    c = conn.cursor()
+    pragmas = {}
+    for name in ('page_size', 'page_count', 'freelist_count', 'auto_vacuum', 'journal_mode'):
+        c.execute(f'PRAGMA {name}')
+        pragmas[name] = c.fetchone()[0]
+    c.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'")
+    analyzed = c.fetchone()[0] > 0
+    tables = []
+    if analyzed:
+        # Premier nombre de stat = lignes estimées ; la ligne de l'index le plus complet suffit
+        c.execute("SELECT tbl, MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 GROUP BY tbl ORDER BY 2 DESC")
+        tables = [{'name': row[0], 'rows': row[1]} for row in c.fetchall()]
+    conn.close()
+
+    wal_size = _file_size(db_path + '-wal')
+    return {
+        'file_size': _file_size(db_path),
+        'wal_size': wal_size,
+        'wal_truncate_at': int(WAL_TRUNCATE_BYTES),
+        'page_size': pragmas['page_size'],
+        'page_count': pragmas['page_count'],
+        'freelist_count': pragmas['freelist_count'],
+        'free_bytes': pragmas['freelist_count'] * pragmas['page_size'],
+        'free_ratio': pragmas['freelist_count'] / pragmas['page_count'] if pragmas['page_count'] else 0,
+        'auto_vacuum': AUTO_VACUUM_MODES.get(pragmas['auto_vacuum'], str(pragmas['auto_vacuum'])),
+        'journal_mode': pragmas['journal_mode'],
+        'analyzed': analyzed,
+        'tables': tables,
+    }
+
+
+# ===========================
+# PASSAGE DE MAINTENANCE
+# ===========================
+
+def checkpoint(db_path, truncate_at=WAL_TRUNCATE_BYTES):
+    """
+    Checkpoint du WAL (PASSIVE, ou TRUNCATE au-delà du seuil)
+
+    Returns:
+        dict: Mode, pages du WAL, pages recopiées, bloqué par un lecteur, taille avant / après
+    """
+    before = _file_size(db_path + '-wal')
+    if not before:
+        return None
+    mode = 'TRUNCATE' if before > truncate_at else 'PASSIVE'
+    conn = connect_db(db_path)
+    conn.execute('PRAGMA busy_timeout = 1000')
+    try:
+        busy, log_pages, checkpointed = conn.execute(f'PRAGMA wal_checkpoint({mode})').fetchone()
+    finally:
+        conn.close()
+    return {'mode': mode.lower(), 'wal_pages': log_pages, 'checkpointed': checkpointed, 'busy': bool(busy),
+            'wal_before': before, 'wal_after': _file_size(db_path + '-wal')}
+
+
+def _analyze(conn, analysis_limit):
+    conn.execute(f'PRAGMA analysis_limit = {int(analysis_limit)}')
+    conn.execute('ANALYZE')
+
+
+def _vacuum_step(conn, pages):
+    conn.execute(f'PRAGMA incremental_vacuum({int(pages)})').fetchall()
+    return conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+
+def run_maintenance(db_path, db_writer=None, force=False):
+    """
+    Un passage complet : checkpoint, ANALYZE borné, vacuum incrémental si calme
+
+    Args:
+        db_writer: Écrivain unique (writer.py) : ANALYZE et vacuum passent par sa file,
+            entre les écritures des requêtes ; sinon connexion directe
+        force (bool): Vacuum même si l'application n'est pas calme (déclenchement manuel)
+
+    Returns:
+        dict: Compte rendu (durées en s, pages rendues, raison d'un vacuum sauté)
+    """
+    started = time.perf_counter()
+    report = {'finished_at': None}
+
+    def write(fn, *args):
+        if db_writer is not None:
+            return db_writer.run(fn, *args)
+        conn = connect_db(db_path)
+        try:
+            result = fn(conn, *args)
+            conn.commit()
+            return result
+        finally:
+            conn.close()
+
+    report['checkpoint'] = checkpoint(db_path)
+
+    step = time.perf_counter()
+    write(_analyze, ANALYSIS_LIMIT)
+    report['analyze_s'] = round(time.perf_counter() - step, 3)
+
+    stats = database_stats(db_path)
+    report['freelist_before'] = stats['freelist_count']
+    freed = 0
+    if stats['auto_vacuum'] != 'incremental':
+        report['vacuum'] = "auto_vacuum désactivé (python migrate.py)"
+    elif stats['freelist_count'] < VACUUM_MIN_FREE_PAGES:
+        report['vacuum'] = "peu de pages libres"
+    elif not force and not is_quiet():
+        report['vacuum'] = "application active, reporté"
+    else:
+        step = time.perf_counter()
+        remaining = stats['freelist_count']
+        # Pas courts : chacun ne tient le verrou d'écriture que quelques millisecondes
+        while remaining > 0 and time.perf_counter() - step < VACUUM_BUDGET_SECONDS:
+            if not force and not is_quiet():
+                break
+            after = write(_vacuum_step, VACUUM_STEP_PAGES)
+            freed += remaining - after
+            if after >= remaining:
+                break
+            remaining = after
+        report['vacuum'] = 'fait'
+        report['vacuum_s'] = round(time.perf_counter() - step, 3)
+    report['pages_freed'] = freed
+    report['bytes_freed'] = freed * stats['page_size']
+
+    if freed and stats['journal_mode'] == 'wal':
+        # Le vacuum a écrit dans le WAL : le fichier principal ne rétrécit qu'au checkpoint
+        report['checkpoint_after_vacuum'] = checkpoint(db_path, truncate_at=0)
+
+    report['duration_s'] = round(time.perf_counter() - started, 3)
+    report['finished_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    logger.info("Maintenance terminée", extra={
+        'duration_s': report['duration_s'], 'pages_freed': freed, 'vacuum': report['vacuum'],
+        'checkpoint': (report['checkpoint'] or {}).get('mode')})
+    return report
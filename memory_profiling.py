@@ -0,0 +1,295 @@
+"""
+Profilage mémoire des workers (tracemalloc), déclenché depuis l'administration
+- démarrage / arrêt du traçage sans redémarrer le processus ;
+- instantanés enregistrés sur disque (MEMORY_DIR), téléchargeables ;
+- comparaison de deux instantanés par fichier ou par ligne (croissance des allocations) ;
+- estimation de la mémoire occupée par les caches et structures en mémoire.
+Tout est propre au processus qui traite la requête (pid affiché).
+"""
+
+from collections import deque
+from datetime import datetime
+import json
+import os
+import re
+import sys
+import threading
+import tracemalloc
+import types
+import uuid
+
+from fragment_cache import CACHES as FRAGMENT_CACHES
+
+# Profondeur des tracebacks enregistrés (plus profond = plus coûteux)
+DEFAULT_FRAMES = 10
+
+# Nombre maximal d'instantanés conservés sur disque
+MAX_SNAPSHOTS = 20
+
+# Nombre maximal d'objets parcourus par estimation de taille
+MAX_SIZED_OBJECTS = 1_000_000
+
+# Allocations ignorées : le profileur lui-même et le chargement de modules
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+_SNAPSHOT_ID_RE = re.compile(r'^[0-9]{8}-[0-9]{6}-[0-9]+-[0-9a-f]{8}$')
+
+# Types jamais parcourus par deep_sizeof (partagés par tout le processus)
+_OPAQUE_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+                 types.MethodType, types.CodeType, types.FrameType)
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None))
+
+# Structures suivies en plus des caches de fragments : nom -> objet
+_tracked = {}
+
+
+def track(name, obj):
+    """Ajoute une structure aux estimations mémoire (caches, agrégats, index...)"""
+    _tracked[name] = obj
+
+
+# ===========================
+# ESTIMATIONS
+# ===========================
+
+def deep_sizeof(obj, max_objects=MAX_SIZED_OBJECTS):
+    """
+    Taille approximative d'un objet et de tout ce qu'il référence
+
+    Returns:
+        tuple: (octets, nombre d'objets, parcours interrompu par max_objects)
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _OPAQUE_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if len(seen) >= max_objects:
+            return total, len(seen), True
+        if isinstance(current, _ATOMIC_TYPES):
+            continue
+        try:
+            if isinstance(current, dict):
+                for key, value in list(current.items()):
+                    stack.append(key)
+                    stack.append(value)
+            elif isinstance(current, (list, tuple, set, frozenset, deque)):
+                stack.extend(list(current))
+            else:
+                attributes = getattr(current, '__dict__', None)
+                if attributes is not None:
+                    stack.append(attributes)
+                for slot in getattr(type(current), '__slots__', ()):
+                    if hasattr(current, slot):
+                        stack.append(getattr(current, slot))
+        except RuntimeError:
+            # Modifié par un autre thread pendant le parcours : estimation partielle
+            continue
+    return total, len(seen), False
+
+
+def cache_estimates():
+    """Mémoire estimée des caches de fragments et des structures suivies, de la plus grosse à la plus petite"""
+    estimates = []
+    for name, cache in list(FRAGMENT_CACHES.items()):
+        size, objects, truncated = deep_sizeof(cache)
+        stats = cache.stats()
+        estimates.append({'name': name, 'kind': 'fragment_cache', 'bytes': size, 'objects': objects,
+                          'truncated': truncated, 'entries': stats['entries'],
+                          'declared_bytes': stats['bytes'], 'max_bytes': stats['max_bytes']})
+    for name, obj in list(_tracked.items()):
+        size, objects, truncated = deep_sizeof(obj)
+        estimates.append({'name': name, 'kind': type(obj).__name__, 'bytes': size, 'objects': objects,
+                          'truncated': truncated})
+    estimates.sort(key=lambda item: item['bytes'], reverse=True)
+    return estimates
+
+
+def process_memory():
+    """RSS actuel et maximal du processus en octets (None si indisponible)"""
+    current = peak = None
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    current = int(line.split()[1]) * 1024
+                elif line.startswith('VmHWM:'):
+                    peak = int(line.split()[1]) * 1024
+    except OSError:
+        try:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            peak *= 1 if sys.platform == 'darwin' else 1024
+        except ImportError:  # Windows
+            pass
+    return {'rss_bytes': current, 'rss_peak_bytes': peak}
+
+
+def status():
+    """État du traçage et mémoire du processus"""
+    traced, traced_peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+    return dict(process_memory(), pid=os.getpid(), tracing=tracemalloc.is_tracing(),
+                frames=tracemalloc.get_traceback_limit(),
+                traced_bytes=traced, traced_peak_bytes=traced_peak,
+                tracemalloc_overhead_bytes=tracemalloc.get_tracemalloc_memory())
+
+
+# ===========================
+# TRAÇAGE ET INSTANTANÉS
+# ===========================
+
+class SnapshotStore:
+    """Instantanés tracemalloc sur disque : .tracemalloc (binaire) et .json (métadonnées)"""
+
+    def __init__(self, directory, max_snapshots=MAX_SNAPSHOTS):
+        self.directory = directory
+        self.max_snapshots = max_snapshots
+        self._lock = threading.Lock()
+
+    def start(self, frames=DEFAULT_FRAMES):
+        """Démarre le traçage ; seules les allocations faites ensuite sont suivies"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self):
+        """Arrête le traçage et libère sa mémoire (les instantanés sur disque sont gardés)"""
+        tracemalloc.stop()
+
+    def take(self, label=''):
+        """Prend un instantané, l'enregistre et retourne ses métadonnées"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("Le traçage tracemalloc n'est pas démarré")
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        now = datetime.now()
+        snapshot_id = f"{now:%Y%m%d-%H%M%S}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(self.directory, exist_ok=True)
+        snapshot.dump(os.path.join(self.directory, snapshot_id + '.tracemalloc'))
+
+        current = status()
+        meta = {
+            'id': snapshot_id,
+            'label': label[:100],
+            'created_at': now.isoformat(timespec='seconds'),
+            'pid': current['pid'],
+            'rss_bytes': current['rss_bytes'],
+            'traced_bytes': current['traced_bytes'],
+            'traced_peak_bytes': current['traced_peak_bytes'],
+            'frames': current['frames'],
+            'caches': cache_estimates(),
+        }
+        with open(os.path.join(self.directory, snapshot_id + '.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        self._prune()
+        return meta
+
+    def _prune(self):
+        with self._lock:
+            for snapshot_id in [item['id'] for item in self.list()][self.max_snapshots:]:
+                self.delete(snapshot_id)
+
+    def list(self):
+        """Métadonnées des instantanés, du plus récent au plus ancien"""
+        if not os.path.isdir(self.directory):
+            return []
+        snapshots = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        snapshots.sort(key=lambda item: item['id'], reverse=True)
+        return snapshots
+
+    def path(self, snapshot_id):
+        """Chemin du fichier .tracemalloc, ou None si l'identifiant est invalide"""
+        if not _SNAPSHOT_ID_RE.match(snapshot_id):
+            return None
+        path = os.path.join(self.directory, snapshot_id + '.tracemalloc')
+        return path if os.path.exists(path) else None
+
+    def meta(self, snapshot_id):
+        if not _SNAPSHOT_ID_RE.match(snapshot_id):
+            return None
+        try:
+            with open(os.path.join(self.directory, snapshot_id + '.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def delete(self, snapshot_id):
+        if not _SNAPSHOT_ID_RE.match(snapshot_id):
+            return
+        for extension in ('.tracemalloc', '.json'):
+            try:
+                os.remove(os.path.join(self.directory, snapshot_id + extension))
+            except FileNotFoundError:
+                pass
+
+    def compare(self, old_id, new_id, key_type='lineno', limit=30):
+        """
+        Croissance des allocations entre deux instantanés
+
+        Args:
+            key_type (str): 'lineno' (par ligne) ou 'filename' (par fichier)
+
+        Returns:
+            dict: Totaux et top des différences, triés par croissance décroissante ; None si introuvable
+        """
+        old_path, new_path = self.path(old_id), self.path(new_id)
+        if old_path is None or new_path is None:
+            return None
+        old_meta, new_meta = self.meta(old_id) or {}, self.meta(new_id) or {}
+        old = tracemalloc.Snapshot.load(old_path)
+        new = tracemalloc.Snapshot.load(new_path)
+        differences = new.compare_to(old, key_type)
+
+        top = []
+        for diff in differences[:limit]:
+            frame = diff.traceback[0]
+            top.append({
+                'location': frame.filename if key_type == 'filename' else f"{frame.filename}:{frame.lineno}",
+                'size_diff': diff.size_diff,
+                'size': diff.size,
+                'count_diff': diff.count_diff,
+                'count': diff.count,
+            })
+        return {
+            'old': old_id,
+            'new': new_id,
+            'key_type': key_type,
+            'same_process': old_meta.get('pid') == new_meta.get('pid'),
+            'total_diff': sum(diff.size_diff for diff in differences),
+            'rss_diff': (new_meta['rss_bytes'] - old_meta['rss_bytes'])
+            if new_meta.get('rss_bytes') is not None and old_meta.get('rss_bytes') is not None else None,
+            'top': top,
+        }
+
+
+def format_report(comparison):
+    """Rapport texte (téléchargeable) d'une comparaison"""
+    lines = [
+        f"Comparaison {comparison['old']} -> {comparison['new']} (par {comparison['key_type']})",
+        f"Croissance totale tracée : {comparison['total_diff'] / 1024:+.1f} Kio",
+    ]
+    if comparison['rss_diff'] is not None:
+        lines.append(f"Croissance RSS : {comparison['rss_diff'] / 1024:+.1f} Kio")
+    if not comparison['same_process']:
+        lines.append("Attention : instantanés pris dans deux processus différents")
+    lines.append('')
+    lines.append(f"{'Δ taille (Kio)':>15} {'taille (Kio)':>13} {'Δ blocs':>9} {'blocs':>9}  emplacement")
+    for item in comparison['top']:
+        lines.append(f"{item['size_diff'] / 1024:>+15.1f} {item['size'] / 1024:>13.1f} "
+                     f"{item['count_diff']:>+9} {item['count']:>9}  {item['location']}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,226 @@
+"""
+Métriques Prometheus pour Sport Connect (route /metrics)
+
+Avec plusieurs workers gunicorn, définir PROMETHEUS_MULTIPROC_DIR (dossier vide,
+nettoyé au démarrage) : chaque processus écrit ses valeurs dans des fichiers
+mmap de ce dossier et /metrics agrège tous les processus, vivants ou terminés.
+"""
+
+import logging
+import os
+import time
+
+from prometheus_client import (CollectorRegistry, Counter, Gauge, Histogram, REGISTRY,
+                               generate_latest, CONTENT_TYPE_LATEST)
+from prometheus_client import multiprocess
+
+import perf
+
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+# Latences HTTP (s) : des réponses 304 (~1 ms) aux pages complètes (plusieurs s)
+HTTP_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Appels LLM (s)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30)
+# Écritures SQLite (s) : attente du verrou d'écriture comprise
+SQLITE_WRITE_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+# Tâches en arrière-plan (s)
+JOB_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 15, 60, 300)
+# Sauvegardes (s) : copie et compression
+BACKUP_BUCKETS = (0.1, 0.5, 1, 5, 15, 60, 300, 900)
+# Écritures regroupées par COMMIT (writer.py)
+WRITER_BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+llm_logger = logging.getLogger('sportconnect.llm')
+
+# Instructions qui prennent le verrou d'écriture SQLite
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'COMMIT', 'BEGIN')
+
+HTTP_REQUEST_DURATION = Histogram(
+    'sportconnect_http_request_duration_seconds', "Durée des requêtes HTTP",
+    ['endpoint', 'method', 'status'], buckets=HTTP_BUCKETS)
+HTTP_IN_PROGRESS = Gauge(
+    'sportconnect_http_requests_in_progress', "Requêtes HTTP en cours de traitement",
+    multiprocess_mode='livesum')
+
+SQLITE_CONNECTIONS = Counter(
+    'sportconnect_sqlite_connections_total', "Connexions SQLite ouvertes")
+SQLITE_STATEMENTS = Counter(
+    'sportconnect_sqlite_statements_total', "Instructions SQL exécutées", ['kind'])
+SQLITE_WRITE_DURATION = Histogram(
+    'sportconnect_sqlite_write_duration_seconds',
+    "Durée des écritures et COMMIT SQLite (inclut l'attente du verrou)", buckets=SQLITE_WRITE_BUCKETS)
+SQLITE_BUSY_ERRORS = Counter(
+    'sportconnect_sqlite_busy_errors_total', "Erreurs 'database is locked' / busy")
+SQLITE_ERRORS = Counter(
+    'sportconnect_sqlite_errors_total', "Autres erreurs SQLite")
+
+LLM_REQUEST_DURATION = Histogram(
+    'sportconnect_llm_request_duration_seconds', "Durée des appels à l'API LLM",
+    ['endpoint', 'status'], buckets=LLM_BUCKETS)
+LLM_TOKENS = Counter(
+    'sportconnect_llm_tokens_total', "Tokens consommés par l'API LLM", ['endpoint', 'kind'])
+
+CHAT_MESSAGES = Counter(
+    'sportconnect_chat_messages_total', "Messages de chat reçus", ['kind'])
+
+CACHE_LOOKUPS = Counter(
+    'sportconnect_cache_lookups_total', "Accès aux caches applicatifs", ['cache', 'result'])
+
+LOG_RECORDS_DROPPED = Counter(
+    'sportconnect_log_records_dropped_total', "Lignes de journal abandonnées (file d'écriture pleine)")
+
+RATE_LIMITED = Counter(
+    'sportconnect_rate_limited_total', "Requêtes refusées par le limiteur de débit (429)", ['rule', 'scope'])
+
+JOB_DURATION = Histogram(
+    'sportconnect_job_duration_seconds', "Durée des tâches en arrière-plan", ['task', 'status'],
+    buckets=JOB_BUCKETS)
+
+BACKUP_DURATION = Histogram(
+    'sportconnect_backup_duration_seconds', "Durée des sauvegardes de la base", ['status'],
+    buckets=BACKUP_BUCKETS)
+BACKUP_LAST_SUCCESS = Gauge(
+    'sportconnect_backup_last_success_timestamp_seconds', "Fin de la dernière sauvegarde réussie (epoch)",
+    multiprocess_mode='max')
+
+WRITER_BATCH_SIZE = Histogram(
+    'sportconnect_writer_batch_size', "Écritures validées par un même COMMIT (écrivain unique)",
+    buckets=WRITER_BATCH_BUCKETS)
+WRITER_BUSY_RETRIES = Counter(
+    'sportconnect_writer_busy_retries_total', "Nouvelles tentatives de l'écrivain sur base verrouillée")
+
+
+# ===========================
+# SQLITE (via les observateurs de perf.py)
+# ===========================
+
+def _on_connect():
+    SQLITE_CONNECTIONS.inc()
+
+
+def _on_statement(sql, duration, error):
+    kind = 'write' if sql.lstrip()[:7].upper().startswith(WRITE_PREFIXES) else 'read'
+    SQLITE_STATEMENTS.labels(kind=kind).inc()
+    if kind == 'write':
+        SQLITE_WRITE_DURATION.observe(duration)
+    if error is not None:
+        message = str(error).lower()
+        if 'locked' in message or 'busy' in message:
+            SQLITE_BUSY_ERRORS.inc()
+        else:
+            SQLITE_ERRORS.inc()
+
+
+perf.connect_hooks.append(_on_connect)
+perf.statement_hooks.append(_on_statement)
+
+
+# ===========================
+# APPELS LLM, CHAT, CACHES
+# ===========================
+
+def llm_post(endpoint, url, **kwargs):
+    """
+    requests.post vers l'API LLM, avec mesure de la latence et des tokens
+
+    Les exceptions de requests sont comptées (status 'timeout' ou 'error') puis relancées.
+    Chaque appel est aussi journalisé (logger 'sportconnect.llm') avec sa latence.
+    requests n'est importé qu'au premier appel (démarrage des workers plus rapide).
+    """
+    import requests
+
+    started = time.perf_counter()
+    try:
+        response = requests.post(url, **kwargs)
+    except requests.exceptions.RequestException as e:
+        status = 'timeout' if isinstance(e, requests.exceptions.Timeout) else 'error'
+        duration = time.perf_counter() - started
+        LLM_REQUEST_DURATION.labels(endpoint=endpoint, status=status).observe(duration)
+        llm_logger.warning("Appel LLM en échec", extra={
+            'llm_endpoint': endpoint, 'llm_status': status, 'llm_ms': round(duration * 1000, 1),
+            'error': f"{type(e).__name__}: {e}"})
+        raise
+
+    duration = time.perf_counter() - started
+    LLM_REQUEST_DURATION.labels(endpoint=endpoint, status=str(response.status_code)).observe(duration)
+    usage = {}
+    if response.status_code == 200:
+        try:
+            usage = response.json().get('usage') or {}
+        except ValueError:
+            usage = {}
+        for kind in ('prompt_tokens', 'completion_tokens'):
+            if usage.get(kind):
+                LLM_TOKENS.labels(endpoint=endpoint, kind=kind.split('_')[0]).inc(usage[kind])
+    llm_logger.log(logging.INFO if response.status_code == 200 else logging.WARNING, "Appel LLM", extra={
+        'llm_endpoint': endpoint, 'llm_status': response.status_code, 'llm_ms': round(duration * 1000, 1),
+        'prompt_tokens': usage.get('prompt_tokens'), 'completion_tokens': usage.get('completion_tokens')})
+    return response
+
+
+def count_chat_message(kind):
+    """Message posté : 'event' (chat d'une activité) ou 'chatbot' (question au coach)"""
+    CHAT_MESSAGES.labels(kind=kind).inc()
+
+
+def count_cache_lookup(cache, hit):
+    CACHE_LOOKUPS.labels(cache=cache, result='hit' if hit else 'miss').inc()
+
+
+def count_log_dropped():
+    LOG_RECORDS_DROPPED.inc()
+
+
+def count_rate_limited(rule, scope):
+    RATE_LIMITED.labels(rule=rule, scope=scope).inc()
+
+
+def observe_job(task, status, seconds):
+    JOB_DURATION.labels(task=task, status=status).observe(seconds)
+
+
+def observe_backup(status, seconds):
+    BACKUP_DURATION.labels(status=status).observe(seconds)
+    if status == 'done':
+        BACKUP_LAST_SUCCESS.set(time.time())
+
+
+def observe_writer_batch(size):
+    WRITER_BATCH_SIZE.observe(size)
+
+
+def count_writer_busy_retry():
+    WRITER_BUSY_RETRIES.inc()
+
+
+# ===========================
+# REQUÊTES HTTP ET EXPOSITION
+# ===========================
+
+def request_started():
+    HTTP_IN_PROGRESS.inc()
+
+
+def request_finished(endpoint, method, status, duration):
+    HTTP_REQUEST_DURATION.labels(endpoint=endpoint, method=method, status=str(status)).observe(duration)
+
+
+def request_done():
+    HTTP_IN_PROGRESS.dec()
+
+
+def render():
+    """Corps et Content-Type de la réponse /metrics (tous processus confondus si multiprocess)"""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid):
+    """À appeler par le serveur quand un worker se termine (jauges 'live')"""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,270 @@
+"""
+Migrations versionnées du schéma de Sport Connect
+Chaque fichier migrations/NNNN_nom.py est une migration : une docstring (la
+première ligne est affichée) et une fonction upgrade(conn). Elles s'appliquent
+dans l'ordre des numéros ; la table schema_version garde celles déjà passées.
+
+- Une migration et son inscription dans schema_version sont dans la même
+  transaction (BEGIN IMMEDIATE) : deux processus qui lancent upgrade en même
+  temps ne l'appliquent qu'une fois, un échec ne laisse rien à moitié fait.
+- Une migration qui ne peut pas tourner dans une transaction (VACUUM) déclare
+  TRANSACTIONAL = False.
+- Les migrations sont idempotentes (IF NOT EXISTS, add_column) : une base créée
+  avant ce fichier rattrape simplement son numéro au premier upgrade.
+
+Au démarrage, l'application ne fait que check_schema : une lecture du numéro de
+version, sans aucun DDL. Une base en retard refuse de démarrer (SchemaOutdated).
+
+Usage :
+    python migrate.py                       # = upgrade
+    python migrate.py upgrade [--target N] [--backup]
+    python migrate.py status
+
+Variable d'environnement : DATABASE_PATH (database.db)
+"""
+
+from datetime import datetime
+import argparse
+import importlib.util
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from db import DATABASE_PATH, is_memory, sqlite_connect
+
+# Forcer l'encodage UTF-8 pour Windows
+if sys.platform == 'win32' and __name__ == '__main__':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+logger = logging.getLogger('sportconnect.migrate')
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+# Attente du verrou d'écriture (autre processus en train de migrer, application en écriture)
+LOCK_TIMEOUT = 30
+
+_FILENAME = re.compile(r'^(\d{4})_(\w+)\.py$')
+
+_SCHEMA_VERSION_SQL = '''CREATE TABLE IF NOT EXISTS schema_version
+                         (version INTEGER PRIMARY KEY,
+                          name TEXT NOT NULL,
+                          applied_at TIMESTAMP NOT NULL,
+                          duration_ms REAL)'''
+
+
+class SchemaOutdated(RuntimeError):
+    """La base n'a pas toutes les migrations connues du code"""
+
+
+# ===========================
+# OUTILS DES MIGRATIONS
+# ===========================
+
+def columns(conn, table):
+    """Noms des colonnes d'une table"""
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def add_column(conn, table, column, definition):
+    """
+    ALTER TABLE ADD COLUMN si la colonne n'existe pas encore
+
+    Returns:
+        bool: True si la colonne a été ajoutée
+    """
+    if column in columns(conn, table):
+        return False
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return True
+
+
+# ===========================
+# DÉCOUVERTE ET ÉTAT
+# ===========================
+
+def discover(directory=MIGRATIONS_DIR):
+    """
+    Migrations présentes, dans l'ordre (noms de fichiers seulement, sans import)
+
+    Returns:
+        list: (version, nom, chemin)
+    """
+    found = {}
+    for filename in os.listdir(directory):
+        match = _FILENAME.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in found:
+            raise ValueError(f"Deux migrations portent le numéro {version:04d} : "
+                             f"{found[version][1]}, {match.group(2)}")
+        found[version] = (version, match.group(2), os.path.join(directory, filename))
+    return [found[version] for version in sorted(found)]
+
+
+def latest_version(directory=MIGRATIONS_DIR):
+    migrations = discover(directory)
+    return migrations[-1][0] if migrations else 0
+
+
+def current_version(conn):
+    """Numéro de la dernière migration appliquée (0 : base vide ou antérieure à schema_version)"""
+    try:
+        return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+
+
+def applied(conn):
+    """Migrations appliquées : {version: {'name', 'applied_at', 'duration_ms'}}"""
+    try:
+        rows = conn.execute("SELECT version, name, applied_at, duration_ms FROM schema_version").fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return {row[0]: {'name': row[1], 'applied_at': row[2], 'duration_ms': row[3]} for row in rows}
+
+
+def check_schema(db_path=DATABASE_PATH, directory=MIGRATIONS_DIR):
+    """
+    Vérification du démarrage : une lecture du numéro de version, aucun DDL
+
+    Returns:
+        int: Version de la base
+
+    Raises:
+        SchemaOutdated: Base absente ou migrations en attente (python migrate.py)
+    """
+    expected = latest_version(directory)
+    if not is_memory(db_path) and not os.path.exists(db_path):
+        raise SchemaOutdated(f"Base {db_path} absente : lancez `python migrate.py` pour la créer")
+    conn = sqlite_connect(db_path)
+    try:
+        version = current_version(conn)
+    finally:
+        conn.close()
+    if version < expected:
+        raise SchemaOutdated(f"Base {db_path} en version {version}, le code attend {expected} : "
+                             f"lancez `python migrate.py`")
+    if version > expected:
+        # Déploiement progressif : la base a déjà les migrations d'une version plus récente du code
+        logger.warning("Schéma plus récent que le code", extra={'version': version, 'expected': expected})
+    return version
+
+
+# ===========================
+# APPLICATION
+# ===========================
+
+def _load(version, name, path):
+    spec = importlib.util.spec_from_file_location(f'migrations.m{version:04d}_{name}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _title(module, name):
+    return (module.__doc__ or name).strip().splitlines()[0]
+
+
+def upgrade(db_path=DATABASE_PATH, target=None, directory=MIGRATIONS_DIR, echo=print):
+    """
+    Applique les migrations en attente (jusqu'à target incluse)
+
+    Returns:
+        list: Migrations appliquées par cet appel (version, nom, durée en ms)
+    """
+    conn = sqlite_connect(db_path, timeout=LOCK_TIMEOUT, isolation_level=None)
+    conn.execute("PRAGMA foreign_keys = OFF")
+    done = []
+    try:
+        conn.execute(_SCHEMA_VERSION_SQL)
+        for version, name, path in discover(directory):
+            if target is not None and version > target:
+                break
+            if version <= current_version(conn):
+                continue
+            module = _load(version, name, path)
+            transactional = getattr(module, 'TRANSACTIONAL', True)
+            started = time.perf_counter()
+            if transactional:
+                conn.execute("BEGIN IMMEDIATE")
+                # Un autre processus a pu l'appliquer pendant qu'on attendait le verrou
+                if version <= current_version(conn):
+                    conn.execute("ROLLBACK")
+                    continue
+                try:
+                    module.upgrade(conn)
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            else:
+                module.upgrade(conn)
+                conn.execute("BEGIN IMMEDIATE")
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            conn.execute("INSERT OR IGNORE INTO schema_version (version, name, applied_at, duration_ms) "
+                         "VALUES (?, ?, ?, ?)",
+                         (version, name, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), duration_ms))
+            conn.execute("COMMIT")
+            done.append((version, name, duration_ms))
+            echo(f"   ✓ {version:04d} {_title(module, name)} ({duration_ms} ms)")
+    finally:
+        conn.close()
+    return done
+
+
+# ===========================
+# LIGNE DE COMMANDE
+# ===========================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest='command')
+    run = commands.add_parser('upgrade', help="Applique les migrations en attente (par défaut)")
+    run.add_argument('--target', type=int, help="Dernière version à appliquer")
+    run.add_argument('--backup', action='store_true', help="Sauvegarde la base avant (backup.py)")
+    commands.add_parser('status', help="Migrations appliquées et en attente")
+    args = parser.parse_args(argv)
+
+    print(f"Base de données : {DATABASE_PATH}")
+    if args.command == 'status':
+        conn = sqlite3.connect(DATABASE_PATH) if os.path.exists(DATABASE_PATH) else None
+        done = applied(conn) if conn else {}
+        if conn:
+            conn.close()
+        pending = 0
+        for version, name, _ in discover():
+            if version in done:
+                print(f"   ✓ {version:04d} {name:<28} {done[version]['applied_at']}  "
+                      f"({done[version]['duration_ms']} ms)")
+            else:
+                pending += 1
+                print(f"   · {version:04d} {name:<28} en attente")
+        print(f"\n{pending} migration(s) en attente")
+        return 1 if pending else 0
+
+    if getattr(args, 'backup', False) and os.path.exists(DATABASE_PATH):
+        import backup
+        result = backup.create_backup(DATABASE_PATH, label='avant-migration')
+        print(f"Sauvegarde : {result['path']}")
+
+    print("\nApplication des migrations...")
+    try:
+        done = upgrade(DATABASE_PATH, target=getattr(args, 'target', None))
+    except (sqlite3.Error, ValueError) as e:
+        print(f"\n❌ Erreur lors de la migration: {e}")
+        return 1
+    conn = sqlite3.connect(DATABASE_PATH)
+    version = current_version(conn)
+    conn.close()
+    print("\n" + "=" * 50)
+    print(f"✅ Schéma en version {version} ({len(done)} migration(s) appliquée(s))")
+    print("=" * 50)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
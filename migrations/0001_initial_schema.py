@@ -0,0 +1,62 @@
+"""
+Schéma initial : activités, chat, réglages, utilisateurs et participations
+Reprend init_db() (app.py) et l'ancien migrations/init_db.py : tables events,
+messages, settings, users, participations, colonnes organizer_id / created_at /
+is_cancelled de events et index des filtres de la page d'accueil.
+"""
+
+from migrate import add_column
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_events_sport ON events(sport)",
+    "CREATE INDEX IF NOT EXISTS idx_events_niveau ON events(niveau)",
+    "CREATE INDEX IF NOT EXISTS idx_events_lieu ON events(lieu)",
+    "CREATE INDEX IF NOT EXISTS idx_participations_user ON participations(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_participations_event ON participations(event_id)",
+]
+
+
+def upgrade(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS events
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     organisateur TEXT,
+                     sport TEXT,
+                     niveau TEXT,
+                     lieu TEXT,
+                     date_heure TEXT,
+                     accessibilite TEXT)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS messages
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     event_id INTEGER NOT NULL,
+                     user_id INTEGER NOT NULL,
+                     username TEXT NOT NULL,
+                     content TEXT NOT NULL,
+                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                     FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE,
+                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS settings
+                    (key TEXT PRIMARY KEY,
+                     value TEXT)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS users
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     username TEXT UNIQUE NOT NULL,
+                     password_hash TEXT NOT NULL,
+                     email TEXT,
+                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                     points INTEGER DEFAULT 0,
+                     avatar_color TEXT DEFAULT '#6c757d')''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS participations
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     user_id INTEGER NOT NULL,
+                     event_id INTEGER NOT NULL,
+                     joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                     points_awarded INTEGER DEFAULT 50,
+                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+                     FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE,
+                     UNIQUE(user_id, event_id))''')
+    add_column(conn, 'events', 'organizer_id', 'INTEGER')
+    # SQLite n'autorise pas DEFAULT CURRENT_TIMESTAMP dans ALTER TABLE
+    add_column(conn, 'events', 'created_at', 'TIMESTAMP')
+    add_column(conn, 'events', 'is_cancelled', 'BOOLEAN DEFAULT 0')
+    for statement in INDEXES:
+        conn.execute(statement)
@@ -0,0 +1,11 @@
+"""
+Géolocalisation des activités
+Colonnes latitude et longitude de events (carte Leaflet)
+"""
+
+from migrate import add_column
+
+
+def upgrade(conn):
+    add_column(conn, 'events', 'latitude', 'REAL')
+    add_column(conn, 'events', 'longitude', 'REAL')
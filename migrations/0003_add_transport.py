@@ -0,0 +1,12 @@
+"""
+Transports en commun des activités
+Colonnes transport_station (station la plus proche) et transport_lines
+(lignes en JSON : ["M4", "M6", "RER B"]) de events
+"""
+
+from migrate import add_column
+
+
+def upgrade(conn):
+    add_column(conn, 'events', 'transport_station', 'TEXT')
+    add_column(conn, 'events', 'transport_lines', 'TEXT')
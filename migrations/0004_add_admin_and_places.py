@@ -0,0 +1,29 @@
+"""
+Administration et lieux de pratique
+- users.is_admin
+- table places (lieux, sports séparés par des virgules, accessibilité, transports)
+- events.place_id
+
+Pour promouvoir un utilisateur :
+    UPDATE users SET is_admin = 1 WHERE username = 'votre_username';
+"""
+
+from migrate import add_column
+
+
+def upgrade(conn):
+    add_column(conn, 'users', 'is_admin', 'INTEGER DEFAULT 0')
+    conn.execute('''CREATE TABLE IF NOT EXISTS places
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     name TEXT NOT NULL,
+                     address TEXT,
+                     city TEXT NOT NULL,
+                     latitude REAL,
+                     longitude REAL,
+                     sports TEXT,
+                     is_pmr_accessible INTEGER DEFAULT 0,
+                     transport_station TEXT,
+                     transport_lines TEXT,
+                     is_active INTEGER DEFAULT 1,
+                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    add_column(conn, 'events', 'place_id', 'INTEGER REFERENCES places(id)')
@@ -0,0 +1,12 @@
+"""
+Genre des activités et images des lieux
+Colonnes ajoutées à la main sur database.db, sans script : events.genre
+(Mixte / Homme / Femme, filtre de la page d'accueil) et places.image_url
+"""
+
+from migrate import add_column
+
+
+def upgrade(conn):
+    add_column(conn, 'events', 'genre', "TEXT DEFAULT 'Mixte'")
+    add_column(conn, 'places', 'image_url', 'TEXT')
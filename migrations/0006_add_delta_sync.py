@@ -0,0 +1,82 @@
+"""
+Synchronisation incrémentale des activités
+- events.row_version, incrémentée par trigger à chaque insertion, modification,
+  annulation ou changement du nombre de participants
+- table sync_versions (compteurs de version monotones, scope 'events')
+- table event_tombstones (activités supprimées)
+"""
+
+from migrate import add_column
+
+# Incrémente le compteur 'events' puis l'applique à la ligne concernée
+BUMP_EVENTS_VERSION = "UPDATE sync_versions SET version = version + 1 WHERE scope = 'events';"
+CURRENT_EVENTS_VERSION = "(SELECT version FROM sync_versions WHERE scope = 'events')"
+
+TRIGGERS = [
+    f"""
+        CREATE TRIGGER IF NOT EXISTS trg_events_insert_version
+        AFTER INSERT ON events
+        BEGIN
+            {BUMP_EVENTS_VERSION}
+            UPDATE events SET row_version = {CURRENT_EVENTS_VERSION} WHERE id = NEW.id;
+        END
+    """,
+    # Le WHEN évite de re-déclencher le trigger sur sa propre mise à jour de row_version
+    f"""
+        CREATE TRIGGER IF NOT EXISTS trg_events_update_version
+        AFTER UPDATE ON events
+        WHEN NEW.row_version IS OLD.row_version
+        BEGIN
+            {BUMP_EVENTS_VERSION}
+            UPDATE events SET row_version = {CURRENT_EVENTS_VERSION} WHERE id = NEW.id;
+        END
+    """,
+    f"""
+        CREATE TRIGGER IF NOT EXISTS trg_events_delete_tombstone
+        AFTER DELETE ON events
+        BEGIN
+            {BUMP_EVENTS_VERSION}
+            INSERT OR REPLACE INTO event_tombstones (event_id, row_version)
+            VALUES (OLD.id, {CURRENT_EVENTS_VERSION});
+        END
+    """,
+    f"""
+        CREATE TRIGGER IF NOT EXISTS trg_participations_insert_version
+        AFTER INSERT ON participations
+        BEGIN
+            {BUMP_EVENTS_VERSION}
+            UPDATE events SET row_version = {CURRENT_EVENTS_VERSION} WHERE id = NEW.event_id;
+        END
+    """,
+    f"""
+        CREATE TRIGGER IF NOT EXISTS trg_participations_delete_version
+        AFTER DELETE ON participations
+        BEGIN
+            {BUMP_EVENTS_VERSION}
+            UPDATE events SET row_version = {CURRENT_EVENTS_VERSION} WHERE id = OLD.event_id;
+        END
+    """,
+]
+
+
+def upgrade(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS sync_versions
+                    (scope TEXT PRIMARY KEY,
+                     version INTEGER NOT NULL DEFAULT 0)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS event_tombstones
+                    (event_id INTEGER PRIMARY KEY,
+                     row_version INTEGER NOT NULL,
+                     deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_event_tombstones_version ON event_tombstones(row_version)")
+
+    if add_column(conn, 'events', 'row_version', 'INTEGER NOT NULL DEFAULT 0'):
+        # Version initiale : une par activité existante, dans l'ordre des ids
+        conn.execute("UPDATE events SET row_version = id")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_row_version ON events(row_version)")
+    conn.execute("""
+        INSERT OR IGNORE INTO sync_versions (scope, version)
+        VALUES ('events', (SELECT COALESCE(MAX(row_version), 0) FROM events))
+    """)
+
+    for statement in TRIGGERS:
+        conn.execute(statement)
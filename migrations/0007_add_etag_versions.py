@@ -0,0 +1,71 @@
+"""
+Compteurs de version des ETags
+- 'places' incrémenté à chaque modification de la table places
+- 'messages:<event_id>' incrémenté à chaque message d'une activité
+"""
+
+BUMP_PLACES_VERSION = "UPDATE sync_versions SET version = version + 1 WHERE scope = 'places';"
+
+
+def bump_messages_version(alias):
+    """Incrémente le compteur du chat de l'activité (créé à la volée)"""
+    return f"""
+            INSERT OR IGNORE INTO sync_versions (scope, version) VALUES ('messages:' || {alias}.event_id, 0);
+            UPDATE sync_versions SET version = version + 1 WHERE scope = 'messages:' || {alias}.event_id;
+    """
+
+
+TRIGGERS = [
+    f"""
+        CREATE TRIGGER IF NOT EXISTS trg_places_insert_version
+        AFTER INSERT ON places
+        BEGIN
+            {BUMP_PLACES_VERSION}
+        END
+    """,
+    f"""
+        CREATE TRIGGER IF NOT EXISTS trg_places_update_version
+        AFTER UPDATE ON places
+        BEGIN
+            {BUMP_PLACES_VERSION}
+        END
+    """,
+    f"""
+        CREATE TRIGGER IF NOT EXISTS trg_places_delete_version
+        AFTER DELETE ON places
+        BEGIN
+            {BUMP_PLACES_VERSION}
+        END
+    """,
+    f"""
+        CREATE TRIGGER IF NOT EXISTS trg_messages_insert_version
+        AFTER INSERT ON messages
+        BEGIN
+            {bump_messages_version('NEW')}
+        END
+    """,
+    f"""
+        CREATE TRIGGER IF NOT EXISTS trg_messages_update_version
+        AFTER UPDATE ON messages
+        BEGIN
+            {bump_messages_version('NEW')}
+        END
+    """,
+    f"""
+        CREATE TRIGGER IF NOT EXISTS trg_messages_delete_version
+        AFTER DELETE ON messages
+        BEGIN
+            {bump_messages_version('OLD')}
+        END
+    """,
+]
+
+
+def upgrade(conn):
+    conn.execute("INSERT OR IGNORE INTO sync_versions (scope, version) VALUES ('places', 1)")
+    conn.execute("""
+        INSERT OR IGNORE INTO sync_versions (scope, version)
+        SELECT 'messages:' || event_id, COUNT(*) FROM messages GROUP BY event_id
+    """)
+    for statement in TRIGGERS:
+        conn.execute(statement)
@@ -0,0 +1,11 @@
+"""
+Index des requêtes fréquentes
+- messages(event_id, created_at) : chat d'une activité, déjà trié par date
+- events(organizer_id) : activités organisées (profil, admin utilisateurs, calendrier)
+Vérifié par benchmarks/check_query_plans.py
+"""
+
+
+def upgrade(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_event ON messages(event_id, created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_organizer ON events(organizer_id)")
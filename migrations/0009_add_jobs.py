@@ -0,0 +1,21 @@
+"""
+File de tâches en arrière-plan
+Table jobs (jobs.py) et index de réservation : prochaine tâche prête, dans l'ordre d'échéance
+"""
+
+
+def upgrade(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS jobs
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     name TEXT NOT NULL,
+                     args TEXT NOT NULL DEFAULT '{}',
+                     status TEXT NOT NULL DEFAULT 'queued',
+                     attempts INTEGER NOT NULL DEFAULT 0,
+                     max_attempts INTEGER NOT NULL DEFAULT 3,
+                     run_at TIMESTAMP NOT NULL,
+                     locked_by TEXT,
+                     locked_until TIMESTAMP,
+                     last_error TEXT,
+                     created_at TIMESTAMP NOT NULL,
+                     finished_at TIMESTAMP)''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_run_at ON jobs(status, run_at)")
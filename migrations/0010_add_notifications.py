@@ -0,0 +1,31 @@
+"""
+Boîte de notifications
+- table notifications (une ligne par destinataire, écrite par notifications.fan_out)
+- index (user_id, id) : boîte d'un utilisateur, de la plus récente à la plus ancienne
+- index partiel des notifications de message non lues par activité (regroupement)
+- users.unread_notifications : compteur matérialisé du badge
+"""
+
+from migrate import add_column
+
+
+def upgrade(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS notifications
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     user_id INTEGER NOT NULL,
+                     event_id INTEGER,
+                     kind TEXT NOT NULL,
+                     message TEXT NOT NULL,
+                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                     is_read INTEGER NOT NULL DEFAULT 0,
+                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+                     FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE)''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications(user_id, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_notifications_unread_event ON notifications(event_id, kind) "
+                 "WHERE is_read = 0")
+
+    add_column(conn, 'users', 'unread_notifications', 'INTEGER NOT NULL DEFAULT 0')
+    conn.execute("""
+        UPDATE users SET unread_notifications =
+            (SELECT COUNT(*) FROM notifications WHERE user_id = users.id AND is_read = 0)
+    """)
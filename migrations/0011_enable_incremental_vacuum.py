@@ -0,0 +1,20 @@
+"""
+Vacuum incrémental et statistiques du planificateur
+- auto_vacuum=INCREMENTAL : les pages libérées par les suppressions sont rendues
+  au système par petits pas (maintenance.py) au lieu d'un VACUUM complet
+- le mode ne s'applique à une base existante qu'après un VACUUM complet
+  (réécriture du fichier : à lancer application arrêtée)
+- ANALYZE initial (sqlite_stat1) pour que le planificateur ne devine plus
+"""
+
+# VACUUM ne peut pas tourner dans une transaction
+TRANSACTIONAL = False
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def upgrade(conn):
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    conn.execute("ANALYZE")
@@ -0,0 +1,21 @@
+"""
+Notifications des activités et comptes supprimés
+- les clés étrangères ne sont pas appliquées (PRAGMA foreign_keys reste à OFF) :
+  ON DELETE CASCADE n'a jamais supprimé les notifications d'une activité ou
+  d'un compte supprimé, elles le sont désormais explicitement (notifications.py)
+- index sur event_id (toutes les lignes, lues ou non) pour ces suppressions
+- notifications orphelines existantes supprimées, compteurs de non-lues recalculés
+"""
+
+
+def upgrade(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_notifications_event ON notifications(event_id)")
+    conn.execute("""
+        DELETE FROM notifications
+        WHERE user_id NOT IN (SELECT id FROM users)
+           OR (event_id IS NOT NULL AND event_id NOT IN (SELECT id FROM events))
+    """)
+    conn.execute("""
+        UPDATE users SET unread_notifications =
+            (SELECT COUNT(*) FROM notifications WHERE user_id = users.id AND is_read = 0)
+    """)
@@ -5,21 +5,23 @@ Contient la classe User et les fonctions utilitaires
 
 from flask_login import UserMixin
 import sqlite3
-import os
 
-DATABASE_PATH = os.environ.get('DATABASE_PATH', 'database.db')
+from db import DATABASE_PATH, connect_db
+from writer import writer_for
 
 
 class User(UserMixin):
     """Classe utilisateur pour Flask-Login"""
 
-    def __init__(self, id, username, email, points, avatar_color, is_admin=False):
+    def __init__(self, id, username, email, points, avatar_color, is_admin=False, unread_notifications=0):
         self.id = id
         self.username = username
         self.email = email
         self.points = points
         self.avatar_color = avatar_color
         self.is_admin = is_admin
+        # Compteur matérialisé (notifications.fan_out) : badge sans requête supplémentaire
+        self.unread_notifications = unread_notifications
 
     def get_level_info(self):
         """Retourne les informations de niveau basées sur les points"""
@@ -118,7 +120,7 @@ def get_user_by_id(user_id):
     Returns:
         User: Instance de User ou None si non trouvé
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect_db(DATABASE_PATH)
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
     c.execute("SELECT * FROM users WHERE id = ?", (user_id,))
@@ -132,7 +134,9 @@ def get_user_by_id(user_id):
             email=user_data['email'],
             points=user_data['points'],
             avatar_color=user_data['avatar_color'],
-            is_admin=bool(user_data['is_admin']) if 'is_admin' in user_data.keys() else False
+            is_admin=bool(user_data['is_admin']) if 'is_admin' in user_data.keys() else False,
+            unread_notifications=user_data['unread_notifications']
+            if 'unread_notifications' in user_data.keys() else 0
         )
     return None
 
@@ -147,7 +151,7 @@ def get_user_by_username(username):
     Returns:
         dict: Données de l'utilisateur ou None si non trouvé
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect_db(DATABASE_PATH)
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
     c.execute("SELECT * FROM users WHERE username = ?", (username,))
@@ -172,7 +176,7 @@ def create_user(username, password_hash, email=None, avatar_color='#6c757d'):
         None: Si erreur (username déjà existant)
     """
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = connect_db(DATABASE_PATH)
         c = conn.cursor()
         c.execute(
             "INSERT INTO users (username, password_hash, email, avatar_color) VALUES (?, ?, ?, ?)",
@@ -187,9 +191,24 @@ def create_user(username, password_hash, email=None, avatar_color='#6c757d'):
         return None
 
 
+def apply_points(conn, user_id, points_change):
+    """
+    Ajoute des points dans la transaction en cours (sans commit)
+
+    Returns:
+        int: Nouveau total de points (None si l'utilisateur n'existe pas)
+    """
+    # MAX pour éviter les points négatifs
+    row = conn.execute(
+        "UPDATE users SET points = MAX(0, points + ?) WHERE id = ? RETURNING points",
+        (points_change, user_id)
+    ).fetchone()
+    return row[0] if row else None
+
+
 def update_user_points(user_id, points_change):
     """
-    Met à jour les points d'un utilisateur
+    Met à jour les points d'un utilisateur (via l'écrivain unique, voir writer.py)
 
     Args:
         user_id (int): ID de l'utilisateur
@@ -198,23 +217,7 @@ def update_user_points(user_id, points_change):
     Returns:
         int: Nouveau total de points
     """
-    conn = sqlite3.connect(DATABASE_PATH)
-    c = conn.cursor()
-
-    # Mise à jour avec MAX pour éviter les points négatifs
-    c.execute(
-        "UPDATE users SET points = MAX(0, points + ?) WHERE id = ?",
-        (points_change, user_id)
-    )
-
-    # Récupérer le nouveau total
-    c.execute("SELECT points FROM users WHERE id = ?", (user_id,))
-    new_points = c.fetchone()[0]
-
-    conn.commit()
-    conn.close()
-
-    return new_points
+    return writer_for(DATABASE_PATH).run(apply_points, user_id, points_change)
 
 
 # ===========================
@@ -231,7 +234,7 @@ def get_all_places(active_only=True):
     Returns:
         list: Liste de dictionnaires représentant les lieux
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect_db(DATABASE_PATH)
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
@@ -256,7 +259,7 @@ def get_place_by_id(place_id):
     Returns:
         dict: Données du lieu ou None si non trouvé
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect_db(DATABASE_PATH)
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
@@ -288,7 +291,7 @@ def create_place(name, city, address=None, latitude=None, longitude=None,
     Returns:
         int: ID du nouveau lieu
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect_db(DATABASE_PATH)
     c = conn.cursor()
 
     c.execute("""
@@ -319,7 +322,7 @@ def update_place(place_id, name=None, city=None, address=None, latitude=None,
     Returns:
         bool: True si la mise à jour a réussi
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect_db(DATABASE_PATH)
     c = conn.cursor()
 
     # Construire la requête dynamiquement
@@ -386,7 +389,7 @@ def delete_place(place_id):
     Returns:
         bool: True si la suppression a réussi
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect_db(DATABASE_PATH)
     c = conn.cursor()
 
     # Désactiver plutôt que supprimer pour préserver les références
@@ -409,7 +412,7 @@ def toggle_place_active(place_id):
     Returns:
         bool: Nouveau statut is_active
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect_db(DATABASE_PATH)
     c = conn.cursor()
 
     c.execute("UPDATE places SET is_active = NOT is_active WHERE id = ?", (place_id,))
@@ -420,3 +423,85 @@ def toggle_place_active(place_id):
     conn.close()
 
     return bool(result[0]) if result else None
+
+
+# ===========================
+# RÉGLAGES (TABLE SETTINGS)
+# ===========================
+
+def get_setting(key, default=''):
+    """Récupérer un paramètre depuis la base de données"""
+    conn = connect_db(DATABASE_PATH)
+    c = conn.cursor()
+    c.execute("SELECT value FROM settings WHERE key = ?", (key,))
+    row = c.fetchone()
+    conn.close()
+    return row[0] if row else default
+
+
+def set_setting(key, value):
+    """Enregistrer un paramètre dans la base de données"""
+    conn = connect_db(DATABASE_PATH)
+    c = conn.cursor()
+    c.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+    conn.commit()
+    conn.close()
+
+
+# ===========================
+# IMAGES DES SPORTS
+# ===========================
+
+# Images par défaut ; un réglage sport_image_<sport> les remplace
+DEFAULT_SPORT_IMAGES = {
+    'Running':          'https://images.unsplash.com/photo-1552674605-db6ffd4facb5?w=400&h=200&fit=crop',
+    'Tennis':           'https://images.unsplash.com/photo-1554068865-24cecd4e34b8?w=400&h=200&fit=crop',
+    'Yoga':             'https://images.unsplash.com/photo-1544367567-0f2fcb009e0b?w=400&h=200&fit=crop',
+    'Football':         'https://images.unsplash.com/photo-1574629810360-7efbbe195018?w=400&h=200&fit=crop',
+    'Natation':         'https://images.unsplash.com/photo-1530549387789-4c1017266635?w=400&h=200&fit=crop',
+    'Basketball':       'https://images.unsplash.com/photo-1546519638-68e109498ffc?w=400&h=200&fit=crop',
+    'Cyclisme':         'https://images.unsplash.com/photo-1541625602330-2277a4c46182?w=400&h=200&fit=crop',
+    'Roller':           '/static/images/sports/roller.jpg',
+    'Volley-ball':      'https://images.unsplash.com/photo-1612872087720-bb876e2e67d1?w=400&h=200&fit=crop',
+    'Danse':            'https://images.unsplash.com/photo-1547153760-18fc86324498?w=400&h=200&fit=crop',
+    'Judo':             'https://images.unsplash.com/photo-1555597673-b21d5c935865?w=400&h=200&fit=crop',
+    'Karaté':           'https://images.unsplash.com/photo-1555597408-26bc8e548a46?w=400&h=200&fit=crop',
+    'Capoeira':         '/static/images/sports/capoeira.jpg',
+    'Ping-pong':        'https://images.unsplash.com/photo-1534158914592-062992fbe900?w=400&h=200&fit=crop',
+    'Patinage':         'https://images.unsplash.com/photo-1547483238991-18f79b7ccf8a?w=400&h=200&fit=crop',
+    'Taekwondo':        '/static/images/sports/taekwondo.jpg',
+    'Kendo':            'https://images.unsplash.com/photo-1509114397022-ed747cca3f65?w=400&h=200&fit=crop',
+    'Handball':         'https://images.unsplash.com/photo-1558618666-fcd25c85f82e?w=400&h=200&fit=crop',
+    'Gymnastique':      'https://images.unsplash.com/photo-1566577739112-5180d4bf9390?w=400&h=200&fit=crop',
+    'Escrime':          '/static/images/sports/escrime.jpg',
+    'Ski':              'https://images.unsplash.com/photo-1551698618-1dfe5d97d256?w=400&h=200&fit=crop',
+    'Parkour':          '/static/images/sports/parkour.jpg',
+    'Hockey':           '/static/images/sports/hockey.jpg',
+    'Skate':            '/static/images/sports/skate.jpg',
+    'Voile':            '/static/images/sports/voile.jpg',
+    'Escalade':         'https://images.unsplash.com/photo-1522163182402-834f871fd851?w=400&h=200&fit=crop',
+    'Rugby':            'https://images.unsplash.com/photo-1555881400-74d7acaacd8b?w=400&h=200&fit=crop',
+    'Badminton':        'https://images.unsplash.com/photo-1544298621-35a764e4c9d8?w=400&h=200&fit=crop',
+    'Boxe':             'https://images.unsplash.com/photo-1549719386-74dfcbf7dbed?w=400&h=200&fit=crop',
+    'MMA':              'https://images.unsplash.com/photo-1555597673-b21d5c935865?w=400&h=200&fit=crop',
+    'Multijeux':        'https://images.unsplash.com/photo-1461896836934-68f78c8c46b6?w=400&h=200&fit=crop',
+    'Ultimate':         'https://images.unsplash.com/photo-1461896836934-68f78c8c46b6?w=400&h=200&fit=crop',
+    'Saut à la perche': 'https://images.unsplash.com/photo-1461896836934-68f78c8c46b6?w=400&h=200&fit=crop',
+    'Bowling':          'https://images.unsplash.com/photo-1508961990440-f1040e1c6d05?w=400&h=200&fit=crop',
+    "Tir à l'arc":      'https://images.unsplash.com/photo-1511884642898-4c92249e20b6?w=400&h=200&fit=crop',
+    'Golf':             'https://images.unsplash.com/photo-1535131749006-b7f58c99034b?w=400&h=200&fit=crop',
+}
+
+
+def get_sport_images():
+    """Retourne le dict images des sports (DB en priorité, sinon défauts)"""
+    conn = connect_db(DATABASE_PATH)
+    c = conn.cursor()
+    c.execute("SELECT key, value FROM settings WHERE key LIKE 'sport_image_%'")
+    rows = c.fetchall()
+    conn.close()
+    images = dict(DEFAULT_SPORT_IMAGES)
+    for key, value in rows:
+        sport_name = key[len('sport_image_'):]
+        images[sport_name] = value
+    return images
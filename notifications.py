@@ -0,0 +1,178 @@
+"""
+Boîte de notifications de Sport Connect (fan-out à l'écriture)
+Quand une activité est annulée, réactivée ou reçoit un message, une ligne est
+écrite pour chaque participant (et l'organisateur) en un seul executemany, dans
+la transaction de l'action. Le compteur users.unread_notifications est tenu à
+jour en même temps : le badge de la barre de navigation vient de la ligne
+utilisateur déjà chargée par Flask-Login, sans requête supplémentaire.
+
+Les clés étrangères n'étant pas appliquées, la suppression d'une activité ou
+d'un compte supprime ses notifications explicitement (delete_for_event,
+delete_for_user), dans la même transaction.
+"""
+
+import sqlite3
+
+from db import DATABASE_PATH, connect_db
+
+# Types de notification et libellés par défaut
+KINDS = {
+    'cancelled': "L'activité {sport} ({date_heure}) a été annulée",
+    'reactivated': "L'activité {sport} ({date_heure}) est de nouveau programmée",
+    'message': "{username} dans {sport} : {preview}",
+}
+
+# Notifications affichées dans la boîte
+INBOX_LIMIT = 50
+
+# Longueur maximale de l'aperçu d'un message de chat
+PREVIEW_CHARS = 120
+
+# Destinataires par requête IN (...) du regroupement des messages
+RECIPIENTS_BATCH_SIZE = 500
+
+
+def recipients(c, event_id, exclude_user_id=None):
+    """
+    Participants et organisateur d'une activité, sans l'auteur de l'action
+
+    Returns:
+        list: Identifiants des utilisateurs à notifier
+    """
+    c.execute("""
+        SELECT user_id FROM participations WHERE event_id = ?
+        UNION
+        SELECT organizer_id FROM events WHERE id = ? AND organizer_id IS NOT NULL
+    """, (event_id, event_id))
+    return [row[0] for row in c.fetchall() if row[0] != exclude_user_id]
+
+
+def fan_out(conn, event_id, kind, message, exclude_user_id=None):
+    """
+    Notifie tous les destinataires d'une activité (sans commit : transaction de l'appelant)
+
+    Les messages de chat sont regroupés : un destinataire qui a déjà une
+    notification de message non lue pour cette activité voit celle-ci mise à
+    jour au lieu d'en recevoir une nouvelle (et son compteur ne bouge pas).
+
+    Args:
+        conn: Connexion de l'action (l'annulation, le message... est écrit dans la même transaction)
+        kind (str): Clé de KINDS
+        message (str): Texte affiché
+
+    Returns:
+        int: Nombre de nouvelles notifications écrites
+    """
+    c = conn.cursor()
+    user_ids = recipients(c, event_id, exclude_user_id)
+    if not user_ids:
+        return 0
+
+    if kind == 'message':
+        # Seulement les destinataires actuels : ni l'auteur, ni ceux qui ont quitté l'activité
+        already_notified = set()
+        for start in range(0, len(user_ids), RECIPIENTS_BATCH_SIZE):
+            batch = user_ids[start:start + RECIPIENTS_BATCH_SIZE]
+            c.execute(f"""
+                UPDATE notifications SET message = ?, created_at = CURRENT_TIMESTAMP
+                WHERE event_id = ? AND kind = 'message' AND is_read = 0
+                  AND user_id IN ({','.join('?' * len(batch))})
+                RETURNING user_id
+            """, [message, event_id] + batch)
+            already_notified.update(row[0] for row in c.fetchall())
+        user_ids = [user_id for user_id in user_ids if user_id not in already_notified]
+
+    c.executemany("INSERT INTO notifications (user_id, event_id, kind, message) VALUES (?, ?, ?, ?)",
+                  [(user_id, event_id, kind, message) for user_id in user_ids])
+    c.executemany("UPDATE users SET unread_notifications = unread_notifications + 1 WHERE id = ?",
+                  [(user_id,) for user_id in user_ids])
+    return len(user_ids)
+
+
+def notify_event(conn, event_id, kind, exclude_user_id=None, **details):
+    """
+    Fan-out avec le libellé de KINDS, complété par le sport et la date de l'activité
+
+    Returns:
+        int: Nombre de nouvelles notifications écrites
+    """
+    c = conn.cursor()
+    c.execute("SELECT sport, date_heure FROM events WHERE id = ?", (event_id,))
+    event = c.fetchone()
+    if not event:
+        return 0
+    message = KINDS[kind].format(sport=event[0], date_heure=event[1], **details)
+    return fan_out(conn, event_id, kind, message, exclude_user_id)
+
+
+def delete_for_event(conn, event_id):
+    """
+    Supprime les notifications d'une activité supprimée (sans commit : transaction de l'appelant)
+
+    Les compteurs de non-lues de leurs destinataires sont diminués d'autant.
+    """
+    c = conn.cursor()
+    c.execute("""
+        SELECT user_id, COUNT(*) FROM notifications
+        WHERE event_id = ? AND is_read = 0
+        GROUP BY user_id
+    """, (event_id,))
+    unread = c.fetchall()
+    c.executemany("UPDATE users SET unread_notifications = max(0, unread_notifications - ?) WHERE id = ?",
+                  [(count, user_id) for user_id, count in unread])
+    c.execute("DELETE FROM notifications WHERE event_id = ?", (event_id,))
+    return c.rowcount
+
+
+def delete_for_user(conn, user_id):
+    """Supprime la boîte d'un compte supprimé (sans commit : transaction de l'appelant)"""
+    return conn.execute("DELETE FROM notifications WHERE user_id = ?", (user_id,)).rowcount
+
+
+def preview(text):
+    """Aperçu d'un message de chat pour la notification"""
+    text = ' '.join(text.split())
+    return text if len(text) <= PREVIEW_CHARS else text[:PREVIEW_CHARS - 1] + '…'
+
+
+def get_inbox(user_id, limit=INBOX_LIMIT):
+    """
+    Dernières notifications d'un utilisateur (index (user_id, id))
+
+    Returns:
+        list: Notifications (dict) de la plus récente à la plus ancienne
+    """
+    conn = connect_db(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    c.execute("""
+        SELECT id, event_id, kind, message, created_at, is_read
+        FROM notifications
+        WHERE user_id = ?
+        ORDER BY id DESC
+        LIMIT ?
+    """, (user_id, limit))
+    notifications = [dict(row) for row in c.fetchall()]
+    conn.close()
+    return notifications
+
+
+def mark_all_read(conn, user_id):
+    """
+    Marque toutes les notifications comme lues et remet le compteur à zéro
+
+    Sans commit : à confier à l'écrivain, db_writer.run(mark_all_read, user_id)
+    """
+    c = conn.cursor()
+    c.execute("UPDATE notifications SET is_read = 1 WHERE user_id = ? AND is_read = 0", (user_id,))
+    c.execute("UPDATE users SET unread_notifications = 0 WHERE id = ?", (user_id,))
+
+
+def mark_read(conn, user_id, notification_id):
+    """Marque une notification comme lue, décrémente le compteur si elle ne l'était pas (sans commit, écrivain)"""
+    c = conn.cursor()
+    c.execute("UPDATE notifications SET is_read = 1 WHERE id = ? AND user_id = ? AND is_read = 0",
+              (notification_id, user_id))
+    if c.rowcount:
+        c.execute("UPDATE users SET unread_notifications = max(0, unread_notifications - 1) WHERE id = ?",
+                  (user_id,))
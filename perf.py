@@ -0,0 +1,323 @@
+"""
+Instrumentation des performances pour Sport Connect
+Mesure par requête : temps total, nombre de requêtes SQL, temps SQL et
+requête la plus lente, agrégés par route dans des histogrammes glissants
+"""
+
+from contextvars import ContextVar
+import bisect
+import sqlite3
+import threading
+import time
+
+# Bornes supérieures des buckets de latence (ms), la dernière case est +inf
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Fenêtre glissante : SLOT_SECONDS x SLOTS (1 heure par tranches d'une minute)
+SLOT_SECONDS = 60
+SLOTS = 60
+
+# Longueur maximale conservée pour le texte d'une requête SQL
+SQL_PREVIEW_CHARS = 300
+
+# Statistiques de la requête HTTP en cours (None hors requête)
+_current = ContextVar('perf_request_stats', default=None)
+
+# Observateurs (ex. métriques Prometheus), appelés pour chaque connexion / requête SQL :
+#   connect_hooks : fn()
+#   statement_hooks : fn(sql, durée en s, exception ou None)
+connect_hooks = []
+statement_hooks = []
+
+# Requêtes lentes (voir slow_queries.py) : seuil en secondes, None = désactivé.
+# slow_statement_hooks : fn(connexion, sql, paramètres, durée en s), appelé une
+# seule fois par exécution, dès que exécution + lecture des lignes dépassent le seuil
+slow_threshold = None
+slow_statement_hooks = []
+
+
+class RequestStats:
+    """Compteurs SQL d'une requête HTTP"""
+
+    __slots__ = ('started', 'sql_count', 'sql_time', 'slowest_time', 'slowest_sql')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_sql = None
+
+    def add(self, sql, duration):
+        self.sql_count += 1
+        self.sql_time += duration
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_sql = sql
+
+
+def start_request():
+    """Commence la mesure d'une requête HTTP"""
+    stats = RequestStats()
+    _current.set(stats)
+    return stats
+
+
+def end_request():
+    """Termine la mesure, retourne (stats, durée totale en s) ou None"""
+    stats = _current.get()
+    if stats is None:
+        return None
+    _current.set(None)
+    return stats, time.perf_counter() - stats.started
+
+
+def current_stats():
+    """Statistiques de la requête en cours, ou None"""
+    return _current.get()
+
+
+def _record(sql, started, error=None):
+    duration = time.perf_counter() - started
+    stats = _current.get()
+    if stats is not None:
+        stats.add(sql, duration)
+    for hook in statement_hooks:
+        hook(sql, duration, error)
+    return duration
+
+
+# ===========================
+# CONNEXIONS SQLITE INSTRUMENTÉES
+# ===========================
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    Curseur qui chronomètre execute/executemany et les fetch*
+
+    SQLite produit les lignes à la demande : le temps des fetch est ajouté
+    à celui de la dernière requête exécutée (sans la recompter).
+    """
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            result = super().execute(sql, parameters)
+        except sqlite3.Error as e:
+            _record(sql, started, e)
+            raise
+        self._last_sql = sql
+        self._last_parameters = parameters
+        self._elapsed = _record(sql, started)
+        self._slow_reported = False
+        if slow_threshold is not None and self._elapsed >= slow_threshold:
+            self._report_slow()
+        return result
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            result = super().executemany(sql, seq_of_parameters)
+        except sqlite3.Error as e:
+            _record(sql, started, e)
+            raise
+        self._last_sql = sql
+        self._last_parameters = None
+        self._elapsed = _record(sql, started)
+        self._slow_reported = True  # pas de plan unique pour un lot de paramètres
+        return result
+
+    def executescript(self, sql_script):
+        started = time.perf_counter()
+        try:
+            result = super().executescript(sql_script)
+        except sqlite3.Error as e:
+            _record(sql_script, started, e)
+            raise
+        self._last_sql = sql_script
+        self._last_parameters = None
+        self._elapsed = _record(sql_script, started)
+        self._slow_reported = True  # plusieurs instructions : pas de plan
+        return result
+
+    def _report_slow(self):
+        self._slow_reported = True
+        for hook in slow_statement_hooks:
+            hook(self.connection, self._last_sql, self._last_parameters, self._elapsed)
+
+    def _fetch_time(self, started):
+        duration = time.perf_counter() - started
+        stats = _current.get()
+        if stats is not None:
+            stats.sql_time += duration
+            sql = getattr(self, '_last_sql', None)
+            if sql is not None and sql == stats.slowest_sql:
+                stats.slowest_time += duration
+        if slow_threshold is not None and not getattr(self, '_slow_reported', True):
+            self._elapsed += duration
+            if self._elapsed >= slow_threshold:
+                self._report_slow()
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._fetch_time(started)
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        try:
+            return super().fetchmany(size) if size is not None else super().fetchmany()
+        finally:
+            self._fetch_time(started)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._fetch_time(started)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connexion dont tous les curseurs (y compris conn.execute) sont instrumentés"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for hook in connect_hooks:
+            hook()
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    # Le raccourci C de sqlite3 n'appelle pas InstrumentedCursor.execute : on passe par cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        # Le COMMIT attend le verrou d'écriture : mesuré comme une requête
+        started = time.perf_counter()
+        try:
+            super().commit()
+        except sqlite3.Error as e:
+            _record('COMMIT', started, e)
+            raise
+        _record('COMMIT', started)
+
+
+# ===========================
+# AGRÉGATION PAR ROUTE (HISTOGRAMMES GLISSANTS)
+# ===========================
+
+class _Slot:
+    """Agrégats d'une route sur une tranche de temps"""
+
+    __slots__ = ('index', 'buckets', 'count', 'wall', 'sql_time', 'sql_count', 'max_sql_count',
+                 'slowest_time', 'slowest_sql', 'errors')
+
+    def __init__(self, index):
+        self.index = index
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.wall = 0.0
+        self.sql_time = 0.0
+        self.sql_count = 0
+        self.max_sql_count = 0
+        self.slowest_time = 0.0
+        self.slowest_sql = None
+        self.errors = 0
+
+
+class RouteStats:
+    """Histogrammes glissants par route (propres au processus)"""
+
+    def __init__(self, slot_seconds=SLOT_SECONDS, slots=SLOTS):
+        self.slot_seconds = slot_seconds
+        self.slots = slots
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, wall, stats, status=200):
+        """Ajoute une requête terminée (wall en secondes)"""
+        index = int(time.time() // self.slot_seconds)
+        wall_ms = wall * 1000
+        with self._lock:
+            ring = self._routes.get(route)
+            if ring is None:
+                ring = self._routes[route] = [None] * self.slots
+            position = index % self.slots
+            slot = ring[position]
+            if slot is None or slot.index != index:
+                slot = ring[position] = _Slot(index)
+            slot.buckets[bisect.bisect_left(BUCKETS_MS, wall_ms)] += 1
+            slot.count += 1
+            slot.wall += wall
+            slot.sql_time += stats.sql_time
+            slot.sql_count += stats.sql_count
+            slot.max_sql_count = max(slot.max_sql_count, stats.sql_count)
+            if status >= 500:
+                slot.errors += 1
+            if stats.slowest_time > slot.slowest_time:
+                slot.slowest_time = stats.slowest_time
+                slot.slowest_sql = (stats.slowest_sql or '')[:SQL_PREVIEW_CHARS]
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+    @staticmethod
+    def _percentile(buckets, count, pct):
+        """Borne supérieure du bucket contenant le percentile (ms)"""
+        target = count * pct / 100
+        seen = 0
+        for i, n in enumerate(buckets):
+            seen += n
+            if seen >= target and n:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else float('inf')
+        return 0
+
+    def summary(self, window_seconds=None):
+        """
+        Agrège les tranches de la fenêtre demandée
+
+        Returns:
+            list: Une entrée par route, triée par temps total décroissant
+        """
+        window_slots = self.slots if window_seconds is None else \
+            max(1, min(self.slots, -(-window_seconds // self.slot_seconds)))
+        oldest = int(time.time() // self.slot_seconds) - window_slots + 1
+        result = []
+        with self._lock:
+            for route, ring in self._routes.items():
+                slots = [slot for slot in ring if slot is not None and slot.index >= oldest]
+                count = sum(slot.count for slot in slots)
+                if not count:
+                    continue
+                buckets = [sum(values) for values in zip(*(slot.buckets for slot in slots))]
+                slowest = max(slots, key=lambda slot: slot.slowest_time)
+                wall = sum(slot.wall for slot in slots)
+                sql_time = sum(slot.sql_time for slot in slots)
+                sql_count = sum(slot.sql_count for slot in slots)
+                result.append({
+                    'route': route,
+                    'count': count,
+                    'errors': sum(slot.errors for slot in slots),
+                    'total_ms': round(wall * 1000, 1),
+                    'mean_ms': round(wall * 1000 / count, 2),
+                    'p50_ms': self._percentile(buckets, count, 50),
+                    'p95_ms': self._percentile(buckets, count, 95),
+                    'p99_ms': self._percentile(buckets, count, 99),
+                    'sql_mean_count': round(sql_count / count, 1),
+                    'sql_max_count': max(slot.max_sql_count for slot in slots),
+                    'sql_mean_ms': round(sql_time * 1000 / count, 2),
+                    'sql_share': round(sql_time / wall, 3) if wall else 0.0,
+                    'slowest_sql_ms': round(slowest.slowest_time * 1000, 2),
+                    'slowest_sql': slowest.slowest_sql,
+                    'buckets': buckets,
+                })
+        result.sort(key=lambda item: item['total_ms'], reverse=True)
+        return result
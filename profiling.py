@@ -0,0 +1,237 @@
+"""
+Profilage à la demande d'une requête HTTP (réservé aux administrateurs)
+Deux modes :
+- 'cprofile' : profil déterministe, enregistré en .pstats (snakeviz, pstats) et en
+  piles agrégées .collapsed (flamegraph.pl, speedscope) reconstruites depuis le graphe d'appels ;
+- 'sample' : échantillonnage de la pile toutes les SAMPLE_INTERVAL secondes, sans
+  ralentir le code profilé, pour les requêtes longues (.collapsed uniquement).
+Sans demande explicite, aucun profileur n'est installé.
+"""
+
+from datetime import datetime
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+
+MODES = ('cprofile', 'sample')
+
+# Période d'échantillonnage du mode 'sample' (s)
+SAMPLE_INTERVAL = 0.005
+
+# Nombre maximal de profils conservés sur disque (les plus anciens sont supprimés)
+MAX_PROFILES = 50
+
+# Nom de fichier : <horodatage>-<route>-<id>.<extension>
+_PROFILE_ID_RE = re.compile(r'^[0-9]{8}-[0-9]{6}-[A-Za-z0-9_.]{1,60}-[0-9a-f]{8}$')
+
+
+def _frame_label(code):
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}"
+
+
+# ===========================
+# PROFILEURS
+# ===========================
+
+class SamplingProfiler:
+    """Relève périodiquement la pile d'un thread depuis un thread annexe"""
+
+    def __init__(self, thread_id=None, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='profiling-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            key = ';'.join(reversed(stack))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def collapsed(self):
+        """Une ligne par pile : 'f1;f2;f3 <nombre d'échantillons>'"""
+        return ''.join(f"{stack} {count}\n" for stack, count in
+                       sorted(self.stacks.items(), key=lambda item: -item[1]))
+
+
+def pstats_to_collapsed(stats, unit=1e-6, min_time=1e-5):
+    """
+    Reconstruit des piles agrégées depuis le graphe d'appels de cProfile
+
+    Le temps propre d'une fonction est réparti entre ses appelants au prorata
+    du temps cumulé venu de chacun (approximation usuelle des flame graphs
+    construits à partir d'un profil déterministe). Valeurs en microsecondes ;
+    les branches de moins de min_time secondes ne sont pas développées.
+    """
+    entries = stats.stats  # func -> (cc, nc, tt, ct, callers)
+    children = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, caller_stats in callers.items():
+            children.setdefault(caller, []).append((func, caller_stats[3]))
+
+    lines = {}
+
+    def walk(func, path, share, depth):
+        _, _, own_time, cumulative, _ = entries[func]
+        label = f"{os.path.basename(func[0])}:{func[2]}:{func[1]}"
+        stack = f"{path};{label}" if path else label
+        self_value = own_time * share
+        if self_value / unit >= 1:
+            lines[stack] = lines.get(stack, 0) + self_value
+        if depth > 200:
+            return
+        for child, edge_time in children.get(func, ()):
+            if child == func or label in path.split(';'):
+                continue
+            child_cumulative = entries[child][3]
+            if child_cumulative > 0 and edge_time * share >= min_time:
+                walk(child, stack, min(1.0, edge_time * share / child_cumulative), depth + 1)
+
+    roots = [func for func, value in entries.items() if not value[4]]
+    for root in roots:
+        walk(root, '', 1.0, 0)
+    return ''.join(f"{stack} {int(value / unit)}\n"
+                   for stack, value in sorted(lines.items(), key=lambda item: -item[1]))
+
+
+class RequestProfile:
+    """Profil d'une requête en cours (créé seulement si demandé)"""
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.started = time.perf_counter()
+        self.started_at = datetime.now()
+        self.wall = None
+        if mode == 'sample':
+            self._profiler = SamplingProfiler()
+            self._profiler.start()
+        else:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self):
+        """Arrête le profileur (idempotent), retourne la durée en s"""
+        if self.wall is None:
+            if self.mode == 'sample':
+                self._profiler.stop()
+            else:
+                self._profiler.disable()
+            self.wall = time.perf_counter() - self.started
+        return self.wall
+
+    def save(self, store, meta):
+        """Enregistre les fichiers du profil, retourne son identifiant"""
+        self.stop()
+        return store.save(self, meta)
+
+
+# ===========================
+# STOCKAGE SUR DISQUE
+# ===========================
+
+class ProfileStore:
+    """Profils enregistrés dans un dossier : .json (métadonnées), .pstats, .collapsed"""
+
+    def __init__(self, directory, max_profiles=MAX_PROFILES):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def save(self, profile, meta):
+        os.makedirs(self.directory, exist_ok=True)
+        route = re.sub(r'[^A-Za-z0-9_.]', '_', meta.get('endpoint') or 'not_found')[:60]
+        profile_id = f"{profile.started_at:%Y%m%d-%H%M%S}-{route}-{uuid.uuid4().hex[:8]}"
+        base = os.path.join(self.directory, profile_id)
+
+        files = []
+        if profile.mode == 'sample':
+            collapsed = profile._profiler.collapsed()
+            meta['samples'] = profile._profiler.samples
+            meta['interval_ms'] = profile._profiler.interval * 1000
+        else:
+            profile._profiler.create_stats()
+            stats = pstats.Stats(profile._profiler)
+            stats.dump_stats(base + '.pstats')
+            files.append('pstats')
+            collapsed = pstats_to_collapsed(stats)
+            meta['function_calls'] = stats.total_calls
+        with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+            f.write(collapsed)
+        files.append('collapsed')
+
+        meta.update({
+            'id': profile_id,
+            'mode': profile.mode,
+            'created_at': profile.started_at.isoformat(timespec='seconds'),
+            'wall_ms': round(profile.wall * 1000, 1),
+            'files': files,
+        })
+        with open(base + '.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        self._prune()
+        return profile_id
+
+    def _prune(self):
+        with self._lock:
+            for profile_id in [item['id'] for item in self.list()][self.max_profiles:]:
+                self.delete(profile_id)
+
+    def list(self):
+        """Métadonnées des profils, du plus récent au plus ancien"""
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        profiles.sort(key=lambda item: item['id'], reverse=True)
+        return profiles
+
+    def path(self, profile_id, kind):
+        """Chemin d'un fichier de profil, ou None si l'identifiant ou le type est invalide"""
+        if kind not in ('pstats', 'collapsed', 'json') or not _PROFILE_ID_RE.match(profile_id):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.{kind}")
+        return path if os.path.exists(path) else None
+
+    def delete(self, profile_id):
+        if not _PROFILE_ID_RE.match(profile_id):
+            return
+        for kind in ('pstats', 'collapsed', 'json'):
+            try:
+                os.remove(os.path.join(self.directory, f"{profile_id}.{kind}"))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        for item in self.list():
+            self.delete(item['id'])
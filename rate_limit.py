@@ -0,0 +1,284 @@
+"""
+Limitation de débit (seau à jetons) pour Sport Connect
+Chaque règle (chatbot, messages, participation) a un budget par utilisateur et
+un budget plus large par adresse IP : une rafale de `burst` requêtes, puis
+`per_minute` requêtes par minute en régime continu.
+
+L'état des seaux est partagé entre workers dans une petite base SQLite dédiée
+(RATE_LIMIT_DB, hors de database.db pour ne pas prendre son verrou d'écriture) :
+une seule instruction UPSERT ... RETURNING recharge et consomme un seau. Les seaux
+d'une requête (utilisateur et IP) sont consommés ensemble ou pas du tout
+(consume_all) : un refus par IP ne coûte pas de jeton au seau utilisateur.
+RATE_LIMIT_STORAGE=memory garde l'état dans le processus (un seul worker).
+
+Derrière un proxy inverse, l'adresse IP est celle transmise par le proxy
+(TRUSTED_PROXIES, voir app.py) : sans cela, tous les clients partageraient un seau.
+
+Variables d'environnement :
+    RATE_LIMIT (on, 'off' pour désactiver), RATE_LIMIT_STORAGE (sqlite | memory),
+    RATE_LIMIT_DB (cache/ratelimit.db), RATE_LIMIT_<RÈGLE> ('burst/par_minute',
+    ex. RATE_LIMIT_CHATBOT=5/6)
+"""
+
+from functools import wraps
+import logging
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from flask import jsonify, request
+from flask_login import current_user
+
+from metrics import count_rate_limited
+
+logger = logging.getLogger('sportconnect.ratelimit')
+
+# Budgets par utilisateur : rafale autorisée et débit continu (requêtes par minute)
+RULES = {
+    'chatbot': {'burst': 5, 'per_minute': 6},         # appels LLM payants et lents
+    'chat_message': {'burst': 10, 'per_minute': 30},  # messages d'événement
+    'participation': {'burst': 6, 'per_minute': 10},  # rejoindre / quitter (points, écritures)
+}
+
+# Budget IP = budget utilisateur x IP_FACTOR (plusieurs utilisateurs derrière un même NAT)
+IP_FACTOR = 4
+
+# Un seau sur PRUNE_EVERY déclenche la purge des seaux pleins depuis longtemps
+PRUNE_EVERY = 1000
+
+_UPSERT_SQL = """
+    INSERT INTO buckets (key, tokens, updated, allowed) VALUES (:key, :capacity - :cost, :now, 1)
+    ON CONFLICT (key) DO UPDATE SET
+        tokens = CASE WHEN min(:capacity, tokens + max(0, :now - updated) * :rate) >= :cost
+                      THEN min(:capacity, tokens + max(0, :now - updated) * :rate) - :cost
+                      ELSE min(:capacity, tokens + max(0, :now - updated) * :rate) END,
+        allowed = min(:capacity, tokens + max(0, :now - updated) * :rate) >= :cost,
+        updated = :now
+    RETURNING tokens, allowed
+"""
+
+
+def _refill(tokens, updated, capacity, rate, now):
+    """Jetons d'un seau après recharge depuis `updated`"""
+    return min(capacity, tokens + max(0.0, now - updated) * rate)
+
+
+def rules_from_env(rules=RULES):
+    """Budgets par défaut, surchargés par RATE_LIMIT_<RÈGLE>='burst/par_minute'"""
+    result = {}
+    for name, rule in rules.items():
+        value = os.environ.get(f'RATE_LIMIT_{name.upper()}', '')
+        if value:
+            burst, per_minute = value.split('/')
+            rule = {'burst': int(burst), 'per_minute': float(per_minute)}
+        result[name] = dict(rule)
+    return result
+
+
+# ===========================
+# STOCKAGE DES SEAUX
+# ===========================
+
+class MemoryBuckets:
+    """Seaux gardés dans le processus (développement, un seul worker)"""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, cost=1, now=None):
+        """
+        Recharge le seau puis retire `cost` jetons s'il y en a assez
+
+        Returns:
+            tuple: (autorisé, jetons restants)
+        """
+        allowed, tokens = self.consume_all([(key, capacity, rate)], cost, now)
+        return allowed, tokens[0]
+
+    def consume_all(self, buckets, cost=1, now=None):
+        """
+        Recharge les seaux puis retire `cost` jetons de chacun, seulement si tous en ont assez
+
+        Args:
+            buckets (list): (clé, capacité, jetons par seconde) de chaque seau
+
+        Returns:
+            tuple: (autorisé, jetons de chaque seau après l'opération)
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            tokens = [_refill(*self._buckets.get(key, (capacity, now)), capacity, rate, now)
+                      for key, capacity, rate in buckets]
+            allowed = all(t >= cost for t in tokens)
+            if allowed:
+                tokens = [t - cost for t in tokens]
+            for (key, _, _), t in zip(buckets, tokens):
+                self._buckets[key] = (t, now)
+        return allowed, tokens
+
+    def prune(self, older_than):
+        with self._lock:
+            for key in [key for key, (_, updated) in self._buckets.items() if updated < older_than]:
+                del self._buckets[key]
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteBuckets:
+    """
+    Seaux partagés entre processus dans une base SQLite dédiée
+
+    Une connexion par thread, rouverte après un fork. Les seaux sont un état
+    jetable : synchronous=OFF, pas de fsync à chaque requête.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute('''CREATE TABLE IF NOT EXISTS buckets
+                            (key TEXT PRIMARY KEY,
+                             tokens REAL NOT NULL,
+                             updated REAL NOT NULL,
+                             allowed INTEGER NOT NULL) WITHOUT ROWID''')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def consume(self, key, capacity, rate, cost=1, now=None):
+        now = time.time() if now is None else now
+        tokens, allowed = self._connection().execute(_UPSERT_SQL, {
+            'key': key, 'capacity': capacity, 'rate': rate, 'cost': cost, 'now': now}).fetchone()
+        return bool(allowed), tokens
+
+    def consume_all(self, buckets, cost=1, now=None):
+        """Comme MemoryBuckets.consume_all, dans une transaction (verrou d'écriture pris d'emblée)"""
+        now = time.time() if now is None else now
+        if len(buckets) == 1:
+            key, capacity, rate = buckets[0]
+            allowed, tokens = self.consume(key, capacity, rate, cost, now)
+            return allowed, [tokens]
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            tokens = []
+            for key, capacity, rate in buckets:
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens.append(_refill(*(row or (capacity, now)), capacity, rate, now))
+            allowed = all(t >= cost for t in tokens)
+            if allowed:
+                tokens = [t - cost for t in tokens]
+            conn.executemany("""
+                INSERT INTO buckets (key, tokens, updated, allowed) VALUES (?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    tokens = excluded.tokens, updated = excluded.updated, allowed = excluded.allowed
+            """, [(key, t, now, int(allowed)) for (key, _, _), t in zip(buckets, tokens)])
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, tokens
+
+    def prune(self, older_than):
+        self._connection().execute("DELETE FROM buckets WHERE updated < ?", (older_than,))
+
+    def clear(self):
+        self._connection().execute("DELETE FROM buckets")
+
+
+def buckets_from_env(default_path):
+    if os.environ.get('RATE_LIMIT_STORAGE', 'sqlite').lower() == 'memory':
+        return MemoryBuckets()
+    return SQLiteBuckets(os.environ.get('RATE_LIMIT_DB', default_path))
+
+
+# ===========================
+# LIMITEUR
+# ===========================
+
+class RateLimiter:
+    """Applique les règles par utilisateur et par IP ; 429 + Retry-After au-delà"""
+
+    def __init__(self, buckets, rules=None, enabled=None):
+        self.buckets = buckets
+        self.rules = rules_from_env() if rules is None else rules
+        if enabled is None:
+            enabled = os.environ.get('RATE_LIMIT', 'on').lower() not in ('0', 'off', 'false', 'no')
+        self.enabled = enabled
+
+    def _buckets_for(self, rule_name):
+        """(clé, capacité, jetons par seconde) des seaux concernés par la requête courante"""
+        rule = self.rules[rule_name]
+        capacity, rate = rule['burst'], rule['per_minute'] / 60
+        keys = []
+        if current_user.is_authenticated:
+            keys.append((f"{rule_name}:user:{current_user.id}", capacity, rate))
+        keys.append((f"{rule_name}:ip:{request.remote_addr}", capacity * IP_FACTOR, rate * IP_FACTOR))
+        return keys
+
+    def check(self, rule_name):
+        """
+        Consomme un jeton dans chaque seau de la règle, si tous en ont un
+
+        Returns:
+            tuple: (autorisé, secondes avant le prochain jeton ou 0, portée refusée ou None)
+        """
+        if not self.enabled:
+            return True, 0, None
+        now = time.time()
+        try:
+            buckets = self._buckets_for(rule_name)
+            allowed, tokens = self.buckets.consume_all(buckets, now=now)
+            if not allowed:
+                # Portée refusée : le seau le plus long à recharger
+                retry_after, key = max((math.ceil((1 - t) / rate), key)
+                                       for (key, _, rate), t in zip(buckets, tokens) if t < 1)
+                return False, max(1, retry_after), key.split(':')[1]
+            if random.random() < 1 / PRUNE_EVERY:
+                self._prune(now)
+        except sqlite3.Error:
+            # Stockage indisponible (verrou, disque) : on laisse passer plutôt que de bloquer le site
+            logger.exception("Limiteur de débit indisponible")
+        return True, 0, None
+
+    def _prune(self, now):
+        # Un seau inactif plus longtemps que sa recharge complète est plein : inutile de le garder
+        slowest = min(rule['per_minute'] / 60 for rule in self.rules.values())
+        largest = max(rule['burst'] for rule in self.rules.values()) * IP_FACTOR
+        self.buckets.prune(now - largest / slowest)
+
+    def limit(self, rule_name):
+        """Décorateur de route (à placer sous @login_required)"""
+        if rule_name not in self.rules:
+            raise KeyError(f"Règle de limitation inconnue : {rule_name}")
+
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                allowed, retry_after, scope = self.check(rule_name)
+                if not allowed:
+                    count_rate_limited(rule_name, scope)
+                    logger.warning("Débit limité", extra={'rule': rule_name, 'scope': scope,
+                                                          'retry_after': retry_after})
+                    message = f"Trop de requêtes, réessayez dans {retry_after} s."
+                    response = jsonify({'success': False, 'error': message, 'message': message})
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(retry_after)
+                    return response
+                return f(*args, **kwargs)
+            return decorated_function
+        return decorator
@@ -41,20 +41,20 @@ if %errorlevel% neq 0 (
 echo      Dépendances installées avec succès
 echo.
 
-REM Initialiser la base de données
-echo [4/6] Initialisation de la base de données...
-python migrations\init_db.py
+REM Créer ou mettre à jour la base de données
+echo [4/6] Migrations de la base de données...
+python migrate.py
 if %errorlevel% neq 0 (
-    echo [ERREUR] Échec de l'initialisation de la base de données
+    echo [ERREUR] Échec des migrations de la base de données
     pause
     exit /b 1
 )
 echo.
 
-echo [5/6] Ajout de la géolocalisation...
-python migrations\add_geolocation.py
+echo [5/6] Vérification du schéma...
+python migrate.py status
 if %errorlevel% neq 0 (
-    echo [ERREUR] Échec de l'ajout de la géolocalisation
+    echo [ERREUR] Des migrations sont encore en attente
     pause
     exit /b 1
 )
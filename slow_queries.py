@@ -0,0 +1,241 @@
+"""
+Journal des requêtes SQL lentes pour Sport Connect
+Toute instruction au-delà du seuil (SLOW_QUERY_MS, 100 ms par défaut, 'off' pour
+désactiver) est enregistrée avec son SQL normalisé, la forme de ses paramètres et
+le plan EXPLAIN QUERY PLAN capturé au moment même, sur la même connexion.
+Les entrées sont regroupées par empreinte du SQL normalisé (propres au processus).
+"""
+
+from datetime import datetime
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+from flask import has_request_context, request
+
+import perf
+
+logger = logging.getLogger('sportconnect.sql')
+
+# Nombre maximal d'empreintes conservées (les moins coûteuses sont évincées)
+MAX_ENTRIES = 200
+# Nombre maximal de formes de paramètres et de routes gardées par empreinte
+MAX_VARIANTS = 10
+# Longueur maximale conservée pour un exemple de SQL brut
+SQL_EXAMPLE_CHARS = 2000
+
+# Instructions dont SQLite sait donner le plan
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def threshold_from_env():
+    """Seuil en secondes lu dans SLOW_QUERY_MS (None si désactivé)"""
+    value = os.environ.get('SLOW_QUERY_MS', '100').strip().lower()
+    if value in ('', 'off', 'false', 'no'):
+        return None
+    return max(0.0, float(value)) / 1000
+
+
+# ===========================
+# NORMALISATION
+# ===========================
+
+def normalize_sql(sql):
+    """
+    SQL sans littéraux ni espaces superflus, listes IN (?, ?, ...) repliées
+
+    Les requêtes construites dynamiquement (filtres enchaînés de index(),
+    update_place()) gardent une empreinte par combinaison de filtres.
+    """
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _SPACE_RE.sub(' ', sql).strip().rstrip(';')
+    return _IN_LIST_RE.sub('(?, ...)', sql)
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode('utf-8')).hexdigest()[:12]
+
+
+def parameter_shape(parameters):
+    """Types des paramètres liés, ex. '(int, str, None)' ou '{user_id: int}'"""
+    if parameters is None:
+        return '—'
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f"{key}: {_type_name(value)}" for key, value in parameters.items()) + '}'
+    return '(' + ', '.join(_type_name(value) for value in parameters) + ')'
+
+
+def _type_name(value):
+    return 'None' if value is None else type(value).__name__
+
+
+# ===========================
+# CAPTURE DU PLAN
+# ===========================
+
+def explain(connection, sql, parameters):
+    """
+    Plan d'exécution sous forme d'arbre indenté (comme le shell sqlite3)
+
+    Returns:
+        tuple: (lignes du plan, erreur ou None)
+    """
+    if not sql.lstrip()[:7].upper().startswith(EXPLAINABLE):
+        return [], None
+    try:
+        # Curseur non instrumenté : le plan ne doit pas être compté ni re-journalisé
+        cursor = connection.cursor(sqlite3.Cursor)
+        rows = cursor.execute('EXPLAIN QUERY PLAN ' + sql, parameters or ()).fetchall()
+        cursor.close()
+    except sqlite3.Error as e:
+        return [], str(e)
+
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node_id] + detail)
+    return lines, None
+
+
+def plan_warnings(plan):
+    """Parcours complets et tris temporaires repérés dans le plan"""
+    warnings = []
+    for line in plan:
+        detail = line.strip()
+        if detail.startswith('SCAN ') and 'USING' not in detail and 'CONSTANT ROW' not in detail:
+            warnings.append(detail)
+        elif detail.startswith('USE TEMP B-TREE'):
+            warnings.append(detail)
+    return warnings
+
+
+# ===========================
+# JOURNAL (REGROUPÉ PAR EMPREINTE)
+# ===========================
+
+class SlowQueryLog:
+    """Requêtes lentes regroupées par empreinte (propres au processus)"""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def record(self, connection, sql, parameters, duration):
+        """Observateur perf.slow_statement_hooks"""
+        normalized = normalize_sql(sql)
+        key = fingerprint(normalized)
+        shape = parameter_shape(parameters)
+        route = request.endpoint if has_request_context() else None
+        now = datetime.now()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            is_new = entry is None
+            needs_plan = is_new or duration > entry['max_s']
+        # EXPLAIN hors du verrou : il interroge SQLite
+        plan, plan_error = explain(connection, sql, parameters) if needs_plan else (None, None)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    cheapest = min(self._entries, key=lambda k: self._entries[k]['total_s'])
+                    del self._entries[cheapest]
+                entry = self._entries[key] = {
+                    'fingerprint': key,
+                    'sql': normalized,
+                    'example_sql': sql[:SQL_EXAMPLE_CHARS],
+                    'count': 0,
+                    'total_s': 0.0,
+                    'max_s': 0.0,
+                    'first_seen': now,
+                    'last_seen': now,
+                    'shapes': {},
+                    'routes': {},
+                    'plan': [],
+                    'plan_error': None,
+                    'plan_at': None,
+                }
+            entry['count'] += 1
+            entry['total_s'] += duration
+            entry['last_seen'] = now
+            if shape in entry['shapes'] or len(entry['shapes']) < MAX_VARIANTS:
+                entry['shapes'][shape] = entry['shapes'].get(shape, 0) + 1
+            if route and (route in entry['routes'] or len(entry['routes']) < MAX_VARIANTS):
+                entry['routes'][route] = entry['routes'].get(route, 0) + 1
+            if duration > entry['max_s']:
+                entry['max_s'] = duration
+                entry['example_sql'] = sql[:SQL_EXAMPLE_CHARS]
+                if plan is not None:
+                    entry['plan'] = plan
+                    entry['plan_error'] = plan_error
+                    entry['plan_at'] = now
+
+        if is_new:
+            logger.warning("Requête SQL lente", extra={
+                'fingerprint': key, 'sql_ms': round(duration * 1000, 1), 'sql': normalized[:200]})
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def summary(self):
+        """
+        Returns:
+            list: Une entrée par empreinte, triée par temps total décroissant
+        """
+        with self._lock:
+            entries = [dict(entry, shapes=dict(entry['shapes']), routes=dict(entry['routes']))
+                       for entry in self._entries.values()]
+        result = []
+        for entry in entries:
+            count = entry['count']
+            result.append({
+                'fingerprint': entry['fingerprint'],
+                'sql': entry['sql'],
+                'example_sql': entry['example_sql'],
+                'count': count,
+                'total_ms': round(entry['total_s'] * 1000, 1),
+                'mean_ms': round(entry['total_s'] * 1000 / count, 2),
+                'max_ms': round(entry['max_s'] * 1000, 2),
+                'first_seen': entry['first_seen'].isoformat(timespec='seconds'),
+                'last_seen': entry['last_seen'].isoformat(timespec='seconds'),
+                'shapes': sorted(entry['shapes'].items(), key=lambda item: -item[1]),
+                'routes': sorted(entry['routes'].items(), key=lambda item: -item[1]),
+                'plan': entry['plan'],
+                'plan_error': entry['plan_error'],
+                'plan_at': entry['plan_at'].isoformat(timespec='seconds') if entry['plan_at'] else None,
+                'plan_warnings': plan_warnings(entry['plan']),
+            })
+        result.sort(key=lambda item: item['total_ms'], reverse=True)
+        return result
+
+
+slow_query_log = SlowQueryLog()
+
+
+def set_threshold(seconds):
+    """Change le seuil de ce processus (None pour désactiver)"""
+    perf.slow_threshold = seconds
+
+
+def get_threshold():
+    return perf.slow_threshold
+
+
+def install(threshold=None):
+    """Branche le journal sur les connexions instrumentées (seuil : SLOW_QUERY_MS)"""
+    if slow_query_log.record not in perf.slow_statement_hooks:
+        perf.slow_statement_hooks.append(slow_query_log.record)
+    set_threshold(threshold_from_env() if threshold is None else threshold)
@@ -27,5 +27,13 @@ echo Appuyez sur Ctrl+C pour arrêter l'application
 echo ========================================
 echo.
 
+REM Appliquer les migrations en attente (sans effet si la base est à jour)
+python migrate.py >nul
+if %errorlevel% neq 0 (
+    echo [ERREUR] Échec des migrations : lancez python migrate.py pour le détail
+    pause
+    exit /b 1
+)
+
 REM Lancer l'application
 python app.py
@@ -0,0 +1,551 @@
+// Variable pour stocker l'activité sélectionnée et la carte
+let selectedActivity = null;
+let sidepanelMap = null;
+let mapMarker = null;
+
+// Fonction pour soumettre automatiquement le formulaire de filtre
+function autoSubmitFilter() {
+    document.getElementById('filter-form').submit();
+}
+
+// Fonction pour réinitialiser les filtres
+function resetFilters() {
+    window.location.href = PAGE_CONFIG.indexUrl;
+}
+
+// Fonction pour sélectionner une activité
+function selectActivity(id, sport, lieu, dateHeure, organizer, lat, lng, accessibilite, participants, transportStation, transportLines, userJoined, isOrganizer) {
+    // Mettre à jour l'état sélectionné
+    selectedActivity = { id, sport, lieu, dateHeure, organizer, lat, lng, accessibilite, participants, transportStation, transportLines, userJoined, isOrganizer };
+
+    // Mettre en surbrillance la carte sélectionnée
+    document.querySelectorAll('.activity-card').forEach(card => {
+        card.classList.remove('selected');
+    });
+    document.querySelector(`[data-event-id="${id}"]`).classList.add('selected');
+
+    // Mettre à jour les filtres du sidepanel
+    document.getElementById('sidepanel-sport').value = sport;
+    document.getElementById('sidepanel-lieu').value = lieu;
+
+    // Mettre à jour la carte
+    updateSidepanelMap(lat, lng, lieu, sport);
+
+    // Mettre à jour les détails
+    updateSidepanelDetails(sport, lieu, dateHeure, organizer, accessibilite, participants, id, transportStation, transportLines);
+}
+
+// Fonction pour mettre à jour la carte du sidepanel
+function updateSidepanelMap(lat, lng, lieu, sport) {
+    const mapContainer = document.getElementById('sidepanel-map');
+
+    if (lat && lng) {
+        // Supprimer le placeholder
+        mapContainer.innerHTML = '<div id="leaflet-map" style="height: 200px; width: 100%; border-radius: 8px;"></div>';
+
+        // Initialiser ou mettre à jour la carte
+        if (sidepanelMap) {
+            sidepanelMap.remove();
+        }
+
+        sidepanelMap = L.map('leaflet-map').setView([lat, lng], 15);
+        L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+            attribution: '© OpenStreetMap'
+        }).addTo(sidepanelMap);
+
+        // Ajouter un marqueur
+        mapMarker = L.marker([lat, lng]).addTo(sidepanelMap)
+            .bindPopup(`<b>${sport}</b><br>${lieu}`)
+            .openPopup();
+    } else {
+        mapContainer.innerHTML = '<div class="map-placeholder"><p>📍 Pas de géolocalisation disponible pour cette activité</p></div>';
+    }
+}
+
+// Fonction pour mettre à jour les détails du sidepanel
+function updateSidepanelDetails(sport, lieu, dateHeure, organizer, accessibilite, participants, eventId, transportStation, transportLines) {
+    const detailsContainer = document.getElementById('sidepanel-details');
+
+    let accessBadge = '';
+    if (accessibilite && accessibilite !== '') {
+        accessBadge = '<span class="detail-badge-pmr">♿ Accessible PMR</span>';
+    }
+
+    // Générer les badges de transport
+    let transportHTML = '';
+    if (transportStation && transportStation !== '') {
+        transportHTML += `<div class="detail-transport">
+            <p class="transport-station-label">🚇 <strong>${transportStation}</strong></p>`;
+
+        if (transportLines && transportLines !== '') {
+            transportHTML += '<div class="transport-lines">';
+            const lines = transportLines.split(',').map(l => l.trim());
+            lines.forEach(line => {
+                const lineClass = getLineClass(line);
+                transportHTML += `<span class="line-badge ${lineClass}">${line}</span>`;
+            });
+            transportHTML += '</div>';
+        }
+        transportHTML += '</div>';
+    }
+
+    detailsContainer.innerHTML = `
+        <div class="detail-card">
+            <h6 class="detail-title">${sport}</h6>
+            <p class="detail-lieu">📍 ${lieu}</p>
+            <p class="detail-date">🕒 ${dateHeure}</p>
+            <p class="detail-organizer">👤 Organisé par ${organizer}</p>
+            <p class="detail-participants">👥 ${participants} participant(s)</p>
+            <div class="detail-badges">
+                ${accessBadge}
+            </div>
+            ${transportHTML}
+        </div>
+    `;
+}
+
+// Fonction pour obtenir la classe CSS selon la ligne de transport
+function getLineClass(line) {
+    line = line.toUpperCase().trim();
+
+    // Lignes de métro
+    if (line.startsWith('M') || /^[0-9]+$/.test(line)) {
+        const num = line.replace('M', '');
+        return `line-metro line-m${num}`;
+    }
+    // RER
+    if (line.startsWith('RER')) {
+        const letter = line.replace('RER', '').replace(' ', '');
+        return `line-rer line-rer-${letter.toLowerCase()}`;
+    }
+    // Tramway
+    if (line.startsWith('T')) {
+        return 'line-tram';
+    }
+    // Bus
+    if (line.startsWith('BUS') || /^[0-9]{2,3}$/.test(line)) {
+        return 'line-bus';
+    }
+    return 'line-default';
+}
+
+// ===========================
+// CHAT FUNCTIONALITY
+// ===========================
+
+let currentChatEventId = null;
+let chatPollingInterval = null;
+let lastMessageId = 0;
+let unreadMessages = {};  // Stocke les messages non lus par event_id
+let lastCheckedMessages = {};  // Dernier message vérifié par event
+let notificationPollingInterval = null;
+
+// Liste des événements auxquels l'utilisateur participe
+const joinedEventIds = PAGE_CONFIG.joinedEventIds;
+
+// Ouvrir le chat
+function openChat() {
+    if (!selectedActivity) return;
+    openChatForEvent(selectedActivity.id, selectedActivity.sport);
+}
+
+// Ouvrir le chat pour un événement spécifique
+function openChatForEvent(eventId, sportName) {
+    currentChatEventId = eventId;
+    lastMessageId = 0;
+
+    document.getElementById('sidepanel-map-view').style.display = 'none';
+    document.getElementById('sidepanel-chat-view').style.display = 'block';
+    document.getElementById('chat-event-name').textContent = '- ' + sportName;
+
+    // Réinitialiser les notifications pour cet événement
+    resetNotifications(eventId);
+
+    // Charger les messages
+    loadMessages();
+
+    // Démarrer le polling
+    if (chatPollingInterval) clearInterval(chatPollingInterval);
+    chatPollingInterval = setInterval(pollMessages, 3000);
+}
+
+// Fermer le chat
+function closeChat() {
+    document.getElementById('sidepanel-map-view').style.display = 'block';
+    document.getElementById('sidepanel-chat-view').style.display = 'none';
+
+    // Arrêter le polling
+    if (chatPollingInterval) {
+        clearInterval(chatPollingInterval);
+        chatPollingInterval = null;
+    }
+
+    currentChatEventId = null;
+}
+
+// Charger les messages
+function loadMessages() {
+    if (!currentChatEventId) return;
+
+    fetch(`/api/event/${currentChatEventId}/messages`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.messages) {
+                renderMessages(data.messages, false);
+                if (data.messages.length > 0) {
+                    lastMessageId = data.messages[data.messages.length - 1].id;
+                    lastCheckedMessages[currentChatEventId] = lastMessageId;
+                }
+            }
+        })
+        .catch(err => console.error('Erreur chargement messages:', err));
+}
+
+// Polling pour nouveaux messages
+function pollMessages() {
+    if (!currentChatEventId) return;
+
+    fetch(`/api/event/${currentChatEventId}/messages?since=${lastMessageId}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.messages && data.messages.length > 0) {
+                renderMessages(data.messages, true);
+                lastMessageId = data.messages[data.messages.length - 1].id;
+                lastCheckedMessages[currentChatEventId] = lastMessageId;
+
+                // Notification pour messages des autres
+                const newFromOthers = data.messages.filter(m => !m.is_mine);
+                if (newFromOthers.length > 0) {
+                    playNotificationSound();
+                }
+            }
+        })
+        .catch(err => console.error('Erreur polling:', err));
+}
+
+// Afficher les messages
+function renderMessages(messages, append) {
+    const container = document.getElementById('chat-messages');
+
+    if (!append) {
+        container.innerHTML = '';
+    }
+
+    if (messages.length === 0 && !append) {
+        container.innerHTML = '<div class="chat-empty"><p>Aucun message pour le moment.<br>Soyez le premier à écrire !</p></div>';
+        return;
+    }
+
+    // Supprimer le message vide si présent
+    const emptyMsg = container.querySelector('.chat-empty');
+    if (emptyMsg) emptyMsg.remove();
+
+    messages.forEach(msg => {
+        const msgDiv = document.createElement('div');
+        msgDiv.className = `chat-message ${msg.is_mine ? 'chat-message-mine' : 'chat-message-other'}`;
+
+        const initials = msg.username.substring(0, 2).toUpperCase();
+
+        msgDiv.innerHTML = `
+            ${!msg.is_mine ? `<div class="chat-avatar" style="background-color: ${msg.avatar_color}">${initials}</div>` : ''}
+            <div class="chat-bubble">
+                ${!msg.is_mine ? `<div class="chat-username">${msg.username}</div>` : ''}
+                <div class="chat-content">${escapeHtml(msg.content)}</div>
+            </div>
+            ${msg.is_mine ? `<div class="chat-avatar" style="background-color: ${msg.avatar_color}">${initials}</div>` : ''}
+        `;
+
+        container.appendChild(msgDiv);
+    });
+
+    // Scroll en bas
+    container.scrollTop = container.scrollHeight;
+}
+
+// Envoyer un message
+function sendMessage(e) {
+    e.preventDefault();
+
+    const input = document.getElementById('chat-input');
+    const content = input.value.trim();
+
+    if (!content || !currentChatEventId) return;
+
+    fetch(`/api/event/${currentChatEventId}/messages`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ content: content })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            renderMessages([data.message], true);
+            lastMessageId = data.message.id;
+            input.value = '';
+        }
+    })
+    .catch(err => console.error('Erreur envoi:', err));
+}
+
+// Jouer le son de notification avec Web Audio API
+function playNotificationSound() {
+    try {
+        const audioContext = new (window.AudioContext || window.webkitAudioContext)();
+        const oscillator = audioContext.createOscillator();
+        const gainNode = audioContext.createGain();
+
+        oscillator.connect(gainNode);
+        gainNode.connect(audioContext.destination);
+
+        oscillator.frequency.value = 800;
+        oscillator.type = 'sine';
+        gainNode.gain.value = 0.3;
+
+        oscillator.start();
+        gainNode.gain.exponentialRampToValueAtTime(0.01, audioContext.currentTime + 0.3);
+        oscillator.stop(audioContext.currentTime + 0.3);
+    } catch (e) {
+        console.log('Audio notification not supported');
+    }
+
+    // Flash visuel sur l'en-tête du chat
+    const chatHeader = document.querySelector('#sidepanel-chat-view .sidepanel-header');
+    if (chatHeader) {
+        chatHeader.classList.add('chat-notification-flash');
+        setTimeout(() => chatHeader.classList.remove('chat-notification-flash'), 500);
+    }
+}
+
+
+// Échapper le HTML
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
+// Mettre à jour le badge de notification sur une carte
+function updateNotificationBadge(eventId, count) {
+    const badge = document.getElementById('notif-' + eventId);
+    if (badge) {
+        if (count > 0) {
+            badge.querySelector('.notif-count').textContent = count > 99 ? '99+' : count;
+            badge.classList.add('visible');
+        } else {
+            badge.classList.remove('visible');
+        }
+    }
+}
+
+// Vérifier les nouveaux messages pour tous les événements rejoints
+function checkAllNotifications() {
+    joinedEventIds.forEach(eventId => {
+        // Ne pas vérifier si le chat est ouvert pour cet événement
+        if (currentChatEventId === eventId) return;
+
+        // Attendre que l'initialisation soit terminée pour cet événement
+        if (!(eventId in lastCheckedMessages)) return;
+
+        const sinceId = lastCheckedMessages[eventId] || 0;
+
+        fetch(`/api/event/${eventId}/messages?since=${sinceId}`)
+            .then(response => response.json())
+            .then(data => {
+                if (data.messages && data.messages.length > 0) {
+                    // Mettre à jour le dernier message vérifié
+                    lastCheckedMessages[eventId] = data.messages[data.messages.length - 1].id;
+
+                    // Compter les nouveaux messages des autres
+                    const newFromOthers = data.messages.filter(m => !m.is_mine);
+                    if (newFromOthers.length > 0) {
+                        // Incrémenter les messages non lus
+                        unreadMessages[eventId] = (unreadMessages[eventId] || 0) + newFromOthers.length;
+                        updateNotificationBadge(eventId, unreadMessages[eventId]);
+
+                        // Notification sonore
+                        playNotificationSound();
+                    }
+                }
+            })
+            .catch(err => console.error('Erreur notification:', err));
+    });
+}
+
+// Réinitialiser les notifications quand on ouvre le chat
+function resetNotifications(eventId) {
+    unreadMessages[eventId] = 0;
+    updateNotificationBadge(eventId, 0);
+}
+
+// Initialiser la carte et les notifications
+document.addEventListener('DOMContentLoaded', function() {
+    // Vérifier si on arrive depuis le calendrier avec un highlight
+    const urlParams = new URLSearchParams(window.location.search);
+    const highlightId = urlParams.get('highlight');
+
+    if (highlightId) {
+        const targetCard = document.querySelector(`.activity-card[data-event-id="${highlightId}"]`);
+        if (targetCard) {
+            // Scroll vers la carte avec animation
+            targetCard.scrollIntoView({ behavior: 'smooth', block: 'center' });
+            // Animation de mise en surbrillance
+            targetCard.classList.add('highlight-from-calendar');
+            // Cliquer pour sélectionner (met à jour le sidepanel)
+            targetCard.click();
+            // Retirer l'animation après 3s
+            setTimeout(function() {
+                targetCard.classList.remove('highlight-from-calendar');
+            }, 3000);
+            // Nettoyer l'URL
+            window.history.replaceState({}, document.title, window.location.pathname);
+        } else {
+            // Événement non trouvé, comportement par défaut
+            const firstGeoCard = document.querySelector('.activity-card[data-event-id]');
+            if (firstGeoCard) {
+                firstGeoCard.click();
+            }
+        }
+    } else {
+        // Comportement par défaut : sélectionner la première activité
+        const firstGeoCard = document.querySelector('.activity-card[data-event-id]');
+        if (firstGeoCard) {
+            firstGeoCard.click();
+        }
+    }
+
+    // Démarrer le polling des notifications pour les événements rejoints
+    if (joinedEventIds.length > 0) {
+        console.log('Événements rejoints:', joinedEventIds);
+
+        // Initialiser les derniers messages vérifiés avant de démarrer le polling
+        const initPromises = joinedEventIds.map(eventId =>
+            fetch(`/api/event/${eventId}/messages`)
+                .then(response => response.json())
+                .then(data => {
+                    if (data.messages && data.messages.length > 0) {
+                        lastCheckedMessages[eventId] = data.messages[data.messages.length - 1].id;
+                    } else {
+                        lastCheckedMessages[eventId] = 0;
+                    }
+                })
+                .catch(err => {
+                    console.error('Erreur fetch messages:', err);
+                    lastCheckedMessages[eventId] = 0;
+                })
+        );
+
+        // Démarrer le polling seulement après l'initialisation
+        Promise.all(initPromises).then(() => {
+            notificationPollingInterval = setInterval(checkAllNotifications, 5000);
+        });
+    }
+});
+
+// Fonction de test pour afficher un badge (à utiliser dans la console)
+function testNotification(eventId) {
+    updateNotificationBadge(eventId, 3);
+}
+
+// ===========================
+// CŒURS FAVORIS — clé partagée avec le coach
+// ===========================
+const FAV_KEY = 'favoriteSports_' + PAGE_CONFIG.userId;
+let favoriteSports = JSON.parse(localStorage.getItem(FAV_KEY) || '[]');
+
+function toggleCardFavorite(sportName) {
+    const idx = favoriteSports.indexOf(sportName);
+    if (idx >= 0) {
+        favoriteSports.splice(idx, 1);
+    } else {
+        favoriteSports.unshift(sportName);
+    }
+    localStorage.setItem(FAV_KEY, JSON.stringify(favoriteSports));
+    refreshAllHearts();
+    reorderCards();
+}
+
+function refreshAllHearts() {
+    document.querySelectorAll('.activity-card').forEach(card => {
+        const sport = card.dataset.sport;
+        const btn = card.querySelector('.card-heart-btn');
+        if (!btn) return;
+        const isFav = favoriteSports.includes(sport);
+        btn.innerHTML = isFav ? '&#9829;' : '&#9825;';
+        btn.classList.toggle('heart-active', isFav);
+    });
+}
+
+function reorderCards() {
+    const grid = document.querySelector('.activities-grid');
+    if (!grid) return;
+    const cards = Array.from(grid.querySelectorAll('.activity-card'));
+    const favCards = cards.filter(c => favoriteSports.includes(c.dataset.sport));
+    const otherCards = cards.filter(c => !favoriteSports.includes(c.dataset.sport));
+    favCards.sort((a, b) =>
+        favoriteSports.indexOf(a.dataset.sport) -
+        favoriteSports.indexOf(b.dataset.sport)
+    );
+    [...favCards, ...otherCards].forEach(card => grid.appendChild(card));
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    refreshAllHearts();
+    reorderCards();
+});
+
+// ===========================
+// SYNCHRONISATION INCRÉMENTALE
+// ===========================
+// Seuls les événements modifiés depuis syncVersion sont renvoyés par le serveur
+let syncVersion = PAGE_CONFIG.syncVersion;
+
+function syncEvents() {
+    if (document.hidden) return;
+
+    const params = new URLSearchParams(window.location.search);
+    params.delete('highlight');
+    params.set('since', syncVersion);
+    params.set('cards', '1');
+
+    fetch(`/api/events/changes?${params}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.reset) {
+                location.reload();
+                return;
+            }
+            const grid = document.querySelector('.activities-grid');
+            if (!grid) return;
+
+            data.deleted.forEach(id => {
+                const card = grid.querySelector(`.activity-card[data-event-id="${id}"]`);
+                if (card) card.remove();
+            });
+
+            data.events.forEach(item => {
+                const tpl = document.createElement('template');
+                tpl.innerHTML = item.html.trim();
+                const newCard = tpl.content.firstElementChild;
+                const oldCard = grid.querySelector(`.activity-card[data-event-id="${item.event.id}"]`);
+                if (oldCard) {
+                    if (oldCard.classList.contains('selected')) newCard.classList.add('selected');
+                    oldCard.replaceWith(newCard);
+                } else {
+                    const emptyState = grid.querySelector('.empty-state');
+                    if (emptyState) emptyState.remove();
+                    grid.insertBefore(newCard, grid.firstChild);
+                }
+            });
+
+            if (data.events.length > 0 || data.deleted.length > 0) {
+                refreshAllHearts();
+                reorderCards();
+            }
+            syncVersion = data.version;
+        })
+        .catch(err => console.error('Erreur synchronisation:', err));
+}
+
+setInterval(syncEvents, 15000);
@@ -0,0 +1,214 @@
+// Données des événements (transmises depuis Flask)
+const eventsData = PAGE_CONFIG.events;
+
+// Initialiser la carte centrée sur Paris par défaut
+let map = L.map('map').setView([48.8566, 2.3522], 12);
+
+// Ajouter le fond de carte OpenStreetMap
+L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+    attribution: '© OpenStreetMap contributors',
+    maxZoom: 18
+}).addTo(map);
+
+// Stocker tous les marqueurs pour le filtrage
+let markers = [];
+let userMarker = null;
+
+// Icônes personnalisées
+const iconAvailable = L.divIcon({
+    className: 'custom-marker',
+    html: '<div style="background-color: #667eea; width: 30px; height: 30px; border-radius: 50%; border: 3px solid white; box-shadow: 0 2px 5px rgba(0,0,0,0.3);"></div>',
+    iconSize: [30, 30],
+    iconAnchor: [15, 15]
+});
+
+const iconJoined = L.divIcon({
+    className: 'custom-marker',
+    html: '<div style="background-color: #28a745; width: 30px; height: 30px; border-radius: 50%; border: 3px solid white; box-shadow: 0 2px 5px rgba(0,0,0,0.3);"></div>',
+    iconSize: [30, 30],
+    iconAnchor: [15, 15]
+});
+
+const iconOrganizer = L.divIcon({
+    className: 'custom-marker',
+    html: '<div style="background-color: #ffc107; width: 30px; height: 30px; border-radius: 50%; border: 3px solid white; box-shadow: 0 2px 5px rgba(0,0,0,0.3);"></div>',
+    iconSize: [30, 30],
+    iconAnchor: [15, 15]
+});
+
+// Marqueurs indexés par id d'événement (mise à jour incrémentale)
+let markersById = {};
+
+// Créer le marqueur d'un événement
+function addEventMarker(item) {
+    if (item.event.latitude && item.event.longitude) {
+        // Choisir l'icône selon le statut
+        let icon = iconAvailable;
+        if (item.is_organizer) {
+            icon = iconOrganizer;
+        } else if (item.user_joined) {
+            icon = iconJoined;
+        }
+
+        // Créer le popup avec les infos
+        const popupContent = `
+            <div style="min-width: 200px;">
+                <h6 style="margin-bottom: 10px; color: #667eea;">${item.event.sport}</h6>
+                <p style="margin: 5px 0; font-size: 13px;">
+                    <strong>📍 Lieu:</strong> ${item.event.lieu}<br>
+                    <strong>🕒 Quand:</strong> ${item.event.date_heure}<br>
+                    <strong>👤 Organisateur:</strong> ${item.organizer_name}<br>
+                    <strong>📊 Niveau:</strong> <span class="badge bg-info">${item.event.niveau}</span><br>
+                    <strong>👥 Participants:</strong> ${item.participant_count}
+                </p>
+                ${item.event.accessibilite ? '<p style="margin: 5px 0;"><span class="badge bg-success">♿ Accessible PMR</span></p>' : ''}
+                ${item.user_joined ? '<p style="margin: 5px 0;"><span class="badge bg-success">✓ Vous participez</span></p>' : ''}
+                <a href="/" class="btn btn-sm btn-primary mt-2" style="width: 100%;">Voir les détails</a>
+            </div>
+        `;
+
+        const marker = L.marker([item.event.latitude, item.event.longitude], {icon: icon})
+            .bindPopup(popupContent)
+            .addTo(map);
+
+        // Stocker les infos pour le filtrage
+        marker.eventData = item;
+        markers.push(marker);
+        markersById[item.event.id] = marker;
+    }
+}
+
+// Retirer le marqueur d'un événement
+function removeEventMarker(eventId) {
+    const marker = markersById[eventId];
+    if (!marker) return;
+    map.removeLayer(marker);
+    markers = markers.filter(m => m !== marker);
+    delete markersById[eventId];
+}
+
+// Ajouter les marqueurs d'événements
+eventsData.forEach(addEventMarker);
+
+// Ajuster la vue pour montrer tous les marqueurs
+if (markers.length > 0) {
+    const group = new L.featureGroup(markers);
+    map.fitBounds(group.getBounds().pad(0.1));
+}
+
+// Fonction de filtrage
+function filterMapMarkers() {
+    const sportFilter = document.getElementById('map-filter-sport').value;
+    const niveauFilter = document.getElementById('map-filter-niveau').value;
+
+    let visibleCount = 0;
+
+    markers.forEach(marker => {
+        const event = marker.eventData.event;
+        let show = true;
+
+        if (sportFilter && event.sport !== sportFilter) {
+            show = false;
+        }
+
+        if (niveauFilter && event.niveau !== niveauFilter) {
+            show = false;
+        }
+
+        if (show) {
+            marker.addTo(map);
+            visibleCount++;
+        } else {
+            map.removeLayer(marker);
+        }
+    });
+
+    // Mettre à jour le compteur
+    document.getElementById('marker-count').innerText = visibleCount;
+}
+
+// Fonction de géolocalisation
+function centerOnUser() {
+    if (navigator.geolocation) {
+        navigator.geolocation.getCurrentPosition(
+            position => {
+                const lat = position.coords.latitude;
+                const lng = position.coords.longitude;
+
+                // Centrer la carte
+                map.setView([lat, lng], 14);
+
+                // Ajouter/mettre à jour le marqueur utilisateur
+                if (userMarker) {
+                    map.removeLayer(userMarker);
+                }
+
+                const userIcon = L.divIcon({
+                    className: 'custom-marker',
+                    html: '<div style="background-color: #dc3545; width: 20px; height: 20px; border-radius: 50%; border: 3px solid white; box-shadow: 0 2px 5px rgba(0,0,0,0.3);"></div>',
+                    iconSize: [20, 20],
+                    iconAnchor: [10, 10]
+                });
+
+                userMarker = L.marker([lat, lng], {icon: userIcon})
+                    .bindPopup('<strong>📍 Vous êtes ici</strong>')
+                    .addTo(map);
+
+                showAlert('Position obtenue avec succès !', 'success');
+            },
+            error => {
+                showAlert('Impossible d\'obtenir votre position.', 'warning');
+            }
+        );
+    } else {
+        showAlert('La géolocalisation n\'est pas supportée par votre navigateur.', 'danger');
+    }
+}
+
+// Synchronisation incrémentale : seuls les événements modifiés sont renvoyés
+let syncVersion = PAGE_CONFIG.syncVersion;
+
+function syncMarkers() {
+    if (document.hidden) return;
+
+    fetch(`/api/events/changes?since=${syncVersion}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.reset) {
+                location.reload();
+                return;
+            }
+            data.deleted.forEach(removeEventMarker);
+            data.events.forEach(item => {
+                removeEventMarker(item.event.id);
+                addEventMarker(item);
+            });
+            if (data.events.length > 0 || data.deleted.length > 0) {
+                filterMapMarkers();
+            }
+            syncVersion = data.version;
+        })
+        .catch(err => console.error('Erreur synchronisation:', err));
+}
+
+setInterval(syncMarkers, 15000);
+
+// Fonction helper pour les alertes (réutilise celle de main.js)
+function showAlert(message, type) {
+    const alertDiv = document.createElement('div');
+    alertDiv.className = `alert alert-${type} alert-dismissible fade show`;
+    alertDiv.role = 'alert';
+    alertDiv.innerHTML = `
+        ${message}
+        <button type="button" class="btn-close" data-bs-dismiss="alert" aria-label="Close"></button>
+    `;
+
+    const container = document.querySelector('.container');
+    if (container) {
+        container.insertBefore(alertDiv, container.firstChild);
+        setTimeout(() => {
+            alertDiv.classList.remove('show');
+            setTimeout(() => alertDiv.remove(), 150);
+        }, 3000);
+    }
+}
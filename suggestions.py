@@ -0,0 +1,89 @@
+"""
+Suggestions d'activités du chatbot Sporty
+Repère les sports, jours et niveaux cités dans la conversation puis
+score les activités disponibles pour proposer les plus pertinentes
+"""
+
+ALL_SPORTS = [
+    'Running', 'Tennis', 'Yoga', 'Football', 'Natation', 'Basketball', 'Cyclisme',
+    'Roller', 'Volley-ball', 'Danse', 'Judo', 'Karaté', 'Capoeira', 'Ping-pong',
+    'Patinage', 'Taekwondo', 'Kendo', 'Handball', 'Gymnastique', 'Escrime', 'Skate',
+    'Voile', 'Escalade', 'Rugby', 'Badminton', 'Multijeux', 'Ultimate',
+    'Boxe', 'MMA', 'Parkour', 'Hockey', 'Saut à la perche', 'Bowling',
+    "Tir à l'arc", 'Golf', 'Ski'
+]
+JOURS_CLES = ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche',
+              'week-end', 'weekend', 'matin', 'après-midi', 'soir']
+NIVEAUX_CLES = ['débutant', 'debutant', 'intermédiaire', 'intermediaire', 'expert', 'confirmé']
+
+
+def extract_keywords(history, user_message):
+    """
+    Mots-clés cités dans les 10 derniers messages et le message courant
+
+    Returns:
+        tuple: (sports, jours, niveaux) mentionnés
+    """
+    recent_text = " ".join(
+        [m.get("content", "") for m in history[-10:]] + [user_message]
+    ).lower()
+
+    sports_mentionnes = [s for s in ALL_SPORTS if s.lower() in recent_text]
+    jours_mentionnes = [j for j in JOURS_CLES if j in recent_text]
+    niveaux_mentionnes = [n for n in NIVEAUX_CLES if n in recent_text]
+    return sports_mentionnes, jours_mentionnes, niveaux_mentionnes
+
+
+def score_event(ev, sports_mentionnes, jours_mentionnes, niveaux_mentionnes):
+    """Score de pertinence d'une activité (0 = non pertinente)"""
+    score = 0
+    ev_sport = (ev['sport'] or '').lower()
+    ev_date = (ev['date_heure'] or '').lower()
+    ev_niveau = (ev['niveau'] or '').lower()
+
+    # Correspondance sport (priorité haute)
+    if sports_mentionnes and any(s.lower() == ev_sport for s in sports_mentionnes):
+        score += 10
+    elif not sports_mentionnes:
+        score += 1  # pas encore de filtre sport → inclure tous
+
+    # Correspondance jour/créneau
+    score += sum(2 for j in jours_mentionnes if j in ev_date)
+
+    # Correspondance niveau
+    score += sum(3 for n in niveaux_mentionnes if n in ev_niveau)
+
+    return score
+
+
+def suggest_events(available_events, history, user_message, limit=3):
+    """
+    Activités disponibles les plus pertinentes pour la conversation
+
+    Args:
+        available_events: Lignes (id, sport, niveau, lieu, date_heure, organisateur)
+        history (list): Messages précédents {'role', 'content'}
+        user_message (str): Message courant
+        limit (int): Nombre maximal de suggestions
+
+    Returns:
+        list: Activités (dict) triées par score décroissant, score > 0
+    """
+    keywords = extract_keywords(history, user_message)
+
+    scored = [(score_event(ev, *keywords), dict(ev)) for ev in available_events]
+
+    # Trier par score décroissant, garder les meilleurs
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [
+        {
+            'id': ev['id'],
+            'sport': ev['sport'] or '',
+            'niveau': ev['niveau'] or '',
+            'lieu': ev['lieu'] or '',
+            'date_heure': ev['date_heure'] or '',
+            'organisateur': ev['organisateur'] or 'Anonyme'
+        }
+        for score, ev in scored[:limit]
+        if score > 0
+    ]
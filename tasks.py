@@ -0,0 +1,101 @@
+"""
+Tâches en arrière-plan de Sport Connect (file jobs.py)
+Importer ce module enregistre les tâches (@job_queue.task) : c'est ce que fait
+le processus dédié (python jobs.py), sans charger l'application web.
+
+Dans l'application, create_app() branche start_worker sur chaque requête
+(JOBS_WORKER=thread) ; les vues mettent les tâches en file par fonction.delay(...).
+"""
+
+import atexit
+import json
+import os
+import threading
+
+import backup
+from db import connect_db
+from extensions import DATABASE_PATH, DERIVED_FOLDER, db_writer
+from jobs import JobQueue, Worker
+import maintenance
+from models import set_setting
+import notifications
+
+job_queue = JobQueue(DATABASE_PATH)
+
+# 'thread' : un worker par processus web, démarré à la première requête ;
+# 'off' : les tâches sont consommées par un processus dédié (python jobs.py)
+JOBS_WORKER = os.environ.get('JOBS_WORKER', 'thread').lower()
+# Attente maximale de la tâche en cours à l'arrêt du processus (s)
+JOBS_SHUTDOWN_SECONDS = float(os.environ.get('JOBS_SHUTDOWN_SECONDS', 10))
+
+jobs_worker = None
+_jobs_worker_lock = threading.Lock()
+
+
+def start_worker():
+    """Démarre (ou redémarre après un fork) le worker de tâches de ce processus"""
+    global jobs_worker
+    if JOBS_WORKER != 'thread' or (jobs_worker is not None and jobs_worker.is_alive()):
+        return
+    with _jobs_worker_lock:
+        if jobs_worker is None or not jobs_worker.is_alive():
+            jobs_worker = Worker(job_queue)
+            jobs_worker.start()
+
+
+@atexit.register
+def stop_worker():
+    """Arrêt propre : la tâche en cours se termine (ou sera reprise à l'expiration de son bail)"""
+    if jobs_worker is not None:
+        jobs_worker.stop(JOBS_SHUTDOWN_SECONDS)
+
+
+# ===========================
+# TÂCHES
+# ===========================
+
+@job_queue.task(max_attempts=2)
+def process_uploaded_image(src_path, kind, base_name, setting_key, url_prefix, variant):
+    """Génère les dérivés d'un upload puis bascule le réglage sur la variante choisie"""
+    from images import generate_derivatives
+
+    filenames = generate_derivatives(src_path, kind, base_name, DERIVED_FOLDER)
+    set_setting(setting_key, url_prefix + filenames[variant])
+    # L'original n'est supprimé qu'une fois traité : une nouvelle tentative le retrouve
+    os.remove(src_path)
+
+
+@job_queue.task(max_attempts=2, every=backup.INTERVAL_SECONDS or None)
+def backup_database():
+    """Sauvegarde compressée de la base et rotation (programmée si BACKUP_INTERVAL_HOURS > 0)"""
+    backup.create_backup(DATABASE_PATH)
+
+
+@job_queue.task(every=maintenance.INTERVAL_SECONDS or None)
+def maintain_database(force=False):
+    """Checkpoint, ANALYZE borné et vacuum incrémental ; compte rendu gardé dans les réglages"""
+    report = maintenance.run_maintenance(DATABASE_PATH, db_writer, force=force)
+    set_setting('maintenance_last_run', json.dumps(report))
+    return report
+
+
+def note_batch_changes(count):
+    """Lignes modifiées par un traitement de masse : passage de maintenance anticipé au-delà du seuil"""
+    if maintenance.note_changes(count):
+        job_queue.enqueue_once('maintain_database', advance=True)
+
+
+@job_queue.task()
+def cleanup_deleted_user(user_id):
+    """Supprime les participations et notifications, annule les activités organisées d'un compte supprimé"""
+    conn = connect_db(DATABASE_PATH)
+    c = conn.cursor()
+    c.execute("DELETE FROM participations WHERE user_id = ?", (user_id,))
+    changes = c.rowcount
+    changes += notifications.delete_for_user(conn, user_id)
+    # Annuler les événements organisés (plutôt que supprimer)
+    c.execute("UPDATE events SET is_cancelled = 1 WHERE organizer_id = ?", (user_id,))
+    changes += c.rowcount
+    conn.commit()
+    conn.close()
+    note_batch_changes(changes)
@@ -0,0 +1,73 @@
+"""
+Préchauffage de Sport Connect avant de servir (wsgi.py, gunicorn.conf.py)
+
+Sans préchauffage, la première requête de chaque worker paie ce que les
+suivantes trouvent prêt : compilation des templates Jinja, automate des routes,
+modules importés à la demande (calendrier, chatbot), cartes d'activité rendues.
+
+- warm_up(app) : une fois, dans le maître gunicorn (preload_app) ; les workers
+  en héritent par fork, en mémoire partagée tant qu'elle n'est pas modifiée ;
+- warm_worker() : dans chaque worker juste après le fork, ce qui ne se partage
+  pas : thread de l'écrivain unique et sa connexion SQLite, worker de tâches.
+
+Les réglages (logo, images des sports) et les lieux sont relus dans SQLite à
+chaque requête : il n'y a pas de cache de processus à remplir pour eux.
+
+Variable d'environnement : WARMUP_CARDS (200 cartes les plus récentes, 0 pour désactiver)
+"""
+
+import importlib
+import logging
+import os
+import time
+
+from blueprints.events import warm_card_cache
+from extensions import db_writer
+import tasks
+
+logger = logging.getLogger('sportconnect.warmup')
+
+WARMUP_CARDS = int(os.environ.get('WARMUP_CARDS', 200))
+
+# Importés à la demande (démarrage rapide), mais utilisés par les pages de tous les
+# utilisateurs : dans le maître, l'import est payé une fois pour tous les workers
+PRELOAD_MODULES = ('calendar', 'dates', 'suggestions', 'llm')
+
+
+def warm_up(app):
+    """
+    Prépare l'application avant la première requête (aucun thread démarré)
+
+    Returns:
+        dict: Durée de chaque étape (ms) et volumes préparés
+    """
+    report = {}
+
+    started = time.perf_counter()
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
+    report['modules_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+    # Templates compilés et gardés dans le cache de l'environnement Jinja
+    started = time.perf_counter()
+    names = app.jinja_env.list_templates()
+    for name in names:
+        app.jinja_env.get_template(name)
+    report['templates'] = len(names)
+    report['templates_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+    # Le contexte de requête construit l'automate des routes (url_map) ; les cartes
+    # y sont rendues comme par index(), avec la même clé de cache
+    started = time.perf_counter()
+    with app.test_request_context('/'):
+        report['cards'] = warm_card_cache(WARMUP_CARDS) if WARMUP_CARDS > 0 else 0
+    report['cards_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+    logger.info("Préchauffage terminé", extra=report)
+    return report
+
+
+def warm_worker():
+    """Après le fork : threads et connexions propres au worker, avant sa première requête"""
+    db_writer.start()
+    tasks.start_worker()
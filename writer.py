@@ -0,0 +1,303 @@
+"""
+Écrivain unique de Sport Connect : sérialise les écritures SQLite d'un processus
+SQLite n'accepte qu'un écrivain à la fois. Plutôt que chaque route ouvre sa
+transaction et espère obtenir le verrou, les écritures sont des fonctions
+`f(conn, *args)` confiées à un thread écrivain par processus :
+
+- le thread vide la file par lots (WRITER_MAX_BATCH) et exécute tout le lot dans
+  une seule transaction BEGIN IMMEDIATE, donc un seul COMMIT (commit groupé) ;
+- chaque fonction tourne dans son SAVEPOINT : une exception n'annule que ses
+  propres écritures et est relancée chez l'appelant, via son Future ;
+- si la base est verrouillée (autre processus), BEGIN / COMMIT sont retentés
+  avec un délai exponentiel aléatoire (jitter) jusqu'à WRITER_BUSY_SECONDS ;
+- la connexion de l'écrivain passe la base en WAL (WRITER_WAL) : les lectures
+  ne bloquent plus le COMMIT, et inversement.
+
+    new_points = db_writer.run(apply_points, user_id, 50)
+
+La fonction s'exécute dans le contexte (contextvars) de l'appelant : ses requêtes
+SQL sont comptées dans les statistiques de la requête HTTP (perf.py).
+
+Variables d'environnement :
+    WRITER (thread, 'off' pour écrire dans le thread appelant), WRITER_MAX_BATCH (64),
+    WRITER_BUSY_SECONDS (10), WRITER_WAL (on, 'off' pour garder le mode de journal actuel)
+"""
+
+from concurrent.futures import Future
+import atexit
+import contextvars
+import logging
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+
+from db import connect_db
+from metrics import count_writer_busy_retry, observe_writer_batch
+
+logger = logging.getLogger('sportconnect.writer')
+
+MODE = os.environ.get('WRITER', 'thread').lower()
+# Écritures regroupées au plus dans une même transaction
+MAX_BATCH = int(os.environ.get('WRITER_MAX_BATCH', 64))
+# Abandon (erreur 'database is locked' relancée) après ce délai de tentatives
+BUSY_SECONDS = float(os.environ.get('WRITER_BUSY_SECONDS', 10))
+WAL = os.environ.get('WRITER_WAL', 'on').lower() not in ('0', 'off', 'false', 'no')
+# Délai entre deux tentatives : min(BACKOFF_CAP, BACKOFF_BASE * 2^n), tiré entre 50 % et 100 %
+BACKOFF_BASE = 0.001
+BACKOFF_CAP = 0.05
+
+_STOP = object()
+
+# BEGIN / SAVEPOINT / COMMIT hors instrumentation (perf.py) : un verrou retenté ici
+# n'est pas une erreur 'database is locked' pour les métriques
+_control = sqlite3.Connection.execute
+
+
+def is_busy(error):
+    """Erreur de verrou SQLite ('database is locked', 'database table is locked', busy)"""
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ('locked' in message or 'busy' in message)
+
+
+def backoff(attempt):
+    """Délai (s) avant la tentative suivante : exponentiel, plafonné, avec jitter"""
+    delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class _Busy(Exception):
+    """Une fonction du lot a rencontré le verrou : tout le lot est rejoué"""
+
+    def __init__(self, error):
+        super().__init__(str(error))
+        self.error = error
+
+
+class SingleWriter:
+    """File d'écritures d'une base, consommée par un thread (un par processus)"""
+
+    def __init__(self, db_path, mode=None, max_batch=None, busy_seconds=None, wal=None):
+        self.db_path = db_path
+        self.mode = MODE if mode is None else mode
+        self.wal = WAL if wal is None else wal
+        self.max_batch = MAX_BATCH if max_batch is None else max_batch
+        self.busy_seconds = BUSY_SECONDS if busy_seconds is None else busy_seconds
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._reset()
+
+    def _reset(self):
+        # Après un fork, le thread du parent n'existe plus : nouvelle file, nouveau thread
+        self._pid = os.getpid()
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self.batches = 0
+        self.writes = 0
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = connect_db(self.db_path)
+            conn.isolation_level = None  # BEGIN / COMMIT explicites
+            conn.execute('PRAGMA busy_timeout = 0')  # attente gérée par backoff()
+            if self.wal:
+                try:
+                    conn.execute('PRAGMA journal_mode=WAL')
+                    conn.execute('PRAGMA synchronous=NORMAL')
+                except sqlite3.OperationalError:
+                    logger.warning("Passage en WAL impossible (base verrouillée), nouvel essai à la prochaine connexion")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # ===========================
+    # CÔTÉ APPELANT
+    # ===========================
+
+    def submit(self, fn, *args):
+        """
+        Met une écriture en file
+
+        Args:
+            fn: Fonction appelée avec (connexion, *args) ; elle ne doit pas faire de commit
+
+        Returns:
+            Future: Résultat de fn, ou son exception
+        """
+        future = Future()
+        if getattr(self._local, 'active', False):
+            # Écriture imbriquée (une fonction du lot en appelle une autre) : même transaction
+            try:
+                future.set_result(fn(self._connection(), *args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        item = (fn, args, contextvars.copy_context(), future)
+        if self.mode != 'thread':
+            self._execute([item])
+            return future
+        self._ensure_thread()
+        self._queue.put(item)
+        return future
+
+    def run(self, fn, *args):
+        """submit() puis attente du résultat (l'exception de fn est relancée ici)"""
+        return self.submit(fn, *args).result()
+
+    def start(self):
+        """Démarre le thread et sa connexion sans attendre la première écriture (worker neuf)"""
+        if self.mode == 'thread':
+            self._ensure_thread()
+
+    def _ensure_thread(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name='sqlite-writer', daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=None):
+        """Traite les écritures déjà en file puis arrête le thread"""
+        thread = self._thread
+        if thread is None or not thread.is_alive() or self._pid != os.getpid():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def status(self):
+        thread = self._thread
+        return {
+            'mode': self.mode,
+            'alive': bool(thread and thread.is_alive() and self._pid == os.getpid()),
+            'batches': self.batches,
+            'writes': self.writes,
+        }
+
+    # ===========================
+    # THREAD ÉCRIVAIN
+    # ===========================
+
+    def _loop(self):
+        # Connexion (et passage en WAL) ouverte dès le démarrage du thread
+        self._connection()
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stopping = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._execute(batch)
+            if stopping:
+                return
+
+    def _execute(self, batch):
+        """Exécute le lot dans une transaction, en rejouant tant que la base est verrouillée"""
+        conn = self._connection()
+        self._local.active = True
+        try:
+            outcomes = self._retry(conn, batch)
+        except sqlite3.OperationalError as e:
+            logger.error("Lot d'écritures abandonné", extra={'batch': len(batch), 'error': str(e)})
+            outcomes = [(False, e)] * len(batch)
+        except BaseException as e:
+            for _, _, _, future in batch:
+                future.set_exception(e)
+            raise
+        else:
+            self.batches += 1
+            self.writes += len(batch)
+            observe_writer_batch(len(batch))
+        finally:
+            self._local.active = False
+
+        for (_, _, _, future), (ok, value) in zip(batch, outcomes):
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def _retry(self, conn, batch):
+        deadline = time.monotonic() + self.busy_seconds
+        attempt = 0
+        while True:
+            try:
+                return self._apply(conn, batch, deadline)
+            except (sqlite3.OperationalError, _Busy) as e:
+                error = e.error if isinstance(e, _Busy) else e
+                if conn.in_transaction:
+                    _control(conn, 'ROLLBACK')
+                if not is_busy(error) or time.monotonic() >= deadline:
+                    raise error
+                count_writer_busy_retry()
+                time.sleep(backoff(attempt))
+                attempt += 1
+            except BaseException:
+                if conn.in_transaction:
+                    _control(conn, 'ROLLBACK')
+                raise
+
+    def _apply(self, conn, batch, deadline):
+        _control(conn, 'BEGIN IMMEDIATE')
+        outcomes = []
+        for fn, args, context, _ in batch:
+            _control(conn, 'SAVEPOINT write')
+            try:
+                result = context.run(fn, conn, *args)
+            except Exception as e:
+                if is_busy(e):
+                    raise _Busy(e)
+                _control(conn, 'ROLLBACK TO write')
+                _control(conn, 'RELEASE write')
+                outcomes.append((False, e))
+            else:
+                _control(conn, 'RELEASE write')
+                outcomes.append((True, result))
+
+        # Un COMMIT refusé laisse la transaction ouverte : on le retente sans rejouer le lot
+        attempt = 0
+        while True:
+            try:
+                _control(conn, 'COMMIT')
+                return outcomes
+            except sqlite3.OperationalError as e:
+                if not is_busy(e) or time.monotonic() >= deadline:
+                    raise
+                count_writer_busy_retry()
+                time.sleep(backoff(attempt))
+                attempt += 1
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def writer_for(db_path):
+    """Écrivain unique de cette base pour le processus"""
+    with _writers_lock:
+        if db_path not in _writers:
+            _writers[db_path] = SingleWriter(db_path)
+        return _writers[db_path]
+
+
+@atexit.register
+def stop_writers():
+    """Arrêt du processus : les écritures en file sont validées avant de quitter"""
+    for db_writer in list(_writers.values()):
+        db_writer.stop(BUSY_SECONDS)
@@ -0,0 +1,12 @@
+"""
+Point d'entrée WSGI de production de Sport Connect
+Usage : gunicorn (configuration lue dans gunicorn.conf.py, qui désigne wsgi:app)
+
+L'application est créée puis préchauffée (warmup.py) à l'import : avec
+preload_app, une seule fois dans le maître, avant le fork des workers.
+"""
+
+from app import app
+from warmup import warm_up
+
+warm_up(app)